@@ -38,6 +38,7 @@ from edxval.api import (
 )
 
 from cms.djangoapps.models.settings.course_grading import CourseGradingModel
+from common.djangoapps.static_replace import invalidate_course_asset_version
 from cms.lib.xblock.upstream_sync import UpstreamLink, UpstreamLinkException
 from cms.lib.xblock.upstream_sync_block import fetch_customizable_fields_from_block
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
@@ -751,6 +752,7 @@ def _import_file_into_course(
         if thumbnail_content is not None:
             content.thumbnail_location = thumbnail_location
         contentstore().save(content)
+        invalidate_course_asset_version(course_key)
         return True, {clipboard_file_path: filename if not import_path else f"static/{import_path}"}
     elif current_file.content_digest == file_data_obj.md5_hash:
         # The file already exists and matches exactly, so no action is needed
@@ -53,7 +53,10 @@ from cms.djangoapps.contentstore.courseware_index import (
     SearchIndexingError
 )
 from cms.djangoapps.contentstore.storage import course_import_export_storage
-from cms.djangoapps.contentstore.toggles import enable_course_optimizer_check_prev_run_links
+from cms.djangoapps.contentstore.toggles import (
+    enable_course_optimizer_check_prev_run_links,
+    stream_export_tarball_enabled,
+)
 from cms.djangoapps.contentstore.utils import (
     IMPORTABLE_FILE_TYPES,
     contains_course_reference,
@@ -68,7 +71,7 @@ from cms.djangoapps.contentstore.utils import (
 from cms.djangoapps.contentstore.xblock_storage_handlers.view_handlers import get_block_info
 from cms.djangoapps.models.settings.course_metadata import CourseMetadata
 from common.djangoapps.course_action_state.models import CourseRerunState
-from common.djangoapps.static_replace import replace_static_urls
+from common.djangoapps.static_replace import invalidate_course_asset_version, replace_static_urls
 from common.djangoapps.student.auth import has_course_author_access
 from common.djangoapps.student.roles import CourseInstructorRole, CourseStaffRole, LibraryUserRole
 from common.djangoapps.util.monitoring import monitor_import_failure
@@ -410,23 +413,21 @@ def create_export_tarball(course_block, course_key, context, status=None):
     name = course_block.url_name
     export_file = NamedTemporaryFile(prefix=name + '.',
                                      suffix=".tar.gz")  # lint-amnesty, pylint: disable=consider-using-with
-    root_dir = path(mkdtemp())
+    stream_tarball = stream_export_tarball_enabled()
+    root_dir = None if stream_tarball else path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        if stream_tarball:
+            LOGGER.debug('tar file being streamed to %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                _export_to_xml(course_block, course_key, None, name, tar_file=tar_file)
+                _set_compressing_state(course_key, status)
         else:
-            set_custom_attribute("exporting_course_to_xml_started", str(course_key))
-            export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
-
-            set_custom_attribute("exporting_course_to_xml_completed", str(course_key))
-        if status:
-            status.set_state('Compressing')
-            set_custom_attribute("compressing_started", str(course_key))
-            status.increment_completed_steps()
-        LOGGER.debug('tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            _export_to_xml(course_block, course_key, root_dir, name)
+            _set_compressing_state(course_key, status)
+            LOGGER.debug('tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
@@ -460,13 +461,36 @@ def create_export_tarball(course_block, course_key, context, status=None):
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
     finally:
-        if os.path.exists(root_dir / name):
+        if root_dir is not None and os.path.exists(root_dir / name):
             shutil.rmtree(root_dir / name)
 
     set_custom_attribute("compressing_completed", str(course_key))
     return export_file
 
 
+def _export_to_xml(course_block, course_key, root_dir, name, tar_file=None):
+    """
+    Exports the course or library to the `name` directory of `root_dir`, or of `tar_file` if given.
+    """
+    if isinstance(course_key, LibraryLocator):
+        export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name, tar_file=tar_file)
+    else:
+        set_custom_attribute("exporting_course_to_xml_started", str(course_key))
+        export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name, tar_file=tar_file)
+
+        set_custom_attribute("exporting_course_to_xml_completed", str(course_key))
+
+
+def _set_compressing_state(course_key, status):
+    """
+    Moves the export task status, if any, to its compressing step.
+    """
+    if status:
+        status.set_state('Compressing')
+        set_custom_attribute("compressing_started", str(course_key))
+        status.increment_completed_steps()
+
+
 class CourseImportTask(UserTask):  # pylint: disable=abstract-method
     """
     Base class for course and library import tasks.
@@ -732,6 +756,7 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
         self.status.increment_completed_steps()
         LOGGER.info(f'{log_prefix}: Extracted file verified. Updating course started')
 
+        stage_timings = {}
         courselike_items = import_func(
             modulestore(), user.id,
             settings.GITHUB_REPO_ROOT, [dirpath],
@@ -739,10 +764,20 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             static_content_store=contentstore(),
             target_id=courselike_key,
             verbose=True,
+            static_content_workers=settings.COURSE_IMPORT_STATIC_CONTENT_WORKERS,
+            stage_timings=stage_timings,
+        )
+        LOGGER.info(f'{log_prefix}: Import stage timings: {stage_timings}')
+        UserTaskArtifact.objects.create(
+            status=self.status,
+            name='ImportTimings',
+            text=json.dumps({stage: round(duration, 3) for stage, duration in stage_timings.items()}),
         )
 
         new_location = courselike_items[0].location
         LOGGER.debug('new course at %s', new_location)
+        # The imported assets may have replaced existing ones.
+        invalidate_course_asset_version(courselike_key)
 
         LOGGER.info(f'{log_prefix}: Course import successful')
         set_custom_attribute('course_import_completed', True)
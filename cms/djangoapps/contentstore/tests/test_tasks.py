@@ -4,6 +4,7 @@ Unit tests for course import and export Celery tasks
 import copy
 import json
 import logging
+import tarfile
 from unittest import mock
 from unittest.mock import AsyncMock, patch, MagicMock
 from uuid import uuid4
@@ -21,17 +22,21 @@ from organizations.tests.factories import OrganizationFactory
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
 from cms.djangoapps.contentstore.tests.test_libraries import LibraryTestCase
+from cms.djangoapps.contentstore.toggles import STREAM_EXPORT_TARBALL
 from cms.djangoapps.contentstore.tests.utils import CourseTestCase
 from common.djangoapps.course_action_state.models import CourseRerunState
 from common.djangoapps.student.tests.factories import UserFactory
 from openedx.core.djangoapps.course_apps.toggles import EXAMS_IDA
 from openedx.core.djangoapps.embargo.models import Country, CountryAccessRule, RestrictedCourse
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, BlockFactory  # lint-amnesty, pylint: disable=wrong-import-order
 from ..tasks import (
     LinkState,
+    create_export_tarball,
     export_olx,
     update_special_exams_and_publish,
     rerun_course,
@@ -76,6 +81,39 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
+    def test_streamed_tarball(self):
+        """
+        Verify that a tarball streamed without a temporary directory has the same files as a compressed export
+        """
+        BlockFactory.create(parent=self.course, category='html', display_name='Streamed HTML')
+        asset_key = StaticContent.compute_location(self.course.id, 'streamed.txt')
+        contentstore().save(StaticContent(asset_key, 'streamed.txt', 'text/plain', b'streamed asset'))
+        course = self.store.get_course(self.course.id)
+
+        tarball_files = {}
+        for stream_tarball in (False, True):
+            with override_waffle_flag(STREAM_EXPORT_TARBALL, active=stream_tarball):
+                tarball = create_export_tarball(course, self.course.id, {})
+            with tarfile.open(tarball.name) as tar_file:
+                tarball_files[stream_tarball] = {
+                    member.name: tar_file.extractfile(member).read() for member in tar_file if member.isfile()
+                }
+
+        self.assertEqual(tarball_files[True], tarball_files[False])
+        self.assertEqual(tarball_files[True][f'{course.url_name}/static/streamed.txt'], b'streamed asset')
+
+    @override_waffle_flag(STREAM_EXPORT_TARBALL, active=True)
+    def test_streamed_tarball_success(self):
+        """
+        Verify that a course export task streaming its tarball succeeds
+        """
+        key = str(self.course.location.course_key)
+        result = export_olx.delay(self.user.id, key, 'en')
+        status = UserTaskStatus.objects.get(task_id=result.id)
+        self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+        artifacts = UserTaskArtifact.objects.filter(status=status)
+        self.assertEqual([artifact.name for artifact in artifacts], ['Output'])
+
     @mock.patch('cms.djangoapps.contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
@@ -136,6 +174,18 @@ class ExportLibraryTestCase(LibraryTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
+    @override_waffle_flag(STREAM_EXPORT_TARBALL, active=True)
+    def test_streamed_tarball_success(self):
+        """
+        Verify that a library export task streaming its tarball succeeds
+        """
+        key = str(self.lib_key)
+        result = export_olx.delay(self.user.id, key, 'en')
+        status = UserTaskStatus.objects.get(task_id=result.id)
+        self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+        artifacts = UserTaskArtifact.objects.filter(status=status)
+        self.assertEqual([artifact.name for artifact in artifacts], ['Output'])
+
 
 @override_settings(CONTENTSTORE=TEST_DATA_CONTENTSTORE)
 class RerunCourseTaskTestCase(CourseTestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
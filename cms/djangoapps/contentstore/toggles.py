@@ -542,3 +542,28 @@ def enable_course_optimizer_check_prev_run_links(course_key):
     Returns a boolean if previous run course optimizer feature is enabled for the given course.
     """
     return ENABLE_COURSE_OPTIMIZER_CHECK_PREV_RUN_LINKS.is_enabled(course_key)
+
+
+# .. toggle_name: contentstore.stream_export_tarball
+# .. toggle_implementation: WaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled, course and library exports are written straight into their .tar.gz archive:
+#   the OLX is built in memory and the static assets are streamed into the archive from the contentstore, rather
+#   than exporting everything to a temporary directory and compressing that directory afterwards.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+# .. toggle_warning: The OLX of the exported course, which excludes its static assets, is held in memory until the
+#   end of the export.
+STREAM_EXPORT_TARBALL = WaffleFlag(
+    f'{CONTENTSTORE_NAMESPACE}.stream_export_tarball',
+    __name__,
+    CONTENTSTORE_LOG_PREFIX,
+)
+
+
+def stream_export_tarball_enabled():
+    """
+    Returns whether exports are streamed straight into their tarball.
+    """
+    return STREAM_EXPORT_TARBALL.is_enabled()
@@ -20,6 +20,7 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, upload_f
 from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory, ToyCourseFactory, LibraryFactory
 
 from cms.djangoapps.contentstore.utils import reverse_usage_url
+from common.djangoapps.static_replace import get_course_asset_version
 from openedx.core.djangoapps.content_libraries import api as library_api
 from openedx.core.djangoapps.content_tagging import api as tagging_api
 
@@ -377,12 +378,15 @@ class ClipboardPasteTestCase(ModuleStoreTestCase):
         assert copy_response.status_code == 200
 
         # Paste the video
+        asset_version = get_course_asset_version(dest_course_key)
         dest_parent_key = dest_course_key.make_usage_key("vertical", "vertical_test")
         paste_response = client.post(XBLOCK_ENDPOINT, {
             "parent_locator": str(dest_parent_key),
             "staged_content": "clipboard",
         }, format="json")
         assert paste_response.status_code == 200
+        # The text of the course cached with its static urls replaced is invalidated by the new file:
+        assert get_course_asset_version(dest_course_key) != asset_version
         static_file_notices = paste_response.json()["static_file_notices"]
         assert static_file_notices == {
             "error_files": [],
@@ -28,7 +28,7 @@ from milestones.tests.utils import MilestonesTestCaseMixin
 from opaque_keys.edx.locator import LibraryLocator
 from path import Path as path
 from storages.backends.s3boto3 import S3Boto3Storage
-from user_tasks.models import UserTaskStatus
+from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
 from cms.djangoapps.contentstore import toggles
 from cms.djangoapps.contentstore import errors as import_error
@@ -323,6 +323,18 @@ class ImportTestCase(CourseTestCase):
         self.assertFalse(CourseInstructorRole(self.course.id).has_user(nonstaff_user))
         self.assertTrue(CourseStaffRole(self.course.id).has_user(nonstaff_user))
 
+    def test_import_stage_timings(self):
+        """
+        Check that the durations of the stages of an import are stored in an artifact of its task.
+        """
+        response = self.import_file_in_course(self.good_tar)
+        self.assertEqual(response.status_code, 200)
+
+        artifact = UserTaskArtifact.objects.get(name='ImportTimings', status__user=self.user)
+        stage_timings = json.loads(artifact.text)
+        for stage in ('parsing', 'courselike', 'static_content', 'asset_metadata', 'children', 'drafts'):
+            self.assertGreaterEqual(stage_timings[stage], 0)
+
     ## Unsafe tar methods #####################################################
     # Each of these methods creates a tarfile with a single type of unsafe
     # content.
@@ -1287,6 +1287,15 @@ MEILISEARCH_PUBLIC_URL = "http://meilisearch.example.com"
 MEILISEARCH_INDEX_PREFIX = ""
 MEILISEARCH_API_KEY = "devkey"
 
+# .. setting_name: MEILISEARCH_REBUILD_MAX_PENDING_TASKS
+# .. setting_default: 2
+# .. setting_description: Number of batches of course documents that rebuilding the Meilisearch index leaves
+#   Meilisearch to index while it goes on generating the documents of the next courses. Meilisearch indexes the
+#   batches of an index one at a time, so a couple of pending batches are enough to keep it busy: more only hold
+#   more documents in its task queue. With 0, the rebuild waits for each batch to be indexed, which is slower but
+#   lets an interrupted incremental rebuild skip every course it has enqueued.
+MEILISEARCH_REBUILD_MAX_PENDING_TASKS = 2
+
 # .. setting_name: LIBRARY_ENABLED_BLOCKS
 # .. setting_default: ['problem', 'video', 'html', 'drag-and-drop-v2']
 # .. setting_description: List of block types that are ready/enabled to be created/used
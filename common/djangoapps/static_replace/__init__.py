@@ -1,9 +1,12 @@
 # lint-amnesty, pylint: disable=missing-module-docstring
 
+import hashlib
 import logging
 import re
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.staticfiles import finders
 from django.contrib.staticfiles.storage import staticfiles_storage
 from opaque_keys.edx.locator import AssetLocator
@@ -12,6 +15,7 @@ from xmodule.contentstore.content import StaticContent
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock/'
+STATIC_REPLACE_CACHE_KEY_PREFIX = 'static_replace'
 
 
 def _url_replace_regex(prefix):
@@ -176,6 +180,39 @@ def replace_static_urls(
     if static_paths_out is None:
         static_paths_out = []
 
+    data_dir = static_asset_path or data_directory
+    staticfiles_exists = {}
+
+    def exists_in_staticfiles_storage(path):
+        """
+        Returns whether the given path exists in the static file pipeline, checking it once per path.
+        """
+        if path not in staticfiles_exists:
+            try:
+                staticfiles_exists[path] = staticfiles_storage.exists(path)
+            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+                log.warning("staticfiles_storage couldn't find path {}: {}".format(
+                    path, str(err)))
+                staticfiles_exists[path] = False
+        return staticfiles_exists[path]
+
+    if (not static_asset_path) and course_id and not lookup_asset_url:
+        # Find all the course assets referenced by the text first, so that they can be
+        # looked up in the contentstore with a single query rather than one per url.
+        asset_paths = []
+
+        def collect_asset_path(original, prefix, quote, rest):  # pylint: disable=unused-argument
+            """
+            Collect a single matched url which references a course asset.
+            """
+            if not rest.endswith('?raw') and not exists_in_staticfiles_storage(rest):
+                asset_paths.append(rest)
+            return original
+
+        process_static_urls(text, collect_asset_path, data_dir=data_dir)
+        if asset_paths:
+            StaticContent.prefetch_asset_metadata(course_id, asset_paths)
+
     def replace_static_url(original, prefix, quote, rest):
         """
         Replace a single matched url.
@@ -200,14 +237,7 @@ def replace_static_urls(
             # first look in the static file pipeline and see if we are trying to reference
             # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
-                log.warning("staticfiles_storage couldn't find path {}: {}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
+            if exists_in_staticfiles_storage(rest):
                 url = staticfiles_storage.url(rest)
             else:
                 # if not, then assume it's courseware specific content and then look in the
@@ -239,4 +269,55 @@ def replace_static_urls(
         static_paths_out.append((original_uri, url))
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return process_static_urls(text, replace_static_url, data_dir=data_dir)
+
+
+def _course_asset_version_key(course_key):
+    """
+    Returns the key caching the version of the assets of the given course.
+    """
+    return f'{STATIC_REPLACE_CACHE_KEY_PREFIX}.asset_version.{course_key}'
+
+
+def get_course_asset_version(course_key):
+    """
+    Returns an opaque version of the assets of the given course, which changes
+    whenever invalidate_course_asset_version is called for the course.
+    """
+    return cache.get_or_set(_course_asset_version_key(course_key), lambda: uuid4().hex, None)
+
+
+def invalidate_course_asset_version(course_key):
+    """
+    Changes the version of the assets of the given course, so that text of the
+    course cached with its urls replaced isn't used anymore.
+
+    This must be called whenever assets of the course are added, updated,
+    deleted, locked or unlocked.
+    """
+    cache.set(_course_asset_version_key(course_key), uuid4().hex, None)
+
+
+def static_replace_cache_key(text, course_key, *args):
+    """
+    Returns the key caching the given text of the given course with its urls
+    replaced, given any other arguments of the replacement.
+
+    The key also depends on the version of the course assets and on the
+    configuration of asset urls, so that changes to either invalidate it.
+    """
+    # Import is placed here to avoid model import at project startup.
+    from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+    key_parts = [
+        text,
+        str(course_key),
+        get_course_asset_version(course_key),
+        AssetBaseUrlConfig.get_base_url(),
+        ' '.join(AssetExcludedExtensionsConfig.get_excluded_extensions()),
+        str(settings.STATIC_URL),
+        # Changes when static files are collected, for storages with a manifest.
+        str(getattr(staticfiles_storage, 'manifest_hash', '')),
+    ]
+    key_parts.extend(str(arg) for arg in args)
+    digest = hashlib.sha1('\0'.join(key_parts).encode('utf-8')).hexdigest()
+    return f'{STATIC_REPLACE_CACHE_KEY_PREFIX}.{digest}'
@@ -2,12 +2,15 @@
 Supports replacement of static/course/jump-to-id URLs to absolute URLs in XBlocks.
 """
 
+from django.conf import settings
+from django.core.cache import cache
 from xblock.reference.plugins import Service
 
 from common.djangoapps.static_replace import (
     replace_course_urls,
     replace_jump_to_id_urls,
-    replace_static_urls
+    replace_static_urls,
+    static_replace_cache_key
 )
 
 
@@ -52,18 +55,35 @@ class ReplaceURLService(Service):
         """
         block = self.xblock()
         if self.lookup_asset_url:
-            text = replace_static_urls(text, xblock=block, lookup_asset_url=self.lookup_asset_url)
-        else:
-            text = replace_static_urls(
-                text,
-                data_directory=getattr(block, 'data_dir', None),
-                course_id=block.scope_ids.usage_id.context_key,
-                static_asset_path=self.static_asset_path or block.static_asset_path,
-                static_paths_out=self.static_paths_out
+            return replace_static_urls(text, xblock=block, lookup_asset_url=self.lookup_asset_url)
+
+        course_key = block.scope_ids.usage_id.context_key
+        data_directory = getattr(block, 'data_dir', None)
+        static_asset_path = self.static_asset_path or block.static_asset_path
+
+        # The replacement only depends on the text, the course and its assets, so its result can be
+        # cached, unless the static urls have to be collected in static_paths_out as it goes.
+        cache_key = None
+        if settings.STATIC_REPLACE_CACHE_TIMEOUT and self.static_paths_out is None:
+            cache_key = static_replace_cache_key(
+                text, course_key, data_directory, static_asset_path, static_replace_only, self.jump_to_id_base_url
             )
-            if not static_replace_only:
-                text = replace_course_urls(text, block.scope_ids.usage_id.context_key)
-                if self.jump_to_id_base_url:
-                    text = replace_jump_to_id_urls(text, block.scope_ids.usage_id.context_key, self.jump_to_id_base_url)
+            cached_text = cache.get(cache_key)
+            if cached_text is not None:
+                return cached_text
+
+        text = replace_static_urls(
+            text,
+            data_directory=data_directory,
+            course_id=course_key,
+            static_asset_path=static_asset_path,
+            static_paths_out=self.static_paths_out
+        )
+        if not static_replace_only:
+            text = replace_course_urls(text, course_key)
+            if self.jump_to_id_base_url:
+                text = replace_jump_to_id_urls(text, course_key, self.jump_to_id_base_url)
 
+        if cache_key is not None:
+            cache.set(cache_key, text, settings.STATIC_REPLACE_CACHE_TIMEOUT)
         return text
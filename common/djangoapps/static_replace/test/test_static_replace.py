@@ -4,10 +4,12 @@ from functools import partial
 import re
 from io import BytesIO
 from unittest.mock import Mock, patch
+from uuid import uuid4
 from urllib.parse import parse_qsl, quote, urlparse, urlunparse, urlencode
 
 import ddt
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import override_settings
 from opaque_keys.edx.keys import CourseKey
 from PIL import Image
@@ -15,6 +17,7 @@ from web_fragments.fragment import Fragment
 
 from common.djangoapps.static_replace import (
     _url_replace_regex,
+    invalidate_course_asset_version,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
@@ -24,7 +27,7 @@ from common.djangoapps.static_replace import (
 from common.djangoapps.static_replace.services import ReplaceURLService
 from common.djangoapps.static_replace.wrapper import replace_urls_wrapper
 from xmodule.assetstore.assetmgr import AssetManager  # lint-amnesty, pylint: disable=wrong-import-order
-from xmodule.contentstore.content import StaticContent  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.contentstore.content import VERSIONED_ASSETS_PREFIX, StaticContent  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.contentstore.django import contentstore  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.exceptions import NotFoundError  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore import ModuleStoreEnum  # lint-amnesty, pylint: disable=wrong-import-order
@@ -602,6 +605,28 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             asset_path = StaticContent.get_canonicalized_asset_path(self.courses[prefix].id, start, base_url, exts)
             assert re.match(expected, asset_path) is not None
 
+    def test_prefetch_asset_metadata(self):
+        """
+        Test that canonicalizing the paths of prefetched assets doesn't query the contentstore again.
+        """
+        course_key = self.courses['split'].id
+        paths = ['split_ünlöck.png', 'split_lock.png', 'special/split_ünlöck.png', 'split_missing.png']
+        expected = [StaticContent.get_canonicalized_asset_path(course_key, path, 'dev', []) for path in paths]
+
+        with check_mongo_calls(1):
+            StaticContent.prefetch_asset_metadata(course_key, paths)
+            assert [StaticContent.get_canonicalized_asset_path(course_key, path, 'dev', []) for path in paths] ==\
+                expected
+
+    def test_replace_static_urls_single_query(self):
+        """
+        Test that all the assets referenced by a text are looked up with a single query.
+        """
+        text = '"/static/split_ünlöck.png" "/static/split_lock.png" "/static/special/split_ünlöck.png"'
+        with check_mongo_calls(1):
+            replaced_text = replace_static_urls(text, course_id=self.courses['split'].id)
+        assert replaced_text.count(f'"{VERSIONED_ASSETS_PREFIX}/') == 3
+
 
 class ReplaceURLServiceTest(SharedModuleStoreTestCase):
     """
@@ -732,3 +757,66 @@ class TestReplaceURLWrapper(SharedModuleStoreTestCase):
         assert isinstance(test_replace, Fragment)
         assert test_replace.content == replace_static_urls(fragment.content, course_id=self.course.id)
         assert test_replace.content == '<a href="/asset-v1:TestX+TS02+2015+type@asset+block/id">'
+
+
+@override_settings(STATIC_REPLACE_CACHE_TIMEOUT=60)
+class ReplaceURLServiceCacheTest(SharedModuleStoreTestCase):
+    """
+    Tests the caching of text with replaced urls by ReplaceURLService.
+    """
+    TEXT = '<a href="/course/id"><img src="/static/id.png">'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.course = CourseFactory.create(org='TestX', number='TS03', run='2015')
+
+    def setUp(self):
+        super().setUp()
+        test_cache = LocMemCache(uuid4().hex, {})
+        for module in ('common.djangoapps.static_replace', 'common.djangoapps.static_replace.services'):
+            patcher = patch(f'{module}.cache', test_cache)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = patch(
+            'common.djangoapps.static_replace.services.replace_static_urls', wraps=replace_static_urls
+        )
+        self.mock_replace_static_urls = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached_text(self):
+        replace_url_service = ReplaceURLService(xblock=self.course)
+        replaced_text = replace_url_service.replace_urls(self.TEXT)
+        assert replaced_text == (
+            '<a href="/courses/course-v1:TestX+TS03+2015/id">'
+            '<img src="/asset-v1:TestX+TS03+2015+type@asset+block/id.png">'
+        )
+        assert replace_url_service.replace_urls(self.TEXT) == replaced_text
+        assert self.mock_replace_static_urls.call_count == 1
+
+        # Other arguments of the replacement aren't served the same cached text.
+        assert replace_url_service.replace_urls(self.TEXT, static_replace_only=True) != replaced_text
+        assert self.mock_replace_static_urls.call_count == 2
+
+    def test_asset_changes_invalidate_cached_text(self):
+        replace_url_service = ReplaceURLService(xblock=self.course)
+        replace_url_service.replace_urls(self.TEXT)
+        invalidate_course_asset_version(self.course.id)
+        replace_url_service.replace_urls(self.TEXT)
+        assert self.mock_replace_static_urls.call_count == 2
+
+    def test_static_paths_out_not_cached(self):
+        static_paths = []
+        replace_url_service = ReplaceURLService(xblock=self.course, static_paths_out=static_paths)
+        replace_url_service.replace_urls(self.TEXT)
+        replace_url_service.replace_urls(self.TEXT)
+        assert self.mock_replace_static_urls.call_count == 2
+        assert len(static_paths) == 2
+
+    @override_settings(STATIC_REPLACE_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        replace_url_service = ReplaceURLService(xblock=self.course)
+        replace_url_service.replace_urls(self.TEXT)
+        replace_url_service.replace_urls(self.TEXT)
+        assert self.mock_replace_static_urls.call_count == 2
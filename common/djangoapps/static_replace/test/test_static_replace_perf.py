@@ -0,0 +1,81 @@
+"""
+Performance test comparing the replacement of urls in the HTML of real courses
+by ReplaceURLService, with and without STATIC_REPLACE_CACHE_TIMEOUT.
+"""
+
+
+import glob
+import os
+import time
+import unittest
+from statistics import median
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.test.utils import override_settings
+
+from common.djangoapps.static_replace.services import ReplaceURLService
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+# The HTML of the blocks of the test courses.
+HTML_FILES_PATTERN = os.path.join(settings.COMMON_ROOT, 'test', 'data', '*', 'html', '*.html')
+
+# Number of timed renders of all the HTML per measurement.
+REPEATS = 20
+
+
+@unittest.skip
+class TestStaticReplaceTimings(SharedModuleStoreTestCase):
+    """
+    This class exists to measure the duration of the replacement of urls in
+    the HTML of real courses, with and without the static replacement cache.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.course = CourseFactory.create()
+        cls.html_texts = []
+        for html_file in sorted(glob.glob(HTML_FILES_PATTERN)):
+            with open(html_file, encoding='utf-8') as f:
+                cls.html_texts.append(f.read())
+
+    def _measure(self):
+        """
+        Returns the median duration, in milliseconds, of the replacement of
+        urls in all the HTML.
+        """
+        replace_url_service = ReplaceURLService(xblock=self.course, jump_to_id_base_url='/jump_to_id/')
+        timings = []
+        for __ in range(REPEATS):
+            start = time.perf_counter()
+            for text in self.html_texts:
+                replace_url_service.replace_urls(text)
+            timings.append((time.perf_counter() - start) * 1000)
+        return median(timings)
+
+    def test_replace_urls_timings(self):
+        """
+        Generate replace_urls timings with and without the cache.
+        """
+        test_cache = LocMemCache(uuid4().hex, {})
+        with patch('common.djangoapps.static_replace.cache', test_cache), \
+                patch('common.djangoapps.static_replace.services.cache', test_cache):
+            results = {}
+            for timeout in (0, 60):
+                with override_settings(STATIC_REPLACE_CACHE_TIMEOUT=timeout):
+                    results[timeout] = self._measure()
+
+        print(
+            "replace_urls:{} html_fragments uncached_ms:{:.1f} cached_ms:{:.1f}".format(
+                len(self.html_texts),
+                results[0],
+                results[60],
+            )
+        )
@@ -14,7 +14,9 @@ file and check it in at the same time as your model changes. To do that,
 import hashlib
 import json
 import logging
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import total_ordering
 from importlib import import_module
@@ -76,6 +78,13 @@ USER_LOGGED_IN_EVENT_NAME = 'edx.user.login'
 USER_LOGGED_OUT_EVENT_NAME = 'edx.user.logout'
 USER_STREAK_UPDATED_EVENT_NAME = "edx.user.celebration.streak_updated"
 
+# Number of users whose anonymous ids are fetched or stored per query by anonymous_ids_for_users.
+ANONYMOUS_IDS_BULK_CHUNK_SIZE = 1000
+
+# Process-local LRU cache of anonymous ids by (user id, course id), sized by ANONYMOUS_USER_ID_CACHE_SIZE.
+_anonymous_user_id_cache = OrderedDict()
+_anonymous_user_id_cache_lock = threading.Lock()
+
 
 class AnonymousUserId(models.Model):
     """
@@ -96,6 +105,74 @@ class AnonymousUserId(models.Model):
     course_id = LearningContextKeyField(db_index=True, max_length=255, blank=True)
 
 
+def _anonymous_user_id_cache_key(user_id, course_id):
+    """
+    Return the key of the anonymous id of a (user id, course_id) pair in the process-local cache.
+    """
+    return (user_id, str(course_id) if course_id else '')
+
+
+def _get_cached_anonymous_user_id(user_id, course_id):
+    """
+    Return the anonymous id of a (user id, course_id) pair from the process-local cache, or None.
+    """
+    if getattr(settings, 'ANONYMOUS_USER_ID_CACHE_SIZE', 0) <= 0:
+        return None
+    key = _anonymous_user_id_cache_key(user_id, course_id)
+    with _anonymous_user_id_cache_lock:
+        anonymous_user_id = _anonymous_user_id_cache.get(key)
+        if anonymous_user_id is not None:
+            _anonymous_user_id_cache.move_to_end(key)
+    return anonymous_user_id
+
+
+def _cache_anonymous_user_id(user, course_id, anonymous_user_id):
+    """
+    Cache the anonymous id of a (user, course_id) pair in the user object and in the process-local cache.
+    """
+    if not hasattr(user, '_anonymous_id'):
+        user._anonymous_id = {}  # pylint: disable=protected-access
+    user._anonymous_id[course_id] = anonymous_user_id  # pylint: disable=protected-access
+
+    max_size = getattr(settings, 'ANONYMOUS_USER_ID_CACHE_SIZE', 0)
+    if max_size <= 0:
+        return
+    key = _anonymous_user_id_cache_key(user.id, course_id)
+    with _anonymous_user_id_cache_lock:
+        _anonymous_user_id_cache[key] = anonymous_user_id
+        _anonymous_user_id_cache.move_to_end(key)
+        while len(_anonymous_user_id_cache) > max_size:
+            _anonymous_user_id_cache.popitem(last=False)
+
+
+def _derive_anonymous_user_id(user_id, course_id):
+    """
+    Return the deterministic anonymous id of a (user id, course_id) pair.
+    """
+    # Uses SECRET_KEY as a cryptographic pepper. This
+    # deterministic ID generation means that concurrent identical
+    # calls to this function return the same value -- no need for
+    # locking. (There may be a low level of integrity errors on
+    # creation as a result of concurrent duplicate row inserts.)
+    #
+    # Consequences for this function of SECRET_KEY exposure: Data
+    # researchers and other third parties receiving these
+    # anonymous user IDs would be able to identify users across
+    # courses, and predict the anonymous user IDs of all users
+    # (but not necessarily identify their accounts.)
+    #
+    # Rotation process of SECRET_KEY with respect to this
+    # function: Rotate at will, since the hashes are stored and
+    # will not change.
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.shake_128()
+    hasher.update(settings.SECRET_KEY.encode('utf8'))
+    hasher.update(str(user_id).encode('utf8'))
+    if course_id:
+        hasher.update(str(course_id).encode('utf-8'))
+    return hasher.hexdigest(16)
+
+
 def anonymous_id_for_user(user, course_id):
     """
     Inputs:
@@ -108,6 +185,8 @@ def anonymous_id_for_user(user, course_id):
     If user is an `AnonymousUser`, returns `None`
     else If this user/course_id pair already has an anonymous id in AnonymousUserId object, return that
     else: create new anonymous_id, save it in AnonymousUserId, and return anonymous id
+
+    Use anonymous_ids_for_users to get the anonymous ids of many users.
     """
 
     # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
@@ -123,6 +202,10 @@ def anonymous_id_for_user(user, course_id):
     monitoring.increment('temp_anon_uid_v2.requested')
 
     cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
+    if cached_id is None:
+        cached_id = _get_cached_anonymous_user_id(user.id, course_id)
+        if cached_id is not None:
+            _cache_anonymous_user_id(user, course_id, cached_id)
     if cached_id is not None:
         monitoring.increment('temp_anon_uid_v2.returned_from_cache')
         return cached_id
@@ -141,28 +224,7 @@ def anonymous_id_for_user(user, course_id):
         anonymous_user_id = anonymous_user_ids[0].anonymous_user_id
         monitoring.increment('temp_anon_uid_v2.fetched_existing')
     else:
-        # Uses SECRET_KEY as a cryptographic pepper. This
-        # deterministic ID generation means that concurrent identical
-        # calls to this function return the same value -- no need for
-        # locking. (There may be a low level of integrity errors on
-        # creation as a result of concurrent duplicate row inserts.)
-        #
-        # Consequences for this function of SECRET_KEY exposure: Data
-        # researchers and other third parties receiving these
-        # anonymous user IDs would be able to identify users across
-        # courses, and predict the anonymous user IDs of all users
-        # (but not necessarily identify their accounts.)
-        #
-        # Rotation process of SECRET_KEY with respect to this
-        # function: Rotate at will, since the hashes are stored and
-        # will not change.
-        # include the secret key as a salt, and to make the ids unique across different LMS installs.
-        hasher = hashlib.shake_128()
-        hasher.update(settings.SECRET_KEY.encode('utf8'))
-        hasher.update(str(user.id).encode('utf8'))
-        if course_id:
-            hasher.update(str(course_id).encode('utf-8'))
-        anonymous_user_id = hasher.hexdigest(16)
+        anonymous_user_id = _derive_anonymous_user_id(user.id, course_id)
 
         try:
             AnonymousUserId.objects.create(
@@ -176,14 +238,75 @@ def anonymous_id_for_user(user, course_id):
             # continue
             monitoring.increment('temp_anon_uid_v2.store_db_error')
 
-    # cache the anonymous_id in the user object
-    if not hasattr(user, '_anonymous_id'):
-        user._anonymous_id = {}  # pylint: disable=protected-access
-    user._anonymous_id[course_id] = anonymous_user_id  # pylint: disable=protected-access
+    _cache_anonymous_user_id(user, course_id, anonymous_user_id)
 
     return anonymous_user_id
 
 
+def anonymous_ids_for_users(users, course_id):
+    """
+    Return the anonymous ids of many users for one course_id, by user id.
+
+    This is the bulk equivalent of anonymous_id_for_user, which returns the
+    same ids: the existing ids of each chunk of users are fetched with one
+    query, and the missing ones are derived and stored with one bulk insert.
+    Anonymous users are left out of the result.
+    """
+    anonymous_user_ids = {}
+    uncached_users = []
+    for user in users:
+        if user.is_anonymous:
+            continue
+        cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
+        if cached_id is None:
+            cached_id = _get_cached_anonymous_user_id(user.id, course_id)
+        if cached_id is None:
+            uncached_users.append(user)
+        else:
+            _cache_anonymous_user_id(user, course_id, cached_id)
+            anonymous_user_ids[user.id] = cached_id
+
+    monitoring.accumulate('temp_anon_uid_v2.requested', len(anonymous_user_ids) + len(uncached_users))
+    monitoring.accumulate('temp_anon_uid_v2.returned_from_cache', len(anonymous_user_ids))
+
+    for start in range(0, len(uncached_users), ANONYMOUS_IDS_BULK_CHUNK_SIZE):
+        chunk = uncached_users[start:start + ANONYMOUS_IDS_BULK_CHUNK_SIZE]
+        # As in anonymous_id_for_user, prefer the ids with the highest record ID.
+        existing_ids = dict(
+            AnonymousUserId.objects.filter(
+                user_id__in=[user.id for user in chunk],
+                course_id=course_id,
+            ).order_by('id').values_list('user_id', 'anonymous_user_id')
+        )
+        new_rows = []
+        for user in chunk:
+            anonymous_user_id = existing_ids.get(user.id)
+            if anonymous_user_id is None:
+                anonymous_user_id = _derive_anonymous_user_id(user.id, course_id)
+                new_rows.append(
+                    AnonymousUserId(user_id=user.id, course_id=course_id, anonymous_user_id=anonymous_user_id)
+                )
+            _cache_anonymous_user_id(user, course_id, anonymous_user_id)
+            anonymous_user_ids[user.id] = anonymous_user_id
+
+        # Rows created concurrently for the same users have the same ids, so conflicts can be ignored.
+        AnonymousUserId.objects.bulk_create(new_rows, ignore_conflicts=True)
+        monitoring.accumulate('temp_anon_uid_v2.fetched_existing', len(existing_ids))
+        monitoring.accumulate('temp_anon_uid_v2.stored', len(new_rows))
+
+    return anonymous_user_ids
+
+
+@receiver(post_delete, sender=AnonymousUserId)
+def _uncache_anonymous_user_id(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remove the anonymous id of a deleted AnonymousUserId from the process-local cache.
+    """
+    key = _anonymous_user_id_cache_key(instance.user_id, instance.course_id)
+    with _anonymous_user_id_cache_lock:
+        _anonymous_user_id_cache.pop(key, None)
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -3,6 +3,7 @@ Miscellaneous tests for the student app.
 """
 
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 from urllib.parse import quote
@@ -30,6 +31,7 @@ from common.djangoapps.student.models import (
     LinkedInAddToProfileConfiguration,
     UserAttribute,
     anonymous_id_for_user,
+    anonymous_ids_for_users,
     unique_id_for_user,
     user_by_anonymous_id
 )
@@ -1129,6 +1131,49 @@ class AnonymousLookupTable(ModuleStoreTestCase):
             assert anonymous_id != new_anonymous_id
             assert self.user == user_by_anonymous_id(new_anonymous_id)
 
+    def test_bulk_anonymous_ids(self):
+        """
+        anonymous_ids_for_users returns the ids of anonymous_id_for_user, existing or new,
+        with one query to fetch them and one to store the new ones.
+        """
+        with override_settings(SECRET_KEY='some_old_secret_key'):
+            old_anonymous_id = anonymous_id_for_user(self.user, self.course.id)
+        users = list(User.objects.filter(id__in=[self.user.id, self.user2.id]))
+
+        with self.assertNumQueries(2):
+            anonymous_ids = anonymous_ids_for_users(users + [AnonymousUser()], self.course.id)
+
+        assert anonymous_ids == {
+            self.user.id: old_anonymous_id,
+            self.user2.id: anonymous_id_for_user(User.objects.get(id=self.user2.id), self.course.id),
+        }
+        assert self.user2 == user_by_anonymous_id(anonymous_ids[self.user2.id])
+        with self.assertNumQueries(0):
+            assert anonymous_ids_for_users(users, self.course.id) == anonymous_ids
+
+    def test_bulk_unique_ids(self):
+        users = [self.user, self.user2]
+        assert anonymous_ids_for_users(users, None) == {user.id: unique_id_for_user(user) for user in users}
+
+    @override_settings(ANONYMOUS_USER_ID_CACHE_SIZE=1)
+    @patch('common.djangoapps.student.models.user._anonymous_user_id_cache', OrderedDict())
+    def test_anonymous_id_process_cache(self):
+        """
+        Anonymous ids are cached by user id and course id, in a cache limited to ANONYMOUS_USER_ID_CACHE_SIZE ids.
+        """
+        anonymous_ids = anonymous_ids_for_users([self.user, self.user2], self.course.id)
+        # Recreate user objects to clear their cached anonymous ids.
+        user, user2 = User.objects.get(id=self.user.id), User.objects.get(id=self.user2.id)
+        with self.assertNumQueries(0):
+            assert anonymous_id_for_user(user2, self.course.id) == anonymous_ids[self.user2.id]
+        with self.assertNumQueries(1):
+            assert anonymous_id_for_user(user, self.course.id) == anonymous_ids[self.user.id]
+
+        AnonymousUserId.objects.filter(user=self.user).delete()
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(2):
+            assert anonymous_id_for_user(user, self.course.id) == anonymous_ids[self.user.id]
+
 
 @skip_unless_lms
 @patch('openedx.core.djangoapps.programs.utils.get_programs')
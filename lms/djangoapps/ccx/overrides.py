@@ -55,6 +55,22 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
         """
         return getattr(block.location, 'ccx', None) or getattr(block, 'enable_ccx', False)
 
+    def get_override_index(self, course_key):
+        """
+        Returns the overrides of the ccx that is active for the course, which
+        are already loaded with a single query and cached per request.
+        """
+        if not isinstance(course_key, CCXLocator):
+            return {}
+
+        ccx = get_current_ccx(course_key)
+
+        overrides = _get_overrides_for_ccx(ccx)
+        # See get_override_for_ccx, the LMS never links CCX courses back to Studio.
+        course_usage_key = _clean_ccx_key(course_key.make_usage_key('course', 'course'))
+        overrides.setdefault(course_usage_key, {})['course_edit_method'] = None
+        return overrides
+
 
 def get_current_ccx(course_key):
     """
@@ -30,7 +30,7 @@ class StudentViewTransformer(BlockStructureTransformer):
         # collect basic xblock fields
         block_structure.request_xblock_fields('category')
 
-        for block_key in block_structure.topological_traversal():
+        for block_key in block_structure.xblock_topological_traversal():
             block = block_structure.get_xblock(block_key)
 
             # We're iterating through blocks (not bound to a user) that are
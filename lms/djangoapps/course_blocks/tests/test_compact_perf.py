@@ -0,0 +1,103 @@
+"""
+Performance test comparing the default and the compact representations of
+collected block structures, see BLOCK_STRUCTURES_SETTINGS['COMPACT_REPRESENTATION'].
+"""
+
+
+import time
+import tracemalloc
+import unittest
+from statistics import median
+
+import ddt
+from django.conf import settings
+from django.test.utils import override_settings
+
+from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager, get_course_in_cache
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory
+
+# Number of (chapters, sequentials per chapter, verticals per sequential,
+# problems per vertical) in the generated courses.
+COURSE_SHAPES = ((2, 5, 5, 2), (10, 5, 5, 4))
+
+# Number of timed get_course_blocks calls per measurement.
+REPEATS = 5
+
+
+@ddt.ddt
+@unittest.skip
+class TestCompactBlockStructureTimings(ModuleStoreTestCase):
+    """
+    This class exists to measure the memory used by collected block
+    structures, and the duration of get_course_blocks, with and without
+    the compact representation of block structures.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory.create()
+
+    def _create_course(self, num_chapters, num_sequentials, num_verticals, num_problems):
+        """
+        Creates and returns a course with the given shape.
+        """
+        course = CourseFactory.create()
+        with self.store.bulk_operations(course.id):
+            for __ in range(num_chapters):
+                chapter = BlockFactory.create(parent=course, category='chapter')
+                for __ in range(num_sequentials):
+                    sequential = BlockFactory.create(parent=chapter, category='sequential', graded=True)
+                    for __ in range(num_verticals):
+                        vertical = BlockFactory.create(parent=sequential, category='vertical')
+                        for __ in range(num_problems):
+                            BlockFactory.create(parent=vertical, category='problem')
+        return course
+
+    def _measure(self, course):
+        """
+        Returns the memory used by the collected block structure of the
+        given course, in bytes, and the median duration of
+        get_course_blocks for it, in milliseconds.
+        """
+        tracemalloc.start()
+        block_structure = get_block_structure_manager(course.id).get_collected()
+        size_in_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(block_structure) > 0
+
+        timings = []
+        for __ in range(REPEATS):
+            start = time.perf_counter()
+            get_course_blocks(self.user, course.location)
+            timings.append((time.perf_counter() - start) * 1000)
+        return size_in_bytes, median(timings)
+
+    @ddt.data(*COURSE_SHAPES)
+    def test_get_course_blocks_timings(self, course_shape):
+        """
+        Generate memory and get_course_blocks timings for both representations.
+        """
+        course = self._create_course(*course_shape)
+        get_course_in_cache(course.id)
+
+        results = {}
+        for compact in (False, True):
+            block_structures_settings = dict(settings.BLOCK_STRUCTURES_SETTINGS, COMPACT_REPRESENTATION=compact)
+            with override_settings(BLOCK_STRUCTURES_SETTINGS=block_structures_settings):
+                results[compact] = self._measure(course)
+
+        print(
+            "get_course_blocks:{} default_bytes:{} compact_bytes:{} default_ms:{:.1f} compact_ms:{:.1f}".format(
+                course_shape,
+                results[False][0],
+                results[True][0],
+                results[False][1],
+                results[True][1],
+            )
+        )
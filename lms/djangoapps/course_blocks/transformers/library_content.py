@@ -32,6 +32,7 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -63,9 +64,8 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
 
         # For each block check if block is library_content.
         # If library_content add children array to content_library_children field
-        for block_key in block_structure.topological_traversal(
+        for block_key in block_structure.xblock_topological_traversal(
                 filter_func=lambda block_key: block_key.block_type == 'library_content',
-                yield_descendants_of_unyielded=True,
         ):
             xblock = block_structure.get_xblock(block_key)
             for child_key in xblock.children:
@@ -193,6 +193,7 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
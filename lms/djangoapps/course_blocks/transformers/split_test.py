@@ -26,6 +26,7 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -45,9 +46,8 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
         root_block = block_structure.get_xblock(block_structure.root_block_usage_key)
         user_partitions = getattr(root_block, 'user_partitions', [])
 
-        for block_key in block_structure.topological_traversal(
+        for block_key in block_structure.xblock_topological_traversal(
                 filter_func=lambda block_key: block_key.block_type == 'split_test',
-                yield_descendants_of_unyielded=True,
         ):
             xblock = block_structure.get_xblock(block_key)
             partition_for_this_block = next(
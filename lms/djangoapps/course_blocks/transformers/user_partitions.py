@@ -4,6 +4,7 @@ User Partitions Transformer
 
 
 from lms.djangoapps.courseware.access import has_access
+from openedx.core.djangoapps.content.block_structure.exceptions import IncrementalCollectNotSupported
 from openedx.core.djangoapps.content.block_structure.transformer import (  # lint-amnesty, pylint: disable=unused-import
     BlockStructureTransformer
 )
@@ -28,6 +29,7 @@ class UserPartitionTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -65,7 +67,7 @@ class UserPartitionTransformer(BlockStructureTransformer):
         # topological sort, we know a block's parents are guaranteed to
         # already have merged group access computed before the block
         # itself.
-        for block_key in block_structure.topological_traversal():
+        for block_key in block_structure.xblock_topological_traversal():
             xblock = block_structure.get_xblock(block_key)
             parent_keys = block_structure.get_parents(block_key)
             merged_parent_access_list = [
@@ -75,6 +77,21 @@ class UserPartitionTransformer(BlockStructureTransformer):
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    @classmethod
+    def collect_incrementally(cls, block_structure):
+        """
+        Collects merged group access for the changed blocks, provided
+        the course's user partitions didn't change since the previous
+        collection. Partitions may change without any block changing
+        (e.g. enrollment track partitions), which requires collecting
+        the merged group access of all blocks again.
+        """
+        root_block = block_structure.get_xblock(block_structure.root_block_usage_key)
+        user_partitions = get_all_partitions_for_course(root_block, active_only=True)
+        if user_partitions != block_structure.get_transformer_data(cls, 'user_partitions'):
+            raise IncrementalCollectNotSupported("The course's user partitions changed.")
+        cls.collect(block_structure)
+
     def transform(self, usage_info, block_structure):
         user = usage_info.user
         SplitTestTransformer().transform(usage_info, block_structure)
@@ -37,7 +37,7 @@ def collect_unioned_set_field(block_structure, transformer, merged_field_name, f
         filter_by: a unary lambda that returns true if a given
             block_key should be included in the result set
     """
-    for block_key in block_structure.topological_traversal():
+    for block_key in block_structure.xblock_topological_traversal():
         result_set = {block_key} if filter_by(block_key) else set()
         for parent in block_structure.get_parents(block_key):
             result_set |= block_structure.get_transformer_block_field(
@@ -74,7 +74,7 @@ def collect_merged_boolean_field(
     hierarchy chain.
     """
 
-    for block_key in block_structure.topological_traversal():
+    for block_key in block_structure.xblock_topological_traversal():
         # compute merged value of the boolean field from all parents
         parents = block_structure.get_parents(block_key)
         all_parents_merged_value = all(
@@ -116,7 +116,7 @@ def collect_merged_date_field(
     block_structure.
     """
 
-    for block_key in block_structure.topological_traversal():
+    for block_key in block_structure.xblock_topological_traversal():
 
         parents = block_structure.get_parents(block_key)
         block_date = get_field_on_block(block_structure.get_xblock(block_key), xblock_field_name)
@@ -20,6 +20,13 @@ from edx_django_utils.monitoring import function_trace
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from xblock.core import XBlock
 
+from lms.djangoapps.courseware.access_cache import (
+    ENROLLMENT_DEPENDENCY,
+    MILESTONES_DEPENDENCY,
+    PARTITIONS_DEPENDENCY,
+    ROLES_DEPENDENCY,
+    cache_access_decision
+)
 from lms.djangoapps.courseware.access_response import (
     IncorrectPartitionGroupError,
     MilestoneAccessError,
@@ -464,6 +471,10 @@ def _has_access_error_block(user, action, block, course_key):
     return _dispatch(checkers, action, user, block)
 
 
+@cache_access_decision(
+    lambda block, user, course_key: (user, course_key, block.scope_ids.usage_id),
+    (ROLES_DEPENDENCY, ENROLLMENT_DEPENDENCY, PARTITIONS_DEPENDENCY),
+)
 def _has_group_access(block, user, course_key):
     """
     This function returns a boolean indicating whether or not `user` has
@@ -651,6 +662,10 @@ def _has_access_course_key(user, action, course_key):
     return _dispatch(checkers, action, user, course_key)
 
 
+@cache_access_decision(
+    lambda user, action, perm: (user, None, (action, perm)),
+    (ROLES_DEPENDENCY,),
+)
 def _has_access_string(user, action, perm):
     """
     Check if user has certain special access, specified as string.  Valid strings:
@@ -724,6 +739,10 @@ def _has_staff_access_to_location(user, location, course_key=None):
     return _has_access_to_course(user, 'staff', course_key)
 
 
+@cache_access_decision(
+    lambda user, access_level, course_key: (user, course_key, access_level),
+    (ROLES_DEPENDENCY,),
+)
 def _has_access_to_course(user, access_level, course_key):
     """
     Returns True if the given user has access_level (= staff or
@@ -848,6 +867,10 @@ def _has_detached_class_tag(block):
     return ACCESS_GRANTED if 'detached' in block._class_tags else ACCESS_DENIED  # pylint: disable=protected-access
 
 
+@cache_access_decision(
+    lambda user, course_id: (user, course_id, None),
+    (MILESTONES_DEPENDENCY,),
+)
 def _has_fulfilled_all_milestones(user, course_id):
     """
     Returns whether the given user has fulfilled all milestones for the
@@ -0,0 +1,139 @@
+"""
+A request-scoped cache of the access decisions made by the functions in access.py,
+used when COURSEWARE_CACHE_ACCESS_DECISIONS is on.
+
+Decisions are cached by the user, course and masquerade state they are made for,
+along with the other arguments of the function that made them. Each decision
+also records the version of the inputs it depends on (see the *_DEPENDENCY
+constants) at the time it was made. Saving or deleting the models that these
+inputs are read from bumps their versions, so that the decisions which depended
+on them are made again rather than reused.
+"""
+
+
+from functools import wraps
+
+from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.monitoring import accumulate
+from milestones.models import UserMilestone
+
+from common.djangoapps.student.models import CourseAccessRole, CourseEnrollment
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
+from lms.djangoapps.courseware.toggles import COURSEWARE_CACHE_ACCESS_DECISIONS
+from lms.djangoapps.teams.models import CourseTeamMembership
+from openedx.core.djangoapps.course_groups.models import CohortMembership, CourseUserGroup
+
+ACCESS_DECISIONS_NAMESPACE = 'courseware.access_cache'
+
+# The inputs that cached access decisions can depend on.
+ROLES_DEPENDENCY = 'roles'
+ENROLLMENT_DEPENDENCY = 'enrollment'
+PARTITIONS_DEPENDENCY = 'partitions'
+MILESTONES_DEPENDENCY = 'milestones'
+
+
+def _masquerade_state(user, course_key):
+    """
+    Returns a hashable representation of the masquerade of `user` in `course_key`, if any.
+    """
+    course_masquerade = get_course_masquerade(user, course_key) if course_key is not None else None
+    if course_masquerade is None:
+        return None
+    return (
+        course_masquerade.role,
+        course_masquerade.user_partition_id,
+        course_masquerade.group_id,
+        course_masquerade.user_name,
+    )
+
+
+def cache_access_decision(get_key, dependencies):
+    """
+    Decorator which caches the AccessResponses returned by an access check
+    function for the rest of the request, when COURSEWARE_CACHE_ACCESS_DECISIONS
+    is on.
+
+    Arguments:
+        get_key: A function which is called with the arguments of the decorated
+            function, and returns the user and the course key that the decision
+            is made for, and a hashable key for the other arguments.
+        dependencies: The *_DEPENDENCY inputs that the decision depends on,
+            besides its arguments and the masquerade state of the user.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            if not COURSEWARE_CACHE_ACCESS_DECISIONS.is_enabled():
+                return func(*args)
+
+            user, course_key, key = get_key(*args)
+            cache_key = (func.__name__, getattr(user, 'id', None), course_key, _masquerade_state(user, course_key), key)
+            request_cache_data = RequestCache(ACCESS_DECISIONS_NAMESPACE).data
+            versions = request_cache_data.setdefault('versions', {})
+            decisions = request_cache_data.setdefault('decisions', {})
+
+            dependency_versions = tuple(versions.get(dependency, 0) for dependency in dependencies)
+            cached_decision = decisions.get(cache_key)
+            if cached_decision is not None and cached_decision[0] == dependency_versions:
+                accumulate('has_access.decision_cache.hits', 1)
+                return cached_decision[1]
+
+            accumulate('has_access.decision_cache.misses', 1)
+            decision = func(*args)
+            decisions[cache_key] = (dependency_versions, decision)
+            return decision
+        return wrapper
+    return decorator
+
+
+def invalidate_access_decisions(*dependencies):
+    """
+    Prevent the access decisions cached in this request which depend on any of
+    the given *_DEPENDENCY inputs from being reused.
+    """
+    versions = RequestCache(ACCESS_DECISIONS_NAMESPACE).data.setdefault('versions', {})
+    for dependency in dependencies:
+        versions[dependency] = versions.get(dependency, 0) + 1
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def _invalidate_roles(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the decisions which depend on roles, including global staff.
+    """
+    invalidate_access_decisions(ROLES_DEPENDENCY)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def _invalidate_enrollment(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the decisions which depend on enrollments, including the enrollment track partition.
+    """
+    invalidate_access_decisions(ENROLLMENT_DEPENDENCY, PARTITIONS_DEPENDENCY)
+
+
+@receiver(post_save, sender=CohortMembership)
+@receiver(post_delete, sender=CohortMembership)
+@receiver(m2m_changed, sender=CourseUserGroup.users.through)
+@receiver(post_save, sender=CourseTeamMembership)
+@receiver(post_delete, sender=CourseTeamMembership)
+def _invalidate_partitions(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the decisions which depend on the partition groups of users,
+    including the team-based content groups.
+    """
+    invalidate_access_decisions(PARTITIONS_DEPENDENCY)
+
+
+@receiver(post_save, sender=UserMilestone)
+@receiver(post_delete, sender=UserMilestone)
+def _invalidate_milestones(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the decisions which depend on the milestones fulfilled by users.
+    """
+    invalidate_access_decisions(MILESTONES_DEPENDENCY)
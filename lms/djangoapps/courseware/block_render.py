@@ -7,6 +7,7 @@ import json
 import logging
 import textwrap
 from collections import OrderedDict
+from contextlib import nullcontext
 
 from functools import partial
 
@@ -65,11 +66,17 @@ from lms.djangoapps.courseware.masquerade import (
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.services import UserStateService
+from lms.djangoapps.courseware.toggles import (
+    courseware_use_block_structure_field_data_cache,
+    courseware_write_behind_user_state
+)
+from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.api import GradesUtilService
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.runtime import UserTagsService, lms_wrappers_aside, lms_applicable_aside_types
 from lms.djangoapps.verify_student.services import XBlockVerificationService
 from openedx.core.djangoapps.bookmarks.api import BookmarksService
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.crawlers.models import CrawlersConfig
 from openedx.core.djangoapps.credit.services import CreditService
 from openedx.core.djangoapps.enrollments.services import EnrollmentsService
@@ -862,12 +869,24 @@ def get_block_by_usage_id(request, course_id, usage_id, disable_staff_debug_info
     block, tracking_context = _get_block_by_usage_key(usage_key)
 
     _, user = setup_masquerade(request, course_key, has_access(request.user, 'staff', block, course_key))
-    field_data_cache = FieldDataCache.cache_for_block_descendents(
-        course_key,
-        user,
-        block,
-        read_only=CrawlersConfig.is_crawler(request),
-    )
+    block_structure = None
+    if courseware_use_block_structure_field_data_cache(course_key):
+        block_structure = get_course_in_cache(course_key)
+    if block_structure is not None and usage_key in block_structure:
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            course_key,
+            user,
+            block_structure,
+            usage_key,
+            read_only=CrawlersConfig.is_crawler(request),
+        )
+    else:
+        field_data_cache = FieldDataCache.cache_for_block_descendents(
+            course_key,
+            user,
+            block,
+            read_only=CrawlersConfig.is_crawler(request),
+        )
     instance = get_block_for_descriptor(
         user,
         request,
@@ -953,7 +972,12 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
                     handler_instance = get_aside_from_xblock(instance, usage_key.aside_type)
                 else:
                     handler_instance = instance
-                resp = handler_instance.handle(handler, req, suffix)
+                if courseware_write_behind_user_state(course_key):
+                    user_state_writes = DjangoXBlockUserStateClient.write_behind()
+                else:
+                    user_state_writes = nullcontext()
+                with user_state_writes:
+                    resp = handler_instance.handle(handler, req, suffix)
                 if suffix == 'problem_check' \
                         and course \
                         and getattr(course, 'entrance_exam_enabled', False) \
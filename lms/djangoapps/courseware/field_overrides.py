@@ -20,8 +20,11 @@ import threading
 from abc import ABCMeta, abstractmethod
 from contextlib import contextmanager
 
+from ccx_keys.locator import CCXBlockUsageLocator
 from django.conf import settings
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
+from opaque_keys.edx.locator import BlockUsageLocator
 from xblock.field_data import FieldData
 
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -30,6 +33,7 @@ NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = 'lms.djangoapps.courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = 'lms.djangoapps.courseware.modulestore_field_overrides.\
     enabled_providers.{course_id}'
+OVERRIDE_INDEX_KEY = 'lms.djangoapps.courseware.field_overrides.override_index.{provider}.{user_id}.{course_id}'
 
 
 def resolve_dotted(name):
@@ -51,6 +55,22 @@ def resolve_dotted(name):
     return target
 
 
+def override_index_key(usage_key):
+    """
+    Returns the key of the block with the given `usage_key` in override
+    indexes (see `FieldOverrideProvider.get_override_index`): the usage key of
+    the block an aside is attached to, without any CCX, version or branch
+    information.
+    """
+    if isinstance(usage_key, (AsideUsageKeyV1, AsideUsageKeyV2)):
+        usage_key = usage_key.usage_key
+    if isinstance(usage_key, CCXBlockUsageLocator):
+        usage_key = usage_key.to_block_locator()
+    if isinstance(usage_key, BlockUsageLocator):
+        usage_key = usage_key.version_agnostic().for_branch(None)
+    return usage_key
+
+
 def _lineage(block):
     """
     Returns an iterator over all ancestors of the given block, starting with
@@ -134,6 +154,18 @@ class FieldOverrideProvider(metaclass=ABCMeta):
         """
         return False
 
+    def get_override_index(self, course_key):
+        """
+        Return all the overrides this provider makes in the course with the
+        given `course_key`, or None if they can't be listed ahead of time.
+
+        The overrides are returned as a dict of {field name: JSON value} dicts,
+        keyed by the `override_index_key` of the overridden blocks. Providers
+        which return an index have their overrides looked up in it, instead of
+        having `get` called for every field read on every block.
+        """
+        return None
+
 
 class OverrideFieldData(FieldData):
     """
@@ -200,6 +232,44 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):  # pylint: disable=super-init-not-called
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        self._override_indexes = {}
+
+    def _get_override_indexes(self, block):
+        """
+        Returns the key of `block` in override indexes, and a tuple with the
+        override index of each provider in the course of `block`, or None for
+        the providers which don't have one.
+
+        Indexes are loaded once per request, user and course.
+        """
+        usage_key = getattr(getattr(block, 'scope_ids', None), 'usage_id', None)
+        if usage_key is None:
+            return None, (None,) * len(self.providers)
+
+        course_key = usage_key.context_key
+        indexes = self._override_indexes.get(course_key)
+        if indexes is None:
+            indexes = tuple(self._get_provider_index(provider, course_key) for provider in self.providers)
+            self._override_indexes[course_key] = indexes
+        return override_index_key(usage_key), indexes
+
+    @staticmethod
+    def _get_provider_index(provider, course_key):
+        """
+        Returns the override index of `provider` in the course with the given
+        `course_key`, or None if it doesn't have one. Cached per request.
+        """
+        cache_key = OVERRIDE_INDEX_KEY.format(
+            provider=f'{type(provider).__module__}.{type(provider).__qualname__}',
+            user_id=getattr(provider.user, 'id', None),
+            course_id=str(course_key),
+        )
+        index = DEFAULT_REQUEST_CACHE.data.get(cache_key, NOTSET)
+        if index is NOTSET:
+            get_override_index = getattr(provider, 'get_override_index', None)
+            index = get_override_index(course_key) if get_override_index else None
+            DEFAULT_REQUEST_CACHE.data[cache_key] = index
+        return index
 
     def get_override(self, block, name):
         """
@@ -207,8 +277,18 @@ class OverrideFieldData(FieldData):
         Returns the overridden value or `NOTSET` if no override is found.
         """
         if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
+            index_key, indexes = self._get_override_indexes(block)
+            for provider, index in zip(self.providers, indexes):
+                if index is None:
+                    value = provider.get(block, name, NOTSET)
+                else:
+                    block_overrides = index.get(index_key)
+                    value = block_overrides.get(name, NOTSET) if block_overrides else NOTSET
+                    if value is not NOTSET:
+                        try:
+                            value = block.fields[name].from_json(value)
+                        except KeyError:
+                            pass
                 if value is not NOTSET:
                     return value
         return NOTSET
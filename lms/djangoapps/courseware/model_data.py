@@ -25,24 +25,35 @@ DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 import json
 import logging
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict, namedtuple
+from collections import defaultdict, deque, namedtuple
 
+from django.conf import settings
 from django.db import DatabaseError, IntegrityError, transaction
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
-from xblock.core import XBlockAside
+from xblock.core import XBlock, XBlockAside
 from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
-from xblock.fields import Scope, UserScope
-from xblock.runtime import KeyValueStore
+from xblock.fields import Scope, ScopeIds, UserScope
+from xblock.plugin import PluginMissingError
+from xblock.runtime import KeyValueStore, Mixologist
 
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 
-from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
+from .models import (
+    StudentModule,
+    XModuleStudentInfoField,
+    XModuleStudentPrefsField,
+    XModuleUserStateSummaryField,
+    chunks
+)
 
 log = logging.getLogger(__name__)
 
+# Maximum number of usage keys in a single StudentModule query.
+STUDENT_MODULE_QUERY_CHUNK_SIZE = 500
+
 
 class InvalidWriteError(Exception):
     """
@@ -82,6 +93,14 @@ def _all_block_types(blocks, aside_types):
     return block_types
 
 
+class _BlockStructureBlock(namedtuple('_BlockStructureBlock', 'scope_ids entry_point location has_score fields')):
+    """
+    The attributes of an XBlock that FieldDataCache needs to prefetch its
+    field data, read from a collected block structure instead of the
+    modulestore.
+    """
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -336,6 +355,12 @@ class UserStateCache:
     """
     def __init__(self, user, course_id):
         self._cache = defaultdict(dict)
+        # Serialized state loaded by cache_fields_lazily, which is only
+        # deserialized into self._cache when the block's fields are accessed.
+        self._raw_state = {}
+        # The usage keys whose state has been queried, once this cache reads
+        # through to the database for the blocks it wasn't asked to prefetch.
+        self._queried_keys = None
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
@@ -350,13 +375,80 @@ class UserStateCache:
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        usage_keys = _all_usage_keys(xblocks, aside_types)
+        if self._queried_keys is not None:
+            self._queried_keys.update(usage_keys)
+
         block_field_state = self._client.get_many(
             self.user.username,
-            _all_usage_keys(xblocks, aside_types),
+            usage_keys,
         )
         for user_state in block_field_state:
+            self._raw_state.pop(user_state.block_key, None)
             self._cache[user_state.block_key] = user_state.state
 
+    def cache_fields_lazily(self, xblocks, aside_types):
+        """
+        Load the state of the supplied ``xblocks`` and ``aside_types`` into
+        this cache, without deserializing it until it is accessed.
+
+        Unlike :meth:`cache_fields`, the state of all the blocks is loaded with
+        a single query (per chunk of usage keys) that doesn't instantiate
+        :class:`~StudentModule` objects, and the state of any block that wasn't
+        prefetched is read through from the database when it is accessed.
+
+        Arguments:
+            xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
+            aside_types (list of str): Aside types to cache fields for.
+        """
+        if self._queried_keys is None:
+            self._queried_keys = set()
+        self._load_raw_state(_all_usage_keys(xblocks, aside_types))
+
+    def _load_raw_state(self, usage_keys):
+        """
+        Load the serialized state of the supplied ``usage_keys`` which haven't
+        been queried yet into self._raw_state.
+        """
+        keys_by_course = defaultdict(list)
+        for usage_key in usage_keys:
+            if usage_key not in self._queried_keys:
+                self._queried_keys.add(usage_key)
+                keys_by_course[usage_key.course_key].append(usage_key)
+
+        for course_key, course_usage_keys in keys_by_course.items():
+            for usage_keys_chunk in chunks(course_usage_keys, STUDENT_MODULE_QUERY_CHUNK_SIZE):
+                student_modules = StudentModule.objects.filter(
+                    student_id=self.user.id,
+                    course_id=course_key,
+                    module_state_key__in=usage_keys_chunk,
+                ).values_list('module_state_key', 'state')
+
+                for module_state_key, state in student_modules:
+                    # As in DjangoXBlockUserStateClient.get_many, empty state
+                    # has been deleted and is treated as if it doesn't exist.
+                    if state is None or state == '{}':
+                        continue
+                    usage_key = module_state_key.map_into_course(course_key)
+                    if usage_key not in self._cache:
+                        self._raw_state[usage_key] = state
+
+    def _load_state(self, cache_key):
+        """
+        Deserialize the state stored for `cache_key` into the cache, if it
+        was loaded by :meth:`cache_fields_lazily` and hasn't been accessed yet.
+        """
+        if self._queried_keys is None:
+            return
+        if cache_key not in self._queried_keys:
+            self._load_raw_state([cache_key])
+
+        serialized_state = self._raw_state.pop(cache_key, None)
+        if serialized_state is not None:
+            state = json.loads(serialized_state)
+            if state != {}:
+                self._cache[cache_key] = state
+
     def set(self, kvs_key, value):
         """
         Set the specified `kvs_key` to the field value `value`.
@@ -399,6 +491,13 @@ class UserStateCache:
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        # The updated state replaces the cached state, as it would have if
+        # the cached state had been deserialized when it was loaded.
+        for cache_key in pending_updates:
+            self._raw_state.pop(cache_key, None)
+            if self._queried_keys is not None:
+                self._queried_keys.add(cache_key)
+
         try:
             self._client.set_many(
                 self.user.username,
@@ -421,6 +520,7 @@ class UserStateCache:
         Returns: A django orm object from the cache
         """
         cache_key = self._cache_key_for_kvs_key(kvs_key)
+        self._load_state(cache_key)
         if cache_key not in self._cache:
             raise KeyError(kvs_key.field_name)
 
@@ -436,6 +536,7 @@ class UserStateCache:
         Raises: KeyError if key isn't found in the cache
         """
         cache_key = self._cache_key_for_kvs_key(kvs_key)
+        self._load_state(cache_key)
         if cache_key not in self._cache:
             raise KeyError(kvs_key.field_name)
 
@@ -457,6 +558,7 @@ class UserStateCache:
         Returns: bool
         """
         cache_key = self._cache_key_for_kvs_key(kvs_key)
+        self._load_state(cache_key)
 
         return (
             cache_key in self._cache and
@@ -464,7 +566,7 @@ class UserStateCache:
         )
 
     def __len__(self):
-        return len(self._cache)
+        return len(self._cache) + len(self._raw_state)
 
     def _cache_key_for_kvs_key(self, key):
         """
@@ -707,9 +809,12 @@ class FieldDataCache:
         self.scorable_locations = set()
         self.add_blocks_to_cache(blocks)
 
-    def add_blocks_to_cache(self, blocks):
+    def add_blocks_to_cache(self, blocks, lazy_user_state=False):
         """
         Add all `blocks` to this FieldDataCache.
+
+        If `lazy_user_state` is True, the user state of the blocks is loaded
+        with UserStateCache.cache_fields_lazily.
         """
         if self.user.is_authenticated:
             self.scorable_locations.update(block.location for block in blocks if block.has_score)
@@ -717,7 +822,10 @@ class FieldDataCache:
                 if scope not in self.cache:
                     continue
 
-                self.cache[scope].cache_fields(fields, blocks, self.asides)
+                if scope == Scope.user_state and lazy_user_state:
+                    self.cache[scope].cache_fields_lazily(blocks, self.asides)
+                else:
+                    self.cache[scope].cache_fields(fields, blocks, self.asides)
 
     def add_block_descendents(self, block, depth=None, block_filter=lambda block: True):
         """
@@ -776,6 +884,79 @@ class FieldDataCache:
         cache.add_block_descendents(block, depth, block_filter)
         return cache
 
+    def add_block_structure_descendents(self, block_structure, usage_key, depth=None):
+        """
+        Add the block `usage_key` and all its descendants in the collected
+        `block_structure` to this FieldDataCache, without loading them from
+        the modulestore.
+
+        Arguments:
+            block_structure: A collected BlockStructureBlockData which contains `usage_key`
+            usage_key: The UsageKey of the root of the blocks to cache
+            depth is the number of levels of descendant blocks to load StudentModules for, in addition to
+                the supplied block. If depth is None, load all descendant StudentModules
+        """
+        mixologist = Mixologist(getattr(settings, 'XBLOCK_MIXINS', ()))
+        block_classes = {}
+        blocks = []
+        conditional_blocks = []
+
+        # The traversal is breadth-first, so that blocks reachable through
+        # several parents are visited at their smallest depth first.
+        visited = {usage_key}
+        to_visit = deque([(usage_key, depth)])
+        while to_visit:
+            block_key, block_depth = to_visit.popleft()
+            if block_key.block_type not in block_classes:
+                try:
+                    block_classes[block_key.block_type] = mixologist.mix(XBlock.load_class(block_key.block_type))
+                except PluginMissingError:
+                    block_classes[block_key.block_type] = None
+            block_class = block_classes[block_key.block_type]
+
+            has_score = block_structure.get_xblock_field(block_key, 'has_score')
+            if has_score is None:
+                has_score = getattr(block_class, 'has_score', False) is True
+            blocks.append(_BlockStructureBlock(
+                scope_ids=ScopeIds(self.user.id, block_key.block_type, None, block_key),
+                entry_point=getattr(block_class, 'entry_point', XBlock.entry_point),
+                location=block_key,
+                has_score=has_score,
+                fields=getattr(block_class, 'fields', {}),
+            ))
+
+            if block_depth is None or block_depth > 0:
+                child_depth = block_depth - 1 if block_depth is not None else None
+                # The blocks required by conditional blocks aren't their
+                # children in the block structure.
+                if block_key.block_type == 'conditional':
+                    conditional_blocks.append((block_key, child_depth))
+                for child_key in block_structure.get_children(block_key):
+                    if child_key not in visited:
+                        visited.add(child_key)
+                        to_visit.append((child_key, child_depth))
+
+        self.add_blocks_to_cache(blocks, lazy_user_state=True)
+
+        for block_key, child_depth in conditional_blocks:
+            for required_block in modulestore().get_item(block_key).get_required_block_descriptors():
+                self.add_block_descendents(required_block, child_depth)
+
+    @classmethod
+    def cache_for_block_structure_descendents(cls, course_id, user, block_structure, usage_key, depth=None,
+                                              asides=None, read_only=False):
+        """
+        course_id: the course in the context of which we want StudentModules.
+        user: the django user for whom to load modules.
+        block_structure: A collected BlockStructureBlockData which contains `usage_key`
+        usage_key: The UsageKey of the root of the blocks to cache
+        depth is the number of levels of descendant blocks to load StudentModules for, in addition to
+            the supplied block. If depth is None, load all descendant StudentModules
+        """
+        cache = FieldDataCache([], course_id, user, asides=asides, read_only=read_only)
+        cache.add_block_structure_descendents(block_structure, usage_key, depth)
+        return cache
+
     def _fields_to_cache(self, blocks):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -966,6 +1147,29 @@ class ScoresClient:
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given users and
+        locations, with a single query, and return them in a dict keyed by
+        user id.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+            'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            clients[user_id]._locations_to_scores[location.map_into_course(course_id)] = cls.Score(  # pylint: disable=protected-access
+                correct, total, created,
+            )
+        for client in clients.values():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 def set_score(user_id, usage_key, score, max_score):
     """
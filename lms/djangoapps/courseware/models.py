@@ -22,7 +22,9 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.db import models
+from django.db.models import Max
 from django.db.models.signals import post_save
+from django.dispatch import Signal
 
 from django.utils.translation import gettext_lazy as _
 from edx_django_utils.cache.utils import RequestCache
@@ -34,6 +36,10 @@ from openedx.core.djangolib.markup import HTML
 
 log = logging.getLogger("edx.courseware")
 
+# Sent with the list of ``student_modules`` that were created or updated in
+# bulk, which doesn't send post_save for each of them.
+student_modules_bulk_saved = Signal()
+
 
 def chunks(items, chunk_size):
     """
@@ -275,6 +281,70 @@ class BaseStudentModuleHistory(models.Model):
             request_cache.setdefault(request_cache_key, {})
             request_cache.data[request_cache_key][student_module.id] = history_entry.id
 
+    @staticmethod
+    def save_history_entries(student_modules, history_model_cls, request_cache_key):
+        """
+        When StudentModule instances are updated in bulk, save the changes in the corresponding activity
+        history table, with a single insert of the new history records, like save_history_entry would have
+        for each of them
+        """
+        student_modules = [
+            student_module for student_module in student_modules
+            if student_module.module_type in history_model_cls.HISTORY_SAVING_TYPES
+        ]
+        if not student_modules:
+            return
+
+        request_cache = RequestCache('studentmodulehistory')
+        request_smh_cache = request_cache.get_cached_response(request_cache_key).get_value_or_default({})
+        cached_history_entries = history_model_cls.objects.in_bulk([
+            request_smh_cache[student_module.id]
+            for student_module in student_modules
+            if student_module.id in request_smh_cache
+        ])
+
+        new_history_entries = []
+        updated_history_entries = []
+        for student_module in student_modules:
+            history_entry = None
+            if student_module.id in request_smh_cache:
+                smh_id = request_smh_cache[student_module.id]
+                history_entry = cached_history_entries.get(smh_id)
+                if history_entry is None:
+                    log.error(
+                        "Cached {} instance does not exist: {}({}) for StudentModule({})".format(
+                            history_model_cls.__name__, history_model_cls.__name__, smh_id, student_module.id
+                        )
+                    )
+
+            if history_entry is None:
+                history_entry = history_model_cls(student_module=student_module, version=None)
+                new_history_entries.append(history_entry)
+            else:
+                updated_history_entries.append(history_entry)
+
+            history_entry.created = student_module.modified
+            history_entry.state = student_module.state
+            history_entry.grade = student_module.grade
+            history_entry.max_grade = student_module.max_grade
+
+        history_model_cls.objects.bulk_create(new_history_entries)
+        history_model_cls.objects.bulk_update(updated_history_entries, ['created', 'state', 'grade', 'max_grade'])
+
+        new_history_ids = {
+            history_entry.student_module_id: history_entry.id for history_entry in new_history_entries
+        }
+        if None in new_history_ids.values():
+            # Not all databases return the ids of the rows inserted in bulk.
+            new_history_ids = dict(
+                history_model_cls.objects.filter(
+                    student_module_id__in=list(new_history_ids),
+                ).values('student_module_id').annotate(last_id=Max('id')).values_list('student_module_id', 'last_id')
+            )
+
+        request_cache.setdefault(request_cache_key, {})
+        request_cache.data[request_cache_key].update(new_history_ids)
+
 
 class StudentModuleHistory(BaseStudentModuleHistory):
     """Keeps a complete history of state changes for a given XModule for a given
@@ -312,11 +382,23 @@ class StudentModuleHistory(BaseStudentModuleHistory):
             "lms.djangoapps.courseware.models.student_module_history_map"
         )
 
+    def save_bulk_history(sender, student_modules, **kwargs):  # pylint: disable=no-self-argument, unused-argument
+        """
+        Creates & saves the StudentModuleHistory entries of the StudentModules
+        saved in bulk whose module_type is one that we save.
+        """
+        BaseStudentModuleHistory.save_history_entries(
+            student_modules,
+            StudentModuleHistory,
+            "lms.djangoapps.courseware.models.student_module_history_map"
+        )
+
     # When the extended studentmodulehistory table exists, don't save
     # duplicate history into courseware_studentmodulehistory, just retain
     # data for reading.
     if not settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
         post_save.connect(save_history, sender=StudentModule)
+        student_modules_bulk_saved.connect(save_bulk_history, sender=StudentModule)
 
 
 class XBlockFieldBase(models.Model):
@@ -9,7 +9,7 @@ import json
 from lms.djangoapps.courseware.models import StudentFieldOverride
 from openedx.core.lib.xblock_utils import is_xblock_aside
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import FieldOverrideProvider, override_index_key
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -26,6 +26,19 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
         """This simple override provider is always enabled"""
         return True
 
+    def get_override_index(self, course_key):
+        """
+        Loads all the overrides for the user in the course with a single query.
+        """
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_key,
+            student_id=self.user.id,
+        ).values_list('location', 'field', 'value')
+        overrides = {}
+        for location, field, value in query:
+            overrides.setdefault(override_index_key(location), {})[field] = json.loads(value)
+        return overrides
+
 
 def get_override_for_user(user, block, name, default=None):
     """
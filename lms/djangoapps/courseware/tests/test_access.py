@@ -23,10 +23,13 @@ from opaque_keys.edx.locator import CourseLocator
 
 import lms.djangoapps.courseware.access as access
 import lms.djangoapps.courseware.access_response as access_response
+from lms.djangoapps.courseware.access_cache import PARTITIONS_DEPENDENCY, cache_access_decision
 from lms.djangoapps.courseware.masquerade import CourseMasquerade
 from lms.djangoapps.courseware.tests.helpers import LoginEnrollmentTestCase, masquerade_as_group_member
 from lms.djangoapps.courseware.toggles import course_is_invitation_only
 from lms.djangoapps.ccx.models import CustomCourseForEdX
+from lms.djangoapps.teams.models import CourseTeamMembership
+from lms.djangoapps.teams.tests.factories import CourseTeamFactory
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
 from openedx.core.djangoapps.waffle_utils.testutils import WAFFLE_TABLES
@@ -970,3 +973,84 @@ class CourseOverviewAccessTestCase(ModuleStoreTestCase):
         course_overview = CourseOverview.get_from_id(course.id)
         with self.assertNumQueries(num_queries, table_ignorelist=QUERY_COUNT_TABLE_IGNORELIST):
             bool(access.has_access(user, 'see_exists', course_overview, course_key=course.id))
+
+
+@override_settings(COURSEWARE_CACHE_ACCESS_DECISIONS=True)
+class AccessDecisionCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for the request cache of access decisions, see COURSEWARE_CACHE_ACCESS_DECISIONS.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.student = UserFactory()
+        self.staff = StaffFactory(course_key=self.course.id)
+
+    def _has_staff_access(self, user):
+        """
+        Returns whether `user` has staff access to the course, and the number
+        of times that the roles of the user were checked to find out.
+        """
+        with patch(
+            'lms.djangoapps.courseware.access.administrative_accesses_to_course_for_user',
+            wraps=access.administrative_accesses_to_course_for_user,
+        ) as mock_accesses:
+            has_staff_access = bool(access._has_access_to_course(user, 'staff', self.course.id))
+        return has_staff_access, mock_accesses.call_count
+
+    def test_decisions_are_reused(self):
+        assert self._has_staff_access(self.staff) == (True, 1)
+        assert self._has_staff_access(self.staff) == (True, 0)
+        assert self._has_staff_access(self.student) == (False, 1)
+        assert self._has_staff_access(self.student) == (False, 0)
+
+    @override_settings(COURSEWARE_CACHE_ACCESS_DECISIONS=False)
+    def test_disabled(self):
+        assert self._has_staff_access(self.staff) == (True, 1)
+        assert self._has_staff_access(self.staff) == (True, 1)
+
+    def test_role_changes_invalidate_decisions(self):
+        assert self._has_staff_access(self.student) == (False, 1)
+
+        CourseStaffRole(self.course.id).add_users(self.student)
+        assert self._has_staff_access(self.student) == (True, 1)
+        assert self._has_staff_access(self.student) == (True, 0)
+
+        CourseStaffRole(self.course.id).remove_users(self.student)
+        assert self._has_staff_access(self.student) == (False, 1)
+
+    def test_team_changes_invalidate_decisions(self):
+        first_team, second_team = (CourseTeamFactory(course_id=self.course.id, topic_id='topic') for __ in range(2))
+        CourseEnrollment.enroll(self.student, self.course.id)
+        team_checks = []
+
+        # Decisions based on team-based content groups depend on the partition groups of users.
+        @cache_access_decision(lambda user: (user, self.course.id, None), (PARTITIONS_DEPENDENCY,))
+        def is_in_first_team(user):
+            team_checks.append(user)
+            return CourseTeamMembership.objects.filter(user=user, team=first_team).exists()
+
+        first_team.add_user(self.student)
+        assert is_in_first_team(self.student)
+        assert is_in_first_team(self.student)
+        assert len(team_checks) == 1
+
+        # Move the student to the other team.
+        CourseTeamMembership.objects.get(user=self.student, team=first_team).delete()
+        second_team.add_user(self.student)
+        assert not is_in_first_team(self.student)
+        assert not is_in_first_team(self.student)
+        assert len(team_checks) == 2
+
+    def test_masquerade_is_part_of_the_key(self):
+        assert self._has_staff_access(self.staff) == (True, 1)
+
+        # A decision made while masquerading is not reused once the masquerade changes.
+        masquerade = CourseMasquerade(self.course.id, role='staff', user_partition_id=0, group_id=1)
+        with patch('lms.djangoapps.courseware.masquerade.get_course_masquerade', return_value=masquerade), \
+                patch('lms.djangoapps.courseware.access_cache.get_course_masquerade', return_value=masquerade):
+            assert self._has_staff_access(self.staff) == (True, 1)
+            assert self._has_staff_access(self.staff) == (True, 0)
+
+        assert self._has_staff_access(self.staff) == (True, 0)
@@ -14,6 +14,7 @@ from ..field_overrides import (
     OverrideFieldData,
     OverrideModulestoreFieldData,
     disable_overrides,
+    override_index_key,
     resolve_dotted
 )
 from ..testutils import FieldOverrideTestMixin
@@ -43,6 +44,26 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class TestIndexedOverrideProvider(FieldOverrideProvider):
+    """
+    A concrete implementation of `FieldOverrideProvider` with an override index, for testing.
+    """
+    index_loads = 0
+
+    def get(self, block, name, default):
+        raise AssertionError("The override index should be used instead.")
+
+    def get_override_index(self, course_key):
+        TestIndexedOverrideProvider.index_loads += 1
+        return {
+            override_index_key(course_key.make_usage_key('course', 'course')): {'display_name': 'Overridden'},
+        }
+
+    @classmethod
+    def enabled_for(cls, course):  # pylint: disable=arguments-differ
+        return True
+
+
 class OverrideFieldBase(SharedModuleStoreTestCase):
     """
     Base class for field data override tests.  Using override_settings and
@@ -145,6 +166,51 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         assert isinstance(data, DictFieldData)
 
 
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'lms.djangoapps.courseware.tests.test_field_overrides.TestIndexedOverrideProvider',))
+class OverrideIndexTests(OverrideFieldBase):
+    """
+    Tests for the override indexes of `OverrideFieldData`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        OverrideFieldData.provider_classes = None
+        TestIndexedOverrideProvider.index_loads = 0
+
+    def tearDown(self):
+        super().tearDown()
+        OverrideFieldData.provider_classes = None
+
+    def make_one(self):
+        """
+        Factory method.
+        """
+        return OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({
+            'display_name': 'Original',
+            'days_early_for_beta': 3,
+        }))
+
+    def test_get(self):
+        data = self.make_one()
+        assert data.get(self.course, 'display_name') == 'Overridden'
+        assert data.get(self.course, 'days_early_for_beta') == 3
+        with disable_overrides():
+            assert data.get(self.course, 'display_name') == 'Original'
+
+    def test_has(self):
+        data = self.make_one()
+        assert data.has(self.course, 'display_name')
+        assert not data.has(self.course, 'due')
+
+    def test_index_loaded_once_per_request(self):
+        for __ in range(3):
+            data = self.make_one()
+            data.get(self.course, 'display_name')
+            data.get(self.course, 'days_early_for_beta')
+        assert TestIndexedOverrideProvider.index_loads == 1
+
+
 class ResolveDottedTests(unittest.TestCase):
     """
     Tests for `resolve_dotted`.
@@ -8,6 +8,7 @@ import pytest
 
 from django.db import connections, DatabaseError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
@@ -26,6 +27,9 @@ from lms.djangoapps.courseware.tests.factories import StudentInfoFactory
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory as cmfStudentModuleFactory
 from lms.djangoapps.courseware.tests.factories import StudentPrefsFactory
 from lms.djangoapps.courseware.tests.factories import UserStateSummaryFactory
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
+from xmodule.modulestore.tests.factories import BlockFactory, CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
 
 
 def mock_field(scope, name):
@@ -444,3 +448,103 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestFieldDataCacheForBlockStructure(ModuleStoreTestCase):
+    """
+    Tests for FieldDataCache.cache_for_block_structure_descendents
+    """
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory.create()
+        self.course = CourseFactory.create()
+        with self.store.bulk_operations(self.course.id):
+            chapter = BlockFactory.create(parent=self.course, category='chapter')
+            self.sequential = BlockFactory.create(parent=chapter, category='sequential')
+            self.problems = []
+            for __ in range(3):
+                vertical = BlockFactory.create(parent=self.sequential, category='vertical')
+                self.problems.append(BlockFactory.create(parent=vertical, category='problem'))
+
+        for attempts, problem in enumerate(self.problems[:2], start=1):
+            cmfStudentModuleFactory(
+                student=self.user,
+                course_id=self.course.id,
+                module_state_key=problem.location,
+                state=json.dumps({'attempts': attempts}),
+            )
+        self.block_structure = get_course_in_cache(self.course.id)
+
+    def _attempts_key(self, problem):
+        """
+        Returns the key of the attempts field of the given problem.
+        """
+        return DjangoKeyValueStore.Key(Scope.user_state, self.user.id, problem.location, 'attempts')
+
+    def _student_module_queries(self, queries):
+        """
+        Returns the queries of the StudentModule table among the given queries.
+        """
+        return [query for query in queries if 'courseware_studentmodule' in query['sql']]
+
+    def test_same_state_as_block_descendents(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            self.course.id, self.user, self.block_structure, self.sequential.location,
+        )
+        block_field_data_cache = FieldDataCache.cache_for_block_descendents(
+            self.course.id, self.user, self.store.get_item(self.sequential.location),
+        )
+
+        with self.assertNumQueries(0):
+            for problem in self.problems:
+                key = self._attempts_key(problem)
+                assert field_data_cache.has(key) == block_field_data_cache.has(key)
+                if block_field_data_cache.has(key):
+                    assert field_data_cache.get(key) == block_field_data_cache.get(key)
+        assert field_data_cache.scorable_locations == block_field_data_cache.scorable_locations
+
+    def test_single_student_module_query(self):
+        with CaptureQueriesContext(connections['default']) as captured:
+            field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+                self.course.id, self.user, self.block_structure, self.sequential.location,
+            )
+        assert len(self._student_module_queries(captured.captured_queries)) == 1
+        assert len(field_data_cache.cache[Scope.user_state]) == 2
+
+    def test_lazy_deserialization(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            self.course.id, self.user, self.block_structure, self.sequential.location,
+        )
+        user_state_cache = field_data_cache.cache[Scope.user_state]
+        assert len(user_state_cache._raw_state) == 2  # pylint: disable=protected-access
+
+        assert field_data_cache.get(self._attempts_key(self.problems[0])) == 1
+        assert list(user_state_cache._raw_state) == [self.problems[1].location]  # pylint: disable=protected-access
+
+    def test_read_through_below_depth(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            self.course.id, self.user, self.block_structure, self.sequential.location, depth=1,
+        )
+        assert len(field_data_cache.cache[Scope.user_state]) == 0
+
+        with self.assertNumQueries(1):
+            assert field_data_cache.get(self._attempts_key(self.problems[1])) == 2
+        with self.assertNumQueries(1):
+            assert not field_data_cache.has(self._attempts_key(self.problems[2]))
+        with self.assertNumQueries(0):
+            assert not field_data_cache.has(self._attempts_key(self.problems[2]))
+
+    def test_set_replaces_lazy_state(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            self.course.id, self.user, self.block_structure, self.sequential.location,
+        )
+        key = self._attempts_key(self.problems[0])
+        field_data_cache.set_many({key: 5})
+
+        assert field_data_cache.get(key) == 5
+        assert json.loads(StudentModule.objects.get(module_state_key=self.problems[0].location).state) == {
+            'attempts': 5,
+        }
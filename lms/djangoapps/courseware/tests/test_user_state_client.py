@@ -3,6 +3,8 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
+
 import pytz
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import Scope
@@ -10,13 +12,17 @@ from datetime import datetime
 from unittest import TestCase
 from collections import defaultdict
 from django.db import connections
+from django.test.utils import CaptureQueriesContext
 
 from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.courseware.user_state_client import (
     DjangoXBlockUserStateClient,
     XBlockUserStateClient,
     XBlockUserState
 )
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 
 
@@ -757,3 +763,95 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
             2. Update the test in the other repo to align with the new functionality
             3. Remove this override to re-enable the working test
         """
+
+
+class TestDjangoUserStateClientWriteBehind(TestDjangoUserStateClient):
+    """
+    Tests of the DjangoUserStateClient backend, with all the state set in a
+    write_behind context.
+    It reuses all tests from :class:`~UserStateClientTestBase`.
+    """
+    __test__ = True
+
+    def setUp(self):
+        super().setUp()
+        write_behind = DjangoXBlockUserStateClient.write_behind()
+        write_behind.__enter__()  # pylint: disable=unnecessary-dunder-call
+        self.addCleanup(write_behind.__exit__, None, None, None)
+
+
+class TestWriteBehind(CacheIsolationTestCase):
+    """
+    Tests of DjangoXBlockUserStateClient.write_behind.
+    """
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        self.client = DjangoXBlockUserStateClient()
+        self.user = UserFactory.create()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.block_keys = [BlockUsageLocator(self.course_key, 'problem', f'block{block}') for block in range(3)]
+
+    def _stored_state(self, block_key):
+        """
+        Returns the state stored for the given block.
+        """
+        return json.loads(StudentModule.objects.get(student=self.user, module_state_key=block_key).state)
+
+    def test_writes_saved_on_exit(self):
+        with DjangoXBlockUserStateClient.write_behind():
+            for attempts in range(1, 4):
+                self.client.set(self.user.username, self.block_keys[0], {'attempts': attempts})
+            self.client.set(self.user.username, self.block_keys[0], {'done': True})
+            assert not StudentModule.objects.filter(student=self.user).exists()
+
+        assert self._stored_state(self.block_keys[0]) == {'attempts': 3, 'done': True}
+        assert len(list(self.client.get_history(self.user.username, self.block_keys[0]))) == 1
+
+    def test_reads_own_writes(self):
+        with DjangoXBlockUserStateClient.write_behind():
+            self.client.set(self.user.username, self.block_keys[0], {'attempts': 1})
+            assert self.client.get(self.user.username, self.block_keys[0]).state == {'attempts': 1}
+            self.client.set(self.user.username, self.block_keys[0], {'attempts': 2})
+
+        assert self._stored_state(self.block_keys[0]) == {'attempts': 2}
+        assert len(list(self.client.get_history(self.user.username, self.block_keys[0]))) == 1
+
+    def test_merged_with_stored_state(self):
+        StudentModuleFactory(
+            student=self.user,
+            course_id=self.course_key,
+            module_state_key=self.block_keys[0],
+            state=json.dumps({'attempts': 1, 'seed': 5}),
+        )
+        with DjangoXBlockUserStateClient.write_behind():
+            self.client.set(self.user.username, self.block_keys[0], {'attempts': 2})
+
+        assert self._stored_state(self.block_keys[0]) == {'attempts': 2, 'seed': 5}
+
+    def test_bulk_writes(self):
+        StudentModuleFactory(
+            student=self.user,
+            course_id=self.course_key,
+            module_state_key=self.block_keys[0],
+            state=json.dumps({'attempts': 1}),
+        )
+        with CaptureQueriesContext(connections['default']) as default_queries:
+            with CaptureQueriesContext(connections['student_module_history']) as history_queries:
+                with DjangoXBlockUserStateClient.write_behind():
+                    for block_key in self.block_keys:
+                        self.client.set(self.user.username, block_key, {'attempts': 2})
+
+        def count_queries(queries, statement, table):
+            return len([
+                query for query in queries.captured_queries
+                if query['sql'].startswith(statement) and table in query['sql']
+            ])
+
+        assert count_queries(default_queries, 'INSERT', 'courseware_studentmodule') == 1
+        assert count_queries(default_queries, 'UPDATE', 'courseware_studentmodule') == 1
+        assert count_queries(history_queries, 'INSERT', 'studentmodulehistoryextended') == 1
+        for block_key in self.block_keys:
+            assert self._stored_state(block_key) == {'attempts': 2}
@@ -138,6 +138,37 @@ COURSEWARE_OPTIMIZED_RENDER_XBLOCK = CourseWaffleFlag(
     f'{WAFFLE_FLAG_NAMESPACE}.optimized_render_xblock', __name__
 )
 
+# .. toggle_name: courseware.use_block_structure_field_data_cache
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Waffle flag that determines whether the field data of the blocks rendered by
+#   get_block_by_usage_id is prefetched from the collected block structure of the course, which loads the
+#   user state of all the blocks with a single query and deserializes it lazily, instead of loading every
+#   descendant block from the modulestore.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-01-01
+# .. toggle_warning: Blocks that are missing from a stale block structure have their user state read from the
+#   database one block at a time.
+COURSEWARE_USE_BLOCK_STRUCTURE_FIELD_DATA_CACHE = CourseWaffleFlag(
+    f'{WAFFLE_FLAG_NAMESPACE}.use_block_structure_field_data_cache', __name__
+)
+
+# .. toggle_name: courseware.write_behind_user_state
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Waffle flag that determines whether the user state set by an XBlock handler is buffered
+#   and saved when the handler returns, with bulk writes of the StudentModules and of their history, instead of
+#   being saved one block at a time as it is set.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-01-01
+# .. toggle_warning: Code that reads StudentModules directly, rather than through DjangoXBlockUserStateClient,
+#   doesn't see the state buffered by the handler until it returns.
+COURSEWARE_WRITE_BEHIND_USER_STATE = CourseWaffleFlag(
+    f'{WAFFLE_FLAG_NAMESPACE}.write_behind_user_state', __name__
+)
+
 # .. toggle_name: COURSES_INVITE_ONLY
 # .. toggle_implementation: SettingToggle
 # .. toggle_type: feature_flag
@@ -150,6 +181,20 @@ COURSEWARE_OPTIMIZED_RENDER_XBLOCK = CourseWaffleFlag(
 # .. toggle_tickets: https://github.com/mitodl/edx-platform/issues/123
 COURSES_INVITE_ONLY = SettingToggle('COURSES_INVITE_ONLY', default=False)
 
+# .. toggle_name: COURSEWARE_CACHE_ACCESS_DECISIONS
+# .. toggle_implementation: SettingToggle
+# .. toggle_type: feature_flag
+# .. toggle_default: False
+# .. toggle_description: Setting this caches the access decisions that has_access makes from the roles,
+#   enrollments, partition groups and milestones of users for the rest of the request, see
+#   lms/djangoapps/courseware/access_cache.py. The decisions are made again when the models they depend on are
+#   saved during the request.
+# .. toggle_category: admin
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warning: Changes to roles, enrollments, cohorts or milestones which are made during a request without
+#   saving their models, e.g. with queryset updates, aren't seen by the cached decisions.
+COURSEWARE_CACHE_ACCESS_DECISIONS = SettingToggle('COURSEWARE_CACHE_ACCESS_DECISIONS', default=False)
 
 ENABLE_OPTIMIZELY_IN_COURSEWARE = WaffleSwitch(  # lint-amnesty, pylint: disable=toggle-missing-annotation
     'RET.enable_optimizely_in_courseware', __name__
@@ -215,3 +260,17 @@ def courseware_disable_navigation_sidebar_blocks_caching(course_key=None):
     Return whether the courseware.disable_navigation_sidebar_blocks_caching flag is on.
     """
     return COURSEWARE_MICROFRONTEND_NAVIGATION_SIDEBAR_BLOCKS_DISABLE_CACHING.is_enabled(course_key)
+
+
+def courseware_use_block_structure_field_data_cache(course_key=None):
+    """
+    Return whether the courseware.use_block_structure_field_data_cache flag is on.
+    """
+    return COURSEWARE_USE_BLOCK_STRUCTURE_FIELD_DATA_CACHE.is_enabled(course_key)
+
+
+def courseware_write_behind_user_state(course_key=None):
+    """
+    Return whether the courseware.write_behind_user_state flag is on.
+    """
+    return COURSEWARE_WRITE_BEHIND_USER_STATE.is_enabled(course_key)
@@ -10,17 +10,20 @@ from operator import attrgetter
 from time import time
 
 from abc import abstractmethod
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import RequestCache
 from xblock.fields import Scope
 
-from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule
+from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule, student_modules_bulk_saved
 
 try:
     import simplejson as json
@@ -30,6 +33,9 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# RequestCache namespace of the user state buffered by DjangoXBlockUserStateClient.write_behind.
+WRITE_BEHIND_NAMESPACE = 'courseware.user_state_client.write_behind'
+
 
 class XBlockUserState(namedtuple('_XBlockUserState', ['username', 'block_key', 'state', 'updated', 'scope'])):
     """
@@ -220,6 +226,35 @@ class XBlockUserStateClient():
         raise NotImplementedError()
 
 
+class _PendingWrites:
+    """
+    The user state set in a DjangoXBlockUserStateClient.write_behind context,
+    which hasn't been saved yet.
+    """
+    def __init__(self):
+        # Maps (user, course_key) to dicts mapping UsageKeys to the fields set on them.
+        self.states = defaultdict(dict)
+        # The number of blocks set, including those set several times.
+        self.num_blocks_set = 0
+
+    def add(self, user, block_keys_to_state):
+        """
+        Overlay the state in ``block_keys_to_state`` over the pending state of ``user``.
+        """
+        for usage_key, state in block_keys_to_state.items():
+            self.states[user, usage_key.context_key].setdefault(usage_key, {}).update(state)
+        self.num_blocks_set += len(block_keys_to_state)
+
+    def pop_all(self):
+        """
+        Return the pending states and the number of blocks set, and clear them.
+        """
+        states, num_blocks_set = self.states, self.num_blocks_set
+        self.states = defaultdict(dict)
+        self.num_blocks_set = 0
+        return states, num_blocks_set
+
+
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
     An interface that uses the Django ORM StudentModule as a backend.
@@ -267,6 +302,139 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         """
         self.user = user
 
+    @classmethod
+    @contextmanager
+    def write_behind(cls):
+        """
+        Context manager which buffers the user state set by all the
+        DjangoXBlockUserStateClients in the current request, and saves it when
+        the context exits, with one bulk insert and one bulk update of the
+        StudentModules, and one bulk insert of their history, per user and course.
+
+        The state of a block that is set several times in the context is
+        only written once. Reading or deleting state through a client saves
+        the pending state first, so that it always reads its own writes.
+        Contexts can be nested; the state is saved when the outermost exits.
+        """
+        request_cache = RequestCache(WRITE_BEHIND_NAMESPACE)
+        if request_cache.get_cached_response('pending_writes').is_found:
+            yield
+            return
+
+        request_cache.set('pending_writes', _PendingWrites())
+        try:
+            yield
+        finally:
+            # Like state set without this buffer, the state set before an
+            # exception was raised is saved.
+            try:
+                cls()._save_pending_writes()  # pylint: disable=protected-access
+            finally:
+                request_cache.delete('pending_writes')
+
+    def _pending_writes(self):
+        """
+        Return the :class:`_PendingWrites` of the current write_behind context, if any.
+        """
+        return RequestCache(WRITE_BEHIND_NAMESPACE).get_cached_response('pending_writes').get_value_or_default(None)
+
+    def _save_pending_writes(self):
+        """
+        Save the user state set in the current write_behind context so far.
+        """
+        pending_writes = self._pending_writes()
+        if pending_writes is None or not pending_writes.states:
+            return
+
+        evt_time = time()
+        states, num_blocks_set = pending_writes.pop_all()
+        saved_student_modules = []
+        with transaction.atomic():
+            for (user, course_key), block_keys_to_state in states.items():
+                saved_student_modules.extend(self._bulk_save_states(user, course_key, block_keys_to_state))
+            student_modules_bulk_saved.send(sender=StudentModule, student_modules=saved_student_modules)
+
+        num_blocks_saved = sum(len(block_keys_to_state) for block_keys_to_state in states.values())
+        self._nr_stat_accumulate('write_behind', 'blocks_saved', num_blocks_saved)
+        self._nr_stat_accumulate('write_behind', 'blocks_coalesced', num_blocks_set - num_blocks_saved)
+
+        finish_time = time()
+        duration = (finish_time - evt_time) * 1000  # milliseconds
+        self._nr_stat_accumulate('write_behind', 'duration', duration)
+
+    def _bulk_save_states(self, user, course_key, block_keys_to_state):
+        """
+        Overlay the state in ``block_keys_to_state`` over the stored state of
+        ``user`` in ``course_key``, in bulk.
+
+        Returns the :class:`~StudentModule`s created or updated in bulk.
+        """
+        stored_student_modules = {
+            student_module.module_state_key.map_into_course(course_key): student_module
+            for student_module in StudentModule.objects.chunked_filter(
+                'module_state_key__in',
+                list(block_keys_to_state),
+                student=user,
+                course_id=course_key,
+            )
+        }
+
+        new_student_modules = []
+        updated_student_modules = []
+        modified = timezone.now()
+        for usage_key, state in block_keys_to_state.items():
+            student_module = stored_student_modules.get(usage_key)
+            if student_module is None:
+                student_module = StudentModule(
+                    student=user,
+                    course_id=course_key,
+                    module_state_key=usage_key,
+                    module_type=usage_key.block_type,
+                    state=json.dumps(state),
+                )
+                new_student_modules.append(student_module)
+                self._nr_block_stat_increment('write_behind', usage_key.block_type, 'blocks_created')
+            else:
+                if student_module.state is None:
+                    current_state = {}
+                else:
+                    current_state = json.loads(student_module.state)
+                current_state.update(state)
+                student_module.state = json.dumps(current_state)
+                # bulk_update doesn't set auto_now fields.
+                student_module.modified = modified
+                updated_student_modules.append(student_module)
+                self._nr_block_stat_increment('write_behind', usage_key.block_type, 'blocks_updated')
+            self._nr_block_stat_accumulate('write_behind', usage_key.block_type, 'size', len(student_module.state))
+
+        StudentModule.objects.bulk_update(updated_student_modules, ['state', 'modified'])
+
+        try:
+            with transaction.atomic():
+                StudentModule.objects.bulk_create(new_student_modules)
+        except IntegrityError:
+            # Some of these StudentModules were created by another process since
+            # they were read, so save the new state one block at a time instead.
+            log.warning("write_behind: IntegrityError for student {} - course_id {} - usage keys {}".format(
+                user, repr(str(course_key)), [student_module.module_state_key for student_module in new_student_modules]
+            ))
+            self._set_many(user, {
+                student_module.module_state_key: block_keys_to_state[student_module.module_state_key]
+                for student_module in new_student_modules
+            })
+            return updated_student_modules
+
+        if any(student_module.id is None for student_module in new_student_modules):
+            # Not all databases return the ids of the rows inserted in bulk.
+            new_student_modules = list(StudentModule.objects.chunked_filter(
+                'module_state_key__in',
+                [student_module.module_state_key for student_module in new_student_modules],
+                student=user,
+                course_id=course_key,
+            ))
+
+        return updated_student_modules + new_student_modules
+
     def _get_student_modules(self, username, block_keys):
         """
         Retrieve the :class:`~StudentModule`s for the supplied ``username`` and ``block_keys``.
@@ -275,6 +443,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             username (str): The name of the user to load `StudentModule`s for.
             block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
         """
+        self._save_pending_writes()
+
         course_key_func = attrgetter('course_key')
         by_course = itertools.groupby(
             sorted(block_keys, key=course_key_func),
@@ -428,6 +598,19 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # what we have.
             return
 
+        pending_writes = self._pending_writes()
+        if pending_writes is not None:
+            pending_writes.add(user, block_keys_to_state)
+            self._nr_stat_accumulate('set_many', 'blocks_buffered', len(block_keys_to_state))
+            return
+
+        self._set_many(user, block_keys_to_state)
+
+    def _set_many(self, user, block_keys_to_state):
+        """
+        Overlay the state in ``block_keys_to_state`` over the stored state of
+        ``user``, one block at a time.
+        """
         evt_time = time()
 
         for usage_key, state in block_keys_to_state.items():
@@ -600,6 +783,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        self._save_pending_writes()
         results = StudentModule.objects.order_by('id').filter(module_state_key=block_key).select_related('student')
         p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
 
@@ -632,6 +816,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        self._save_pending_writes()
         results = StudentModule.objects.order_by('id').filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
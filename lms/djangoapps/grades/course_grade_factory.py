@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from openedx.core.djangoapps.signals.signals import (
@@ -13,6 +14,7 @@ from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
 from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -23,6 +25,9 @@ class CourseGradeFactory:
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of students whose scores are bulk-loaded at once by iter.
+    ITER_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -75,6 +80,7 @@ class CourseGradeFactory:
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            prefetch_scores=False,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -84,6 +90,11 @@ class CourseGradeFactory:
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        When force_update or prefetch_scores is True, the problem scores of
+        the students are bulk-loaded for batches of ITER_BATCH_SIZE students,
+        instead of being queried for each student. Use prefetch_scores when
+        the problem scores of the returned grades are to be read.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -93,8 +104,33 @@ class CourseGradeFactory:
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if not (force_update or prefetch_scores):
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+            return
+
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.ITER_BATCH_SIZE))
+            if not batch:
+                return
+            self._prefetch_scores(course_data, batch)
+            try:
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                SubsectionGradeFactory.clear_prefetched_scores(course_data.course_key)
+
+    @staticmethod
+    def _prefetch_scores(course_data, users):
+        """
+        Bulk-loads the problem scores of the given users, falling back to
+        loading them for each user if this fails.
+        """
+        try:
+            SubsectionGradeFactory.prefetch_scores(course_data, users)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Cannot prefetch scores of %d students in course %s', len(users), course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
         try:
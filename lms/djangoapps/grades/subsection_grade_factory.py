@@ -10,11 +10,12 @@ from django.conf import settings
 from lazy import lazy
 from submissions import api as submissions_api
 
-from common.djangoapps.student.models import anonymous_id_for_user
+from common.djangoapps.student.models import anonymous_id_for_user, anonymous_ids_for_users
 from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.djangoapps.signals.signals import COURSE_ASSESSMENT_GRADE_CHANGED
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 
 from .course_data import CourseData
@@ -27,6 +28,8 @@ class SubsectionGradeFactory:
     """
     Factory for Subsection Grades.
     """
+    _PREFETCHED_SCORES_CACHE_NAMESPACE = 'grades.subsection_grade_factory.SubsectionGradeFactory.scores'
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -115,12 +118,57 @@ class SubsectionGradeFactory:
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_scores(cls, course_data, users):
+        """
+        Bulk-loads the scores of the given users in the course, from CSM
+        and from the Submissions API, for use by their factories until
+        clear_prefetched_scores is called.
+
+        The CSM scores are loaded for all the scorable blocks of the
+        collected course structure, a superset of those of each user's
+        structure. The Submissions API has no public query of the scores
+        of many students, so those are still loaded for each student.
+        """
+        course_key = course_data.course_key
+        scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        csm_scores = ScoresClient.create_for_users(course_key, [user.id for user in users], scorable_locations)
+
+        anonymous_user_ids = anonymous_ids_for_users(users, course_key)
+        get_cache(cls._PREFETCHED_SCORES_CACHE_NAMESPACE)[str(course_key)] = {
+            user.id: (
+                submissions_api.get_scores(str(course_key), anonymous_user_ids[user.id]),
+                csm_scores[user.id],
+            )
+            for user in users
+        }
+
+    @classmethod
+    def clear_prefetched_scores(cls, course_key):
+        """
+        Clears the scores prefetched for this course from the RequestCache.
+        """
+        get_cache(cls._PREFETCHED_SCORES_CACHE_NAMESPACE).pop(str(course_key), None)
+
+    @lazy
+    def _prefetched_scores(self):
+        """
+        Returns the (submissions scores, CSM scores) prefetched for the
+        student in the course, or None if they weren't prefetched.
+        """
+        prefetched_scores = get_cache(self._PREFETCHED_SCORES_CACHE_NAMESPACE).get(str(self.course_data.course_key))
+        return prefetched_scores.get(self.student.id) if prefetched_scores else None
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores[1]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -130,6 +178,8 @@ class SubsectionGradeFactory:
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores[0]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
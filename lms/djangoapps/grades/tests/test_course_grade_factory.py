@@ -7,6 +7,7 @@ import ddt
 
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.model_data import ScoresClient
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.factories import CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
@@ -158,6 +159,21 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         assert mock_update.called == force_update
 
+    @ddt.data({'force_update': True}, {'prefetch_scores': True})
+    def test_iter_prefetches_scores(self, iter_kwargs):
+        with patch(
+            'lms.djangoapps.grades.subsection_grade_factory.ScoresClient.create_for_users',
+            wraps=ScoresClient.create_for_users,
+        ) as mock_create_for_users, patch(
+            'lms.djangoapps.grades.subsection_grade_factory.ScoresClient.create_for_locations',
+        ) as mock_create_for_locations:
+            grade_results = list(CourseGradeFactory().iter(
+                users=[self.request.user], course=self.course, **iter_kwargs
+            ))
+        assert grade_results[0].error is None
+        assert mock_create_for_users.call_count == 1
+        assert not mock_create_for_locations.called
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -39,6 +39,7 @@ class GradesTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 4
     READ_VERSION = 4
+    SUPPORTS_INCREMENTAL_COLLECT = True
     FIELDS_TO_COLLECT = [
         'due',
         'format',
@@ -116,7 +117,7 @@ class GradesTransformer(BlockStructureTransformer):
 
         block_types_to_ignore = {'course', 'chapter', 'sequential'}
 
-        for block_key in block_structure.topological_traversal():
+        for block_key in block_structure.xblock_topological_traversal():
             if block_key.block_type in block_types_to_ignore:
                 _set_field(block_key, None)
             else:
@@ -138,7 +139,7 @@ class GradesTransformer(BlockStructureTransformer):
         """
         Collect the `max_score` for every block in the provided `block_structure`.
         """
-        for block_locator in block_structure.post_order_traversal():
+        for block_locator in block_structure.xblock_post_order_traversal():
             block = block_structure.get_xblock(block_locator)
             if getattr(block, 'has_score', False):
                 cls._collect_max_score(block_structure, block)
@@ -489,6 +489,19 @@ def list_problem_responses(course_key, problem_location, limit_responses=None):
     where `state` represents a student's response to the problem
     identified by `problem_location`.
     """
+    return list(iter_problem_responses(course_key, problem_location, limit_responses))
+
+
+def iter_problem_responses(course_key, problem_location, limit_responses=None):
+    """
+    Yield the responses to a given problem one at a time, in the format
+    returned by list_problem_responses.
+
+    The StudentModule rows are fetched in chunks of USER_STATE_BATCH_SIZE,
+    rather than all at once.  The chunks are paginated by student id, which
+    is unique among the rows of a problem, since database drivers like
+    mysqlclient buffer the whole result of a query anyway.
+    """
     if isinstance(problem_location, UsageKey):
         problem_key = problem_location
     else:
@@ -498,20 +511,29 @@ def list_problem_responses(course_key, problem_location, limit_responses=None):
     if not run:
         problem_key = UsageKey.from_string(problem_location).map_into_course(course_key)
     if problem_key.course_key != course_key:
-        return []
+        return
 
     smdat = StudentModule.objects.filter(
         course_id=course_key,
         module_state_key=problem_key
     ).select_related('student')
-    smdat = smdat.order_by('student')
-    if limit_responses is not None:
-        smdat = smdat[:limit_responses]
+    smdat = smdat.order_by('student_id')
 
-    return [
-        {'username': response.student.username, 'state': get_response_state(response)}
-        for response in smdat
-    ]
+    last_student_id = None
+    remaining = limit_responses
+    while remaining is None or remaining > 0:
+        batch_size = settings.USER_STATE_BATCH_SIZE if remaining is None else min(
+            remaining, settings.USER_STATE_BATCH_SIZE
+        )
+        batch = smdat if last_student_id is None else smdat.filter(student_id__gt=last_student_id)
+        responses = list(batch[:batch_size])
+        for response in responses:
+            yield {'username': response.student.username, 'state': get_response_state(response)}
+        if len(responses) < batch_size:
+            return
+        last_student_id = responses[-1].student_id
+        if remaining is not None:
+            remaining -= len(responses)
 
 
 def get_response_state(response):
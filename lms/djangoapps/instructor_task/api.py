@@ -13,6 +13,7 @@ from collections import Counter
 
 import pytz
 from celery.states import READY_STATES
+from django.conf import settings
 
 from common.djangoapps.util import milestones_helpers
 from lms.djangoapps.bulk_email.api import get_course_email
@@ -29,7 +30,7 @@ from lms.djangoapps.instructor_task.api_helper import (
     submit_scheduled_task,
 )
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
-from lms.djangoapps.instructor_task.models import InstructorTask, InstructorTaskSchedule, SCHEDULED
+from lms.djangoapps.instructor_task.models import InstructorTask, InstructorTaskSchedule, PROGRESS, SCHEDULED
 from lms.djangoapps.instructor_task.tasks import (
     calculate_grades_csv,
     calculate_inactive_enrolled_students_info_csv,
@@ -607,3 +608,25 @@ def process_scheduled_instructor_tasks():
             submit_scheduled_task(schedule)
         except QueueConnectionError as exc:
             log.error(f"Error processing scheduled task with task id '{schedule.task.id}': {exc}")
+
+
+def resume_stale_grade_reports():
+    """
+    Utility function that re-runs the tasks of the sharded grade reports which have not made progress within
+    GRADE_REPORT_SHARD_TIMEOUT, for instance because the worker generating one of their shards was killed. Re-running
+    the task of a sharded grade report only queues again its lost shards, or the merge of its shards.
+    """
+    task_classes = {
+        InstructorTaskTypes.GRADE_COURSE: calculate_grades_csv,
+        InstructorTaskTypes.GRADE_PROBLEMS: calculate_problem_grade_report,
+    }
+    stale_before = datetime.datetime.now(pytz.utc) - datetime.timedelta(seconds=settings.GRADE_REPORT_SHARD_TIMEOUT)
+    # Only sharded grade reports have subtasks.
+    stale_tasks = InstructorTask.objects.filter(
+        task_type__in=list(task_classes), task_state=PROGRESS, updated__lt=stale_before
+    ).exclude(subtasks='')
+    for instructor_task in stale_tasks:
+        log.info(f"Resuming stale grade report task with id '{instructor_task.id}'")
+        task_classes[instructor_task.task_type].apply_async(
+            [instructor_task.id, {'task_id': instructor_task.task_id}], task_id=instructor_task.task_id
+        )
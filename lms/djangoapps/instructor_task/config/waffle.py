@@ -29,6 +29,33 @@ USE_ON_DISK_GRADE_REPORTING = CourseWaffleFlag(
     f'{WAFFLE_NAMESPACE}.use_on_disk_grade_reporting', __name__
 )
 
+# .. toggle_name: instructor_task.use_sharded_grade_reporting
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When generating course and problem grade reports, split the enrolled learners into
+#   shards of GRADE_REPORT_USERS_PER_SHARD learners, generated in parallel by subtasks and checkpointed to the
+#   report store, before merging them into the final report. Takes precedence over
+#   instructor_task.use_on_disk_grade_reporting.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+USE_SHARDED_GRADE_REPORTING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_sharded_grade_reporting', __name__
+)
+
+# .. toggle_name: instructor_task.use_fast_rescoring
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When rescoring problems which only contain numerical and formula responses, and no
+#   scripts, grade the answers of all the learners in bulk with a single instance of the problem, grading each
+#   distinct answer once. Only the learners whose score or correctness changes are then rescored one by one;
+#   the others are counted as rescored without loading the problem for them, so no rescore events are emitted
+#   for them. Not used when grading methods are enabled in problems.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+USE_FAST_RESCORING = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.use_fast_rescoring', __name__
+)
+
 
 def problem_grade_report_verified_only(course_id):
     """
@@ -55,3 +82,19 @@ def use_on_disk_grade_reporting(course_id):
     False otherwise.
     """
     return USE_ON_DISK_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_sharded_grade_reporting(course_id):
+    """
+    Returns True if grade reports should be generated in
+    shards by subtasks, False otherwise.
+    """
+    return USE_SHARDED_GRADE_REPORTING.is_enabled(course_id)
+
+
+def use_fast_rescoring(course_id):
+    """
+    Returns True if problems made only of numerical and formula responses
+    should be rescored in bulk, False otherwise.
+    """
+    return USE_FAST_RESCORING.is_enabled(course_id)
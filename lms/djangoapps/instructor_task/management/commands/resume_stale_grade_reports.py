@@ -0,0 +1,15 @@
+"""
+Command to resume stale sharded grade reports.
+"""
+from django.core.management.base import BaseCommand
+
+from lms.djangoapps.instructor_task.api import resume_stale_grade_reports
+
+
+class Command(BaseCommand):
+    """
+    Command to re-run the tasks of the sharded grade reports in the `PROGRESS` state which have not made progress
+    within GRADE_REPORT_SHARD_TIMEOUT, so that their lost shards are generated again. Meant to be run periodically.
+    """
+    def handle(self, *args, **options):
+        resume_stale_grade_reports()
@@ -23,7 +23,7 @@ from botocore.exceptions import ClientError
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 
 from django.utils.translation import gettext as _
@@ -296,6 +296,12 @@ class DjangoStorageReportStore(ReportStore):
         object, ready to be read from the beginning.
         """
         path = self.path_to(course_id, filename, parent_dir)
+        if 'b' in getattr(buff, 'mode', ''):
+            # Binary files are handed to the storage as they are, so that large
+            # reports are streamed to it rather than read into memory.
+            self.storage.save(path, File(buff))
+            return
+
         # See https://github.com/boto/boto/issues/2868
         # Boto doesn't play nice with unicode in python3
         buff_contents = buff.read()
@@ -318,6 +324,25 @@ class DjangoStorageReportStore(ReportStore):
         output_buffer.seek(0)
         self.store(course_id, filename, output_buffer, parent_dir)
 
+    def exists(self, course_id, filename, parent_dir=''):
+        """
+        Return True if a file named `filename` is stored for `course_id`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename, parent_dir))
+
+    def open(self, course_id, filename, parent_dir=''):
+        """
+        Return a binary file-like object for the file named `filename`
+        stored for `course_id`.
+        """
+        return self.storage.open(self.path_to(course_id, filename, parent_dir), 'rb')
+
+    def delete(self, course_id, filename, parent_dir=''):
+        """
+        Delete the file named `filename` stored for `course_id`, if any.
+        """
+        self.storage.delete(self.path_to(course_id, filename, parent_dir))
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples.
@@ -35,7 +35,13 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv
 )
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses,
+    generate_grade_report_shard as _generate_grade_report_shard,
+    merge_grade_report_shards as _merge_grade_report_shards,
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -51,6 +57,7 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     override_score_module_state,
     perform_module_state_update,
     rescore_problem_module_state,
+    rescore_problem_module_states_in_bulk,
     reset_attempts_module_state
 )
 from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
@@ -81,8 +88,9 @@ def rescore_problem(entry_id, xblock_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = gettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xblock_instance_args)
+    bulk_update_fcn = partial(rescore_problem_module_states_in_bulk, xblock_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, bulk_update_fcn=bulk_update_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -219,6 +227,29 @@ def calculate_problem_grade_report(entry_id, xblock_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def generate_grade_report_shard(
+    entry_id, report_type, action_name, shard_index, first_user_id, last_user_id, subtask_status_dict
+):
+    """
+    Generate the rows of a sharded grade report for the learners with ids
+    between `first_user_id` and `last_user_id`, and store them in the report store.
+    """
+    return _generate_grade_report_shard(
+        entry_id, report_type, action_name, shard_index, first_user_id, last_user_id, subtask_status_dict
+    )
+
+
+@shared_task
+@set_code_owner_attribute
+def merge_grade_report_shards(entry_id, report_type, action_name, subtask_status_dict):
+    """
+    Merge the shards of a sharded grade report and push the report to an S3 bucket for download.
+    """
+    return _merge_grade_report_shards(entry_id, report_type, action_name, subtask_status_dict)
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_students_features_csv(entry_id, xblock_instance_args):
@@ -3,17 +3,25 @@ Functionality for generating grade reports.
 """
 
 import csv
+import json
 import logging
+import os
+import pickle
 import re
+import traceback
 from collections import OrderedDict, defaultdict
 from datetime import datetime
-from itertools import chain
+from io import TextIOWrapper
+from itertools import chain, islice
 from tempfile import TemporaryFile
 
 from time import time
 
+from celery.states import FAILURE, READY_STATES, SUCCESS
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
@@ -22,6 +30,7 @@ from six.moves import zip_longest
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.roles import BulkRoleCache
+from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.certificates import api as certs_api
 from lms.djangoapps.certificates.api import get_certificates_for_course_and_users
 from lms.djangoapps.course_blocks.api import get_course_blocks
@@ -29,12 +38,20 @@ from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateCli
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
 from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
-from lms.djangoapps.instructor_analytics.basic import list_problem_responses
-from lms.djangoapps.instructor_analytics.csvs import format_dictlist
+from lms.djangoapps.instructor_analytics.basic import iter_problem_responses
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
     problem_grade_report_verified_only,
     use_on_disk_grade_reporting,
+    use_sharded_grade_reporting,
+)
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SUBTASK_LOCK_EXPIRE,
+    SubtaskStatus,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    update_subtask_status,
 )
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
@@ -72,6 +89,11 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _grouper(iterable, chunk_size=100, fillvalue=None):
+    args = [iter(iterable)] * chunk_size
+    return zip_longest(*args, fillvalue=fillvalue)
+
+
 class _CourseGradeReportContext:
     """
     Internal class that provides a common context to use for a single grade
@@ -81,17 +103,21 @@ class _CourseGradeReportContext:
     """
 
     def __init__(self, _xblock_instance_args, _entry_id, course_id, _task_input, action_name):
+        task_id = _xblock_instance_args.get('task_id') if _xblock_instance_args is not None else None
         self.task_info_string = (
             'Task: {task_id}, '
             'InstructorTask ID: {entry_id}, '
             'Course: {course_id}, '
             'Input: {task_input}'
         ).format(
-            task_id=_xblock_instance_args.get('task_id') if _xblock_instance_args is not None else None,
+            task_id=task_id,
             entry_id=_entry_id,
             course_id=course_id,
             task_input=_task_input,
         )
+        self.task_id = task_id
+        self.entry_id = _entry_id
+        self.task_input = _task_input
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
@@ -413,6 +439,279 @@ class TemporaryFileReportMixin:
             )
 
 
+class ShardedReportMixin(TemporaryFileReportMixin):
+    """
+    Mixin for a file report that is generated in shards of learners, each shard
+    being computed by a separate subtask and checkpointed to the report store.
+
+    The task generating the report only splits the enrolled learners into
+    ranges of user ids and queues one subtask per shard.  Each shard subtask
+    stores its rows as partial CSV files, followed by a small checkpoint file
+    recording its counts.  Once every shard is done, a last subtask merges the
+    partial files into the final report.
+
+    Shards that have a checkpoint are never computed again, so re-running the
+    task of an interrupted report only computes the missing shards.  Each shard
+    also has a lease file, renewed when the shard is queued and while it is
+    generated, so that only the shards whose lease is older than
+    GRADE_REPORT_SHARD_TIMEOUT are considered lost and queued again.  The
+    resume_stale_grade_reports management command re-runs the tasks of the
+    reports which stopped making progress.
+    """
+    # Key of the report in SHARDED_GRADE_REPORTS, set by subclasses.
+    REPORT_TYPE = None
+
+    MANIFEST_FILENAME = 'manifest.json'
+
+    @lazy
+    def report_store(self):
+        return ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    @lazy
+    def shards_dir(self):
+        """
+        Returns the directory of the report store holding the shards of this report.
+        """
+        parent_dir = self.context.upload_parent_dir or self.report_store.path_to(self.context.course_id)
+        return os.path.join(parent_dir, 'grade_report_shards', str(self.context.entry_id))
+
+    def _generate(self):
+        """
+        Queues the subtasks generating the shards of this report.
+        """
+        self.context.update_status('ShardedReportMixin - 1: Starting grade report')
+        entry = InstructorTask.objects.get(pk=self.context.entry_id)
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            # The task is being re-run: resume the report from its checkpoints,
+            # unless the shards were already merged (which deletes the manifest).
+            manifest = self._read_json(self.MANIFEST_FILENAME)
+            merge_status = json.loads(entry.subtasks)['status'][self._merge_subtask_id()]
+            if manifest is None or merge_status['state'] in READY_STATES:
+                self.context.update_status('ShardedReportMixin - 2: Shards already merged')
+                return json.loads(entry.task_output)
+            self.context.update_status('ShardedReportMixin - 2: Resuming lost shards')
+            self._queue_pending_subtasks(entry, manifest, only_lost=True)
+            return json.loads(entry.task_output)
+
+        manifest = self._create_manifest()
+        if not manifest['shards']:
+            self.context.update_status('ShardedReportMixin - 2: Uploading empty grade report')
+            self._merge_shards(manifest)
+            return self.context.update_status('ShardedReportMixin - 3: Completed grades')
+
+        self._write_json(self.MANIFEST_FILENAME, manifest)
+        subtask_ids = [self._shard_subtask_id(shard_index) for shard_index in range(len(manifest['shards']))]
+        subtask_ids.append(self._merge_subtask_id())
+        with outer_atomic():
+            progress = initialize_subtask_info(entry, self.context.action_name, manifest['total'], subtask_ids)
+
+        self.context.update_status('ShardedReportMixin - 2: Queueing {} shards'.format(len(manifest['shards'])))
+        self._queue_pending_subtasks(entry, manifest)
+        return progress
+
+    def generate_shard(self, shard_index, first_user_id, last_user_id):
+        """
+        Writes the rows of the learners with ids in the given range to the
+        report store, and returns the (succeeded, failed) counts of the shard.
+        """
+        checkpoint = self._read_json(self._shard_filename(shard_index, 'json'))
+        if checkpoint is not None:
+            self.context.update_status(f'ShardedReportMixin - Shard {shard_index} already generated')
+            return checkpoint['succeeded'], checkpoint['failed']
+
+        self.context.update_status(f'ShardedReportMixin - Generating shard {shard_index}')
+        self.user_id_range = (first_user_id, last_user_id)
+        lease_time = self._renew_lease(shard_index)
+        succeeded, failed = 0, 0
+        with TemporaryFile('r+') as success_file, TemporaryFile('r+') as error_file:
+            success_writer = csv.writer(success_file)
+            error_writer = csv.writer(error_file)
+            for success_rows, error_rows in self._batched_rows():
+                success_writer.writerows(success_rows)
+                error_writer.writerows(error_rows)
+                succeeded += len(success_rows)
+                failed += len(error_rows)
+                self.context.task_progress.succeeded = succeeded
+                self.context.task_progress.failed = failed
+                self.context.task_progress.attempted = succeeded + failed
+                self.context.update_status(f'ShardedReportMixin - Generating shard {shard_index}')
+                if time() - lease_time > settings.GRADE_REPORT_SHARD_TIMEOUT / 4:
+                    lease_time = self._renew_lease(shard_index)
+
+            # Partial files left by an interrupted run would prevent the
+            # storage from saving the new ones under the same names.
+            for filename, shard_file in ((self._shard_filename(shard_index, 'csv'), success_file),
+                                         (self._shard_filename(shard_index, 'err.csv'), error_file)):
+                shard_file.seek(0)
+                self.report_store.delete(self.context.course_id, filename, parent_dir=self.shards_dir)
+                self.report_store.store(self.context.course_id, filename, shard_file, parent_dir=self.shards_dir)
+
+        # The checkpoint is written last, once the shard is completely stored.
+        self._write_json(self._shard_filename(shard_index, 'json'), {'succeeded': succeeded, 'failed': failed})
+        return succeeded, failed
+
+    def merge_shards(self):
+        """
+        Merges the stored shards of this report into the final report.
+        """
+        self._merge_shards(self._read_json(self.MANIFEST_FILENAME))
+
+    def _merge_shards(self, manifest):
+        """
+        Concatenates the stored shards listed in the given manifest, uploads
+        the resulting report and deletes the shards.
+        """
+        self.context.update_status('ShardedReportMixin - Merging shards')
+        num_shards = len(manifest['shards'])
+        checkpoints = [self._read_json(self._shard_filename(shard_index, 'json')) for shard_index in range(num_shards)]
+        missing_shards = [shard_index for shard_index, checkpoint in enumerate(checkpoints) if checkpoint is None]
+        if missing_shards:
+            raise ValueError(f'Unable to merge grade report: shards {missing_shards} were not generated')
+
+        with TemporaryFile('r+') as success_file, TemporaryFile('r+') as error_file:
+            csv.writer(success_file).writerow(self._success_headers())
+            csv.writer(error_file).writerow(self._error_headers())
+            for shard_index in range(num_shards):
+                for filename, merged_file in ((self._shard_filename(shard_index, 'csv'), success_file),
+                                              (self._shard_filename(shard_index, 'err.csv'), error_file)):
+                    with self.report_store.open(self.context.course_id, filename, self.shards_dir) as shard_file:
+                        merged_file.write(shard_file.read().decode('utf-8'))
+
+            self.context.task_progress.succeeded = sum(checkpoint['succeeded'] for checkpoint in checkpoints)
+            self.context.task_progress.failed = sum(checkpoint['failed'] for checkpoint in checkpoints)
+            self.context.task_progress.attempted = (
+                self.context.task_progress.succeeded + self.context.task_progress.failed
+            )
+            self.context.task_progress.total = self.context.task_progress.attempted
+
+            self.context.update_status('ShardedReportMixin - Uploading files')
+            self.upload_temp_files(success_file, error_file, self.context.task_progress.failed > 0)
+
+        for shard_index in range(num_shards):
+            for extension in ('csv', 'err.csv', 'json', 'lease.json'):
+                self.report_store.delete(
+                    self.context.course_id, self._shard_filename(shard_index, extension), self.shards_dir
+                )
+        self.report_store.delete(self.context.course_id, self.MANIFEST_FILENAME, self.shards_dir)
+
+    def queue_merge_if_ready(self):
+        """
+        Queues the subtask merging the shards once every shard subtask is done.
+        """
+        entry = InstructorTask.objects.get(pk=self.context.entry_id)
+        subtask_status_info = json.loads(entry.subtasks)['status']
+        merge_subtask_id = self._merge_subtask_id()
+        shards_done = all(
+            status['state'] in READY_STATES
+            for subtask_id, status in subtask_status_info.items()
+            if subtask_id != merge_subtask_id
+        )
+        if not shards_done or subtask_status_info[merge_subtask_id]['state'] in READY_STATES:
+            return
+
+        # Shards finishing at the same time may both see every shard done.
+        if cache.add(f'grade-report-merge-{merge_subtask_id}', 'true', SUBTASK_LOCK_EXPIRE):
+            from lms.djangoapps.instructor_task.tasks import merge_grade_report_shards  # pylint: disable=import-outside-toplevel
+            self.context.update_status('ShardedReportMixin - Queueing merge of shards')
+            merge_grade_report_shards.apply_async(
+                (
+                    self.context.entry_id,
+                    self.REPORT_TYPE,
+                    self.context.action_name,
+                    SubtaskStatus.create(merge_subtask_id).to_dict(),
+                ),
+                task_id=merge_subtask_id,
+            )
+
+    def _create_manifest(self):
+        """
+        Splits the learners included in this report into shards, returning a
+        dict with the (first_user_id, last_user_id) range of each shard and
+        the total number of learners.
+        """
+        users_per_shard = settings.GRADE_REPORT_USERS_PER_SHARD
+        shards = []
+        total = 0
+        for user_ids in _grouper(self._enrolled_learner_ids().iterator(), users_per_shard):
+            user_ids = [user_id for user_id in user_ids if user_id is not None]
+            shards.append((user_ids[0], user_ids[-1]))
+            total += len(user_ids)
+        return {'shards': shards, 'total': total}
+
+    def _queue_pending_subtasks(self, entry, manifest, only_lost=False):
+        """
+        Queues the subtasks of the shards that are not done yet, and the merge
+        subtask if every shard is done.  With `only_lost`, the shards that are
+        still queued or being generated, according to their lease, are skipped.
+        """
+        from lms.djangoapps.instructor_task.tasks import generate_grade_report_shard  # pylint: disable=import-outside-toplevel
+        subtask_status_info = json.loads(entry.subtasks)['status']
+        for shard_index, (first_user_id, last_user_id) in enumerate(manifest['shards']):
+            subtask_id = self._shard_subtask_id(shard_index)
+            if subtask_status_info[subtask_id]['state'] in READY_STATES:
+                continue
+            if only_lost and not self._is_shard_lost(shard_index):
+                self.context.update_status(f'ShardedReportMixin - Shard {shard_index} is still pending')
+                continue
+            self._renew_lease(shard_index)
+            generate_grade_report_shard.apply_async(
+                (
+                    self.context.entry_id,
+                    self.REPORT_TYPE,
+                    self.context.action_name,
+                    shard_index,
+                    first_user_id,
+                    last_user_id,
+                    SubtaskStatus.create(subtask_id).to_dict(),
+                ),
+                task_id=subtask_id,
+            )
+        self.queue_merge_if_ready()
+
+    def _renew_lease(self, shard_index):
+        """
+        Records that the given shard is queued or being generated, and returns the time of the record.
+        """
+        lease_time = time()
+        self._write_json(self._shard_filename(shard_index, 'lease.json'), {'renewed': lease_time})
+        return lease_time
+
+    def _is_shard_lost(self, shard_index):
+        """
+        Returns whether the lease of the given shard was not renewed within
+        GRADE_REPORT_SHARD_TIMEOUT.  Queuing a lost shard which has a checkpoint
+        only records its status.
+        """
+        lease = self._read_json(self._shard_filename(shard_index, 'lease.json'))
+        return lease is None or time() - lease['renewed'] > settings.GRADE_REPORT_SHARD_TIMEOUT
+
+    def _shard_subtask_id(self, shard_index):
+        return f'{self.context.task_id}-shard-{shard_index}'
+
+    def _merge_subtask_id(self):
+        return f'{self.context.task_id}-merge'
+
+    def _shard_filename(self, shard_index, extension):
+        return f'shard-{shard_index:05d}.{extension}'
+
+    def _read_json(self, filename):
+        """
+        Returns the decoded contents of the given JSON file of the shards
+        directory, or None if it does not exist.
+        """
+        if not self.report_store.exists(self.context.course_id, filename, self.shards_dir):
+            return None
+        with self.report_store.open(self.context.course_id, filename, self.shards_dir) as json_file:
+            return json.loads(json_file.read().decode('utf-8'))
+
+    def _write_json(self, filename, contents):
+        """
+        Stores the given contents as a JSON file of the shards directory.
+        """
+        self.report_store.delete(self.context.course_id, filename, self.shards_dir)
+        self.report_store.store(self.context.course_id, filename, ContentFile(json.dumps(contents)), self.shards_dir)
+
+
 class GradeReportBase:
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
@@ -420,6 +719,9 @@ class GradeReportBase:
 
     def __init__(self, context):
         self.context = context
+        # Optional (first_user_id, last_user_id) range restricting the
+        # learners included in this report, see ShardedReportMixin.
+        self.user_id_range = None
 
     def _get_enrolled_learner_count(self):
         """
@@ -446,28 +748,43 @@ class GradeReportBase:
         TASK_LOG.info('%s, Task type: %s, %s, %s', task_info_string, self.context.action_name,
                       message, self.context.task_progress.state)
 
+    def _enrolled_learners_filter_kwargs(self):
+        """
+        Returns the filter kwargs selecting the users enrolled in the course
+        that are included in this report.
+        """
+        filter_kwargs = {
+            'courseenrollment__course_id': self.context.course_id,
+        }
+        if self.context.report_for_verified_only:
+            filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+        return filter_kwargs
+
+    def _enrolled_learner_ids(self):
+        """
+        Returns a queryset of the ids of the users included in this report,
+        ordered by id.
+        """
+        user_ids_list = get_user_model().objects.filter(
+            **self._enrolled_learners_filter_kwargs()
+        ).values_list('id', flat=True).order_by('id')
+        if self.user_id_range is not None:
+            user_ids_list = user_ids_list.filter(id__range=self.user_id_range)
+        return user_ids_list
+
     def _batch_users(self):
         """
         Returns a generator of batches of users.
         """
-        def grouper(iterable, chunk_size=100, fillvalue=None):
-            args = [iter(iterable)] * chunk_size
-            return zip_longest(*args, fillvalue=fillvalue)
-
-        def get_enrolled_learners_for_course(course_id, verified_only=False):
+        def get_enrolled_learners_for_course():
             """
             Get all the enrolled users in a course chunk by chunk.
             This generator method fetches & loads the enrolled user objects on demand which in chunk
             size defined. This method is a workaround to avoid out-of-memory errors.
             """
-            filter_kwargs = {
-                'courseenrollment__course_id': course_id,
-            }
-            if verified_only:
-                filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
-
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
-            user_chunks = grouper(user_ids_list)
+            filter_kwargs = self._enrolled_learners_filter_kwargs()
+            user_ids_list = self._enrolled_learner_ids()
+            user_chunks = _grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
                 min_id = min(user_ids)
@@ -480,10 +797,7 @@ class GradeReportBase:
 
                 yield users
 
-        return get_enrolled_learners_for_course(
-            course_id=self.context.course_id,
-            verified_only=self.context.report_for_verified_only
-        )
+        return get_enrolled_learners_for_course()
 
     def log_additional_info_for_testing(self, message):
         """
@@ -522,7 +836,9 @@ class CourseGradeReport(GradeReportBase):
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
-            if use_on_disk_grade_reporting(course_id):  # AU-926
+            if use_sharded_grade_reporting(course_id):
+                return ShardedCourseGradeReport(context)._generate()  # pylint: disable=protected-access
+            elif use_on_disk_grade_reporting(course_id):  # AU-926
                 return TempFileCourseGradeReport(context)._generate()  # pylint: disable=protected-access
             else:
                 return InMemoryCourseGradeReport(context)._generate()  # pylint: disable=protected-access
@@ -709,6 +1025,11 @@ class TempFileCourseGradeReport(CourseGradeReport, TemporaryFileReportMixin):
     """ Course Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+class ShardedCourseGradeReport(CourseGradeReport, ShardedReportMixin):
+    """ Course Grade Report that is generated in shards of learners by subtasks """
+    REPORT_TYPE = 'course'
+
+
 class ProblemGradeReport(GradeReportBase):
     """
     Class to encapsulate functionality related to generating user/row had header data for Problem Grade Reports.
@@ -721,7 +1042,9 @@ class ProblemGradeReport(GradeReportBase):
         """
         with modulestore().bulk_operations(course_id):
             context = _ProblemGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
-            if use_on_disk_grade_reporting(course_id):  # AU-926
+            if use_sharded_grade_reporting(course_id):
+                return ShardedProblemGradeReport(context)._generate()  # pylint: disable=protected-access
+            elif use_on_disk_grade_reporting(course_id):  # AU-926
                 return TempFileProblemGradeReport(context)._generate()  # pylint: disable=protected-access
             else:
                 return InMemoryProblemGradeReport(context)._generate()  # pylint: disable=protected-access
@@ -758,6 +1081,7 @@ class ProblemGradeReport(GradeReportBase):
             course=self.context.course,
             collected_block_structure=self.context.course_structure,
             course_key=self.context.course_id,
+            prefetch_scores=True,
         ):
             if not course_grade:
                 err_msg = str(error)
@@ -804,6 +1128,95 @@ class TempFileProblemGradeReport(ProblemGradeReport, TemporaryFileReportMixin):
     """ Program Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+class ShardedProblemGradeReport(ProblemGradeReport, ShardedReportMixin):
+    """ Problem Grade Report that is generated in shards of learners by subtasks """
+    REPORT_TYPE = 'problem'
+
+
+# Maps the REPORT_TYPE of sharded reports to their (report class, context class).
+SHARDED_GRADE_REPORTS = {
+    ShardedCourseGradeReport.REPORT_TYPE: (ShardedCourseGradeReport, _CourseGradeReportContext),
+    ShardedProblemGradeReport.REPORT_TYPE: (ShardedProblemGradeReport, _ProblemGradeReportContext),
+}
+
+
+def _get_sharded_report(entry_id, report_type, action_name):
+    """
+    Returns the sharded report of the given type for the given InstructorTask.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    report_class, context_class = SHARDED_GRADE_REPORTS[report_type]
+    context = context_class(
+        {'task_id': entry.task_id}, entry_id, entry.course_id, json.loads(entry.task_input), action_name
+    )
+    return report_class(context)
+
+
+def generate_grade_report_shard(
+    entry_id, report_type, action_name, shard_index, first_user_id, last_user_id, subtask_status_dict
+):
+    """
+    Generates one shard of a sharded grade report, recording its progress in
+    the InstructorTask, and queues the merge of the shards after the last one.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    report = _get_sharded_report(entry_id, report_type, action_name)
+    try:
+        with modulestore().bulk_operations(report.context.course_id):
+            succeeded, failed = report.generate_shard(shard_index, first_user_id, last_user_id)
+    except Exception:
+        TASK_LOG.exception(
+            '%s, Task type: %s, Grade report shard %s failed unexpectedly!',
+            report.context.task_info_string, action_name, shard_index
+        )
+        # Since we don't know how far the shard got, we count all its learners as having failed.
+        report.user_id_range = (first_user_id, last_user_id)
+        num_learners = report._enrolled_learner_ids().count()  # pylint: disable=protected-access
+        subtask_status.increment(failed=num_learners, state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        report.queue_merge_if_ready()
+        raise
+
+    subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    report.queue_merge_if_ready()
+    return subtask_status.to_dict()
+
+
+def merge_grade_report_shards(entry_id, report_type, action_name, subtask_status_dict):
+    """
+    Merges the shards of a sharded grade report into the final report.  The
+    InstructorTask is marked as failed if any shard is missing.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    report = _get_sharded_report(entry_id, report_type, action_name)
+    try:
+        with modulestore().bulk_operations(report.context.course_id):
+            report.merge_shards()
+    except Exception as exc:
+        TASK_LOG.exception(
+            '%s, Task type: %s, Merging grade report shards failed!', report.context.task_info_string, action_name
+        )
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        # Completing the last subtask marks the InstructorTask as succeeded.
+        entry = InstructorTask.objects.get(pk=entry_id)
+        entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+        entry.task_state = FAILURE
+        entry.save_now()
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 class ProblemResponses:
     """
     Class to encapsulate functionality related to generating Problem Responses Reports.
@@ -870,13 +1283,39 @@ class ProblemResponses:
                 containing the student data which will be included in the
                 final csv, and the features/keys to include in that CSV.
         """
+        student_data_keys = OrderedDict()
+        student_data = list(cls._iter_student_data(
+            user_id, course_key, usage_key_str_list, filter_types, student_data_keys,
+        ))
+        return student_data, cls._build_student_data_keys_list(student_data_keys)
+
+    @classmethod
+    def _iter_student_data(
+        cls, user_id, course_key, usage_key_str_list, filter_types=None, student_data_keys=None,
+    ):
+        """
+        Generate the problem responses for all problem under the
+        ``problem_location`` root, one block at a time.
+        Arguments:
+            user_id (int): The user id for the user generating the report
+            course_key (CourseKey): The ``CourseKey`` for the course whose report
+                is being generated
+            usage_key_str_list (List[str]): The generated report will include these
+                blocks and their child blocks.
+            filter_types (List[str]): The report generator will only include data for
+                block types in this list.
+            student_data_keys (OrderedDict): The keys of the user states returned
+                by the blocks' report generators are added to this dict as the
+                responses are generated.
+        Yields:
+              Dict: the student data of a single row of the final csv.
+        """
         usage_keys = [
             UsageKey.from_string(usage_key_str).map_into_course(course_key)
             for usage_key_str in usage_key_str_list
         ]
         user = get_user_model().objects.get(pk=user_id)
 
-        student_data = []
         max_count = settings.FEATURES.get('MAX_PROBLEM_RESPONSES_COUNT')
 
         store = modulestore()
@@ -884,7 +1323,8 @@ class ProblemResponses:
 
         # Each user's generated report data may contain different fields, so we use an OrderedDict to prevent
         # duplication of keys while preserving the order the XBlock provides the keys in.
-        student_data_keys = OrderedDict()
+        if student_data_keys is None:
+            student_data_keys = OrderedDict()
 
         with store.bulk_operations(course_key):
             for usage_key in usage_keys:  # lint-amnesty, pylint: disable=too-many-nested-blocks
@@ -914,9 +1354,9 @@ class ProblemResponses:
                         except NotImplementedError:
                             pass
 
-                    responses = []
+                    num_responses = 0
 
-                    for response in list_problem_responses(course_key, block_key, max_count):
+                    for response in iter_problem_responses(course_key, block_key, max_count):
                         response['title'] = title
                         # A human-readable location for the current block
                         response['location'] = ' > '.join(base_path + path)
@@ -940,28 +1380,32 @@ class ProblemResponses:
                                 for key in user_state_keys:
                                     student_data_keys[key] = 1
 
-                                responses.append(user_response)
+                                num_responses += 1
+                                yield user_response
                         else:
-                            responses.append(response)
-
-                    student_data += responses
+                            num_responses += 1
+                            yield response
 
                     if max_count is not None:
-                        max_count -= len(responses)
+                        max_count -= num_responses
                         if max_count <= 0:
                             break
 
+    @staticmethod
+    def _build_student_data_keys_list(student_data_keys):
+        """
+        Return the columns of the report, given the keys of the user states
+        returned by the blocks' report generators.
+        """
         # Keep the keys in a useful order, starting with username, title and location,
         # then the columns returned by the xblock report generator in sorted order and
         # finally end with the more machine friendly block_key and state.
-        student_data_keys_list = (
+        return (
             ['username', 'title', 'location'] +
             list(student_data_keys.keys()) +
             ['block_key', 'state']
         )
 
-        return student_data, student_data_keys_list
-
     @classmethod
     def generate(cls, _xblock_instance_args, _entry_id, course_id, task_input, action_name):
         """
@@ -981,31 +1425,50 @@ class ProblemResponses:
         if problem_types_filter:
             filter_types = problem_types_filter.split(',')
 
-        # Compute result table and format it
-        student_data, student_data_keys = cls._build_student_data(
+        student_data_keys = OrderedDict()
+        student_data = cls._iter_student_data(
             user_id=task_input.get('user_id'),
             course_key=course_id,
             usage_key_str_list=problem_locations,
             filter_types=filter_types,
+            student_data_keys=student_data_keys,
         )
 
-        for data in student_data:
-            for key in student_data_keys:
-                data.setdefault(key, '')
-
-        header, rows = format_dictlist(student_data, student_data_keys)
-
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
-
-        rows.insert(0, header)
+        with TemporaryFile() as spool_file, TemporaryFile() as report_file:
+            # The columns of the report are only known once all the responses are
+            # generated, so the responses are spooled in batches of at most
+            # PROBLEM_RESPONSES_MAX_ROWS_IN_MEMORY rows until then.
+            num_rows, num_batches = 0, 0
+            while True:
+                batch = list(islice(student_data, settings.PROBLEM_RESPONSES_MAX_ROWS_IN_MEMORY))
+                if not batch:
+                    break
+                pickle.dump(batch, spool_file, pickle.HIGHEST_PROTOCOL)
+                num_rows += len(batch)
+                num_batches += 1
+
+            task_progress.attempted = task_progress.succeeded = num_rows
+            task_progress.skipped = task_progress.total - task_progress.attempted
+
+            current_step = {'step': 'Uploading CSV'}
+            task_progress.update_task_state(extra_meta=current_step)
+
+            header = cls._build_student_data_keys_list(student_data_keys)
+            report_text_file = TextIOWrapper(report_file, encoding='utf-8', newline='')
+            csv_writer = csv.writer(report_text_file)
+            csv_writer.writerow(header)
+            spool_file.seek(0)
+            for __ in range(num_batches):
+                csv_writer.writerows(
+                    [str(data.get(key, '')) for key in header] for data in pickle.load(spool_file)
+                )
+            report_text_file.detach()
 
-        current_step = {'step': 'Uploading CSV'}
-        task_progress.update_task_state(extra_meta=current_step)
+            # Perform the upload
+            report_file.seek(0)
+            csv_name = cls._generate_upload_file_name(problem_locations, filter_types)
+            report_name = upload_csv_file_to_report_store(report_file, csv_name, course_id, start_date)
 
-        # Perform the upload
-        csv_name = cls._generate_upload_file_name(problem_locations, filter_types)
-        report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
         current_step = {
             'step': 'CSV uploaded',
             'report_name': report_name,
@@ -19,7 +19,7 @@ from django.core.files.storage import DefaultStorage
 from openassessment.data import OraAggregateData, OraDownloadData
 from pytz import UTC
 
-from common.djangoapps.student.models import unique_id_for_user, anonymous_id_for_user
+from common.djangoapps.student.models import anonymous_ids_for_users
 from lms.djangoapps.instructor_analytics.basic import get_proctored_exam_results
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.survey.models import SurveyAnswer
@@ -521,7 +521,9 @@ def generate_anonymous_ids(_xblock_instance_args, _entry_id, course_id, task_inp
     _log_and_update_progress({'step': "Compiling learner rows"})
 
     header = ['User ID', 'Anonymized User ID', 'Course Specific Anonymized User ID']
-    rows = [[s.id, unique_id_for_user(s), anonymous_id_for_user(s, course_id)]
+    unique_ids = anonymous_ids_for_users(students, None)
+    anonymous_ids = anonymous_ids_for_users(students, course_id)
+    rows = [[s.id, unique_ids[s.id], anonymous_ids[s.id]]
             for s in students]
 
     task_progress.attempted = students.count
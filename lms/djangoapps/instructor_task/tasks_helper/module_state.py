@@ -5,25 +5,41 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from collections import defaultdict
 from time import time
 
+from django.conf import settings
 from django.utils.translation import gettext_noop
+from eventtracking import tracker
 from opaque_keys.edx.keys import UsageKey
 from xblock.scorable import Score
 
-from xmodule.capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
+from xmodule.capa.correctmap import CorrectMap
+from xmodule.capa.responsetypes import (
+    CustomResponse,
+    FormulaResponse,
+    LoncapaProblemError,
+    NumericalResponse,
+    ResponseError,
+    StudentInputError
+)
+from xmodule.capa.safe_exec import safe_exec_many
 from common.djangoapps.student.models import get_user_by_username_or_email
+from common.djangoapps.track import contexts
 from common.djangoapps.track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from common.djangoapps.track.views import task_track
 from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.courseware.courses import get_problems_in_section
-from lms.djangoapps.courseware.model_data import FieldDataCache
+from lms.djangoapps.courseware.model_data import FieldDataCache, set_score
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.block_render import get_block_for_descriptor
+from lms.djangoapps.grades.api import constants as grades_constants
 from lms.djangoapps.grades.api import events as grades_events
+from lms.djangoapps.grades.api import signals as grades_signals
 from openedx.core.lib.courses import get_course_by_id
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 
+from ..config.waffle import use_fast_rescoring
 from ..exceptions import UpdateProblemModuleStateError
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
@@ -31,7 +47,8 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 TASK_LOG = logging.getLogger('edx.celery.task')
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                bulk_update_fcn=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -43,6 +60,11 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `bulk_update_fcn` is provided, it is called once before the `update_fcn`, with the course id, the
+    blocks of the problems by location, the StudentModules to update and the task_input. It returns the
+    update statuses of the StudentModules it has updated in bulk, by id, and the `update_fcn` is only
+    called for the other StudentModules.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -88,12 +110,19 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
+    bulk_update_statuses = {}
+    if bulk_update_fcn is not None:
+        bulk_update_statuses = bulk_update_fcn(course_id, problems, modules_to_update, task_input)
+
     for module_to_update in modules_to_update:
         task_progress.attempted += 1
-        block = problems[str(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        update_status = update_fcn(block, module_to_update, task_input)
+        if module_to_update.id in bulk_update_statuses:
+            update_status = bulk_update_statuses[module_to_update.id]
+        else:
+            block = problems[str(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            update_status = update_fcn(block, module_to_update, task_input)
         if update_status == UPDATE_STATUS_SUCCEEDED:
             # If the update_fcn returns true, then it performed some kind of work.
             # Logging of failures is left to the update_fcn itself.
@@ -206,6 +235,267 @@ def rescore_problem_module_state(xblock_instance_args, block, student_module, ta
         return UPDATE_STATUS_SUCCEEDED
 
 
+# The response types which only depend on the answers of learners and on the problem, when the problem
+# has no scripts, and can therefore be rescored in bulk.
+BULK_RESCORE_RESPONSE_TYPES = (NumericalResponse, FormulaResponse)
+
+
+def rescore_problem_module_states_in_bulk(
+    xblock_instance_args, course_id, problems, student_modules, task_input
+):  # pylint: disable=unused-argument
+    """
+    Rescores in bulk the submissions of StudentModules to problems which are only
+    made of numerical and formula responses and have no scripts, when fast
+    rescoring is enabled for the course.
+
+    Each of these problems is instantiated once, and each distinct answer to each
+    of its responses is graded once. The StudentModules whose score and
+    correctness would not change are then counted as rescored, without
+    instantiating the problem for their students, although their score is still
+    published and the rescore event emitted for them. The other StudentModules,
+    including those of the problems which cannot be rescored in bulk, are left to
+    rescore_problem_module_state.
+
+    For the other problems, the check functions of their custom responses are run
+    on all the submissions at once with safe_exec_many, which leaves the results in
+    the cache for rescore_problem_module_state.
+
+    Returns the update statuses of the StudentModules rescored in bulk, by id.
+    """
+    if not use_fast_rescoring(course_id) or settings.FEATURES.get('ENABLE_GRADING_METHOD_IN_PROBLEMS', False):
+        return {}
+
+    student_modules_by_location = defaultdict(list)
+    for student_module in student_modules:
+        student_modules_by_location[str(student_module.module_state_key)].append(student_module)
+
+    update_statuses = {}
+    with modulestore().bulk_operations(course_id):
+        course = get_course_by_id(course_id)
+        for location, location_student_modules in student_modules_by_location.items():
+            # A single submission is rescored as fast by rescore_problem_module_state.
+            if len(location_student_modules) < 2:
+                continue
+            lcp = _get_problem_for_rescoring(
+                course, problems[location], location_student_modules[0].student, xblock_instance_args
+            )
+            if lcp is None:
+                continue
+            if not _can_rescore_in_bulk(lcp):
+                _run_check_functions(course, problems[location], lcp, location_student_modules, xblock_instance_args)
+                continue
+
+            responders = list(lcp.responders.values())
+            max_score = lcp.get_max_score()
+            graded_answers = {}
+            for student_module in location_student_modules:
+                earned = _get_unchanged_rescored_score(student_module, responders, max_score, graded_answers)
+                if earned is not None:
+                    _publish_unchanged_rescore(
+                        problems[location], student_module, earned, max_score, task_input, xblock_instance_args
+                    )
+                    update_statuses[student_module.id] = UPDATE_STATUS_SUCCEEDED
+
+            TASK_LOG.info(
+                "Rescored in bulk %d of %d submissions to problem %s, from %d distinct answers",
+                sum(1 for student_module in location_student_modules if student_module.id in update_statuses),
+                len(location_student_modules),
+                location,
+                len(graded_answers),
+            )
+
+    return update_statuses
+
+
+def _get_problem_for_rescoring(course, block, student, xblock_instance_args):
+    """
+    Returns the LoncapaProblem of `block` instantiated for `student`, or None if
+    `block` isn't a problem.
+    """
+    if block.location.block_type != 'problem':
+        return None
+
+    instance = _get_module_instance_for_task(
+        course.id,
+        student,
+        block,
+        xblock_instance_args,
+        grade_bucket_type='rescore',
+        course=course
+    )
+    return getattr(instance, 'lcp', None)
+
+
+def _can_rescore_in_bulk(lcp):
+    """
+    Returns whether the submissions to the LoncapaProblem `lcp` can be rescored in bulk.
+    """
+    # The answers of problems with scripts can depend on the seed of each student.
+    if lcp.context.get('script_code'):
+        return False
+
+    responders = list(lcp.responders.values())
+    return bool(responders) and all(isinstance(responder, BULK_RESCORE_RESPONSE_TYPES) for responder in responders)
+
+
+def _run_check_functions(course, block, lcp, student_modules, xblock_instance_args):
+    """
+    Runs the check functions of the custom responses of `block` on the answers of
+    `student_modules` with safe_exec_many, so that their results are in the cache
+    when each submission is rescored.
+
+    `lcp` is the problem instantiated for the student of the first StudentModule.
+    The problem is instantiated once for each other seed shared by several
+    StudentModules, since the check functions run with the seed of each student.
+    """
+    if lcp.capa_system.cache is None:
+        return
+
+    states_by_seed = defaultdict(list)
+    for student_module in student_modules:
+        state = json.loads(student_module.state or '{}')
+        states_by_seed[state.get('seed')].append((student_module, state))
+
+    jobs = []
+    for seed, states in states_by_seed.items():
+        # A single submission is rescored as fast by rescore_problem_module_state.
+        if seed != lcp.seed and len(states) < 2:
+            continue
+        seed_lcp = lcp if seed == lcp.seed else _get_problem_for_rescoring(
+            course, block, states[0][0].student, xblock_instance_args
+        )
+        responders = [
+            responder for responder in seed_lcp.responders.values()
+            if isinstance(responder, CustomResponse) and responder.cfn
+        ]
+        if not responders:
+            continue
+        for _student_module, state in states:
+            student_answers = state.get('student_answers') or {}
+            for responder in responders:
+                job = responder.get_check_function_job(student_answers)
+                if job is not None:
+                    del job['cache']
+                    jobs.append(job)
+
+    if jobs:
+        exceptions = safe_exec_many(jobs, cache=lcp.capa_system.cache)
+        TASK_LOG.info(
+            "Ran %d check functions of problem %s for %d submissions, %d of which raised an error",
+            len(jobs),
+            block.location,
+            len(student_modules),
+            sum(1 for exception in exceptions if exception is not None),
+        )
+
+
+def _grade_answer(responder, answer, graded_answers):
+    """
+    Returns the correctness and the number of points of `answer` to `responder`,
+    memoized in `graded_answers`, or None if it cannot be graded in bulk.
+    """
+    if not isinstance(answer, str):
+        return None
+
+    key = (responder.answer_id, answer)
+    if key not in graded_answers:
+        try:
+            correct_map = responder.get_score({responder.answer_id: answer})
+        except Exception:  # pylint: disable=broad-except
+            # Leave invalid answers to rescore_problem_module_state, which reports them.
+            graded_answers[key] = None
+        else:
+            graded_answers[key] = (
+                correct_map.get_correctness(responder.answer_id),
+                correct_map.get_npoints(responder.answer_id),
+            )
+    return graded_answers[key]
+
+
+def _get_unchanged_rescored_score(student_module, responders, max_score, graded_answers):
+    """
+    Returns the points earned by the submission of `student_module`, if rescoring
+    it with `responders` would leave its score and the correctness of its answers
+    unchanged, else None.
+    """
+    state = json.loads(student_module.state or '{}')
+    if not state.get('done'):
+        return None
+
+    student_answers = state.get('student_answers') or {}
+    correct_map = CorrectMap()
+    correct_map.set_dict(state.get('correct_map'))
+
+    earned = 0
+    for responder in responders:
+        graded_answer = _grade_answer(responder, student_answers.get(responder.answer_id), graded_answers)
+        if graded_answer is None:
+            return None
+        answer_id = responder.answer_id
+        if graded_answer != (correct_map.get_correctness(answer_id), correct_map.get_npoints(answer_id)):
+            return None
+        earned += graded_answer[1]
+
+    score = state.get('score') or {}
+    if score and (score.get('raw_earned'), score.get('raw_possible')) != (earned, max_score):
+        return None
+    if student_module.grade != earned or student_module.max_grade != max_score:
+        return None
+    return earned
+
+
+def _publish_unchanged_rescore(block, student_module, earned, max_score, task_input, xblock_instance_args):
+    """
+    Publishes the score of the submission of `student_module`, which rescoring
+    leaves unchanged, and emits its problem_rescore event, like rescoring the
+    problem does.  The persisted grades of the student are then recomputed, in
+    case they drifted from the scores of their problems.
+    """
+    student = student_module.student
+    create_new_event_transaction_id()
+    set_event_transaction_type(grades_events.GRADES_RESCORE_EVENT_TYPE)
+
+    # An unchanged score is published even if only_if_higher is set.
+    score_modified_time = set_score(student.id, block.location, earned, max_score)
+    grades_signals.PROBLEM_RAW_SCORE_CHANGED.send(
+        sender=None,
+        raw_earned=earned,
+        raw_possible=max_score,
+        weight=getattr(block, 'weight', None),
+        user_id=student.id,
+        course_id=str(block.location.course_key),
+        usage_id=str(block.location),
+        only_if_higher=task_input['only_if_higher'],
+        modified=score_modified_time,
+        score_db_table=grades_constants.ScoreDatabaseTableEnum.courseware_student_module,
+    )
+
+    state = json.loads(student_module.state)
+    event_info = {
+        'state': {
+            key: state.get(key)
+            for key in (
+                'seed', 'student_answers', 'has_saved_answers', 'correct_map', 'correct_map_history', 'input_state',
+                'done',
+            )
+        },
+        'problem_id': str(block.location),
+        'orig_score': earned,
+        'orig_total': max_score,
+        'new_score': earned,
+        'new_total': max_score,
+        'correct_map': state['correct_map'],
+        'success': 'correct' if all(
+            answer.get('correctness') == 'correct' for answer in state['correct_map'].values()
+        ) else 'incorrect',
+        'attempts': state.get('attempts', 0),
+    }
+    context = contexts.course_context_from_course_id(block.location.course_key)
+    context['user_id'] = student.id
+    with tracker.get_tracker().context('problem_rescore', context):
+        _get_track_function_for_task(student, xblock_instance_args)('problem_rescore', event_info)
+
+
 @outer_atomic
 def override_score_module_state(xblock_instance_args, block, student_module, task_input):
     '''
@@ -19,20 +19,28 @@ from celery.states import FAILURE, SUCCESS
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.test.utils import override_settings
 from django.urls import reverse
+from edx_toggles.toggles.testutils import override_waffle_flag
 
 from xmodule.capa.responsetypes import StudentInputError
-from xmodule.capa.tests.response_xml_factory import CodeResponseXMLFactory, CustomResponseXMLFactory
+from xmodule.capa.tests.response_xml_factory import (
+    CodeResponseXMLFactory,
+    CustomResponseXMLFactory,
+    NumericalResponseXMLFactory
+)
 from xmodule.capa.tests.test_util import UseUnsafeCodejail
 from lms.djangoapps.courseware.model_data import StudentModule
 from lms.djangoapps.grades.api import CourseGradeFactory
+from lms.djangoapps.grades.api import signals as grades_signals
 from lms.djangoapps.instructor_task.api import (
     submit_delete_problem_state_for_all_students,
     submit_rescore_problem_for_all_students,
     submit_rescore_problem_for_student,
     submit_reset_problem_attempts_for_all_students
 )
+from lms.djangoapps.instructor_task.config.waffle import USE_FAST_RESCORING
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
 from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.tasks_helper import module_state
 from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport
 from lms.djangoapps.instructor_task.tests.test_base import (
     OPTION_1,
@@ -436,6 +444,166 @@ class TestRescoringTask(TestIntegrationTask):
         for user in self.users:
             self.check_state(user, block, 0, 1, expected_attempts=2)
 
+    def define_numerical_problem(self, problem_url_name, answer, redefine=False, script=None):
+        """
+        Defines a problem with two numerical responses, whose answer is `answer`.
+
+        If the `redefine` flag is set, then change the definition of the existing problem.
+        """
+        factory = NumericalResponseXMLFactory()
+        problem_xml = factory.build_xml(answer=answer, tolerance="0.01", num_responses=2, script=script)
+        if redefine:
+            block = self.module_store.get_item(
+                InstructorTaskModuleTestCase.problem_location(problem_url_name)
+            )
+            block.data = problem_xml
+            with self.module_store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, block.location.course_key):  # lint-amnesty, pylint: disable=line-too-long
+                self.module_store.update_item(block, self.user.id)
+                self.module_store.publish(block.location, self.user.id)
+        else:
+            BlockFactory.create(parent_location=self.problem_section.location,
+                                category="problem",
+                                display_name=str(problem_url_name),
+                                data=problem_xml)
+
+    def _submit_numerical_answers(self, problem_url_name):
+        """
+        Submits answers of 5, 5 for u1, 5, 4 for u2 and 4, 4 for u3 and u4 to a numerical problem.
+        """
+        self.submit_student_answer('u1', problem_url_name, ['5', '5'])
+        self.submit_student_answer('u2', problem_url_name, ['5', '4.0'])
+        self.submit_student_answer('u3', problem_url_name, ['4', '4'])
+        self.submit_student_answer('u4', problem_url_name, ['2*2', '4'])
+
+    @ddt.data(True, False)
+    def test_fast_rescoring_numerical_problem(self, use_fast_rescoring):
+        """
+        Rescoring numerical problems in bulk gives the same grades as rescoring them one by one.
+        """
+        problem_url_name = 'H1P1'
+        self.define_numerical_problem(problem_url_name, answer='5')
+        block = self.module_store.get_item(InstructorTaskModuleTestCase.problem_location(problem_url_name))
+        self._submit_numerical_answers(problem_url_name)
+        for user, expected_score in zip(self.users, (2, 1, 0, 0)):
+            self.check_state(user, block, expected_score, 2)
+
+        self.define_numerical_problem(problem_url_name, answer='4', redefine=True)
+        with override_waffle_flag(USE_FAST_RESCORING, active=use_fast_rescoring):
+            instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        status = json.loads(InstructorTask.objects.get(id=instructor_task.id).task_output)
+        assert status['attempted'] == 4
+        assert status['succeeded'] == 4
+        for user, expected_score in zip(self.users, (0, 1, 2, 2)):
+            self.check_state(user, block, expected_score, 2)
+
+    def test_fast_rescoring_skips_unchanged_submissions(self):
+        """
+        The problem is only instantiated once to rescore the submissions whose grade does not change.
+        """
+        problem_url_name = 'H1P1'
+        self.define_numerical_problem(problem_url_name, answer='5')
+        block = self.module_store.get_item(InstructorTaskModuleTestCase.problem_location(problem_url_name))
+        self._submit_numerical_answers(problem_url_name)
+
+        self.define_numerical_problem(problem_url_name, answer='5.001', redefine=True)
+        with override_waffle_flag(USE_FAST_RESCORING, active=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state._get_module_instance_for_task',
+            wraps=module_state._get_module_instance_for_task,  # pylint: disable=protected-access
+        ) as mock_get_module_instance, patch.object(
+            grades_signals.PROBLEM_WEIGHTED_SCORE_CHANGED, 'send'
+        ) as mock_score_changed, patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state.task_track'
+        ) as mock_task_track:
+            instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        assert mock_get_module_instance.call_count == 1
+        # The grades of the students are still recomputed, and the rescore events emitted.
+        assert sorted(
+            (call.kwargs['user_id'], call.kwargs['weighted_earned']) for call in mock_score_changed.call_args_list
+        ) == sorted((user.id, expected_score) for user, expected_score in zip(self.users, (2, 1, 0, 0)))
+        assert [call[0][2] for call in mock_task_track.call_args_list] == ['problem_rescore'] * 4
+        status = json.loads(InstructorTask.objects.get(id=instructor_task.id).task_output)
+        assert status['attempted'] == 4
+        assert status['succeeded'] == 4
+        for user, expected_score in zip(self.users, (2, 1, 0, 0)):
+            self.check_state(user, block, expected_score, 2)
+
+    def test_fast_rescoring_problem_with_script(self):
+        """
+        Problems with scripts are rescored one by one.
+        """
+        problem_url_name = 'H1P1'
+        self.define_numerical_problem(problem_url_name, answer='$answer', script='answer = 5')
+        block = self.module_store.get_item(InstructorTaskModuleTestCase.problem_location(problem_url_name))
+        self._submit_numerical_answers(problem_url_name)
+
+        self.define_numerical_problem(problem_url_name, answer='$answer', redefine=True, script='answer = 4')
+        with override_waffle_flag(USE_FAST_RESCORING, active=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state._get_module_instance_for_task',
+            wraps=module_state._get_module_instance_for_task,  # pylint: disable=protected-access
+        ) as mock_get_module_instance:
+            self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        assert mock_get_module_instance.call_count == 5
+        for user, expected_score in zip(self.users, (0, 1, 2, 2)):
+            self.check_state(user, block, expected_score, 2)
+
+
+    def define_check_function_problem(self, problem_url_name, expect, redefine=False):
+        """
+        Defines a custom response problem whose check function accepts the answer `expect`.
+
+        If the `redefine` flag is set, then change the definition of the existing problem.
+        """
+        factory = CustomResponseXMLFactory()
+        script = textwrap.dedent("""
+                def check_func(expect, answer_given):
+                    return answer_given == expect
+            """)
+        problem_xml = factory.build_xml(script=script, cfn="check_func", expect=expect, num_responses=1)
+        if redefine:
+            block = self.module_store.get_item(
+                InstructorTaskModuleTestCase.problem_location(problem_url_name)
+            )
+            block.data = problem_xml
+            with self.module_store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, block.location.course_key):  # lint-amnesty, pylint: disable=line-too-long
+                self.module_store.update_item(block, self.user.id)
+                self.module_store.publish(block.location, self.user.id)
+        else:
+            BlockFactory.create(parent_location=self.problem_section.location,
+                                category="problem",
+                                display_name=str(problem_url_name),
+                                data=problem_xml)
+
+    def test_fast_rescoring_runs_check_functions_at_once(self):
+        """
+        The check functions of a problem are run on all the submissions at once before rescoring them.
+        """
+        problem_url_name = 'H1P1'
+        self.define_check_function_problem(problem_url_name, expect='5')
+        block = self.module_store.get_item(InstructorTaskModuleTestCase.problem_location(problem_url_name))
+        for user, answer in zip(self.users, ('5', '5', '4', '4')):
+            self.submit_student_answer(user.username, problem_url_name, [answer, answer])
+        for user, expected_score in zip(self.users, (1, 1, 0, 0)):
+            self.check_state(user, block, expected_score, 1)
+
+        self.define_check_function_problem(problem_url_name, expect='4', redefine=True)
+        with override_waffle_flag(USE_FAST_RESCORING, active=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state.safe_exec_many',
+            wraps=module_state.safe_exec_many,
+        ) as mock_safe_exec_many:
+            instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        mock_safe_exec_many.assert_called_once()
+        jobs = mock_safe_exec_many.call_args[0][0]
+        assert sorted(job['globals_dict']['ans'] for job in jobs) == ['4', '4', '5', '5']
+        status = json.loads(InstructorTask.objects.get(id=instructor_task.id).task_output)
+        assert status['attempted'] == 4
+        assert status['succeeded'] == 4
+        for user, expected_score in zip(self.users, (0, 0, 1, 1)):
+            self.check_state(user, block, expected_score, 1)
+
 
 @override_settings(RATELIMIT_ENABLE=False)
 class TestResetAttemptsTask(TestIntegrationTask):
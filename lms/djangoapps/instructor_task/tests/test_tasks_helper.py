@@ -7,6 +7,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -18,7 +19,9 @@ from unittest.mock import ANY, MagicMock, Mock, patch
 import ddt
 import pytest
 import unicodecsv
+from celery.states import SUCCESS
 from django.conf import settings
+from django.core.management import call_command
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
 from freezegun import freeze_time
@@ -37,7 +40,8 @@ from lms.djangoapps.grades.course_data import CourseData
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGradeOverride
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
-from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, list_problem_responses
+from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, iter_problem_responses
+from lms.djangoapps.instructor_task.tasks import calculate_grades_csv
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import upload_may_enroll_csv, upload_students_csv
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
@@ -46,6 +50,8 @@ from lms.djangoapps.instructor_task.tasks_helper.grades import (
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
+    _get_sharded_report,
+    generate_grade_report_shard,
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
@@ -54,6 +60,8 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.data import InstructorTaskTypes
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,6 +91,8 @@ _TEAMS_CONFIG = TeamsConfig({
     'topics': [{'id': 'topic', 'name': 'Topic', 'description': 'A Topic'}],
 })
 USE_ON_DISK_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_on_disk_grade_reporting'
+USE_SHARDED_GRADE_REPORT = 'lms.djangoapps.instructor_task.tasks_helper.grades.use_sharded_grade_reporting'
+GENERATE_GRADE_REPORT_SHARD = 'lms.djangoapps.instructor_task.tasks.generate_grade_report_shard.apply_async'
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -437,6 +447,135 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             result,
         )
 
+    def _create_sharded_report_entry(self, num_students):
+        """
+        Creates num_students enrolled students and the InstructorTask of a
+        grade report for them.
+        """
+        for i in range(num_students):
+            self.create_student(f'student{i}', f'student{i}@example.com')
+        return InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type=InstructorTaskTypes.GRADE_COURSE,
+            task_id='grade-report-task',
+        )
+
+    def _verify_sharded_report(self, entry, num_students, num_shards):
+        """
+        Verifies that the sharded report of the given InstructorTask was merged
+        and contains the rows of all the students.
+        """
+        entry.refresh_from_db()
+        assert entry.task_state == SUCCESS
+        assert_dict_contains_subset(
+            self,
+            {'attempted': num_students, 'succeeded': num_students, 'failed': 0, 'total': num_students},
+            json.loads(entry.task_output),
+        )
+        assert json.loads(entry.subtasks)['succeeded'] == num_shards + 1
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        assert len(links) == 1
+        with report_store.storage.open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            usernames = [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+        assert usernames == [f'student{i}' for i in range(num_students)]
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report(self, _mock_current_task):
+        entry = self._create_sharded_report_entry(5)
+        with patch(USE_SHARDED_GRADE_REPORT, return_value=True):
+            result = CourseGradeReport.generate({'task_id': entry.task_id}, entry.id, self.course.id, {}, 'graded')
+        assert_dict_contains_subset(self, {'attempted': 0, 'total': 5}, result)
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report_resumes(self, _mock_current_task):
+        entry = self._create_sharded_report_entry(5)
+        xblock_instance_args = {'task_id': entry.task_id}
+        with freeze_time('2020-01-01 00:00:00'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+            assert mock_queue.call_count == 3
+
+            # Only the first shard is generated before the workers are killed.
+            generate_grade_report_shard(*mock_queue.call_args_list[0][0][0])
+
+        # The other shards are lost once their lease expires.
+        with freeze_time('2020-01-01 01:00:01'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+            assert [call[0][0][3] for call in mock_queue.call_args_list] == [1, 2]
+
+            for call in mock_queue.call_args_list:
+                generate_grade_report_shard(*call[0][0])
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report_resumes_running_shard(self, _mock_current_task):
+        entry = self._create_sharded_report_entry(5)
+        xblock_instance_args = {'task_id': entry.task_id}
+        with freeze_time('2020-01-01 00:00:00'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+            shard_calls = [call[0][0] for call in mock_queue.call_args_list]
+            generate_grade_report_shard(*shard_calls[0])
+
+        # The second shard is still being generated when the task is re-run, so only the third one is queued again.
+        with freeze_time('2020-01-01 00:50:00'):
+            report = _get_sharded_report(entry.id, 'course', 'graded')
+            report._renew_lease(1)  # pylint: disable=protected-access
+        with freeze_time('2020-01-01 01:00:01'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+            assert [call[0][0][3] for call in mock_queue.call_args_list] == [2]
+
+            generate_grade_report_shard(*shard_calls[1])
+            generate_grade_report_shard(*mock_queue.call_args_list[0][0][0])
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report_resumes_after_merge(self, _mock_current_task):
+        entry = self._create_sharded_report_entry(5)
+        xblock_instance_args = {'task_id': entry.task_id}
+        with patch(USE_SHARDED_GRADE_REPORT, return_value=True):
+            CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
+        # A redelivered task finds the shards merged, and neither queues nor merges them again.
+        with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+            result = CourseGradeReport.generate(xblock_instance_args, entry.id, self.course.id, {}, 'graded')
+        mock_queue.assert_not_called()
+        assert_dict_contains_subset(self, {'attempted': 5, 'succeeded': 5, 'total': 5}, result)
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    def test_stale_sharded_grade_report_is_resumed(self):
+        entry = self._create_sharded_report_entry(5)
+        with freeze_time('2020-01-01 00:00:00'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                calculate_grades_csv.apply_async([entry.id, {'task_id': entry.task_id}], task_id=entry.task_id)
+            assert mock_queue.call_count == 3
+
+            # Only the first shard is generated before the workers are killed.
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                generate_grade_report_shard(*mock_queue.call_args_list[0][0][0])
+
+        # The report is left alone while it may still make progress.
+        with freeze_time('2020-01-01 00:30:00'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True), patch(GENERATE_GRADE_REPORT_SHARD) as mock_queue:
+                call_command('resume_stale_grade_reports')
+            mock_queue.assert_not_called()
+
+        with freeze_time('2020-01-01 01:00:01'):
+            with patch(USE_SHARDED_GRADE_REPORT, return_value=True):
+                call_command('resume_stale_grade_reports')
+        self._verify_sharded_report(entry, num_students=5, num_shards=3)
+
 
 @ddt.ddt
 class TestTeamGradeReport(InstructorGradeReportTestCase):
@@ -525,10 +664,10 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         assert len(student_data) == 4
 
     @patch(
-        'lms.djangoapps.instructor_task.tasks_helper.grades.list_problem_responses',
-        wraps=list_problem_responses
+        'lms.djangoapps.instructor_task.tasks_helper.grades.iter_problem_responses',
+        wraps=iter_problem_responses
     )
-    def test_build_student_data_for_block_without_generate_report_data(self, mock_list_problem_responses):
+    def test_build_student_data_for_block_without_generate_report_data(self, mock_iter_problem_responses):
         """
         Ensure that building student data for a block the doesn't have the
         ``generate_report_data`` method works as expected.
@@ -554,7 +693,24 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         )
         assert 'state' in student_data[0]
         assert student_data_keys_list == ['username', 'title', 'location', 'block_key', 'state']
-        mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
+        mock_iter_problem_responses.assert_called_with(self.course.id, ANY, ANY)
+
+    @ddt.data(None, 3, 4, 10)
+    @override_settings(USER_STATE_BATCH_SIZE=2)
+    def test_iter_problem_responses_pages(self, limit_responses):
+        """
+        Ensure that iter_problem_responses pages through the responses in
+        batches of USER_STATE_BATCH_SIZE without skipping or repeating any.
+        """
+        problem = self.define_option_problem('Problem1')
+        students = [self.create_student(f'student{ctr}') for ctr in range(5)]
+        for student in students:
+            self.submit_student_answer(student.username, 'Problem1', ['Option 1'])
+
+        responses = list(iter_problem_responses(self.course.id, problem.location, limit_responses))
+
+        expected = sorted(students, key=lambda student: student.id)[:limit_responses]
+        assert [response['username'] for response in responses] == [student.username for student in expected]
 
     @patch('xmodule.capa_block.ProblemBlock.generate_report_data', create=True)
     def test_build_student_data_for_block_with_mock_generate_report_data(self, mock_generate_report_data):
@@ -745,12 +901,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         )
         assert len(student_data) == filtered_count
 
-    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.list_problem_responses')
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.iter_problem_responses')
     @patch('xmodule.capa_block.ProblemBlock.generate_report_data', create=True)
     def test_build_student_data_for_block_with_generate_report_data_not_implemented(
             self,
             mock_generate_report_data,
-            mock_list_problem_responses,
+            mock_iter_problem_responses,
     ):
         """
         Ensure that if ``generate_report_data`` raises a NotImplementedError,
@@ -764,7 +920,7 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
             usage_key_str_list=[str(problem.location)],
         )
         mock_generate_report_data.assert_called_with(ANY, ANY)
-        mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
+        mock_iter_problem_responses.assert_called_with(self.course.id, ANY, ANY)
 
     def test_success(self):
         task_input = {
@@ -773,15 +929,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         }
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
-                       '.ProblemResponses._build_student_data') as mock_build_student_data:
-                mock_build_student_data.return_value = (
-                    [
-                        {'username': 'user0', 'state': 'state0'},
-                        {'username': 'user1', 'state': 'state1'},
-                        {'username': 'user2', 'state': 'state2'},
-                    ],
-                    ['username', 'state']
-                )
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter([
+                    {'username': 'user0', 'state': 'state0'},
+                    {'username': 'user1', 'state': 'state1'},
+                    {'username': 'user2', 'state': 'state2'},
+                ])
                 result = ProblemResponses.generate(
                     None, None, self.course.id, task_input, 'calculated'
                 )
@@ -792,6 +945,26 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         assert set(({'attempted': 3, 'succeeded': 3, 'failed': 0}).items()).issubset(set(result.items()))
         assert "report_name" in result
 
+    @override_settings(PROBLEM_RESPONSES_MAX_ROWS_IN_MEMORY=2)
+    def test_success_with_spooled_rows(self):
+        task_input = {
+            'problem_locations': str(self.course.location),
+            'user_id': self.instructor.id
+        }
+        student_data = [{'username': f'user{i}', 'state': f'state{i}'} for i in range(5)]
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter(student_data)
+                result = ProblemResponses.generate(
+                    None, None, self.course.id, task_input, 'calculated'
+                )
+        assert set(({'attempted': 5, 'succeeded': 5, 'failed': 0}).items()).issubset(set(result.items()))
+        self.verify_rows_in_csv([
+            {'username': f'user{i}', 'title': '', 'location': '', 'block_key': '', 'state': f'state{i}'}
+            for i in range(5)
+        ])
+
     @ddt.data(
         ('blkid', None, 'edx_1.23x_test_course_student_state_from_blkid_2020-01-01-0000.csv'),
         ('blkid', 'poll,survey', 'edx_1.23x_test_course_student_state_from_blkid_for_poll,survey_2020-01-01-0000.csv'),
@@ -812,15 +985,12 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'), \
                 freeze_time('2020-01-01'):
             with patch('lms.djangoapps.instructor_task.tasks_helper.grades'
-                       '.ProblemResponses._build_student_data') as mock_build_student_data:
-                mock_build_student_data.return_value = (
-                    [
-                        {'username': 'user0', 'state': 'state0'},
-                        {'username': 'user1', 'state': 'state1'},
-                        {'username': 'user2', 'state': 'state2'},
-                    ],
-                    ['username', 'state']
-                )
+                       '.ProblemResponses._iter_student_data') as mock_iter_student_data:
+                mock_iter_student_data.return_value = iter([
+                    {'username': 'user0', 'state': 'state0'},
+                    {'username': 'user1', 'state': 'state1'},
+                    {'username': 'user2', 'state': 'state2'},
+                ])
                 result = ProblemResponses.generate(
                     None, None, self.course.id, task_input, 'calculated'
                 )
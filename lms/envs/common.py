@@ -272,6 +272,10 @@ AUTOMATIC_VERIFY_STUDENT_IDENTITY_FOR_TESTING = False
 # Maximum number of rows to include in the csv file for downloading problem responses.
 MAX_PROBLEM_RESPONSES_COUNT = 5000
 
+# Maximum number of rows held in memory while generating the csv file for downloading problem
+# responses. The other rows are spooled to a temporary file until the report is uploaded.
+PROBLEM_RESPONSES_MAX_ROWS_IN_MEMORY = 1000
+
 ENABLED_PAYMENT_REPORTS = [
     "refund_report",
     "itemized_purchase_report",
@@ -2261,6 +2265,20 @@ CERT_NAME_LONG = "Certificate of Achievement"
 # the ones that contain information other than grades.
 GRADES_DOWNLOAD_ROUTING_KEY = Derived(lambda settings: settings.HIGH_MEM_QUEUE)
 
+# .. setting_name: GRADE_REPORT_USERS_PER_SHARD
+# .. setting_default: 5000
+# .. setting_description: Number of learners in each shard of a grade report, when grade reports are
+#   generated in shards by subtasks. See the instructor_task.use_sharded_grade_reporting waffle flag.
+GRADE_REPORT_USERS_PER_SHARD = 5000
+
+# .. setting_name: GRADE_REPORT_SHARD_TIMEOUT
+# .. setting_default: 60 * 60
+# .. setting_description: Number of seconds after which a shard of a grade report which is neither generated nor
+#   making progress is considered lost, so that re-running the task of the report queues the shard again. The
+#   resume_stale_grade_reports management command, meant to be run periodically, re-runs the tasks of the reports
+#   which have not made progress within this time.
+GRADE_REPORT_SHARD_TIMEOUT = 60 * 60
+
 ############################ ORA 2 ############################################
 ORA_WORKFLOW_UPDATE_ROUTING_KEY = "edx.lms.core.ora_workflow_update"
 
@@ -324,6 +324,16 @@ class FieldData:
         """
         return field_name in self.class_field_names()
 
+    def shallow_copy(self):
+        """
+        Returns a copy of this instance with its own fields dict,
+        sharing the field values with this instance.
+        """
+        field_data = self.__class__.__new__(self.__class__)
+        field_data.__dict__.update(self.__dict__)
+        field_data.fields = dict(self.fields)
+        return field_data
+
 
 class TransformerData(FieldData):
     """
@@ -362,6 +372,16 @@ class TransformerDataMap(dict):
             self[key] = new_transformer_data
             return new_transformer_data
 
+    def shallow_copy(self):
+        """
+        Returns a new TransformerDataMap with shallow copies of
+        this map's TransformerData.
+        """
+        return TransformerDataMap(
+            (transformer_name, transformer_data.shallow_copy())
+            for transformer_name, transformer_data in self.items()
+        )
+
     def _translate_key(self, key):
         """
         Allows the given key to be either the transformer's class or name,
@@ -393,6 +413,11 @@ class BlockData(FieldData):
         # Map of transformer name to its block-specific data.
         self.transformer_data = TransformerDataMap()
 
+    def shallow_copy(self):
+        block_data = super().shallow_copy()
+        block_data.transformer_data = self.transformer_data.shallow_copy()
+        return block_data
+
 
 class BlockStructureBlockData(BlockStructure):
     """
@@ -429,6 +454,35 @@ class BlockStructureBlockData(BlockStructure):
             deepcopy(self._block_data_map),
         )
 
+    def shallow_copy(self):
+        """
+        Returns a new instance of BlockStructureBlockData which can be
+        modified through the BlockStructure API without affecting this
+        instance.
+
+        Unlike `copy`, the values of the collected fields are not copied
+        but shared with this instance: only the containers the API modifies
+        (block relations, block data and transformer data) are copied, so
+        this is much cheaper than a deep copy. Collected field values must
+        therefore be replaced, never modified in place.
+        """
+        from .factory import BlockStructureFactory
+        block_relations = {}
+        for usage_key, relations in self._block_relations.items():
+            block_relations[usage_key] = new_relations = _BlockRelations()
+            new_relations.parents = list(relations.parents)
+            new_relations.children = list(relations.children)
+
+        return BlockStructureFactory.create_new(
+            self.root_block_usage_key,
+            block_relations,
+            self.transformer_data.shallow_copy(),
+            {
+                usage_key: block_data.shallow_copy()
+                for usage_key, block_data in self._block_data_map.items()
+            },
+        )
+
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
@@ -814,6 +868,43 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         return self._xblock_map[usage_key]
 
+    def has_xblock(self, usage_key):
+        """
+        Returns whether an xBlock was instantiated for the given usage
+        key. When the block structure is collected incrementally, only
+        the blocks whose data is being collected again have xBlocks; the
+        data of the other blocks is kept from the previous collection.
+
+        Arguments:
+            usage_key (UsageKey) - Usage key of the block.
+        """
+        return usage_key in self._xblock_map
+
+    def xblock_topological_traversal(self, filter_func=None):
+        """
+        Performs a topological sort of the block structure and yields
+        the usage_key of each block which has an instantiated xBlock
+        and, if given, passes filter_func.
+
+        Transformers should traverse the block structure with this
+        method, or xblock_post_order_traversal, in order to support
+        incremental collection.
+        """
+        def has_filtered_xblock(usage_key):
+            return self.has_xblock(usage_key) and (filter_func is None or filter_func(usage_key))
+
+        return self.topological_traversal(
+            filter_func=has_filtered_xblock,
+            yield_descendants_of_unyielded=True,
+        )
+
+    def xblock_post_order_traversal(self):
+        """
+        Performs a post-order sort of the block structure and yields
+        the usage_key of each block which has an instantiated xBlock.
+        """
+        return self.post_order_traversal(filter_func=self.has_xblock)
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
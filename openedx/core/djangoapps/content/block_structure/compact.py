@@ -0,0 +1,688 @@
+"""
+Module with a compact, integer-indexed representation of block structures.
+
+The usage keys of the blocks are interned into an index, the relations of the
+blocks are stored in CSR-style arrays of block indexes and their data in
+columns (one list per field, indexed by block), instead of the per-block
+_BlockRelations, BlockData and TransformerData objects of
+BlockStructureBlockData.
+"""
+
+
+from array import array
+from collections.abc import MutableMapping
+from copy import deepcopy
+from datetime import datetime
+
+from xmodule.block_metadata_utils import get_datetime_field
+
+from openedx.core.lib.graph_traversals import traverse_post_order, traverse_topologically
+
+from .block_structure import BlockData, BlockStructureBlockData, TransformerData, TransformerDataMap
+
+
+class _Missing:
+    """
+    Type of the marker of missing values in columns, which remains the
+    same object when copied or pickled.
+    """
+    def __repr__(self):
+        return '<missing>'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return '_MISSING'
+
+
+_MISSING = _Missing()
+
+
+class _DatetimeHolder:
+    """
+    Holds a datetime value, so it can be normalized by get_datetime_field.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _normalize(value):
+    """
+    Returns the given collected value, normalizing datetimes like
+    get_datetime_field does for BlockData objects.
+    """
+    if isinstance(value, datetime):
+        return get_datetime_field(_DatetimeHolder(value), 'value', value)
+    return value
+
+
+# pylint: disable=protected-access
+class _ColumnFields(MutableMapping):
+    """
+    The fields of a block in a CompactBlockStructureBlockData, as a dict
+    which reads and writes the columns of the block structure.
+    """
+    def __init__(self, block_structure, transformer_name, block_index):
+        self._block_structure = block_structure
+        self._transformer_name = transformer_name
+        self._block_index = block_index
+
+    def __getitem__(self, field_name):
+        block_structure = self._block_structure
+        value = block_structure._get_value(
+            block_structure._columns(self._transformer_name).get(field_name), self._block_index
+        )
+        if value is _MISSING:
+            raise KeyError(field_name)
+        return value
+
+    def __setitem__(self, field_name, value):
+        self._block_structure._set_value(self._transformer_name, field_name, self._block_index, value)
+
+    def __delitem__(self, field_name):
+        self[field_name]  # pylint: disable=pointless-statement
+        self._block_structure._set_value(self._transformer_name, field_name, self._block_index, _MISSING)
+
+    def __iter__(self):
+        block_structure = self._block_structure
+        for field_name, column in list(block_structure._columns(self._transformer_name).items()):
+            if block_structure._get_value(column, self._block_index) is not _MISSING:
+                yield field_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _BlockTransformerDataMap(TransformerDataMap):
+    """
+    The TransformerDataMap of a block in a CompactBlockStructureBlockData,
+    whose TransformerData read and write the columns of the block
+    structure.
+    """
+    def __init__(self, block_structure, block_index):
+        super().__init__()
+        self._block_structure = block_structure
+        self._block_index = block_index
+        for transformer_name, presence in block_structure._transformer_present.items():
+            if presence[block_index]:
+                dict.__setitem__(self, transformer_name, self._transformer_data(transformer_name))
+
+    def get_or_create(self, key):
+        transformer_name = self._translate_key(key)
+        if transformer_name not in self:
+            self._block_structure._transformer_presence(transformer_name)[self._block_index] = 1
+            dict.__setitem__(self, transformer_name, self._transformer_data(transformer_name))
+        return self[transformer_name]
+
+    def _transformer_data(self, transformer_name):
+        """
+        Returns a TransformerData of the given transformer for the block.
+        """
+        transformer_data = TransformerData()
+        transformer_data.fields = _ColumnFields(self._block_structure, transformer_name, self._block_index)
+        return transformer_data
+
+
+def _transformer_name(transformer):
+    """
+    Returns the name of the given transformer or transformer name, like
+    TransformerDataMap does for its keys.
+    """
+    try:
+        return transformer.name()
+    except AttributeError:
+        return transformer
+
+
+class CompactBlockStructureBlockData(BlockStructureBlockData):
+    """
+    A BlockStructureBlockData with the same API, which stores the
+    relations and data of its blocks in integer-indexed arrays.
+
+    Blocks are identified internally by their index in self._keys.
+    Their relations are stored in CSR (compressed sparse row) arrays:
+    the children of the block at index i are the block indexes in
+    self._child_indexes[self._child_offsets[i]:self._child_offsets[i + 1]],
+    and likewise for its parents. These arrays are never modified: the
+    relations of blocks which are modified after creation are moved to
+    self._relation_overrides.
+
+    xBlock fields are stored in self._xblock_columns, a map of field name
+    to a list of the values of that field indexed by block, and block
+    fields of transformers in self._transformer_columns, a map of
+    transformer name to such a map. Missing values are _MISSING.
+
+    Shallow copies share the keys, CSR arrays and columns with the
+    instance they're copied from; any of them is copied before being
+    modified (copy on write). Columns are identified by their
+    (transformer name, field name) key, with a transformer name of None
+    for xBlock fields, and self._owned_columns holds the keys of the
+    columns which aren't shared with another instance.
+
+    Note: BlockData and TransformerData objects returned by the
+    __getitem__, iteritems, itervalues and get_transformer_block_data
+    methods are built on each call, so modifying them doesn't modify
+    the block structure. Use the setter methods of the block structure
+    instead.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, root_block_usage_key, block_relations=None, transformer_data=None, block_data_map=None):
+        """
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage key of the root
+                block of the structure.
+
+            block_relations (dict {UsageKey: _BlockRelations}) - The
+                relations of the blocks, as stored by
+                BlockStructureBlockData.
+
+            transformer_data (TransformerDataMap) - Data of the
+                transformers which is not specific to a block.
+
+            block_data_map (dict {UsageKey: BlockData}) - The data of
+                the blocks, as stored by BlockStructureBlockData.
+        """
+        self.root_block_usage_key = root_block_usage_key
+        self.transformer_data = transformer_data if transformer_data is not None else TransformerDataMap()
+        if block_relations is None:
+            block_relations = {root_block_usage_key: None}
+        block_data_map = block_data_map or {}
+
+        # Interned usage keys: the data of a block can exist without
+        # the block, so both maps provide keys.
+        keys = list(block_relations)
+        keys.extend(usage_key for usage_key in block_data_map if usage_key not in block_relations)
+        index = {usage_key: block_index for block_index, usage_key in enumerate(keys)}
+        self._keys = keys
+        self._index = index
+        self._keys_owned = True
+
+        self._present = bytearray(len(keys))
+        for block_index in range(len(block_relations)):
+            self._present[block_index] = 1
+        self._size = len(block_relations)
+
+        child_offsets, child_indexes = array('l', [0]), array('l')
+        parent_offsets, parent_indexes = array('l', [0]), array('l')
+        for usage_key in keys:
+            relations = block_relations.get(usage_key)
+            if relations is not None:
+                child_indexes.extend(index[child] for child in relations.children)
+                parent_indexes.extend(index[parent] for parent in relations.parents)
+            child_offsets.append(len(child_indexes))
+            parent_offsets.append(len(parent_indexes))
+        self._child_offsets, self._child_indexes = child_offsets, child_indexes
+        self._parent_offsets, self._parent_indexes = parent_offsets, parent_indexes
+
+        # {block index: [[parent indexes], [child indexes]]}
+        self._relation_overrides = {}
+
+        self._has_data = bytearray(len(keys))
+        self._xblock_columns = {}
+        self._transformer_columns = {}
+        # {transformer name: bytearray}, whether a block has data for
+        # the transformer.
+        self._transformer_present = {}
+        for usage_key, block_data in block_data_map.items():
+            block_index = index[usage_key]
+            self._has_data[block_index] = 1
+            for field_name, value in block_data.fields.items():
+                self._new_column(self._xblock_columns, field_name)[block_index] = value
+            for transformer_name, transformer_block_data in block_data.transformer_data.items():
+                self._transformer_presence(transformer_name)[block_index] = 1
+                columns = self._transformer_columns.setdefault(transformer_name, {})
+                for field_name, value in transformer_block_data.fields.items():
+                    self._new_column(columns, field_name)[block_index] = value
+
+        # Keys of the columns which aren't shared with copies.
+        self._owned_columns = set(self._column_keys())
+
+    def copy(self):
+        """
+        Returns a new instance of CompactBlockStructureBlockData with a
+        deep-copy of this instance's contents.
+        """
+        block_structure = deepcopy(self)
+        block_structure._keys_owned = True
+        block_structure._owned_columns = set(block_structure._column_keys())
+        return block_structure
+
+    def shallow_copy(self):
+        """
+        Returns a new instance of CompactBlockStructureBlockData which
+        can be modified through the BlockStructure API without affecting
+        this instance.
+
+        Keys, relations and columns are shared until modified, and
+        collected field values are always shared: they must therefore be
+        replaced, never modified in place.
+        """
+        block_structure = self.__class__.__new__(self.__class__)
+        block_structure.__dict__.update(self.__dict__)
+        block_structure.transformer_data = self.transformer_data.shallow_copy()
+        block_structure._present = bytearray(self._present)
+        block_structure._has_data = bytearray(self._has_data)
+        block_structure._transformer_present = {
+            transformer_name: bytearray(presence) for transformer_name, presence in self._transformer_present.items()
+        }
+        block_structure._relation_overrides = {
+            block_index: [list(parents), list(children)]
+            for block_index, (parents, children) in self._relation_overrides.items()
+        }
+        block_structure._xblock_columns = dict(self._xblock_columns)
+        block_structure._transformer_columns = {
+            transformer_name: dict(columns) for transformer_name, columns in self._transformer_columns.items()
+        }
+
+        # Both instances now share the keys and columns.
+        self._keys_owned = block_structure._keys_owned = False
+        self._owned_columns = set()
+        block_structure._owned_columns = set()
+        return block_structure
+
+    #--- Block structure relation methods ---#
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, usage_key):
+        block_index = self._index.get(usage_key)
+        return block_index is not None and self._present[block_index] == 1
+
+    def get_block_keys(self):
+        return (usage_key for block_index, usage_key in enumerate(self._keys) if self._present[block_index])
+
+    def get_parents(self, usage_key):
+        block_index = self._index.get(usage_key)
+        if block_index is None:
+            return []
+        return [self._keys[parent_index] for parent_index in self._parent_indexes_of(block_index)]
+
+    def get_children(self, usage_key):
+        block_index = self._index.get(usage_key)
+        if block_index is None:
+            return []
+        return [self._keys[child_index] for child_index in self._child_indexes_of(block_index)]
+
+    def set_root_block(self, usage_key):
+        block_index = self._index[usage_key]
+        self.root_block_usage_key = usage_key
+        self._relations(block_index)[0] = []
+
+    def topological_traversal(
+            self,
+            filter_func=None,
+            yield_descendants_of_unyielded=False,
+            start_node=None,
+    ):
+        """
+        Performs a topological sort of the block indexes of the block
+        structure and yields the usage_key of each block as it is
+        encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_topologically.
+        """
+        block_indexes = traverse_topologically(
+            start_node=self._index[start_node or self.root_block_usage_key],
+            get_parents=self._parent_indexes_of,
+            get_children=self._child_indexes_of,
+            filter_func=self._index_filter(filter_func),
+            yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+        )
+        return (self._keys[block_index] for block_index in block_indexes)
+
+    def post_order_traversal(
+            self,
+            filter_func=None,
+            start_node=None,
+    ):
+        """
+        Performs a post-order sort of the block indexes of the block
+        structure and yields the usage_key of each block as it is
+        encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_post_order.
+        """
+        block_indexes = traverse_post_order(
+            start_node=self._index[start_node or self.root_block_usage_key],
+            get_children=self._child_indexes_of,
+            filter_func=self._index_filter(filter_func),
+        )
+        return (self._keys[block_index] for block_index in block_indexes)
+
+    #--- Block structure data methods ---#
+
+    def iteritems(self):
+        return (
+            (usage_key, self._block_data(block_index))
+            for block_index, usage_key in enumerate(self._keys)
+            if self._has_data[block_index]
+        )
+
+    def itervalues(self):
+        return (block_data for _, block_data in self.iteritems())
+
+    def __getitem__(self, usage_key):
+        block_index = self._index.get(usage_key)
+        if block_index is None or not self._has_data[block_index]:
+            raise KeyError(usage_key)
+        return self._block_data(block_index)
+
+    def get_xblock_field(self, usage_key, field_name, default=None):
+        block_index = self._index.get(usage_key)
+        if block_index is None or not self._has_data[block_index]:
+            return default
+        value = self._get_value(self._xblock_columns.get(field_name), block_index)
+        return default if value is _MISSING else _normalize(value)
+
+    def override_xblock_field(self, usage_key, field_name, override_data):
+        block_index = self._get_or_create_block_index(usage_key)
+        self._set_value(None, field_name, block_index, override_data)
+
+    def get_transformer_block_data(self, usage_key, transformer):
+        transformer_name = _transformer_name(transformer)
+        block_index = self._transformer_block_index(usage_key, transformer_name)
+        if block_index is None:
+            raise KeyError(transformer_name)
+        return self._transformer_block_data(transformer_name, block_index)
+
+    def get_transformer_block_field(self, usage_key, transformer, key, default=None):
+        transformer_name = _transformer_name(transformer)
+        block_index = self._transformer_block_index(usage_key, transformer_name)
+        if block_index is None:
+            return default
+        value = self._get_value(self._transformer_columns[transformer_name].get(key), block_index)
+        return default if value is _MISSING else _normalize(value)
+
+    def set_transformer_block_field(self, usage_key, transformer, key, value):
+        transformer_name = _transformer_name(transformer)
+        block_index = self._get_or_create_block_index(usage_key)
+        self._transformer_presence(transformer_name)[block_index] = 1
+        self._set_value(transformer_name, key, block_index, value)
+
+    def remove_transformer_block_field(self, usage_key, transformer, key):
+        transformer_name = _transformer_name(transformer)
+        block_index = self._transformer_block_index(usage_key, transformer_name)
+        if block_index is None:
+            return
+        if self._get_value(self._transformer_columns[transformer_name].get(key), block_index) is not _MISSING:
+            self._set_value(transformer_name, key, block_index, _MISSING)
+
+    def remove_block(self, usage_key, keep_descendants):
+        block_index = self._index.get(usage_key)
+        if block_index is None or not self._present[block_index]:
+            raise KeyError(usage_key)
+        parents, children = self._relations(block_index)
+
+        # Remove block from its children.
+        for child_index in children:
+            self._relations(child_index)[0].remove(block_index)
+
+        # Remove block from its parents.
+        for parent_index in parents:
+            self._relations(parent_index)[1].remove(block_index)
+
+        # Remove block.
+        del self._relation_overrides[block_index]
+        self._present[block_index] = 0
+        self._size -= 1
+        self._has_data[block_index] = 0
+
+        # Recreate the graph connections if descendants are to be kept.
+        if keep_descendants:
+            for child_index in children:
+                for parent_index in parents:
+                    self._relations(parent_index)[1].append(child_index)
+                    self._relations(child_index)[0].append(parent_index)
+
+    #--- Internal methods ---#
+
+    def _prune_unreachable(self):
+        """
+        Mutates this block structure by removing any unreachable blocks.
+        """
+        reachable = bytearray(len(self._keys))
+        for block_index in traverse_post_order(
+            start_node=self._index[self.root_block_usage_key],
+            get_children=self._child_indexes_of,
+        ):
+            reachable[block_index] = 1
+
+        for block_index, is_present in enumerate(self._present):
+            if is_present and not reachable[block_index]:
+                self._present[block_index] = 0
+                self._size -= 1
+                self._relation_overrides.pop(block_index, None)
+
+        # Keep only the relations with reachable parents.
+        for block_index, is_reachable in enumerate(reachable):
+            if is_reachable:
+                parents = self._parent_indexes_of(block_index)
+                if not all(reachable[parent_index] for parent_index in parents):
+                    self._relations(block_index)[0] = [
+                        parent_index for parent_index in parents if reachable[parent_index]
+                    ]
+
+    def _add_relation(self, parent_key, child_key):
+        parent_index = self._add_block_index(parent_key)
+        child_index = self._add_block_index(child_key)
+        self._relations(child_index)[0].append(parent_index)
+        self._relations(parent_index)[1].append(child_index)
+
+    def _get_or_create_block(self, usage_key):
+        """
+        Returns a BlockData of the block with the given usage key, marking
+        it as having data. Unlike the BlockData objects returned by
+        __getitem__, its fields and transformer data are stored in the
+        columns of this block structure when they are set.
+        """
+        block_data = BlockData(usage_key)
+        block_index = self._get_or_create_block_index(usage_key)
+        block_data.fields = _ColumnFields(self, None, block_index)
+        block_data.transformer_data = _BlockTransformerDataMap(self, block_index)
+        return block_data
+
+    def _index_filter(self, filter_func):
+        """
+        Returns a filter function of block indexes for the given filter
+        function of usage keys.
+        """
+        if filter_func is None:
+            return None
+        return lambda block_index: filter_func(self._keys[block_index])
+
+    def _parent_indexes_of(self, block_index):
+        """
+        Returns the indexes of the parents of the block at the given index.
+        """
+        if not self._present[block_index]:
+            return ()
+        relations = self._relation_overrides.get(block_index)
+        if relations is not None:
+            return relations[0]
+        if block_index + 1 < len(self._parent_offsets):
+            return self._parent_indexes[self._parent_offsets[block_index]:self._parent_offsets[block_index + 1]]
+        return ()
+
+    def _child_indexes_of(self, block_index):
+        """
+        Returns the indexes of the children of the block at the given index.
+        """
+        if not self._present[block_index]:
+            return ()
+        relations = self._relation_overrides.get(block_index)
+        if relations is not None:
+            return relations[1]
+        if block_index + 1 < len(self._child_offsets):
+            return self._child_indexes[self._child_offsets[block_index]:self._child_offsets[block_index + 1]]
+        return ()
+
+    def _relations(self, block_index):
+        """
+        Returns the modifiable [parent indexes, child indexes] lists of
+        the block at the given index, moving its relations out of the
+        CSR arrays if needed.
+        """
+        relations = self._relation_overrides.get(block_index)
+        if relations is None:
+            relations = [list(self._parent_indexes_of(block_index)), list(self._child_indexes_of(block_index))]
+            self._relation_overrides[block_index] = relations
+        return relations
+
+    def _intern(self, usage_key):
+        """
+        Returns the index of the given usage key, adding it to the index
+        if needed.
+        """
+        block_index = self._index.get(usage_key)
+        if block_index is None:
+            if not self._keys_owned:
+                self._keys = list(self._keys)
+                self._index = dict(self._index)
+                self._keys_owned = True
+            block_index = len(self._keys)
+            self._keys.append(usage_key)
+            self._index[usage_key] = block_index
+            self._present.append(0)
+            self._has_data.append(0)
+            for presence in self._transformer_present.values():
+                presence.append(0)
+        return block_index
+
+    def _add_block_index(self, usage_key):
+        """
+        Adds the block with the given usage key to the structure, if it
+        isn't present, and returns its index.
+        """
+        block_index = self._intern(usage_key)
+        if not self._present[block_index]:
+            self._present[block_index] = 1
+            self._size += 1
+            self._relation_overrides[block_index] = [[], []]
+        return block_index
+
+    def _get_or_create_block_index(self, usage_key):
+        """
+        Returns the index of the block with the given usage key, marking
+        it as having data.
+        """
+        block_index = self._intern(usage_key)
+        self._has_data[block_index] = 1
+        return block_index
+
+    def _transformer_block_index(self, usage_key, transformer_name):
+        """
+        Returns the index of the block with the given usage key if it has
+        data for the given transformer, else None.
+        """
+        block_index = self._index.get(usage_key)
+        presence = self._transformer_present.get(transformer_name)
+        if block_index is None or presence is None or not (self._has_data[block_index] and presence[block_index]):
+            return None
+        return block_index
+
+    def _transformer_presence(self, transformer_name):
+        """
+        Returns the bytearray of the blocks having data for the given transformer.
+        """
+        presence = self._transformer_present.get(transformer_name)
+        if presence is None:
+            presence = self._transformer_present[transformer_name] = bytearray(len(self._keys))
+        return presence
+
+    def _new_column(self, columns, field_name):
+        """
+        Returns the column for the given field in the given columns,
+        creating it if needed.
+        """
+        column = columns.get(field_name)
+        if column is None:
+            column = columns[field_name] = [_MISSING] * len(self._keys)
+        return column
+
+    @staticmethod
+    def _get_value(column, block_index):
+        """
+        Returns the value of the given column for the block at the given
+        index, or _MISSING.
+        """
+        if column is None or block_index >= len(column):
+            return _MISSING
+        return column[block_index]
+
+    def _columns(self, transformer_name):
+        """
+        Returns the map of field name to column of the given transformer,
+        or of the xBlock fields if transformer_name is None.
+        """
+        if transformer_name is None:
+            return self._xblock_columns
+        return self._transformer_columns.get(transformer_name, {})
+
+    def _set_value(self, transformer_name, field_name, block_index, value):
+        """
+        Sets the value of the given field of the given transformer, or
+        xBlock field if transformer_name is None, for the block at the
+        given index, copying the column first if it is shared.
+        """
+        if transformer_name is None:
+            columns = self._xblock_columns
+        else:
+            columns = self._transformer_columns.setdefault(transformer_name, {})
+        column = columns.get(field_name)
+        column_key = (transformer_name, field_name)
+        if column is None or column_key not in self._owned_columns:
+            column = columns[field_name] = list(column) if column is not None else []
+            self._owned_columns.add(column_key)
+        if block_index >= len(column):
+            column.extend([_MISSING] * (len(self._keys) - len(column)))
+        column[block_index] = value
+
+    def _column_keys(self):
+        """
+        Returns an iterator over the (transformer name, field name) keys
+        of all the columns.
+        """
+        for field_name in self._xblock_columns:
+            yield None, field_name
+        for transformer_name, columns in self._transformer_columns.items():
+            for field_name in columns:
+                yield transformer_name, field_name
+
+    def _block_data(self, block_index):
+        """
+        Returns a new BlockData with the data of the block at the given index.
+        """
+        block_data = BlockData(self._keys[block_index])
+        for field_name, column in self._xblock_columns.items():
+            value = self._get_value(column, block_index)
+            if value is not _MISSING:
+                block_data.fields[field_name] = value
+        for transformer_name, presence in self._transformer_present.items():
+            if presence[block_index]:
+                block_data.transformer_data[transformer_name] = self._transformer_block_data(
+                    transformer_name, block_index
+                )
+        return block_data
+
+    def _transformer_block_data(self, transformer_name, block_index):
+        """
+        Returns a new TransformerData with the data of the given
+        transformer for the block at the given index.
+        """
+        transformer_block_data = TransformerData()
+        for field_name, column in self._transformer_columns.get(transformer_name, {}).items():
+            value = self._get_value(column, block_index)
+            if value is not _MISSING:
+                transformer_block_data.fields[field_name] = value
+        return transformer_block_data
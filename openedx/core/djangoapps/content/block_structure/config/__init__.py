@@ -9,6 +9,17 @@ from openedx.core.lib.cache_utils import request_cached
 
 from .models import BlockStructureConfiguration
 
+# .. toggle_name: block_structure.incremental_collect
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, block structures which are out of date after a course is published are
+#   collected again only for the blocks which changed since the previous collection, their descendants and their
+#   ancestors, reusing the previously collected data of the other blocks. This only applies to courses in the split
+#   modulestore, and only when all registered transformers support incremental collection.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+INCREMENTAL_COLLECT = WaffleSwitch('block_structure.incremental_collect', __name__)
+
 
 @request_cached()
 def num_versions_to_keep():
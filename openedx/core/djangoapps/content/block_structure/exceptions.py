@@ -32,6 +32,14 @@ class TransformerDataIncompatible(BlockStructureException):
     pass  # lint-amnesty, pylint: disable=unnecessary-pass
 
 
+class IncrementalCollectNotSupported(BlockStructureException):
+    """
+    Exception for when a Transformer can't collect data incrementally
+    for a block structure, which must then be collected entirely.
+    """
+    pass  # lint-amnesty, pylint: disable=unnecessary-pass
+
+
 class BlockStructureNotFound(BlockStructureException):
     """
     Exception for when a Block Structure is not found.
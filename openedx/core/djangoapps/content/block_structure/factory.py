@@ -1,6 +1,8 @@
 """
 Module for factory class for BlockStructure objects.
 """
+from openedx.core.lib.graph_traversals import traverse_pre_order
+
 from .block_structure import BlockStructureBlockData, BlockStructureModulestoreData
 
 
@@ -65,6 +67,92 @@ class BlockStructureFactory:
         build_block_structure(root_xblock)
         return block_structure
 
+    @classmethod
+    def create_incrementally(cls, root_block_usage_key, modulestore, previous_block_structure, changed_block_keys):
+        """
+        Creates and returns a block structure from the modulestore
+        starting at the given root_block_usage_key, reusing the given
+        previously collected block structure for the blocks which
+        didn't change.
+
+        xBlocks are only instantiated for the changed blocks, their
+        descendants and their ancestors, whose data is to be collected
+        again. The other blocks keep their previously collected data,
+        and the previously collected transformer data is kept too.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure that is to be created.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks within the block
+                structure starting at root_block_usage_key.
+
+            previous_block_structure (BlockStructureBlockData) - The
+                block structure previously collected for
+                root_block_usage_key.
+
+            changed_block_keys (set(UsageKey)) - The usage keys, without
+                branch information, of the blocks which were added or
+                changed since previous_block_structure was collected.
+
+        Returns:
+            BlockStructureModulestoreData - The created block structure.
+        """
+        root_block_usage_key = root_block_usage_key.for_branch(None)
+        block_structure = BlockStructureModulestoreData(root_block_usage_key)
+        xblocks = {}
+
+        def get_xblock(usage_key):
+            """
+            Returns the xBlock for the given usage key, instantiating it once.
+            """
+            if usage_key not in xblocks:
+                xblocks[usage_key] = modulestore.get_item(usage_key)
+            return xblocks[usage_key]
+
+        # Build the relations, from the modulestore for the changed
+        # blocks and from the previous block structure for the others.
+        blocks_visited = set()
+        new_block_keys = set()
+        blocks_to_visit = [root_block_usage_key]
+        while blocks_to_visit:
+            usage_key = blocks_to_visit.pop()
+            if usage_key in blocks_visited:
+                continue
+            blocks_visited.add(usage_key)
+            block_structure._add_block(block_structure._block_relations, usage_key)  # pylint: disable=protected-access
+
+            if usage_key not in previous_block_structure:
+                new_block_keys.add(usage_key)
+            if usage_key in changed_block_keys or usage_key in new_block_keys:
+                children = [child.location.for_branch(None) for child in get_xblock(usage_key).get_children()]
+            else:
+                children = previous_block_structure.get_children(usage_key)
+
+            for child_key in children:
+                block_structure._add_relation(usage_key, child_key)  # pylint: disable=protected-access
+                blocks_to_visit.append(child_key)
+
+        # Find the blocks whose data is to be collected again.
+        changed_block_keys = (blocks_visited & set(changed_block_keys)) | new_block_keys
+        blocks_to_collect = {root_block_usage_key}
+        for usage_key in changed_block_keys:
+            blocks_to_collect.update(traverse_pre_order(usage_key, block_structure.get_children))
+            blocks_to_collect.update(traverse_pre_order(usage_key, block_structure.get_parents))
+
+        for usage_key in blocks_visited:
+            if usage_key in blocks_to_collect:
+                block_structure._add_xblock(usage_key, get_xblock(usage_key))  # pylint: disable=protected-access
+            else:
+                try:
+                    block_data = previous_block_structure[usage_key]
+                except KeyError:
+                    continue
+                block_structure._block_data_map[usage_key] = block_data  # pylint: disable=protected-access
+        block_structure.transformer_data = previous_block_structure.transformer_data
+        return block_structure
+
     @classmethod
     def create_from_store(cls, root_block_usage_key, block_structure_store):
         """
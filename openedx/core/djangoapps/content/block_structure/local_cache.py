@@ -0,0 +1,161 @@
+"""
+Process-local, memory-bounded LRU cache of deserialized block structures,
+used by the BlockStructureStore in front of the django cache and storage.
+"""
+
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+from edx_django_utils import monitoring
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+
+class BlockStructureLocalCache:
+    """
+    LRU cache of deserialized block structures, bounded by the total
+    size in bytes of their serializations.
+
+    The cached block structures must never be modified: callers get
+    copies of them (see BlockStructureBlockData.shallow_copy).
+
+    Entries are keyed by the same key as the django cache, which includes
+    the root block usage key, the data version and the schema versions of
+    the transformers and block structures, so newly collected versions of a
+    block structure never collide with stale entries. Those are evicted when
+    the cache is full, or when the course is published or deleted.
+    """
+
+    def __init__(self):
+        # Map of cache key to (root block usage key, block structure, size in bytes).
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def max_size_in_bytes():
+        """
+        Returns the maximum total size of the cached block structures.
+        A value of 0 disables the cache.
+        """
+        # .. setting_name: BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_BYTES']
+        # .. setting_default: 0
+        # .. setting_description: Maximum total size, in bytes, of the serialized block structures kept
+        #   deserialized in the memory of each process, in front of the django cache. Set to 0 to disable
+        #   this process-local cache.
+        return settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', 0)
+
+    def is_enabled(self):
+        """
+        Returns whether the cache is enabled.
+        """
+        return self.max_size_in_bytes() > 0
+
+    def get(self, cache_key):
+        """
+        Returns the cached block structure for the given key, or None.
+        """
+        if not self.is_enabled():
+            return None
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(cache_key)
+            self._set_custom_attributes(hit=entry is not None)
+
+        return entry[1] if entry else None
+
+    def add(self, cache_key, root_block_usage_key, block_structure, size_in_bytes):
+        """
+        Adds the given block structure to the cache, evicting the least
+        recently used entries as needed.
+
+        Returns whether the block structure was added.
+        """
+        max_size_in_bytes = self.max_size_in_bytes()
+        if size_in_bytes > max_size_in_bytes:
+            return False
+
+        with self._lock:
+            self._pop(cache_key)
+            self._entries[cache_key] = (root_block_usage_key, block_structure, size_in_bytes)
+            self.size_in_bytes += size_in_bytes
+            while self.size_in_bytes > max_size_in_bytes:
+                self._pop(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, course_key):
+        """
+        Removes all the cached block structures of the given course.
+        """
+        with self._lock:
+            stale_keys = [
+                cache_key
+                for cache_key, (root_block_usage_key, _, _) in self._entries.items()
+                if root_block_usage_key.course_key == course_key
+            ]
+            for cache_key in stale_keys:
+                self._pop(cache_key)
+        if stale_keys:
+            logger.info("BlockStructure: Removed %d entries from local cache; %s.", len(stale_keys), course_key)
+
+    def clear(self):
+        """
+        Removes all the cached block structures and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size_in_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns a dict of statistics about the cache.
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_in_bytes': self.size_in_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _pop(self, cache_key):
+        """
+        Removes the entry for the given key, if any. Must be called with the lock held.
+        """
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self.size_in_bytes -= entry[2]
+
+    def _set_custom_attributes(self, hit):
+        """
+        Reports the state of the cache for the current request.
+        """
+        # .. custom_attribute_name: block_structure_local_cache_hit
+        # .. custom_attribute_description: Whether the last block structure read during the request
+        #   was found in the process-local block structure cache.
+        monitoring.set_custom_attribute('block_structure_local_cache_hit', hit)
+        # .. custom_attribute_name: block_structure_local_cache_hit_rate
+        # .. custom_attribute_description: The ratio of hits to reads of the process-local block
+        #   structure cache, since the process started.
+        monitoring.set_custom_attribute(
+            'block_structure_local_cache_hit_rate', round(self.hits / (self.hits + self.misses), 3)
+        )
+        # .. custom_attribute_name: block_structure_local_cache_size_in_bytes
+        # .. custom_attribute_description: The total size of the serialized block structures
+        #   held by the process-local block structure cache.
+        monitoring.set_custom_attribute('block_structure_local_cache_size_in_bytes', self.size_in_bytes)
+
+
+local_cache = BlockStructureLocalCache()
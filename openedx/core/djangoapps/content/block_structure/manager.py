@@ -5,14 +5,23 @@ BlockStructures.
 
 
 from contextlib import contextmanager
+from logging import getLogger
 
 from xmodule.modulestore import ModuleStoreEnum
 
-from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
+from . import config
+from .exceptions import (
+    BlockStructureNotFound,
+    IncrementalCollectNotSupported,
+    TransformerDataIncompatible,
+    UsageKeyNotInBlockStructure
+)
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
 
 class BlockStructureManager:
     """
@@ -126,7 +135,8 @@ class BlockStructureManager:
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                if not self._update_collected_incrementally():
+                    self._update_collected()
 
     def _update_collected(self):
         """
@@ -148,6 +158,60 @@ class BlockStructureManager:
             self.store.add(block_structure)
             return block_structure
 
+    def _update_collected_incrementally(self):
+        """
+        The store is updated with transformers data newly collected
+        only for the blocks which changed in the modulestore since the
+        stored block structure was collected, their descendants and
+        their ancestors.
+
+        Returns the updated block structure, or None if it can't be
+        collected incrementally, in which case it should be collected
+        entirely.
+        """
+        if not config.INCREMENTAL_COLLECT.is_enabled() or not BlockStructureTransformers.supports_incremental_collect():
+            return None
+
+        previous_version = self.store.get_collected_data_version(self.root_block_usage_key)
+        get_changed_block_keys = getattr(self.modulestore, 'get_changed_block_keys', None)
+        if not previous_version or not get_changed_block_keys:
+            return None
+
+        with self._bulk_operations():
+            # Always uses published-only branch regardless of CMS or LMS context.
+            with self.modulestore.branch_setting(
+                ModuleStoreEnum.Branch.published_only,
+                self.root_block_usage_key.course_key
+            ):
+                changed_block_keys = get_changed_block_keys(self.root_block_usage_key.course_key, previous_version)
+                if changed_block_keys is None:
+                    return None
+                try:
+                    previous_block_structure = self.store.get(self.root_block_usage_key)
+                    BlockStructureTransformers.verify_versions(previous_block_structure)
+                except (BlockStructureNotFound, TransformerDataIncompatible):
+                    return None
+
+                block_structure = BlockStructureFactory.create_incrementally(
+                    self.root_block_usage_key,
+                    self.modulestore,
+                    previous_block_structure,
+                    changed_block_keys,
+                )
+
+            try:
+                BlockStructureTransformers.collect_incrementally(block_structure)
+            except IncrementalCollectNotSupported as exc:
+                logger.info("BlockStructure: Not collecting incrementally: %s; %s.", exc, self.root_block_usage_key)
+                return None
+            self.store.add(block_structure)
+            logger.info(
+                "BlockStructure: Collected incrementally %d changed blocks; %s.",
+                len(changed_block_keys),
+                self.root_block_usage_key,
+            )
+            return block_structure
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
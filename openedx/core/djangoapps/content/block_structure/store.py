@@ -6,13 +6,16 @@ Module for the Storage of BlockStructure objects.
 
 from logging import getLogger
 
+from django.conf import settings
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib import cache_codecs
 
 from . import config
 from .block_structure import BlockStructureBlockData
+from .compact import CompactBlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .local_cache import local_cache
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
 
@@ -37,8 +40,8 @@ class BlockStructureStore:
 
     def add(self, block_structure):
         """
-        Stores and caches a compressed and pickled serialization of
-        the given block structure.
+        Stores and caches a compressed serialization of the given
+        block structure.
 
         The data stored includes the structure's
         block relations, transformer data, and block data.
@@ -55,7 +58,8 @@ class BlockStructureStore:
     def get(self, root_block_usage_key):
         """
         Deserializes and returns the block structure starting at
-        root_block_usage_key, if found in the cache or storage.
+        root_block_usage_key, if found in the process-local cache, the
+        cache or storage.
 
         The given root_block_usage_key must equate the
         root_block_usage_key previously passed to the `add` method.
@@ -74,6 +78,11 @@ class BlockStructureStore:
             found.
         """
         bs_model = self._get_model(root_block_usage_key)
+        cache_key = self._encode_root_cache_key(bs_model)
+
+        block_structure = local_cache.get(cache_key)
+        if block_structure is not None:
+            return block_structure.shallow_copy()
 
         try:
             serialized_data = self._get_from_cache(bs_model)
@@ -81,7 +90,11 @@ class BlockStructureStore:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        if local_cache.add(cache_key, root_block_usage_key, block_structure, len(serialized_data)):
+            # The cached instance must remain unmodified.
+            return block_structure.shallow_copy()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -94,6 +107,7 @@ class BlockStructureStore:
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        local_cache.invalidate(root_block_usage_key.course_key)
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -111,6 +125,26 @@ class BlockStructureStore:
 
         return False
 
+    def get_collected_data_version(self, root_block_usage_key):
+        """
+        Returns the version of the modulestore data from which the
+        stored block structure for the given key was collected, if it
+        was collected with the current schema versions of the
+        Transformers and BlockStructure classes. Otherwise returns None.
+        """
+        try:
+            bs_model = self._get_model(root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+
+        version_data = self._version_data_of_model(bs_model)
+        if (
+            version_data['transformers_schema_version'] != TransformerRegistry.get_write_version_hash() or
+            version_data['block_structure_schema_version'] != str(BlockStructureBlockData.VERSION)
+        ):
+            return None
+        return version_data['data_version']
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -174,14 +208,16 @@ class BlockStructureStore:
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, with the
+        codec configured in BLOCK_STRUCTURES_SETTINGS['CODEC'].
         """
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
             block_structure._block_data_map,
         )
-        return zpickle(data_to_cache)
+        codec_name = settings.BLOCK_STRUCTURES_SETTINGS.get('CODEC', cache_codecs.ZPickleCodec.name)
+        return cache_codecs.dumps(data_to_cache, codec_name)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
@@ -189,13 +225,20 @@ class BlockStructureStore:
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            block_relations, transformer_data, block_data_map = cache_codecs.loads(serialized_data)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
             logger.exception("BlockStructure: Failed to load data from cache for %s", bs_model)
             raise BlockStructureNotFound(bs_model.data_usage_key)  # lint-amnesty, pylint: disable=raise-missing-from
 
+        if settings.BLOCK_STRUCTURES_SETTINGS.get('COMPACT_REPRESENTATION', False):
+            return CompactBlockStructureBlockData(
+                root_block_usage_key,
+                block_relations,
+                transformer_data,
+                block_data_map,
+            )
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
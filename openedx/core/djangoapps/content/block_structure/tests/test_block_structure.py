@@ -248,7 +248,8 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
-    def test_copy(self):
+    @ddt.data('copy', 'shallow_copy')
+    def test_copy(self, copy_method):
         def _set_value(structure, value):
             """
             Sets a test transformer block field to the given value in the given structure.
@@ -267,7 +268,7 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(block_structure, 'original_value')
 
         # create a new copy of the structure and verify they are equivalent
-        new_copy = block_structure.copy()
+        new_copy = getattr(block_structure, copy_method)()
         assert block_structure.root_block_usage_key == new_copy.root_block_usage_key
         for block in block_structure:
             assert block in new_copy
@@ -0,0 +1,197 @@
+"""
+Tests for compact.py
+"""
+
+
+import itertools
+# pylint: disable=protected-access
+from copy import deepcopy
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+
+from ..block_structure import BlockStructureBlockData
+from ..compact import CompactBlockStructureBlockData
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+ALL_CHILDREN_MAPS = [
+    ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+    ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+    ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+]
+
+
+@ddt.ddt
+class TestCompactBlockStructureBlockData(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for CompactBlockStructureBlockData, verifying it behaves like
+    the BlockStructureBlockData it is created from.
+    """
+
+    def create_block_structures(self, children_map):
+        """
+        Returns a BlockStructureBlockData for the given children_map,
+        with collected data for each block, and the equivalent
+        CompactBlockStructureBlockData.
+        """
+        block_structure = self.create_block_structure(children_map)
+        for block_key in range(len(children_map)):
+            block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_key}')
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'even', block_key % 2 == 0)
+        block_structure.set_transformer_data(MockTransformer, 'global', 'value')
+
+        compact_block_structure = CompactBlockStructureBlockData(
+            block_structure.root_block_usage_key,
+            deepcopy(block_structure._block_relations),
+            deepcopy(block_structure.transformer_data),
+            deepcopy(block_structure._block_data_map),
+        )
+        return block_structure, compact_block_structure
+
+    @ddt.data(*ALL_CHILDREN_MAPS)
+    def test_relations(self, children_map):
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+        self.assert_block_structure(compact_block_structure, children_map)
+        assert len(compact_block_structure) == len(block_structure)
+        assert list(compact_block_structure) == list(block_structure)
+        assert (len(children_map) + 1) not in compact_block_structure
+
+    @ddt.data(*itertools.product(ALL_CHILDREN_MAPS, [None, lambda block_key: block_key != 1]))
+    @ddt.unpack
+    def test_traversals(self, children_map, filter_func):
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+        assert list(compact_block_structure.topological_traversal(filter_func=filter_func)) ==\
+               list(block_structure.topological_traversal(filter_func=filter_func))
+        assert list(compact_block_structure.post_order_traversal(filter_func=filter_func)) ==\
+               list(block_structure.post_order_traversal(filter_func=filter_func))
+
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            list(range(1, 7)),
+            ALL_CHILDREN_MAPS,
+        )
+    )
+    @ddt.unpack
+    def test_remove_block(self, keep_descendants, block_to_remove, children_map):
+        if block_to_remove >= len(children_map):
+            return
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+
+        for structure in (block_structure, compact_block_structure):
+            structure.remove_block(block_to_remove, keep_descendants)
+        self._assert_equivalent(block_structure, compact_block_structure, children_map)
+        assert compact_block_structure.get_xblock_field(block_to_remove, 'display_name') is None
+
+        for structure in (block_structure, compact_block_structure):
+            structure._prune_unreachable()
+        self._assert_equivalent(block_structure, compact_block_structure, children_map)
+
+    def test_remove_missing_block(self):
+        _, compact_block_structure = self.create_block_structures(self.SIMPLE_CHILDREN_MAP)
+        compact_block_structure.remove_block(1, keep_descendants=False)
+        with self.assertRaises(KeyError):
+            compact_block_structure.remove_block(1, keep_descendants=False)
+
+    def test_block_data(self):
+        block_structure, compact_block_structure = self.create_block_structures(self.SIMPLE_CHILDREN_MAP)
+        due = datetime(2017, 3, 23, 16, 38, 46)
+
+        for structure in (block_structure, compact_block_structure):
+            structure.override_xblock_field(3, 'due', due)
+            structure.set_transformer_block_field(3, 'other_transformer', 'key', 'value')
+            structure.remove_transformer_block_field(4, MockTransformer, 'even')
+            structure.set_transformer_data(MockTransformer, 'global', 'new value')
+
+        for block_key in range(len(self.SIMPLE_CHILDREN_MAP)):
+            compact_block_data = compact_block_structure[block_key]
+            block_data = block_structure[block_key]
+            assert compact_block_data.location == block_data.location
+            assert compact_block_data.fields == block_data.fields
+            assert set(compact_block_data.transformer_data) == set(block_data.transformer_data)
+            for transformer_name, transformer_block_data in block_data.transformer_data.items():
+                assert compact_block_data.transformer_data[transformer_name].fields == transformer_block_data.fields
+            for field_name in ('display_name', 'due', 'missing'):
+                assert compact_block_structure.get_xblock_field(block_key, field_name, 'default') ==\
+                       block_structure.get_xblock_field(block_key, field_name, 'default')
+            for transformer, key in itertools.product((MockTransformer, 'other_transformer'), ('even', 'key')):
+                assert compact_block_structure.get_transformer_block_field(block_key, transformer, key, 'default') ==\
+                       block_structure.get_transformer_block_field(block_key, transformer, key, 'default')
+
+        assert compact_block_structure.get_transformer_data(MockTransformer, 'global') == 'new value'
+        with self.assertRaises(KeyError):
+            compact_block_structure.get_transformer_block_data(0, 'other_transformer')
+        assert dict(compact_block_structure.iteritems()).keys() == dict(block_structure.iteritems()).keys()
+
+    def test_add_relation(self):
+        _, compact_block_structure = self.create_block_structures(self.LINEAR_CHILDREN_MAP)
+        compact_block_structure._add_relation(3, 4)
+        compact_block_structure._add_relation(0, 4)
+        self.assert_block_structure(compact_block_structure, [[1, 4], [2], [3], [4], []])
+        assert compact_block_structure.get_xblock_field(4, 'display_name') is None
+
+    @ddt.data('copy', 'shallow_copy')
+    def test_copy(self, copy_method):
+        _, block_structure = self.create_block_structures(self.LINEAR_CHILDREN_MAP)
+        new_copy = getattr(block_structure, copy_method)()
+        assert isinstance(new_copy, CompactBlockStructureBlockData)
+        self.assert_block_structure(new_copy, self.LINEAR_CHILDREN_MAP)
+
+        # verify edits to the original block structure do not affect the copy
+        block_structure.remove_block(2, keep_descendants=True)
+        block_structure.override_xblock_field(1, 'display_name', 'edit1')
+        block_structure._add_relation(3, 4)
+        self.assert_block_structure(block_structure, [[1], [3], [], [4], []], missing_blocks=[2])
+        self.assert_block_structure(new_copy, self.LINEAR_CHILDREN_MAP)
+        assert new_copy.get_xblock_field(1, 'display_name') == 'Block 1'
+        assert 4 not in new_copy
+
+        # verify edits to the copy do not affect the original
+        new_copy.remove_block(3, keep_descendants=True)
+        new_copy.set_transformer_block_field(1, MockTransformer, 'even', 'edit2')
+        self.assert_block_structure(block_structure, [[1], [3], [], [4], []], missing_blocks=[2])
+        self.assert_block_structure(new_copy, [[1], [2], [], []], missing_blocks=[3])
+        assert block_structure.get_transformer_block_field(1, MockTransformer, 'even') is False
+        assert new_copy.get_transformer_block_field(1, MockTransformer, 'even') == 'edit2'
+
+    def test_get_or_create_block(self):
+        _, compact_block_structure = self.create_block_structures(self.SIMPLE_CHILDREN_MAP)
+        new_copy = compact_block_structure.shallow_copy()
+
+        block_data = new_copy._get_or_create_block(1)
+        block_data.display_name = 'edit'
+        block_data.transformer_data.get_or_create(MockTransformer).even = 'edit'
+        block_data.transformer_data.get_or_create('other_transformer').key = 'value'
+        del block_data.transformer_data[MockTransformer].fields['even']
+        assert new_copy.get_xblock_field(1, 'display_name') == 'edit'
+        assert new_copy.get_transformer_block_field(1, MockTransformer, 'even', 'default') == 'default'
+        assert new_copy.get_transformer_block_field(1, 'other_transformer', 'key') == 'value'
+        assert new_copy[1].fields == {'display_name': 'edit'}
+
+        # verify the edits do not affect the original
+        assert compact_block_structure.get_xblock_field(1, 'display_name') == 'Block 1'
+        assert compact_block_structure.get_transformer_block_field(1, MockTransformer, 'even') is False
+        with self.assertRaises(KeyError):
+            compact_block_structure.get_transformer_block_data(1, 'other_transformer')
+
+    @ddt.data(*ALL_CHILDREN_MAPS)
+    def test_create_block_structure(self, children_map):
+        compact_block_structure = self.create_block_structure(children_map, CompactBlockStructureBlockData)
+        self.assert_block_structure(compact_block_structure, children_map)
+        assert len(dict(compact_block_structure.iteritems())) == len(children_map)
+
+    def _assert_equivalent(self, block_structure, compact_block_structure, children_map):
+        """
+        Verifies that the given block structures have the same blocks and relations.
+        """
+        assert isinstance(block_structure, BlockStructureBlockData)
+        assert len(compact_block_structure) == len(block_structure)
+        for block_key in range(len(children_map)):
+            assert (block_key in compact_block_structure) == (block_key in block_structure)
+            if block_key in block_structure:
+                assert set(compact_block_structure.get_children(block_key)) ==\
+                       set(block_structure.get_children(block_key))
+                assert set(compact_block_structure.get_parents(block_key)) ==\
+                       set(block_structure.get_parents(block_key))
+        assert list(compact_block_structure.topological_traversal()) == list(block_structure.topological_traversal())
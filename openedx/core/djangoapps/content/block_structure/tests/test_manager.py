@@ -4,12 +4,14 @@ Tests for manager.py
 
 import pytest
 import ddt
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, Mock
 from django.test import TestCase
+from edx_toggles.toggles.testutils import override_waffle_switch
 
 from xmodule.modulestore import ModuleStoreEnum
 
 from ..block_structure import BlockStructureBlockData
+from ..config import INCREMENTAL_COLLECT
 from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -18,6 +20,7 @@ from .helpers import (
     MockCache,
     MockModulestoreFactory,
     MockTransformer,
+    MockXBlock,
     UsageKeyFactoryMixin,
     mock_registered_transformers
 )
@@ -95,6 +98,28 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + str(block_key)
 
 
+class TestIncrementalTransformer(TestTransformer1):
+    """
+    Test Transformer class supporting incremental collection, which
+    records the blocks it collected data for.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_block_keys = set()
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects block data for the blocks of the block structure which
+        have xBlocks.
+        """
+        for block_key in block_structure.xblock_topological_traversal():
+            block_structure.set_transformer_block_field(
+                block_key, cls, cls.collect_data_key, cls._create_block_value(block_key, cls.collect_data_key)
+            )
+            cls.collected_block_keys.add(block_key)
+        cls.collect_call_count += 1
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -253,3 +278,102 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
                 setattr(self.modulestore, attr_name, original_branch_setting)
             elif hasattr(self.modulestore, attr_name):
                 delattr(self.modulestore, attr_name)
+
+    def _publish(self, changed_block_ids):
+        """
+        Simulates the publishing of a new version of the course, in
+        which the given blocks changed.
+        """
+        root_block = self.modulestore.get_item(self.block_key_factory(0))
+        previous_version = root_block.field_map.get('course_version')
+        root_block.field_map['course_version'] = f'version{len(self.modulestore.versions)}'
+        self.modulestore.versions.append(root_block.field_map['course_version'])
+        self.modulestore.get_changed_block_keys = Mock(
+            return_value={self.block_key_factory(block_id) for block_id in changed_block_ids}
+        )
+        return previous_version
+
+    def _setup_incremental_collect(self):
+        """
+        Collects the block structure with a version number, using a
+        transformer which supports incremental collection.
+        """
+        TestIncrementalTransformer.collect_call_count = 0
+        TestIncrementalTransformer.collected_block_keys = set()
+        self.registered_transformers = [TestIncrementalTransformer()]
+        self.modulestore.versions = []
+        self._publish([])
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+        assert TestIncrementalTransformer.collected_block_keys == {
+            self.block_key_factory(block_id) for block_id in range(len(self.children_map))
+        }
+        TestIncrementalTransformer.collected_block_keys = set()
+
+    @ddt.data(
+        (3, {0, 1, 3}),
+        (1, {0, 1, 3, 4}),
+        (2, {0, 2}),
+    )
+    @ddt.unpack
+    @override_waffle_switch(INCREMENTAL_COLLECT, True)
+    def test_update_collected_incrementally(self, changed_block_id, expected_collected_block_ids):
+        self._setup_incremental_collect()
+        previous_version = self._publish([changed_block_id])
+
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+            block_structure = self.bs_manager.get_collected()
+
+        self.modulestore.get_changed_block_keys.assert_called_once_with(
+            self.block_key_factory(0).course_key, previous_version
+        )
+        assert TestIncrementalTransformer.collected_block_keys == {
+            self.block_key_factory(block_id) for block_id in expected_collected_block_ids
+        }
+        assert TestIncrementalTransformer.collect_call_count == 2
+        self.assert_block_structure(block_structure, self.children_map)
+        TestIncrementalTransformer.assert_collected(block_structure)
+
+    @override_waffle_switch(INCREMENTAL_COLLECT, True)
+    def test_update_collected_incrementally_with_new_block(self):
+        self._setup_incremental_collect()
+        self._publish([2])
+
+        # add block 5 as a child of block 2
+        self.children_map = [[1, 2], [3, 4], [5], [], [], []]
+        new_block_key = self.block_key_factory(5)
+        self.modulestore.blocks[new_block_key] = MockXBlock(new_block_key, modulestore=self.modulestore)
+        self.modulestore.blocks[self.block_key_factory(2)].children = [new_block_key]
+
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected_if_needed()
+            block_structure = self.bs_manager.get_collected()
+
+        assert TestIncrementalTransformer.collected_block_keys == {
+            self.block_key_factory(block_id) for block_id in (0, 2, 5)
+        }
+        self.assert_block_structure(block_structure, self.children_map)
+        TestIncrementalTransformer.assert_collected(block_structure)
+
+    @ddt.data(
+        'switch_disabled',
+        'transformer_not_supported',
+        'changes_unknown',
+    )
+    def test_update_collected_incrementally_fallback(self, reason):
+        self._setup_incremental_collect()
+        self._publish([3])
+        if reason == 'transformer_not_supported':
+            self.registered_transformers.append(TestTransformer1())
+        elif reason == 'changes_unknown':
+            self.modulestore.get_changed_block_keys.return_value = None
+
+        with override_waffle_switch(INCREMENTAL_COLLECT, reason != 'switch_disabled'):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+
+        # all blocks are collected again
+        assert TestIncrementalTransformer.collected_block_keys == {
+            self.block_key_factory(block_id) for block_id in range(len(self.children_map))
+        }
@@ -2,13 +2,19 @@
 Tests for block_structure/cache.py
 """
 
+from unittest.mock import patch
+
 import pytest
 import ddt
+from django.conf import settings
+from django.test.utils import override_settings
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
+from ..compact import CompactBlockStructureBlockData
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
+from ..local_cache import local_cache
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
 
@@ -30,6 +36,9 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
 
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
     def add_transformers(self):
         """
         Add each registered transformer to the block structure.
@@ -54,6 +63,28 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         assert stored_value is not None
         self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data('zpickle', 'pickle')
+    def test_add_and_get_with_codec(self, codec_name):
+        with override_settings(BLOCK_STRUCTURES_SETTINGS=dict(settings.BLOCK_STRUCTURES_SETTINGS, CODEC=codec_name)):
+            self.store.add(self.block_structure)
+
+        # stored values are readable whatever the codec currently configured
+        self.mock_cache.map.clear()
+        stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+
+    def test_add_and_get_compact(self):
+        self.store.add(self.block_structure)
+        with override_settings(
+            BLOCK_STRUCTURES_SETTINGS=dict(settings.BLOCK_STRUCTURES_SETTINGS, COMPACT_REPRESENTATION=True)
+        ):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        assert isinstance(stored_value, CompactBlockStructureBlockData)
+        self.assert_block_structure(stored_value, self.children_map)
+        assert stored_value.get_transformer_block_field(
+            self.block_key_factory(0), MockTransformer, 'test'
+        ) == f'{MockTransformer.name()} val'
+
     def test_delete(self):
         self.store.add(self.block_structure)
         self.store.delete(self.block_structure.root_block_usage_key)
@@ -76,3 +107,68 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         assert self.mock_cache.timeout_from_last_call == 0
         self.store.add(self.block_structure)
         assert self.mock_cache.timeout_from_last_call == timeout
+
+    def _enable_local_cache(self, max_size_in_bytes=10 * 1024 * 1024):
+        """
+        Enables the process-local cache for the rest of the test.
+        """
+        override = override_settings(
+            BLOCK_STRUCTURES_SETTINGS=dict(settings.BLOCK_STRUCTURES_SETTINGS, LOCAL_CACHE_MAX_BYTES=max_size_in_bytes)
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_local_cache_disabled(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        assert local_cache.stats()['entries'] == 0
+
+    def test_local_cache(self):
+        self._enable_local_cache()
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        assert local_cache.stats()['misses'] == 1
+
+        # served from the local cache, without the django cache or storage
+        self.mock_cache.map.clear()
+        with patch.object(self.store, '_get_from_store') as mock_get_from_store:
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        mock_get_from_store.assert_not_called()
+        self.assert_block_structure(stored_value, self.children_map)
+        stats = local_cache.stats()
+        assert stats['hits'] == 1
+        assert stats['entries'] == 1
+        assert stats['size_in_bytes'] > 0
+
+    def test_local_cache_returns_copies(self):
+        self._enable_local_cache()
+        self.store.add(self.block_structure)
+        root_key = self.block_structure.root_block_usage_key
+
+        first_value = self.store.get(root_key)
+        first_value.remove_block(self.block_key_factory(1), keep_descendants=False)
+        first_value.set_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test', 'changed')
+
+        second_value = self.store.get(root_key)
+        self.assert_block_structure(second_value, self.children_map)
+        assert second_value.get_transformer_block_field(
+            self.block_key_factory(0), MockTransformer, 'test'
+        ) == f'{MockTransformer.name()} val'
+
+    def test_local_cache_eviction(self):
+        self.store.add(self.block_structure)
+        size_in_bytes = len(next(iter(self.mock_cache.map.values())))
+
+        # too small for the block structure
+        self._enable_local_cache(size_in_bytes - 1)
+        self.store.get(self.block_structure.root_block_usage_key)
+        assert local_cache.stats()['entries'] == 0
+
+    def test_local_cache_invalidation(self):
+        self._enable_local_cache()
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        assert local_cache.stats()['entries'] == 1
+
+        self.store.delete(self.block_structure.root_block_usage_key)
+        assert local_cache.stats()['entries'] == 0
@@ -58,6 +58,14 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Transformers set SUPPORTS_INCREMENTAL_COLLECT to True once their
+    # collect_incrementally method correctly updates a block structure
+    # in which only some of the blocks have instantiated xBlocks.  See
+    # collect_incrementally for the contract.  A block structure is
+    # collected incrementally only if all registered transformers
+    # support it.
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -107,6 +115,40 @@ class BlockStructureTransformer:
                 data to be cached for the transformer.
         """
 
+    @classmethod
+    def collect_incrementally(cls, block_structure):
+        """
+        Collects data into a block_structure that was previously
+        collected, after some of its blocks changed in the modulestore.
+
+        The given block_structure contains all the blocks and relations
+        of the updated course, but only the changed blocks, their
+        descendants and their ancestors have instantiated xBlocks (see
+        has_xblock).  The other blocks keep the data previously collected
+        for them, which remains valid as neither they nor their
+        ancestors changed.  The transformer-level data previously
+        collected is kept as well, until it is overwritten.
+
+        Implementations must therefore only access the xBlocks of the
+        blocks for which has_xblock is True, and must (re)compute any
+        block data derived from ancestors or descendants for all of these
+        blocks.  Traversals can be limited to them with:
+            xblock_topological_traversal
+            xblock_post_order_traversal
+
+        The default implementation calls collect, which is correct for
+        transformers whose collect only calls request_xblock_fields or
+        only traverses the blocks as above.  Other transformers must
+        override this method before setting
+        SUPPORTS_INCREMENTAL_COLLECT.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - A mutable
+                block structure that is to be updated with collected
+                data to be cached for the transformer.
+        """
+        cls.collect(block_structure)
+
     @abstractmethod
     def transform(self, usage_info, block_structure):
         """
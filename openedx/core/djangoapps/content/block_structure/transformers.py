@@ -80,6 +80,30 @@ class BlockStructureTransformers:
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def supports_incremental_collect(cls):
+        """
+        Returns whether all registered transformers support incremental
+        collection.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
+    @classmethod
+    def collect_incrementally(cls, block_structure):
+        """
+        Collects data for each registered transformer, for the blocks of
+        an incrementally created block structure which have xBlocks.
+        """
+        for transformer in TransformerRegistry.get_registered_transformers():
+            block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+            transformer.collect_incrementally(block_structure)
+
+        # Collect all fields that were requested by the transformers.
+        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -4,13 +4,16 @@ directly. Use openedx.core.djangoapps.content.learning_sequences.api -- that
 __init__.py imports from here, and is a more stable place to import from.
 """
 import logging
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Dict, FrozenSet, List, Optional, Union
+from time import monotonic
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 
+from django.conf import settings
 from django.db import transaction
 from django.db.models.query import QuerySet
-from edx_django_utils.cache import TieredCache
+from edx_django_utils.cache import TieredCache, get_cache_key
 from edx_django_utils.monitoring import function_trace, set_custom_attribute
 from opaque_keys import OpaqueKey
 from opaque_keys.edx.keys import CourseKey
@@ -49,10 +52,17 @@ from .processors.enrollment_track_partition_groups import EnrollmentTrackPartiti
 from .processors.milestones import MilestonesOutlineProcessor
 from .processors.schedule import ScheduleOutlineProcessor
 from .processors.special_exams import SpecialExamsOutlineProcessor
+from .processors.base import OutlineProcessor
 from .processors.visibility import VisibilityOutlineProcessor
 
 log = logging.getLogger(__name__)
 
+# Process-local cache of the most recently used base course outlines, with
+# the time at which they expire, keyed like the TieredCache. See
+# LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE.
+_OUTLINE_PROCESS_CACHE: "OrderedDict[str, Tuple[float, CourseOutlineData]]" = OrderedDict()
+_OUTLINE_PROCESS_CACHE_LOCK = threading.Lock()
+
 # Public API...
 __all__ = [
     'get_content_errors',
@@ -115,11 +125,16 @@ def get_course_outline(course_key: CourseKey) -> CourseOutlineData:
     course_context = _get_course_context_for_outline(course_key)
 
     # Check to see if it's in the cache.
-    cache_key = "learning_sequences.api.get_course_outline.v2.{}.{}".format(
+    cache_key = _course_outline_cache_key(
         course_context.learning_context.context_key, course_context.learning_context.published_version
     )
+    outline_data = _get_outline_from_process_cache(cache_key)
+    if outline_data is not None:
+        return outline_data
+
     outline_cache_result = TieredCache.get_cached_response(cache_key)
     if outline_cache_result.is_found:
+        _add_outline_to_process_cache(cache_key, outline_cache_result.value)
         return outline_cache_result.value
 
     # Fetch model data, and remember that empty Sections should still be
@@ -193,10 +208,53 @@ def get_course_outline(course_key: CourseKey) -> CourseOutlineData:
         course_visibility=CourseVisibility(course_context.course_visibility),
     )
     TieredCache.set_all_tiers(cache_key, outline_data, 300)
+    _add_outline_to_process_cache(cache_key, outline_data)
+
+    return outline_data
+
+
+def _course_outline_cache_key(course_key: CourseKey, published_version: str) -> str:
+    """
+    Returns the key of the outline of the given version of a course in the caches.
+    """
+    return f"learning_sequences.api.get_course_outline.v2.{course_key}.{published_version}"
+
 
+def _get_outline_from_process_cache(cache_key: str) -> Optional[CourseOutlineData]:
+    """
+    Returns the outline with the given key in the process-local cache, or None.
+    """
+    if settings.LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE <= 0:
+        return None
+
+    with _OUTLINE_PROCESS_CACHE_LOCK:
+        expires_at, outline_data = _OUTLINE_PROCESS_CACHE.get(cache_key, (None, None))
+        if outline_data is None:
+            return None
+        # The same version of a course can be published again, from another process.
+        if monotonic() >= expires_at:
+            del _OUTLINE_PROCESS_CACHE[cache_key]
+            return None
+        _OUTLINE_PROCESS_CACHE.move_to_end(cache_key)
     return outline_data
 
 
+def _add_outline_to_process_cache(cache_key: str, outline_data: CourseOutlineData):
+    """
+    Adds an outline to the process-local cache, evicting the least recently used outlines beyond its size.
+    """
+    max_size = settings.LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE
+    if max_size <= 0:
+        return
+
+    expires_at = monotonic() + settings.LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_TIMEOUT
+    with _OUTLINE_PROCESS_CACHE_LOCK:
+        _OUTLINE_PROCESS_CACHE[cache_key] = (expires_at, outline_data)
+        _OUTLINE_PROCESS_CACHE.move_to_end(cache_key)
+        while len(_OUTLINE_PROCESS_CACHE) > max_size:
+            _OUTLINE_PROCESS_CACHE.popitem(last=False)
+
+
 def _get_user_partition_groups_from_qset(upg_qset) -> Dict[int, FrozenSet[int]]:
     """
     Given a QuerySet of UserPartitionGroup, return a mapping of UserPartition
@@ -337,22 +395,16 @@ def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnes
 
     # Run each OutlineProcessor in order to figure out what items we have to
     # remove from the CourseOutline.
-    processors = {}
-    usage_keys_to_remove = set()
-    inaccessible_sequences = set()
-    for name, processor_cls in processor_classes:
-        # Future optimization: This should be parallelizable (don't rely on a
-        # particular ordering).
-        processor = processor_cls(course_key, user, at_time)
-        processors[name] = processor
-        processor.load_data(full_course_outline)
-        if not user_can_see_all_content:
-            # function_trace lets us see how expensive each processor is being.
-            with function_trace(f'learning_sequences.api.outline_processors.{name}'):
-                processor_usage_keys_removed = processor.usage_keys_to_remove(full_course_outline)
-                processor_inaccessible_sequences = processor.inaccessible_sequences(full_course_outline)
-                usage_keys_to_remove |= processor_usage_keys_removed
-                inaccessible_sequences |= processor_inaccessible_sequences
+    processors = {
+        name: processor_cls(course_key, user, at_time)
+        for name, processor_cls in processor_classes
+    }
+    if user_can_see_all_content:
+        for processor in processors.values():
+            processor.load_data(full_course_outline)
+        usage_keys_to_remove, inaccessible_sequences = set(), set()
+    else:
+        usage_keys_to_remove, inaccessible_sequences = _get_processor_results(processors, full_course_outline)
 
     # Open question: Does it make sense to remove a Section if it has no Sequences in it?
     trimmed_course_outline = full_course_outline.remove(usage_keys_to_remove)
@@ -382,6 +434,63 @@ def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnes
     return user_course_outline, processors
 
 
+def _get_processor_results(processors: Dict[str, OutlineProcessor], full_course_outline: CourseOutlineData):
+    """
+    Runs the given outline processors, and returns the usage keys that they
+    remove from the course outline, and the sequences that they make
+    inaccessible.
+
+    If LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT is set, the results of the
+    processors which declare their inputs are cached together, by the
+    published version of the course and these inputs. These processors don't
+    load their data when their results are found in the cache.
+    """
+    timeout = settings.LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT
+    cache_inputs = {}
+    if timeout > 0:
+        for name, processor in processors.items():
+            processor_cache_inputs = processor.cache_inputs()
+            if processor_cache_inputs is not None:
+                cache_inputs[name] = processor_cache_inputs
+
+    cache_key = None
+    cached_results = {}
+    if cache_inputs:
+        cache_key = get_cache_key(
+            prefix='learning_sequences.api.outline_processor_results.v2',
+            course_key=str(full_course_outline.course_key),
+            published_version=full_course_outline.published_version,
+            cache_inputs=repr(sorted(cache_inputs.items())),
+        )
+        results_cache_result = TieredCache.get_cached_response(cache_key)
+        if results_cache_result.is_found:
+            cached_results = results_cache_result.value
+
+    results = {}
+    for name, processor in processors.items():
+        # Future optimization: This should be parallelizable (don't rely on a
+        # particular ordering).
+        if name in cached_results:
+            results[name] = cached_results[name]
+            continue
+        processor.load_data(full_course_outline)
+        # function_trace lets us see how expensive each processor is being.
+        with function_trace(f'learning_sequences.api.outline_processors.{name}'):
+            results[name] = (
+                frozenset(processor.usage_keys_to_remove(full_course_outline)),
+                frozenset(processor.inaccessible_sequences(full_course_outline)),
+            )
+    if cache_key and not cached_results:
+        TieredCache.set_all_tiers(cache_key, {name: results[name] for name in cache_inputs}, timeout)
+
+    usage_keys_to_remove = set()
+    inaccessible_sequences = set()
+    for processor_usage_keys_removed, processor_inaccessible_sequences in results.values():
+        usage_keys_to_remove |= processor_usage_keys_removed
+        inaccessible_sequences |= processor_inaccessible_sequences
+    return usage_keys_to_remove, inaccessible_sequences
+
+
 @function_trace('learning_sequences.api.replace_course_outline')
 def replace_course_outline(course_outline: CourseOutlineData,
                            content_errors: Optional[List[ContentErrorData]] = None):
@@ -412,6 +521,12 @@ def replace_course_outline(course_outline: CourseOutlineData,
         _update_course_section_sequences(course_outline, course_context)
         _update_publish_report(course_outline, content_errors, course_context)
 
+    # The same version of a course can be published again, e.g. when forcing the outline to be updated.
+    cache_key = _course_outline_cache_key(course_outline.course_key, course_outline.published_version)
+    TieredCache.delete_all_tiers(cache_key)
+    with _OUTLINE_PROCESS_CACHE_LOCK:
+        _OUTLINE_PROCESS_CACHE.pop(cache_key, None)
+
 
 def _update_course_context(course_outline: CourseOutlineData):
     """
@@ -23,9 +23,13 @@ class OutlineProcessor:
     An OutlineProcessor is invoked synchronously during a request for the
     CourseOutline. The steps are:
         * __init__
+        * cache_inputs (if processor caching is enabled)
         * load_data
         * inaccessible_sequences, usage_keys_to_remove (no ordering guarantee)
 
+    The last two steps are skipped when the results of the processor are
+    found in the cache.
+
     Also note that you should not assume any ordering relative to any other
     OutlineProcessor. Once async support works its way fully into Django, we'll
     likely even want to run these in parallel.
@@ -61,6 +65,21 @@ class OutlineProcessor:
         """
         pass  # lint-amnesty, pylint: disable=unnecessary-pass
 
+    def cache_inputs(self):
+        """
+        Return a hashable value of the per-user inputs that the results of
+        inaccessible_sequences and usage_keys_to_remove depend on, besides the
+        course outline, or None if these results can't be cached.
+
+        This is called before load_data. When processor caching is enabled
+        (see LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT), the results are
+        cached by course version and inputs, and reused for any user with the
+        same inputs without calling load_data or computing them again.
+        Processors whose inputs are the data they load can load it here, as
+        long as load_data doesn't load it again.
+        """
+        return None
+
     def inaccessible_sequences(self, full_course_outline: CourseOutlineData):  # pylint: disable=unused-argument
         """
         Return a set/frozenset of Sequence UsageKeys that are not accessible.
@@ -26,11 +26,15 @@ class CohortPartitionGroupsOutlineProcessor(OutlineProcessor):
         super().__init__(course_key, user, at_time)
         self.user_cohort_group_id: Union[int, None] = None
         self.cohorted_partition_id: Union[int, None] = None
+        self._data_loaded = False
 
     def load_data(self, full_course_outline) -> None:
         """
         Load the cohorted partition id and the user's group id.
         """
+        if self._data_loaded:
+            return
+        self._data_loaded = True
 
         # It is possible that a cohort is not linked to any content group/partition.
         # This is why the cohorted_partition_id needs to be set independently
@@ -43,6 +47,14 @@ class CohortPartitionGroupsOutlineProcessor(OutlineProcessor):
             if user_cohort:
                 self.user_cohort_group_id, _ = get_group_info_for_cohort(user_cohort)
 
+    def cache_inputs(self):
+        """
+        The results depend on the cohorted partition and the content group of the user's cohort.
+        """
+        # The inputs are the data loaded, which doesn't depend on the outline.
+        self.load_data(None)
+        return self.cohorted_partition_id, self.user_cohort_group_id
+
     def _is_user_excluded_by_partition_group(self, user_partition_groups) -> bool:
         """
         Is the user part of the group to which the block is restricting content?
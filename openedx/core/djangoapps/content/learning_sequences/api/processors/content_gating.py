@@ -26,12 +26,16 @@ class ContentGatingOutlineProcessor(OutlineProcessor):
         super().__init__(course_key, user, at_time)
         self.required_content = None
         self.can_skip_entrance_exam = False
+        self._data_loaded = False
 
     def load_data(self, full_course_outline):
         """
         Get the required content for the course, and whether
         or not the user can skip the entrance exam.
         """
+        if self._data_loaded:
+            return
+        self._data_loaded = True
         self.required_content = milestones_helpers.get_required_content(self.course_key, self.user)
 
         if self.user.is_authenticated:
@@ -39,6 +43,14 @@ class ContentGatingOutlineProcessor(OutlineProcessor):
                 self.user, self.course_key
             )
 
+    def cache_inputs(self):
+        """
+        The results depend on the content required of the user, and whether they can skip the entrance exam.
+        """
+        # The inputs are the data loaded, which doesn't depend on the outline.
+        self.load_data(None)
+        return tuple(self.required_content or ()), self.can_skip_entrance_exam
+
     def inaccessible_sequences(self, full_course_outline):
         """
         Mark any section that is gated by required content as inaccessible
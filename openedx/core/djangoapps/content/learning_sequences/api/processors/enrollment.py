@@ -12,6 +12,15 @@ class EnrollmentOutlineProcessor(OutlineProcessor):
     """
     Simple OutlineProcessor that removes items based on Enrollment and course visibility setting.
     """
+    def cache_inputs(self):
+        """
+        The results depend on whether unenrolled access is enabled and the user is enrolled.
+        """
+        return (
+            COURSE_ENABLE_UNENROLLED_ACCESS_FLAG.is_enabled(self.course_key),
+            CourseEnrollment.is_enrolled(self.user, self.course_key),
+        )
+
     def usage_keys_to_remove(self, full_course_outline):
         """
         Return sequences/sections to be removed
@@ -32,11 +32,15 @@ class EnrollmentTrackPartitionGroupsOutlineProcessor(OutlineProcessor):
         super().__init__(course_key, user, at_time)
         self.enrollment_track_groups: Dict[str, Group] = {}
         self.user_group = None
+        self._data_loaded = False
 
     def load_data(self, full_course_outline) -> None:
         """
         Pull track groups for this course and which group the user is in.
         """
+        if self._data_loaded:
+            return
+        self._data_loaded = True
         user_partition = create_enrollment_track_partition_with_course_id(self.course_key)
         self.enrollment_track_groups = get_user_partition_groups(
             self.course_key,
@@ -47,6 +51,14 @@ class EnrollmentTrackPartitionGroupsOutlineProcessor(OutlineProcessor):
         # TODO: fix type annotation: https://github.com/openedx/tcril-engineering/issues/313
         self.user_group = self.enrollment_track_groups.get(ENROLLMENT_TRACK_PARTITION_ID)  # type: ignore
 
+    def cache_inputs(self):
+        """
+        The results depend on the enrollment track group of the user.
+        """
+        # The inputs are the data loaded, which doesn't depend on the outline.
+        self.load_data(None)
+        return (self.user_group.id if self.user_group else None,)
+
     def _is_user_excluded_by_partition_group(self, user_partition_groups):
         """
         Is the user part of the group to which the block is restricting content?
@@ -32,11 +32,15 @@ class TeamPartitionGroupsOutlineProcessor(OutlineProcessor):
         """
         super().__init__(course_key, user, at_time)
         self.current_user_groups: Dict[str, Group] = {}
+        self._data_loaded = False
 
     def load_data(self, _) -> None:
         """
         Pull team groups for this course and which group the user is in.
         """
+        if self._data_loaded:
+            return
+        self._data_loaded = True
         if not CONTENT_GROUPS_FOR_TEAMS.is_enabled(self.course_key):
             return
 
@@ -48,6 +52,17 @@ class TeamPartitionGroupsOutlineProcessor(OutlineProcessor):
             partition_dict_key="id",
         )
 
+    def cache_inputs(self):
+        """
+        The results depend on the team groups of the user, if content groups for teams are enabled.
+        """
+        # The inputs are the data loaded, which doesn't depend on the outline.
+        self.load_data(None)
+        return (
+            CONTENT_GROUPS_FOR_TEAMS.is_enabled(self.course_key),
+            tuple(sorted((partition_id, group.id) for partition_id, group in self.current_user_groups.items())),
+        )
+
     def _is_user_excluded_by_partition_group(self, user_partition_groups):
         """
         Is the user part of the group to which the block is restricting content?
@@ -9,6 +9,7 @@ import unittest
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.db.models import signals
+from django.test.utils import override_settings
 from edx_proctoring.exceptions import ProctoredExamNotFoundException
 from edx_toggles.toggles.testutils import override_waffle_flag
 from edx_when.api import set_dates_for_course
@@ -56,6 +57,10 @@ from ..outlines import (
     replace_course_outline,
 )
 from ..processors.enrollment_track_partition_groups import EnrollmentTrackPartitionGroupsOutlineProcessor
+from ..processors.visibility import VisibilityOutlineProcessor
+
+OUTLINE_PROCESS_CACHE = 'openedx.core.djangoapps.content.learning_sequences.api.outlines._OUTLINE_PROCESS_CACHE'
+OUTLINES_MONOTONIC = 'openedx.core.djangoapps.content.learning_sequences.api.outlines.monotonic'
 from .test_data import generate_sections
 
 
@@ -158,6 +163,56 @@ class CourseOutlineTestCase(CacheIsolationTestCase):
             uncached_new_version_outline = get_course_outline(self.course_key)  # lint-amnesty, pylint: disable=unused-variable
             assert new_version_outline == new_version_outline  # lint-amnesty, pylint: disable=comparison-with-itself
 
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE=1)
+    @patch.dict(OUTLINE_PROCESS_CACHE, clear=True)
+    def test_process_cached_response(self):
+        replace_course_outline(self.course_outline)
+        uncached_outline = get_course_outline(self.course_key)
+
+        # Outlines are still found in the process cache when the other caches are cleared.
+        self.clear_caches()
+        with self.assertNumQueries(1):
+            assert get_course_outline(self.course_key) is uncached_outline
+
+        # Outlines of other versions aren't returned, and evict the least recently used outlines.
+        new_version_outline = attr.evolve(self.course_outline, published_version="2222222222222222")
+        replace_course_outline(new_version_outline)
+        assert get_course_outline(self.course_key) == new_version_outline
+        replace_course_outline(self.course_outline)
+        self.clear_caches()
+        with self.assertNumQueries(5):
+            assert get_course_outline(self.course_key) == self.course_outline
+
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE=1)
+    @patch.dict(OUTLINE_PROCESS_CACHE, clear=True)
+    def test_replace_same_version(self):
+        """Replacing the outline of a version removes the previous outline from the caches."""
+        replace_course_outline(self.course_outline)
+        assert get_course_outline(self.course_key) == self.course_outline
+
+        empty_outline = attr.evolve(self.course_outline, sections=[])
+        replace_course_outline(empty_outline)
+        assert get_course_outline(self.course_key) == empty_outline
+
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE=1)
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_TIMEOUT=60)
+    @patch.dict(OUTLINE_PROCESS_CACHE, clear=True)
+    def test_process_cache_timeout(self):
+        """Outlines expire from the process cache, since other processes can replace them."""
+        replace_course_outline(self.course_outline)
+        with patch(OUTLINES_MONOTONIC, return_value=1000):
+            assert get_course_outline(self.course_key) == self.course_outline
+
+        # The outline of the same version is replaced in another process.
+        empty_outline = attr.evolve(self.course_outline, sections=[])
+        with patch(OUTLINE_PROCESS_CACHE, {}):
+            replace_course_outline(empty_outline)
+
+        with patch(OUTLINES_MONOTONIC, return_value=1059):
+            assert get_course_outline(self.course_key) == self.course_outline
+        with patch(OUTLINES_MONOTONIC, return_value=1060):
+            assert get_course_outline(self.course_key) == empty_outline
+
 
 class UserCourseOutlineTestCase(CacheIsolationTestCase):
     """
@@ -228,6 +283,30 @@ class UserCourseOutlineTestCase(CacheIsolationTestCase):
         )
         assert global_staff_outline_details.outline == global_staff_outline
 
+    @override_settings(LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT=60)
+    def test_cached_processor_results(self):
+        """Processor results are reused for users with the same inputs."""
+        at_time = datetime(2020, 5, 21, tzinfo=timezone.utc)
+        with patch.object(
+            VisibilityOutlineProcessor,
+            'usage_keys_to_remove',
+            autospec=True,
+            side_effect=VisibilityOutlineProcessor.usage_keys_to_remove,
+        ) as mock_usage_keys_to_remove, patch.object(
+            VisibilityOutlineProcessor,
+            'load_data',
+            autospec=True,
+        ) as mock_load_data:
+            student_outline = get_user_course_outline(self.course_key, self.student, at_time)
+            student_outline_details = get_user_course_outline_details(self.course_key, self.student, at_time)
+            beta_tester_outline = get_user_course_outline(self.course_key, self.beta_tester, at_time)
+
+        # The data of the processors isn't loaded either when their results are cached.
+        assert mock_usage_keys_to_remove.call_count == 1
+        assert mock_load_data.call_count == 1
+        assert student_outline_details.outline == student_outline
+        assert beta_tester_outline.sections == student_outline.sections
+
 
 class OutlineProcessorTestCase(CacheIsolationTestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
     @classmethod
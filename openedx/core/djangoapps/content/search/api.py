@@ -5,9 +5,10 @@ from __future__ import annotations
 
 import logging
 import time
+from collections import deque
 from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta, timezone
-from functools import wraps
+from functools import partial, wraps
 from typing import Callable, Generator
 
 from django.conf import settings
@@ -172,6 +173,49 @@ def _wait_for_meili_tasks(info_list: list[TaskInfo]) -> None:
         _wait_for_meili_task(info)
 
 
+class _PendingMeiliTasks:
+    """
+    Bounded queue of the Meilisearch tasks enqueued by a rebuild that haven't been waited for yet.
+
+    Meilisearch indexes the documents of a task while the next documents are being generated, instead of
+    the rebuild waiting for each task as soon as it's enqueued. Tasks are waited for in the order they
+    were enqueued, which is also the order in which Meilisearch processes the tasks of an index.
+    """
+
+    def __init__(self, max_pending: int):
+        """
+        `max_pending` is the number of tasks which may stay pending while the rebuild goes on; with 0,
+        each task is waited for as soon as it's enqueued.
+        """
+        self.max_pending = max(max_pending, 0)
+        self._tasks: deque[tuple[TaskInfo, Callable[[], None] | None]] = deque()
+
+    def add(self, info: TaskInfo, on_success: Callable[[], None] | None = None) -> None:
+        """
+        Add an enqueued task, then wait for the oldest tasks until at most `max_pending` are left.
+        `on_success` is called once the task has succeeded.
+        """
+        self._tasks.append((info, on_success))
+        while len(self._tasks) > self.max_pending:
+            self._wait_for_oldest()
+
+    def wait_for_all(self) -> None:
+        """
+        Wait for all the pending tasks.
+        """
+        while self._tasks:
+            self._wait_for_oldest()
+
+    def _wait_for_oldest(self) -> None:
+        """
+        Wait for the oldest pending task. Raises MeilisearchError if it failed.
+        """
+        info, on_success = self._tasks.popleft()
+        _wait_for_meili_task(info)
+        if on_success is not None:
+            on_success()
+
+
 def _index_exists(index_name: str) -> bool:
     """
     Check if an index exists
@@ -405,11 +449,23 @@ def index_course(course_key: CourseKey, index_name: str | None = None) -> list:
     """
     Rebuilds the index for a given course.
     """
-    store = modulestore()
     client = _get_meilisearch_client()
-    docs = []
     if index_name is None:
         index_name = STUDIO_INDEX_NAME
+    docs = _searchable_docs_for_course(course_key)
+
+    if docs:
+        # Add all the docs in this course at once (usually faster than adding one at a time):
+        _wait_for_meili_task(client.index(index_name).add_documents(docs))
+    return docs
+
+
+def _searchable_docs_for_course(course_key: CourseKey) -> list:
+    """
+    Returns the search index documents of all the blocks of a given course.
+    """
+    store = modulestore()
+    docs = []
     # Pre-fetch the course with all of its children:
     course = store.get_course(course_key, depth=None)
 
@@ -422,16 +478,17 @@ def index_course(course_key: CourseKey, index_name: str | None = None) -> list:
 
     # Index course children
     _recurse_children(course, add_with_children)
-
-    if docs:
-        # Add all the docs in this course at once (usually faster than adding one at a time):
-        _wait_for_meili_task(client.index(index_name).add_documents(docs))
     return docs
 
 
 def rebuild_index(status_cb: Callable[[str], None] | None = None, incremental=False) -> None:  # lint-amnesty, pylint: disable=too-many-statements
     """
     Rebuild the Meilisearch index from scratch
+
+    The documents of up to MEILISEARCH_REBUILD_MAX_PENDING_TASKS courses are indexed by Meilisearch while the
+    documents of the next courses are generated. When `incremental` is set, a course is only recorded as indexed
+    once Meilisearch has indexed its documents, so that an interrupted rebuild resumes with the courses whose
+    documents may not have been indexed.
     """
     if status_cb is None:
         status_cb = log.info
@@ -590,7 +647,12 @@ def rebuild_index(status_cb: Callable[[str], None] | None = None, incremental=Fa
         status_cb("Indexing courses...")
         # To reduce memory usage on large instances, split up the CourseOverviews into pages of 1,000 courses:
 
-        paginator = Paginator(CourseOverview.objects.only('id', 'display_name'), 1000)
+        def mark_course_indexed(course_key: CourseKey) -> None:
+            if incremental:
+                IncrementalIndexCompleted.objects.get_or_create(context_key=course_key)
+
+        pending_tasks = _PendingMeiliTasks(settings.MEILISEARCH_REBUILD_MAX_PENDING_TASKS)
+        paginator = Paginator(CourseOverview.objects.only('id', 'display_name').order_by('id'), 1000)
         for p in paginator.page_range:
             for course in paginator.page(p).object_list:
                 status_cb(
@@ -599,11 +661,18 @@ def rebuild_index(status_cb: Callable[[str], None] | None = None, incremental=Fa
                 if course.id in keys_indexed:
                     num_contexts_done += 1
                     continue
-                course_docs = index_course(course.id, index_name)
-                if incremental:
-                    IncrementalIndexCompleted.objects.get_or_create(context_key=course.id)
+                course_docs = _searchable_docs_for_course(course.id)
+                if course_docs:
+                    # Add all the docs in this course at once (usually faster than adding one at a time):
+                    pending_tasks.add(
+                        client.index(index_name).add_documents(course_docs),
+                        on_success=partial(mark_course_indexed, course.id),
+                    )
+                else:
+                    mark_course_indexed(course.id)
                 num_contexts_done += 1
                 num_blocks_done += len(course_docs)
+        pending_tasks.wait_for_all()
 
     IncrementalIndexCompleted.objects.all().delete()
     status_cb(f"Done! {num_blocks_done} blocks indexed across {num_contexts_done} courses, collections and libraries.")
@@ -14,7 +14,7 @@ import ddt
 import pytest
 from django.test import override_settings
 from freezegun import freeze_time
-from meilisearch.errors import MeilisearchApiError
+from meilisearch.errors import MeilisearchApiError, MeilisearchError
 from openedx_learning.api import authoring as authoring_api
 from organizations.tests.factories import OrganizationFactory
 
@@ -435,6 +435,46 @@ class TestSearchApi(ModuleStoreTestCase):
         # one missing course indexed
         assert mock_meilisearch.return_value.index.return_value.add_documents.call_count == 8
 
+    @override_settings(MEILISEARCH_ENABLED=True, MEILISEARCH_REBUILD_MAX_PENDING_TASKS=1)
+    def test_reindex_meilisearch_pending_tasks(self, mock_meilisearch) -> None:
+        """
+        Test that courses are only recorded as indexed once their pending documents have been indexed.
+        """
+        # Courses are indexed in the order of their ids, so the other course is indexed after self.course
+        other_course = self.store.create_course(
+            "org1", "z_course", "test_run", self.user_id, fields={"display_name": "Other Course"},
+        )
+        self.store.create_child(self.user_id, other_course.location, "sequential", "other_sequential")
+        CourseOverview.get_from_id(other_course.id)
+
+        # Each task records the documents it adds, and the documents of the other course fail to be indexed
+        mock_meilisearch.return_value.index.return_value.add_documents.side_effect = lambda docs: Mock(docs=docs)
+        waited_for = []
+
+        def wait_for_meili_task(info):
+            docs = getattr(info, "docs", [])
+            if any(doc["context_key"] == str(other_course.id) for doc in docs):
+                raise MeilisearchError("Failed to index documents")
+            waited_for.append(info)
+
+        with patch(
+            "openedx.core.djangoapps.content.search.api._wait_for_meili_task", side_effect=wait_for_meili_task
+        ):
+            with pytest.raises(MeilisearchError, match="Failed to index documents"):
+                api.rebuild_index(incremental=True)
+
+        # Only the course whose documents were indexed before the failure is recorded as indexed
+        course_ids = (str(self.course.id), str(other_course.id))
+        assert [
+            info.docs[0]["context_key"] for info in waited_for
+            if isinstance(getattr(info, "docs", None), list) and info.docs[0]["context_key"] in course_ids
+        ] == [str(self.course.id)]
+        indexed_course_keys = {
+            key for key in IncrementalIndexCompleted.objects.values_list("context_key", flat=True)
+            if key in (self.course.id, other_course.id)
+        }
+        assert indexed_course_keys == {self.course.id}
+
     @override_settings(MEILISEARCH_ENABLED=True)
     def test_reset_meilisearch_index(self, mock_meilisearch) -> None:
         api.reset_index()
@@ -1,11 +1,20 @@
 """
 Helper functions for caching course assets.
 """
+import hashlib
+import logging
+import os
+from tempfile import NamedTemporaryFile
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentMetadata
+from xmodule.contentstore.django import contentstore
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -14,6 +23,18 @@ try:
 except InvalidCacheBackendError:
     pass
 
+# The data of content of this size, in bytes, or larger is not cached. This is the
+# default item size limit of memcached, and we don't want to do too much buffering
+# in memory when we're serving an actual request.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
+
+def _metadata_cache_key(location):
+    """
+    Returns the key caching the metadata of the content at the given location.
+    """
+    return f'metadata:{location}'.encode("utf-8")
+
 
 def set_cached_content(content):
     """
@@ -29,6 +50,51 @@ def get_cached_content(location):
     return CONTENT_CACHE.get(str(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
 
 
+def set_cached_content_metadata(metadata):
+    """
+    Stores the given StaticContentMetadata in the cache, using its location as the key.
+    """
+    CONTENT_CACHE.set(_metadata_cache_key(metadata.location), metadata, version=STATIC_CONTENT_VERSION)
+
+
+def get_cached_content_metadata(location):
+    """
+    Retrieves the StaticContentMetadata of the given piece of content by its location if cached.
+
+    On a cache miss, the metadata of all the assets of the course is cached at
+    once, if this hasn't been done recently, as requests for an asset of a
+    course are usually followed by requests for its other assets.
+    """
+    metadata = CONTENT_CACHE.get(_metadata_cache_key(location), version=STATIC_CONTENT_VERSION)
+    if metadata is None:
+        course_metadata = cache_course_content_metadata(location.course_key)
+        metadata = course_metadata.get(str(location))
+    return metadata
+
+
+def cache_course_content_metadata(course_key):
+    """
+    Caches the StaticContentMetadata of all the assets of the given course,
+    unless this has been done since they last expired from the cache.
+
+    Returns a dict of the cached metadata by location string, which is empty
+    if nothing was cached.
+    """
+    warmed_key = f'metadata_warmed:{course_key}'.encode("utf-8")
+    if not CONTENT_CACHE.add(warmed_key, True, version=STATIC_CONTENT_VERSION):
+        return {}
+
+    assets, __ = contentstore().get_all_content_for_course(course_key)
+    course_metadata = {
+        str(asset['asset_key']): StaticContentMetadata.from_asset(asset) for asset in assets
+    }
+    CONTENT_CACHE.set_many(
+        {_metadata_cache_key(location): metadata for location, metadata in course_metadata.items()},
+        version=STATIC_CONTENT_VERSION,
+    )
+    return course_metadata
+
+
 def del_cached_content(location):
     """
     Delete content for the given location, as well versions of the content without a run.
@@ -40,11 +106,113 @@ def del_cached_content(location):
         """Force the location to a Unicode string."""
         return str(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location_str(location), _metadata_cache_key(location)]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        location_without_run = location.replace(run=None)
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
+    else:
+        locations.extend([location_str(location_without_run), _metadata_cache_key(location_without_run)])
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+def _disk_cache_filename(content):
+    """
+    Returns the name of the file caching the given piece of content on disk.
+
+    The name depends on the modification date of the content, so that updated
+    content is cached in a new file.
+    """
+    key = f'{content.location}:{content.last_modified_at.isoformat()}:{STATIC_CONTENT_VERSION}'
+    extension = os.path.splitext(content.location.path)[1]
+    return hashlib.sha1(key.encode('utf-8')).hexdigest() + extension
+
+
+def get_disk_cached_content_path(content):
+    """
+    Returns the path of the file caching the given piece of content on disk,
+    or None if it isn't cached there.
+
+    The content is written to CONTENTSERVER_DISK_CACHE_DIR once it has been
+    requested CONTENTSERVER_DISK_CACHE_MIN_REQUESTS times, and the least recently
+    used files are then evicted to keep the directory within
+    CONTENTSERVER_DISK_CACHE_MAX_SIZE.
+    """
+    if not settings.CONTENTSERVER_DISK_CACHE_DIR:
+        return None
+    if content.length is not None and content.length > settings.CONTENTSERVER_DISK_CACHE_MAX_SIZE:
+        return None
+
+    filename = _disk_cache_filename(content)
+    path = os.path.join(settings.CONTENTSERVER_DISK_CACHE_DIR, filename)
+    try:
+        # The modification time of cached files records when they were last used.
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    requests_key = f'contentserver.disk_cache.requests.{filename}'
+    CONTENT_CACHE.add(requests_key, 0)
+    try:
+        num_requests = CONTENT_CACHE.incr(requests_key)
+    except ValueError:
+        # The key expired between the add and the incr.
+        return None
+    if num_requests < settings.CONTENTSERVER_DISK_CACHE_MIN_REQUESTS:
+        return None
+
+    # Write to a temporary file first, so that concurrent requests never
+    # serve a partially written file.
+    temp_file = None
+    try:
+        os.makedirs(settings.CONTENTSERVER_DISK_CACHE_DIR, exist_ok=True)
+        with NamedTemporaryFile(dir=settings.CONTENTSERVER_DISK_CACHE_DIR, delete=False) as temp_file:
+            for chunk in content.stream_data():
+                temp_file.write(chunk)
+        os.replace(temp_file.name, path)
+    except OSError:
+        log.exception('Unable to cache %s on disk', content.location)
+        if temp_file is not None and os.path.exists(temp_file.name):
+            os.remove(temp_file.name)
+        return None
+
+    evict_disk_cached_content(settings.CONTENTSERVER_DISK_CACHE_MAX_SIZE)
+    return path
+
+
+def evict_disk_cached_content(max_size):
+    """
+    Removes the least recently used files from CONTENTSERVER_DISK_CACHE_DIR
+    until their total size is at most `max_size` bytes.
+
+    Returns the number of removed files.
+    """
+    cached_files = []
+    try:
+        with os.scandir(settings.CONTENTSERVER_DISK_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        cached_files.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:
+                    # The file was removed by a concurrent eviction.
+                    continue
+    except FileNotFoundError:
+        return 0
+
+    total_size = sum(size for __, size, __ in cached_files)
+    num_removed = 0
+    for __, size, path in sorted(cached_files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+            num_removed += 1
+        except FileNotFoundError:
+            pass
+        total_size -= size
+    return num_removed
@@ -0,0 +1,44 @@
+"""
+Management command to remove the least recently used course assets from the contentserver disk cache.
+"""
+
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from openedx.core.djangoapps.contentserver.caching import evict_disk_cached_content
+
+
+class Command(BaseCommand):
+    """
+    Remove the least recently used files from CONTENTSERVER_DISK_CACHE_DIR until
+    their total size is at most --max-size bytes, CONTENTSERVER_DISK_CACHE_MAX_SIZE
+    by default. Use --max-size 0 to empty the disk cache.
+
+    The contentserver already evicts files whenever it caches a new asset, so this
+    is only needed after lowering CONTENTSERVER_DISK_CACHE_MAX_SIZE, or to empty
+    the disk cache.
+
+    Examples:
+
+        ./manage.py lms evict_contentserver_disk_cache
+        ./manage.py lms evict_contentserver_disk_cache --max-size 0
+    """
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        """ Add arguments to the command parser. """
+        parser.add_argument('--max-size', type=int, help='Maximum total size of the cached files, in bytes')
+
+    def handle(self, *args, **options):
+        """
+        Handle the evict contentserver disk cache command.
+        """
+        if not settings.CONTENTSERVER_DISK_CACHE_DIR:
+            raise CommandError('CONTENTSERVER_DISK_CACHE_DIR is not set')
+        max_size = options['max_size']
+        if max_size is None:
+            max_size = settings.CONTENTSERVER_DISK_CACHE_MAX_SIZE
+        num_removed = evict_disk_cached_content(max_size)
+        self.stdout.write(f'Removed {num_removed} files from {settings.CONTENTSERVER_DISK_CACHE_DIR}')
@@ -0,0 +1,43 @@
+"""
+Tests for the evict_contentserver_disk_cache management command.
+"""
+import os
+from tempfile import TemporaryDirectory
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+
+class TestEvictContentserverDiskCache(TestCase):
+    """
+    Tests for the evict_contentserver_disk_cache management command.
+    """
+
+    def _create_cached_file(self, cache_dir, filename, last_used):
+        """
+        Creates a 10 bytes file in the disk cache, last used at the given timestamp.
+        """
+        path = os.path.join(cache_dir, filename)
+        with open(path, 'wb') as cached_file:
+            cached_file.write(b'x' * 10)
+        os.utime(path, (last_used, last_used))
+
+    def test_evict(self):
+        with TemporaryDirectory() as cache_dir, override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=cache_dir, CONTENTSERVER_DISK_CACHE_MAX_SIZE=20,
+        ):
+            for index, filename in enumerate(('first', 'second', 'third')):
+                self._create_cached_file(cache_dir, filename, 1000 * (index + 1))
+
+            call_command('evict_contentserver_disk_cache')
+            assert sorted(os.listdir(cache_dir)) == ['second', 'third']
+
+            call_command('evict_contentserver_disk_cache', '--max-size', '0')
+            assert not os.listdir(cache_dir)
+
+    @override_settings(CONTENTSERVER_DISK_CACHE_DIR=None)
+    def test_disk_cache_disabled(self):
+        with pytest.raises(CommandError):
+            call_command('evict_contentserver_disk_cache')
@@ -6,12 +6,15 @@ Tests for content server.
 import copy
 import datetime
 import logging
+import os
 import unittest
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 from uuid import uuid4
 
 import ddt
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -27,7 +30,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, SharedModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from .. import views
+from .. import caching, views
 
 log = logging.getLogger(__name__)
 
@@ -324,17 +327,211 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges partial content.
         """
-        first_byte = self.length_unlocked / 4
-        last_byte = self.length_unlocked / 2
+        first_byte = self.length_unlocked // 4
+        last_byte = self.length_unlocked // 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        assert resp.status_code == 206
+        assert 'Content-Range' not in resp
+        assert resp['Content-Type'].startswith('multipart/byteranges; boundary=')
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        assert resp['Content-Length'] == str(len(resp.content))
+
+        content = self.contentstore.find(self.unlocked_asset).data
+        parts = resp.content.split(f'--{boundary}'.encode('utf-8'))
+        assert parts[-1] == b'--\r\n'
+        assert len(parts) == 4
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:3], expected_ranges):
+            headers, data = part.split(b'\r\n\r\n', 1)
+            assert f'Content-Range: bytes {first}-{last}/{self.length_unlocked}'.encode('utf-8') in headers
+            assert data == content[first:last + 1] + b'\r\n'
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a range request with more than MAX_BYTE_RANGES ranges outputs the full content.
+        """
+        ranges = ', '.join(f'{byte}-{byte}' for byte in range(views.MAX_BYTE_RANGES + 1))
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE=f'bytes={ranges}')
+
         assert resp.status_code == 200
         assert 'Content-Range' not in resp
         assert resp['Content-Length'] == str(self.length_unlocked)
 
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that a range request whose ranges add up to more than the content outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-, 0-')
+
+        assert resp.status_code == 200
+        assert 'Content-Range' not in resp
+        assert resp['Content-Length'] == str(self.length_unlocked)
+
+    def test_streamed_asset(self):
+        """
+        Test that assets loaded as streams are sent as streaming responses.
+        """
+        with patch.object(views, 'load_asset_from_location', side_effect=self._load_asset_as_stream):
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            assert resp.streaming
+            assert resp['Content-Length'] == str(self.length_unlocked)
+            assert b''.join(resp.streaming_content) == self.contentstore.find(self.unlocked_asset).data
+
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-19')
+            assert resp.status_code == 206
+            assert b''.join(resp.streaming_content) == self.contentstore.find(self.unlocked_asset).data[10:20]
+
+    @ddt.data(None, '/protected/')
+    def test_disk_cached_asset(self, x_accel_redirect_prefix):
+        """
+        Test that streamed assets are served from the disk cache once they have
+        been requested CONTENTSERVER_DISK_CACHE_MIN_REQUESTS times.
+        """
+        with TemporaryDirectory() as cache_dir, override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=cache_dir,
+            CONTENTSERVER_DISK_CACHE_MIN_REQUESTS=2,
+            CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX=x_accel_redirect_prefix,
+        ), patch.object(caching, 'CONTENT_CACHE', LocMemCache(uuid4().hex, {})), patch.object(
+            views, 'load_asset_from_location', side_effect=self._load_asset_as_stream
+        ):
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            assert not os.listdir(cache_dir)
+            assert 'X-Accel-Redirect' not in resp
+
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            cached_files = os.listdir(cache_dir)
+            assert len(cached_files) == 1
+            if x_accel_redirect_prefix:
+                assert resp['X-Accel-Redirect'] == x_accel_redirect_prefix + cached_files[0]
+                assert resp['Content-Type'] == self.contentstore.find(self.unlocked_asset).content_type
+            else:
+                assert 'X-Accel-Redirect' not in resp
+                assert 'Content-Disposition' not in resp
+                assert b''.join(resp.streaming_content) == self.contentstore.find(self.unlocked_asset).data
+            assert resp['Accept-Ranges'] == 'bytes'
+
+    def test_disk_cached_asset_missing(self):
+        """
+        Test that assets are served from the contentstore if their disk cached
+        file can't be opened.
+        """
+        with TemporaryDirectory() as cache_dir, override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=cache_dir,
+            CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX=None,
+        ), patch.object(
+            views, 'get_disk_cached_content_path', return_value=os.path.join(cache_dir, 'evicted')
+        ), patch.object(
+            views, 'load_asset_from_location', side_effect=self._load_asset_as_stream
+        ):
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            assert b''.join(resp.streaming_content) == self.contentstore.find(self.unlocked_asset).data
+
+    def test_disk_cache_eviction(self):
+        """
+        Test that the least recently used files are evicted from the disk cache
+        once it grows over CONTENTSERVER_DISK_CACHE_MAX_SIZE.
+        """
+        with TemporaryDirectory() as cache_dir, override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=cache_dir,
+            CONTENTSERVER_DISK_CACHE_MIN_REQUESTS=1,
+            CONTENTSERVER_DISK_CACHE_MAX_SIZE=self.length_unlocked + 10,
+        ), patch.object(caching, 'CONTENT_CACHE', LocMemCache(uuid4().hex, {})), patch.object(
+            views, 'load_asset_from_location', side_effect=self._load_asset_as_stream
+        ):
+            for filename, last_used in (('old', 1000), ('recent', 3000)):
+                stale_path = os.path.join(cache_dir, filename)
+                with open(stale_path, 'wb') as stale_file:
+                    stale_file.write(b'x' * 10)
+                os.utime(stale_path, (last_used, last_used))
+
+            # Caching the asset evicts the least recently used files.
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            cached_files = sorted(os.listdir(cache_dir))
+            assert len(cached_files) == 2
+            assert 'old' not in cached_files
+            assert 'recent' in cached_files
+
+            # Serving the asset from the disk cache records its use.
+            asset_path = os.path.join(cache_dir, next(name for name in cached_files if name != 'recent'))
+            os.utime(asset_path, (2000, 2000))
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            assert os.path.getmtime(asset_path) > 3000
+
+            assert caching.evict_disk_cached_content(self.length_unlocked) == 1
+            assert os.listdir(cache_dir) == [os.path.basename(asset_path)]
+
+    @override_settings(CONTENTSERVER_DISK_CACHE_MAX_SIZE=10)
+    def test_disk_cache_skips_large_asset(self):
+        """
+        Test that assets larger than CONTENTSERVER_DISK_CACHE_MAX_SIZE are not cached on disk.
+        """
+        with TemporaryDirectory() as cache_dir, override_settings(
+            CONTENTSERVER_DISK_CACHE_DIR=cache_dir,
+            CONTENTSERVER_DISK_CACHE_MIN_REQUESTS=1,
+        ), patch.object(caching, 'CONTENT_CACHE', LocMemCache(uuid4().hex, {})), patch.object(
+            views, 'load_asset_from_location', side_effect=self._load_asset_as_stream
+        ):
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            assert not os.listdir(cache_dir)
+
+    def test_metadata_cache(self):
+        """
+        Test that redirect, authorization and conditional request decisions are
+        made from the cached metadata of the assets, without loading them.
+        """
+        with patch.object(caching, 'CONTENT_CACHE', LocMemCache(uuid4().hex, {})):
+            # The metadata of all the assets of the course is cached by the first request.
+            resp = self.client.get(self.url_unlocked)
+            assert resp.status_code == 200
+            last_modified = resp['Last-Modified']
+            assert caching.get_cached_content_metadata(self.locked_asset).locked
+
+            with patch.object(views, 'load_asset_from_location') as mock_load_asset:
+                url_unlocked_versioned_old = StaticContent.add_version_to_asset_path(self.url_unlocked, FAKE_MD5_HASH)
+                resp = self.client.get(url_unlocked_versioned_old)
+                assert resp.status_code == 301
+                assert resp.url.endswith(self.url_unlocked_versioned)
+
+                resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=last_modified)
+                assert resp.status_code == 304
+
+                self.client.logout()
+                resp = self.client.get(self.url_locked)
+                assert resp.status_code == 403
+
+                mock_load_asset.assert_not_called()
+
+    def test_metadata_cache_invalidation(self):
+        """
+        Test that the cached metadata of an asset is deleted along with its cached content.
+        """
+        with patch.object(caching, 'CONTENT_CACHE', LocMemCache(uuid4().hex, {})):
+            metadata = caching.get_cached_content_metadata(self.unlocked_asset)
+            assert metadata.length == self.length_unlocked
+            assert metadata.content_digest is not None
+
+            caching.del_cached_content(self.unlocked_asset)
+            with patch.object(caching, 'contentstore') as mock_contentstore:
+                assert caching.get_cached_content_metadata(self.unlocked_asset) is None
+                mock_contentstore.assert_not_called()
+
+    def _load_asset_as_stream(self, location):
+        """
+        Loads the asset at the given location as a stream, as done for large assets.
+        """
+        return AssetManager.find(location, as_stream=True)
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
@@ -7,14 +7,19 @@ have 3 views as entry points.
 """
 import datetime
 import logging
+import os
+from uuid import uuid4
 
+from django.conf import settings
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotFound,
     HttpResponseNotModified,
-    HttpResponsePermanentRedirect
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse
 )
 from django.views.decorators.http import require_safe
 from edx_django_utils.monitoring import set_custom_attribute
@@ -26,13 +31,25 @@ from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.header_control import force_header_for_response
 from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent
+from xmodule.contentstore.content import (
+    XASSET_LOCATION_TAG,
+    StaticContent,
+    StaticContentMetadata,
+    StaticContentStream
+)
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.sandboxing import course_code_library_asset_name
 
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    MAX_CACHED_CONTENT_LENGTH,
+    get_cached_content,
+    get_cached_content_metadata,
+    get_disk_cached_content_path,
+    set_cached_content,
+    set_cached_content_metadata
+)
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 
@@ -51,6 +68,9 @@ log = logging.getLogger(__name__)
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Maximum number of ranges of a Range header, above which the full content is sent.
+MAX_BYTE_RANGES = 16
+
 
 def is_asset_request(request):
     """Determines whether the given request is an asset request"""
@@ -85,14 +105,18 @@ def process_request(request):
         except (InvalidLocationError, InvalidKeyError):
             return HttpResponseBadRequest()
 
-        # Attempt to load the asset to make sure it exists, and grab the asset digest
-        # if we're able to load it.
-        actual_digest = None
-        try:
-            content = load_asset_from_location(loc)
-            actual_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            return HttpResponseNotFound()
+        # Attempt to load the metadata of the asset to make sure it exists, and grab the
+        # asset digest. The asset itself is only loaded once we know it will be sent.
+        content = None
+        metadata = get_cached_content_metadata(loc)
+        if metadata is None:
+            try:
+                content = load_asset_from_location(loc)
+            except (ItemNotFoundError, NotFoundError):
+                return HttpResponseNotFound()
+            metadata = StaticContentMetadata.from_content(content)
+            set_cached_content_metadata(metadata)
+        actual_digest = metadata.content_digest
 
         # If this was a versioned asset, and the digest doesn't match, redirect
         # them to the actual version.
@@ -116,33 +140,70 @@ def process_request(request):
         set_custom_attribute('contentserver.from_cdn', is_from_cdn)
 
         # Check if this content is locked or not.
-        locked = is_content_locked(content)
+        locked = is_content_locked(metadata)
         set_custom_attribute('contentserver.locked', locked)
 
         # Check that user has access to the content.
-        if not is_user_authorized(request, content, loc):
+        if not is_user_authorized(request, metadata, loc):
             return HttpResponseForbidden('Unauthorized')
 
         # Figure out if the client sent us a conditional request, and let them know
         # if this asset has changed since then.
-        last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        last_modified_at_str = metadata.last_modified_at.strftime(HTTP_DATE_FORMAT)
         if 'HTTP_IF_MODIFIED_SINCE' in request.META:
             if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
             if if_modified_since == last_modified_at_str:
                 return HttpResponseNotModified()
 
-        # *** File streaming within a byte range ***
+        if content is None:
+            try:
+                content = load_asset_from_location(loc)
+            except (ItemNotFoundError, NotFoundError):
+                return HttpResponseNotFound()
+
+        # Serve assets that are cached on the local disk from there, if enabled.
+        disk_cache_path = None
+        if isinstance(content, StaticContentStream):
+            disk_cache_path = get_disk_cached_content_path(content)
+        set_custom_attribute('contentserver.disk_cached', disk_cache_path is not None)
+        if disk_cache_path is not None and settings.CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX:
+            # Let the web server send the file, and handle any Range header.
+            content.close()
+            response = HttpResponse()
+            response['X-Accel-Redirect'] = os.path.join(
+                settings.CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX, os.path.basename(disk_cache_path)
+            )
+            response['Content-Type'] = content.content_type
+            response['Accept-Ranges'] = 'bytes'
+            response['X-Frame-Options'] = 'ALLOW'
+            set_caching_headers(content, loc, response)
+            return response
+
+        if disk_cache_path is not None:
+            try:
+                disk_cache_file = open(disk_cache_path, 'rb')  # pylint: disable=consider-using-with
+            except OSError:
+                # The file may have been evicted since it was looked up, so serve the content from
+                # the contentstore instead.
+                log.warning("Unable to open disk cached file %s for content: %s", disk_cache_path, str(loc))
+                disk_cache_path = None
+            else:
+                content.close()
+                content = StaticContentStream(
+                    content.location, content.name, content.content_type, disk_cache_file,
+                    last_modified_at=content.last_modified_at, length=content.length, locked=content.locked,
+                    content_digest=content.content_digest,
+                )
+
+        # *** File streaming within byte ranges ***
         # If a Range is provided, parse Range attribute of the request
         # Add Content-Range in the response if Range is structurally correct
-        # Request -> Range attribute structure: "Range: bytes=first-[last]"
-        # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
-        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
+        # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]]..."
+        # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength", for
+        # a single range, or a "multipart/byteranges" body with a Content-Range per part for multiple ranges.
+        # https://www.rfc-editor.org/rfc/rfc7233
         response = None
         if request.META.get('HTTP_RANGE'):
-            # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-            if isinstance(content, StaticContent):
-                content = AssetManager.find(loc, as_stream=True)
-
             header_value = request.META['HTTP_RANGE']
             try:
                 unit, ranges = parse_range_header(header_value, content.length)
@@ -156,44 +217,58 @@ def process_request(request):
                 if unit != 'bytes':
                     # Only accept ranges in bytes
                     log.warning("Unknown unit in Range header: %s for content: %s", header_value, str(loc))
-                elif len(ranges) > 1:
-                    # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                    # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                    # But we send back the full content.
+                elif len(ranges) > MAX_BYTE_RANGES or sum(last - first + 1 for first, last in ranges) > content.length:
+                    # Requests for many small or overlapping ranges are a known denial of service
+                    # vector, so we send back the full content instead.
                     log.warning(
-                        "More than 1 ranges in Range header: %s for content: %s", header_value, str(loc)
+                        "Too many or overlapping ranges in Range header: %s for content: %s", header_value, str(loc)
                     )
                 else:
-                    first, last = ranges[0]
+                    satisfiable_ranges = [
+                        (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                    ]
+                    if not satisfiable_ranges:
+                        log.warning(
+                            "Cannot satisfy ranges in Range header: %s for content: %s",
+                            header_value, str(loc)
+                        )
+                        response = HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        response['Content-Range'] = f'bytes */{content.length}'
+                        return response
 
-                    if 0 <= first <= last < content.length:
-                        # If the byte range is satisfiable
-                        response = HttpResponse(content.stream_data_in_range(first, last))
+                    if len(satisfiable_ranges) == 1:
+                        first, last = satisfiable_ranges[0]
+                        response = _streaming_response(content, content.stream_data_in_range(first, last))
                         response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                             first=first, last=last, length=content.length
                         )
                         response['Content-Length'] = str(last - first + 1)
-                        response.status_code = 206  # Partial Content
-
-                        set_custom_attribute('contentserver.ranged', True)
+                        response['Content-Type'] = content.content_type
                     else:
-                        log.warning(
-                            "Cannot satisfy ranges in Range header: %s for content: %s",
-                            header_value, str(loc)
-                        )
-                        return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        boundary = uuid4().hex
+                        length, body = multipart_byteranges_body(content, satisfiable_ranges, boundary)
+                        response = _streaming_response(content, body)
+                        response['Content-Length'] = str(length)
+                        response['Content-Type'] = f'multipart/byteranges; boundary={boundary}'
+                    response.status_code = 206  # Partial Content
+
+                    set_custom_attribute('contentserver.ranged', True)
 
         # If Range header is absent or syntactically invalid return a full content response.
         if response is None:
-            response = HttpResponse(content.stream_data())
+            if disk_cache_path is not None:
+                # Let the WSGI server send the file with its file wrapper, e.g. using sendfile.
+                response = FileResponse(disk_cache_file)
+            else:
+                response = _streaming_response(content, content.stream_data())
             response['Content-Length'] = content.length
+            response['Content-Type'] = content.content_type
 
         set_custom_attribute('contentserver.content_len', content.length)
         set_custom_attribute('contentserver.content_type', content.content_type)
 
         # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
         response['Accept-Ranges'] = 'bytes'
-        response['Content-Type'] = content.content_type
         response['X-Frame-Options'] = 'ALLOW'
 
         # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -205,6 +280,54 @@ def process_request(request):
         return response
 
 
+def _streaming_response(content, streaming_content):
+    """
+    Returns a response sending the given data of the given content.
+
+    Content read from a stream is streamed to the client, and the stream is
+    closed along with the response.  Content held in memory is sent at once.
+    """
+    if not isinstance(content, StaticContentStream):
+        return HttpResponse(streaming_content)
+
+    def close_when_done():
+        try:
+            yield from streaming_content
+        finally:
+            content.close()
+
+    return StreamingHttpResponse(close_when_done())
+
+
+def multipart_byteranges_body(content, ranges, boundary):
+    """
+    Returns the length and a generator of the body of a "multipart/byteranges"
+    response sending the given (first, last) byte ranges of the given content.
+    """
+    part_headers = []
+    for first, last in ranges:
+        part_header = f'\r\n--{boundary}\r\n'
+        if content.content_type:
+            part_header += f'Content-Type: {content.content_type}\r\n'
+        part_header += f'Content-Range: bytes {first}-{last}/{content.length}\r\n\r\n'
+        part_headers.append(part_header.encode('utf-8'))
+    closing_delimiter = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+    length = (
+        sum(len(part_header) for part_header in part_headers) +
+        sum(last - first + 1 for first, last in ranges) +
+        len(closing_delimiter)
+    )
+
+    def body():
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            yield from content.stream_data_in_range(first, last)
+        yield closing_delimiter
+
+    return length, body()
+
+
 def set_caching_headers(content, location, response):
     """
     Sets caching headers based on whether or not the asset is restricted.
@@ -339,7 +462,7 @@ def load_asset_from_location(location):
         # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
         # because it's the default for memcached and also we don't want to do too much
         # buffering in memory when we're serving an actual request.
-        if content.length is not None and content.length < 1048576:
+        if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
             content = content.copy_to_in_mem()
             set_cached_content(content)
 
@@ -0,0 +1,257 @@
+"""
+Versioned, pluggable codecs used to serialize large values stored in caches.
+
+Every codec other than the legacy ``zpickle`` one prefixes its output with a
+small header identifying the codec and the compression algorithm used, so
+values written by any codec (including the headerless legacy format) can
+always be read back, whatever codec is currently configured for writing.
+
+Usage::
+
+    serialized = cache_codecs.dumps(data, 'pickle')
+    data = cache_codecs.loads(serialized)
+"""
+
+
+import datetime
+import logging
+import pickle
+import zlib
+
+import msgpack
+import zstandard
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+log = logging.getLogger(__name__)
+
+# Magic bytes which start every serialization which has a header. The first byte
+# can't start a zlib stream, so legacy (headerless) data can't be mistaken for it.
+HEADER_MAGIC = b'\xedC'
+HEADER_LENGTH = len(HEADER_MAGIC) + 2
+
+COMPRESSION_ZLIB = 0
+COMPRESSION_ZSTD = 1
+
+# Extension type codes used by MsgpackCodec. Subclasses should use codes from 16 upwards.
+EXT_TUPLE = 1
+EXT_DATETIME = 2
+
+_CODECS_BY_NAME = {}
+_CODECS_BY_ID = {}
+
+
+class CacheCodecError(Exception):
+    """
+    Raised when a value can't be serialized or deserialized by a codec.
+    """
+
+
+def compress(data):
+    """
+    Compress data with zstd, at its fastest level.
+
+    Returns a (compression, compressed_data) tuple.
+    """
+    return COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=1).compress(data)
+
+
+def decompress(compression, data):
+    """
+    Decompress data compressed with the given compression algorithm.
+    """
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise CacheCodecError(f'Unknown compression: {compression}')
+
+
+class CacheCodec:
+    """
+    Base class for cache codecs.
+
+    Subclasses must define a unique ``name``, used to select the codec in
+    settings, and a unique ``codec_id`` (0-255), stored in the header of every
+    serialization, and implement ``encode`` and ``decode``.
+    """
+    name = None
+    codec_id = None
+
+    def encode(self, data):
+        """
+        Return the (uncompressed) bytes representing data.
+        """
+        raise NotImplementedError
+
+    def decode(self, encoded):
+        """
+        Return the data represented by encoded bytes.
+        """
+        raise NotImplementedError
+
+    def dumps(self, data):
+        """
+        Return the compressed serialization of data, with its header.
+        """
+        compression, payload = compress(self.encode(data))
+        return HEADER_MAGIC + bytes((self.codec_id, compression)) + payload
+
+    def loads(self, serialized):
+        """
+        Return the data represented by a serialization returned by ``dumps``.
+        """
+        compression = serialized[len(HEADER_MAGIC) + 1]
+        return self.decode(decompress(compression, serialized[HEADER_LENGTH:]))
+
+
+class ZPickleCodec(CacheCodec):
+    """
+    The legacy zlib-compressed pickle format, without any header.
+    """
+    name = 'zpickle'
+    codec_id = 0
+
+    def dumps(self, data):
+        return zpickle(data)
+
+    def loads(self, serialized):
+        return zunpickle(serialized)
+
+
+class PickleCodec(CacheCodec):
+    """
+    Pickle protocol 5, compressed with zstd.
+    """
+    name = 'pickle'
+    codec_id = 1
+
+    def encode(self, data):
+        return pickle.dumps(data, 5)
+
+    def decode(self, encoded):
+        return pickle.loads(encoded)
+
+
+class MsgpackCodec(CacheCodec):
+    """
+    msgpack, compressed with zstd.
+
+    Only plain data (dicts, lists, tuples, strings, numbers and datetimes) is
+    supported. Subclasses can support other types by extending ``ext_default``
+    and ``ext_hook``, which are given a context object that subclasses can use
+    to share state (e.g. a table of interned values) while packing or unpacking
+    a single value.
+    """
+    name = 'msgpack'
+    codec_id = 2
+
+    def ext_default(self, obj, context):
+        """
+        Return a msgpack.ExtType representing obj, which isn't natively supported by msgpack.
+        """
+        if type(obj) is tuple:  # pylint: disable=unidiomatic-typecheck
+            return msgpack.ExtType(EXT_TUPLE, self._packb(list(obj), context))
+        if isinstance(obj, datetime.datetime):
+            return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode('ascii'))
+        raise TypeError(f'Unsupported type: {type(obj)}')
+
+    def ext_hook(self, code, data, context):
+        """
+        Return the object represented by a msgpack.ExtType's code and data.
+        """
+        if code == EXT_TUPLE:
+            return tuple(self._unpackb(data, context))
+        if code == EXT_DATETIME:
+            return datetime.datetime.fromisoformat(data.decode('ascii'))
+        return msgpack.ExtType(code, data)
+
+    def _packb(self, data, context):
+        """
+        Pack data, calling ``ext_default`` for unsupported types.
+        """
+        return msgpack.packb(
+            data,
+            default=lambda obj: self.ext_default(obj, context),
+            use_bin_type=True,
+            strict_types=True,
+        )
+
+    def _unpackb(self, data, context):
+        """
+        Unpack data, calling ``ext_hook`` for extension types.
+        """
+        return msgpack.unpackb(
+            data,
+            ext_hook=lambda code, ext_data: self.ext_hook(code, ext_data, context),
+            raw=False,
+            strict_map_key=False,
+        )
+
+    def encode(self, data):
+        return self._packb(data, None)
+
+    def decode(self, encoded):
+        return self._unpackb(encoded, None)
+
+
+def register_codec(codec_class):
+    """
+    Register a codec class, so it can be used by ``dumps`` and ``loads``.
+
+    Can be used as a class decorator.
+    """
+    codec = codec_class()
+    existing = _CODECS_BY_ID.get(codec.codec_id)
+    if existing is not None and existing.name != codec.name:
+        raise ValueError(f'Codec id {codec.codec_id} is already used by {existing.name}')
+    _CODECS_BY_NAME[codec.name] = codec
+    _CODECS_BY_ID[codec.codec_id] = codec
+    return codec_class
+
+
+def get_codec(name):
+    """
+    Return the registered codec named ``name``.
+    """
+    try:
+        return _CODECS_BY_NAME[name]
+    except KeyError:
+        raise CacheCodecError(f'Unknown cache codec: {name}')  # lint-amnesty, pylint: disable=raise-missing-from
+
+
+def dumps(data, codec_name=ZPickleCodec.name):
+    """
+    Serialize data with the codec named ``codec_name``.
+
+    If the codec can't serialize data, it is serialized with the legacy
+    ``zpickle`` codec instead, which supports any picklable data.
+    """
+    codec = get_codec(codec_name)
+    try:
+        return codec.dumps(data)
+    except (TypeError, ValueError, CacheCodecError):
+        if codec.name == ZPickleCodec.name:
+            raise
+        log.warning("Cache codec %s failed to serialize data, falling back to %s", codec.name, ZPickleCodec.name)
+        return get_codec(ZPickleCodec.name).dumps(data)
+
+
+def loads(serialized):
+    """
+    Deserialize data serialized by ``dumps``, whatever codec was used.
+    """
+    if not serialized.startswith(HEADER_MAGIC):
+        return get_codec(ZPickleCodec.name).loads(serialized)
+
+    codec_id = serialized[len(HEADER_MAGIC)]
+    try:
+        codec = _CODECS_BY_ID[codec_id]
+    except KeyError:
+        raise CacheCodecError(f'Unknown cache codec id: {codec_id}')  # lint-amnesty, pylint: disable=raise-missing-from
+    return codec.loads(serialized)
+
+
+register_codec(ZPickleCodec)
+register_codec(PickleCodec)
+register_codec(MsgpackCodec)
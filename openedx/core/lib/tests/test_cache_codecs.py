@@ -0,0 +1,83 @@
+"""
+Tests for cache_codecs.py
+"""
+import datetime
+import zlib
+from unittest import TestCase
+from zoneinfo import ZoneInfo
+
+import ddt
+import pytest
+
+from openedx.core.lib import cache_codecs
+from openedx.core.lib.cache_utils import zpickle
+
+DATA = {
+    'name': 'data',
+    'values': [1, 2.5, None, True, b'bytes'],
+    'tuple': ('a', ('nested', 1)),
+    'edited_on': datetime.datetime(2024, 5, 17, 12, 30, 1, 123, tzinfo=ZoneInfo('UTC')),
+    'nested': {'dict': {'with': ['lists']}},
+}
+
+
+class Unsupported:
+    """
+    An object which can be pickled, but not serialized with msgpack.
+    """
+    def __eq__(self, other):
+        return isinstance(other, Unsupported)
+
+
+@ddt.ddt
+class TestCacheCodecs(TestCase):
+    """
+    Tests for the cache codecs.
+    """
+
+    @ddt.data('zpickle', 'pickle', 'msgpack')
+    def test_round_trip(self, codec_name):
+        assert cache_codecs.loads(cache_codecs.dumps(DATA, codec_name)) == DATA
+
+    def test_legacy_format(self):
+        serialized = cache_codecs.dumps(DATA, 'zpickle')
+        assert serialized == zpickle(DATA)
+        assert cache_codecs.loads(zpickle(DATA)) == DATA
+
+    @ddt.data('pickle', 'msgpack')
+    def test_header(self, codec_name):
+        serialized = cache_codecs.dumps(DATA, codec_name)
+        assert serialized.startswith(cache_codecs.HEADER_MAGIC)
+        assert serialized[len(cache_codecs.HEADER_MAGIC)] == cache_codecs.get_codec(codec_name).codec_id
+
+    def test_compression(self):
+        serialized = cache_codecs.dumps(DATA, 'msgpack')
+        assert serialized[len(cache_codecs.HEADER_MAGIC) + 1] == cache_codecs.COMPRESSION_ZSTD
+        assert cache_codecs.loads(serialized) == DATA
+
+    def test_zlib_compression(self):
+        codec = cache_codecs.get_codec('msgpack')
+        serialized = (
+            cache_codecs.HEADER_MAGIC + bytes((codec.codec_id, cache_codecs.COMPRESSION_ZLIB)) +
+            zlib.compress(codec.encode(DATA))
+        )
+        assert cache_codecs.loads(serialized) == DATA
+
+    def test_fallback_for_unsupported_data(self):
+        data = {'unsupported': Unsupported()}
+        serialized = cache_codecs.dumps(data, 'msgpack')
+        assert not serialized.startswith(cache_codecs.HEADER_MAGIC)
+        assert cache_codecs.loads(serialized) == data
+
+    def test_unknown_codec(self):
+        with pytest.raises(cache_codecs.CacheCodecError):
+            cache_codecs.dumps(DATA, 'unknown')
+        with pytest.raises(cache_codecs.CacheCodecError):
+            cache_codecs.loads(cache_codecs.HEADER_MAGIC + bytes((255, 0)))
+
+    def test_register_duplicate_codec_id(self):
+        class DuplicateCodec(cache_codecs.PickleCodec):
+            name = 'duplicate'
+
+        with pytest.raises(ValueError):
+            cache_codecs.register_codec(DuplicateCodec)
@@ -402,6 +402,15 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_CODEC
+# .. setting_default: 'zpickle'
+# .. setting_description: Name of the codec used to serialize split modulestore structures stored in the
+#   course_structure_cache. 'zpickle' is the legacy zlib-compressed pickle format, 'pickle' uses a newer
+#   pickle protocol and 'split_structure_msgpack' is a compact msgpack encoding of structures. Both of
+#   these are compressed with zstd. Structures cached with any codec can be read back whatever the value
+#   of this setting, so it can be changed without flushing the cache.
+COURSE_STRUCTURE_CACHE_CODEC = 'zpickle'
+
 DATABASES = {
     # edxapp's edxapp-migrate scripts and the edxapp_migrate play
     # will ensure that any DB not named read_replica will be migrated
@@ -1535,8 +1544,48 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     #   For more information, check https://github.com/openedx/edx-platform/pull/13388 and
     #   https://github.com/openedx/edx-platform/pull/14571.
     TASK_MAX_RETRIES=5,
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['CODEC']
+    # .. setting_default: 'zpickle'
+    # .. setting_description: Name of the codec used to serialize collected block structures, both in the
+    #   cache and in storage. 'zpickle' is the legacy zlib-compressed pickle format, and 'pickle' uses a
+    #   newer pickle protocol, compressed with zstd. Block structures serialized with any codec can be read
+    #   back whatever the value of this setting.
+    CODEC='zpickle',
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['COMPACT_REPRESENTATION']
+    # .. setting_default: False
+    # .. setting_description: Whether block structures read from the cache or storage are represented
+    #   with CompactBlockStructureBlockData, which stores the relations and data of their blocks in
+    #   integer-indexed arrays and columns instead of per-block objects, reducing their memory footprint.
+    COMPACT_REPRESENTATION=False,
 )
 
+############################# Learning Sequences #############################
+
+# .. setting_name: LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE
+# .. setting_default: 0
+# .. setting_description: Number of base course outlines (CourseOutlineData) of the learning_sequences app kept
+#   in a process-local cache, in front of the TieredCache. Outlines are cached by published version, and the least
+#   recently used outlines are evicted to bound memory, or once they are older than
+#   LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_TIMEOUT. The cache is disabled when 0.
+LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE = 0
+
+# .. setting_name: LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_TIMEOUT
+# .. setting_default: 60
+# .. setting_description: Number of seconds for which a base course outline is kept in the process-local cache of
+#   LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_SIZE. Publishing the same version of a course again only evicts its
+#   outline from the cache of the process doing it, so other processes may serve the previous outline until then.
+LEARNING_SEQUENCES_OUTLINE_PROCESS_CACHE_TIMEOUT = 60
+
+# .. setting_name: LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT
+# .. setting_default: 0
+# .. setting_description: Number of seconds for which the results of learning_sequences outline processors are
+#   cached, keyed by the published version of the course and the per-user inputs declared by each processor (see
+#   OutlineProcessor.cache_inputs), so that they are shared by the course outline endpoints and by users with the
+#   same inputs. Processors which don't declare their inputs are always run. The cache is disabled when 0.
+LEARNING_SEQUENCES_PROCESSOR_CACHE_TIMEOUT = 0
+
 ################################ Bulk Email ################################
 
 # Suffix used to construct 'from' email address for bulk emails.
@@ -1827,10 +1876,51 @@ CONTENTSTORE = {
         'ssl': False,
         'auth_source': None
     },
+    # Per-contentstore options, e.g. {'default': {'shared_blobs': True}} to store the data of identical assets
+    # once, in blobs shared by courses and their reruns. See MongoContentStore.
     'ADDITIONAL_OPTIONS': {},
     'DOC_STORE_CONFIG': DOC_STORE_CONFIG
 }
 
+# .. setting_name: CONTENTSERVER_DISK_CACHE_DIR
+# .. setting_default: None
+# .. setting_description: Directory of a local disk cache of the course assets that are too large for the
+#   "course_assets" cache. Once such an asset has been requested CONTENTSERVER_DISK_CACHE_MIN_REQUESTS times,
+#   the contentserver copies it to this directory and serves it from there. Cached files are named after the
+#   location and modification date of assets, so updated assets are cached anew, and the least recently used
+#   files are removed once the directory grows over CONTENTSERVER_DISK_CACHE_MAX_SIZE. The disk cache is
+#   disabled when None.
+CONTENTSERVER_DISK_CACHE_DIR = None
+
+# .. setting_name: CONTENTSERVER_DISK_CACHE_MAX_SIZE
+# .. setting_default: 10 * 1024 * 1024 * 1024
+# .. setting_description: Maximum total size, in bytes, of the files in CONTENTSERVER_DISK_CACHE_DIR. The least
+#   recently used files are removed whenever a new asset is cached over this size, and assets larger than this
+#   are never cached on disk. See also the evict_contentserver_disk_cache management command.
+CONTENTSERVER_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# .. setting_name: CONTENTSERVER_DISK_CACHE_MIN_REQUESTS
+# .. setting_default: 3
+# .. setting_description: Number of requests for a course asset after which it is cached in
+#   CONTENTSERVER_DISK_CACHE_DIR.
+CONTENTSERVER_DISK_CACHE_MIN_REQUESTS = 3
+
+# .. setting_name: CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX
+# .. setting_default: None
+# .. setting_description: When set, course assets cached in CONTENTSERVER_DISK_CACHE_DIR are sent by the web
+#   server instead of the contentserver, with an X-Accel-Redirect header made of this prefix and the name of
+#   the cached file. The prefix must be an internal location of the web server (e.g. an nginx ``internal``
+#   location) serving CONTENTSERVER_DISK_CACHE_DIR.
+CONTENTSERVER_X_ACCEL_REDIRECT_PREFIX = None
+
+# .. setting_name: STATIC_REPLACE_CACHE_TIMEOUT
+# .. setting_default: 0
+# .. setting_description: Number of seconds for which the HTML of XBlocks is cached, in the default cache, with
+#   its static, course and jump_to_id urls replaced. Cached HTML is keyed by a hash of the original HTML, the
+#   course, the version of the course assets (which changes whenever assets are uploaded, deleted, locked or
+#   unlocked in Studio, or the course is imported) and the asset url configuration. The cache is disabled when 0.
+STATIC_REPLACE_CACHE_TIMEOUT = 0
+
 MODULESTORE = {
     'default': {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
@@ -2234,6 +2324,21 @@ CODE_JAIL_REST_SERVICE_CONNECT_TIMEOUT = 0.5  # time in seconds
 #   codejail remote service endpoint.
 CODE_JAIL_REST_SERVICE_READ_TIMEOUT = 3.5  # time in seconds
 
+# .. setting_name: CODE_JAIL_BATCH_MAX_WORKERS
+# .. setting_default: 4
+# .. setting_description: Maximum number of code executions that safe_exec_many runs concurrently, locally or
+#   with the codejail remote service, when executing a batch of code, e.g. the check function of a problem with
+#   the answers of many students.
+CODE_JAIL_BATCH_MAX_WORKERS = 4
+
+# .. setting_name: CAPA_COMPILED_PROBLEM_CACHE_SIZE
+# .. setting_default: 0
+# .. setting_description: Number of compiled capa problem parts kept in a process-local cache: the XML trees parsed
+#   from problem texts, and the contexts produced by running the scripts of problems with a given seed. Problems
+#   which include files, import python_lib.zip, or whose scripts use the anonymous student id are not cached.
+#   The cache is disabled when 0.
+CAPA_COMPILED_PROBLEM_CACHE_SIZE = 0
+
 ####################### Locale/Internationalization ########################
 
 # Locale/Internationalization
@@ -2640,6 +2745,14 @@ DEFAULT_EMAIL_LOGO_URL = 'https://edx-cdn.org/v3/default/logo.png'
 COURSE_OLX_VALIDATION_STAGE = 1
 COURSE_OLX_VALIDATION_IGNORE_LIST = None
 
+# .. setting_name: COURSE_IMPORT_STATIC_CONTENT_WORKERS
+# .. setting_default: 1
+# .. setting_description: Number of threads which read, hash and save the static files of a course or library
+#   into the static content store concurrently when it is imported from OLX. Each thread holds the file it
+#   imports in memory. When 1, the files are imported one by one. The blocks are always written to the
+#   modulestore one by one.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 1
+
 
 ############################## Documentation ###############################
 
@@ -2803,6 +2916,14 @@ GENERATE_PROFILE_SCORES = False
 USERNAME_REGEX_PARTIAL = r'[\w .@_+-]+'
 USERNAME_PATTERN = fr'(?P<username>{USERNAME_REGEX_PARTIAL})'
 
+# .. setting_name: ANONYMOUS_USER_ID_CACHE_SIZE
+# .. setting_default: 0
+# .. setting_description: Number of (user, course) anonymous user ids kept in a process-local cache by
+#   anonymous_id_for_user and anonymous_ids_for_users, in addition to the cache on user objects. The ids never
+#   change once stored, but deleting them, e.g. when retiring users, only removes them from the cache of the
+#   process which deletes them. The cache is disabled when 0.
+ANONYMOUS_USER_ID_CACHE_SIZE = 0
+
 DISCUSSION_RATELIMIT = '100/m'
 SKIP_RATE_LIMIT_ON_ACCOUNT_AFTER_DAYS = 0
 
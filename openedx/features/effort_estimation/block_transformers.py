@@ -10,6 +10,7 @@ import lxml.html
 from django.utils.functional import cached_property
 from edxval.api import get_videos_for_course
 
+from openedx.core.djangoapps.content.block_structure.exceptions import IncrementalCollectNotSupported
 from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
 from openedx.core.lib.mobile_utils import is_request_from_mobile_app
 
@@ -34,6 +35,7 @@ class EffortEstimationTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     # Public xblock field names
     EFFORT_ACTIVITIES = 'effort_activities'
@@ -75,7 +77,7 @@ class EffortEstimationTransformer(BlockStructureTransformer):
         }
 
         try:
-            for block_key in block_structure.topological_traversal():
+            for block_key in block_structure.xblock_topological_traversal():
                 xblock = block_structure.get_xblock(block_key)
 
                 if xblock.category in collections:
@@ -87,6 +89,16 @@ class EffortEstimationTransformer(BlockStructureTransformer):
             # course at all. Better no estimate than a misleading estimate.
             block_structure.set_transformer_data(cls, cls.DISABLE_ESTIMATION, True)
 
+    @classmethod
+    def collect_incrementally(cls, block_structure):
+        """
+        Grabs raw estimates for changed leaf content, unless the previous collection disabled estimation, since
+        the data it was missing may belong to blocks which didn't change.
+        """
+        if block_structure.get_transformer_data(cls, cls.DISABLE_ESTIMATION, default=False):
+            raise IncrementalCollectNotSupported('Effort estimation was disabled by the previous collection.')
+        cls.collect(block_structure)
+
     @classmethod
     def _collect_html_effort(cls, block_structure, block_key, xblock, _cache):
         """Records a word count for later reading speed calculations."""
@@ -31,3 +31,12 @@ class AssetManager:
         compressed course structure from the structure cache.
         """
         return contentstore().find(asset_key, throw_on_not_found, as_stream)
+
+    @staticmethod
+    def find_all_metadata(asset_keys):
+        """
+        Finds the metadata of the course assets with the given keys in the deprecated contentstore,
+        with a single query. Returns a list of asset data dictionaries, as returned by
+        ContentStore.get_all_content_for_course, for the assets which exist.
+        """
+        return contentstore().get_all_content_for_asset_keys(asset_keys)
@@ -30,7 +30,7 @@ from lxml import etree
 
 from openedx.core.djangolib.markup import HTML, Text
 from openedx.core.lib.safe_lxml.xmlparser import XML
-from xmodule.capa import customrender, inputtypes, responsetypes, xqueue_interface
+from xmodule.capa import compiled_problem_cache, customrender, inputtypes, responsetypes, xqueue_interface
 from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.safe_exec import safe_exec
 from xmodule.capa.util import contextualize_text, convert_files_to_filenames, get_course_id_from_capa_block
@@ -72,6 +72,10 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# The student id the script code of problems is run with to check that their
+# context doesn't depend on the student, before caching it.
+CONTEXT_CACHE_PROBE_STUDENT_ID = "compiled-problem-cache-probe"
+
 log = logging.getLogger(__name__)
 
 # -----------------------------------------------------------------------------
@@ -195,23 +199,14 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        if isinstance(problem_text, str):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode("utf-8")
-        self.tree = XML(problem_text)
-
-        try:
-            self.make_xml_compatible(self.tree)
-        except Exception:
-            capa_block = self.capa_block
-            log.exception(
-                "CAPAProblemError: %s, id:%s, data: %s", capa_block.display_name, self.problem_id, capa_block.data
-            )
-            raise
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # Reuse the tree parsed from the same problem text before, if any
+        tree_cache_key = None
+        self.tree = None
+        if compiled_problem_cache.is_enabled():
+            tree_cache_key = compiled_problem_cache.cache_key("tree", problem_text)
+            self.tree = compiled_problem_cache.get(tree_cache_key)
+        if self.tree is None:
+            self._parse_problem_text(problem_text, tree_cache_key)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -244,6 +239,33 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
+    def _parse_problem_text(self, problem_text, tree_cache_key):
+        """
+        Parse the problem XML into self.tree, and cache the tree with the given
+        key unless it is None or the tree includes files.
+        """
+        # parse problem XML file into an element tree
+        if isinstance(problem_text, str):
+            # etree chokes on Unicode XML with an encoding declaration
+            problem_text = problem_text.encode("utf-8")
+        self.tree = XML(problem_text)
+
+        try:
+            self.make_xml_compatible(self.tree)
+        except Exception:
+            capa_block = self.capa_block
+            log.exception(
+                "CAPAProblemError: %s, id:%s, data: %s", capa_block.display_name, self.problem_id, capa_block.data
+            )
+            raise
+
+        # Included files can change independently of the problem text.
+        if tree_cache_key is not None and self.tree.find(".//include") is None:
+            compiled_problem_cache.set(tree_cache_key, self.tree)
+
+        # handle any <include file="foo"> tags
+        self._process_includes()
+
     @property
     def is_grading_method_enabled(self) -> bool:
         """
@@ -918,6 +940,7 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
         all_code = ""
 
         python_path = []
+        system_path = []
 
         for script in tree.findall(".//script"):
 
@@ -930,6 +953,7 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
             # TODO: evaluate only python
 
             for d in self._extract_system_path(script):
+                system_path.append(d)
                 if d not in python_path and os.path.exists(d):
                     python_path.append(d)
 
@@ -938,6 +962,7 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
             all_code += code
 
         extra_files = []
+        context_cache_key = None
         if all_code:
             # An asset named python_lib.zip can be imported by Python code.
             zip_lib = self.capa_system.get_python_lib_zip()
@@ -945,27 +970,66 @@ class LoncapaProblem:  # pylint: disable=too-many-public-methods,too-many-instan
                 extra_files.append(("python_lib.zip", zip_lib))
                 python_path.append("python_lib.zip")
 
-            try:
+            limit_overrides_context = get_course_id_from_capa_block(self.capa_block)
+            unsafely = self.capa_system.can_execute_unsafe_code()
+
+            # The context only depends on the code, its path, the seed and how the code
+            # is run, unless the code uses the student id, or imports python_lib.zip which
+            # can change independently of the problem.
+            user_dependent_cache_key = None
+            if compiled_problem_cache.is_enabled() and not extra_files and "anonymous_student_id" not in all_code:
+                cache_key_args = (
+                    all_code, self.seed, tuple(system_path), tuple(python_path), limit_overrides_context, unsafely
+                )
+                context_cache_key = compiled_problem_cache.cache_key("context", *cache_key_args)
+                user_dependent_cache_key = compiled_problem_cache.cache_key("user_dependent_context", *cache_key_args)
+                cached_context = compiled_problem_cache.get(context_cache_key)
+                if cached_context is not None:
+                    cached_context["anonymous_student_id"] = self.capa_system.anonymous_student_id
+                    return cached_context
+                if compiled_problem_cache.get(user_dependent_cache_key):
+                    context_cache_key = None
+
+            def exec_code(code_context):
                 safe_exec(
                     all_code,
-                    context,
+                    code_context,
                     random_seed=self.seed,
                     python_path=python_path,
                     extra_files=extra_files,
                     cache=self.capa_system.cache,
-                    limit_overrides_context=get_course_id_from_capa_block(self.capa_block),
+                    limit_overrides_context=limit_overrides_context,
                     slug=self.problem_id,
-                    unsafely=self.capa_system.can_execute_unsafe_code(),
+                    unsafely=unsafely,
                 )
+
+            try:
+                exec_code(context)
             except Exception as err:
                 log.exception("Error while execing script code: %s", all_code)
                 msg = Text(f"Error while executing script code: {err}")
                 raise responsetypes.LoncapaProblemError(msg)
 
+            # Code can get the student id in ways no text search can find, so the context
+            # is only cached if running the code for another student gives the same context.
+            if context_cache_key is not None:
+                other_context = {"seed": self.seed, "anonymous_student_id": CONTEXT_CACHE_PROBE_STUDENT_ID}
+                try:
+                    exec_code(other_context)
+                except Exception:  # pylint: disable=broad-except
+                    other_context = None
+                else:
+                    other_context["anonymous_student_id"] = context["anonymous_student_id"]
+                if other_context != context:
+                    compiled_problem_cache.set(user_dependent_cache_key, True)
+                    context_cache_key = None
+
         # Store code source in context, along with the Python path needed to run it correctly.
         context["script_code"] = all_code
         context["python_path"] = python_path
         context["extra_files"] = extra_files or None
+        if context_cache_key is not None:
+            compiled_problem_cache.set(context_cache_key, context)
         return context
 
     def _extract_html(  # private
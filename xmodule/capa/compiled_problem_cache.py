@@ -0,0 +1,84 @@
+"""
+A process-local cache of the user-independent results of compiling capa
+problems: the XML trees parsed from problem texts, and the contexts produced
+by executing the scripts of problems with a given seed.
+
+Compiling a problem mutates both its tree and its context, so copies of them
+are stored in the cache, and copies are returned from it. The cache is sized
+by settings.CAPA_COMPILED_PROBLEM_CACHE_SIZE, and disabled when it is 0.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+
+from django.conf import settings
+
+# Part of the keys of the cache. Change it whenever the trees or contexts that
+# LoncapaProblem compiles from a problem text change.
+CAPA_COMPILED_PROBLEM_VERSION = 1
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_size():
+    """
+    Returns the maximum number of entries of the cache, 0 when it is disabled.
+    """
+    return getattr(settings, "CAPA_COMPILED_PROBLEM_CACHE_SIZE", 0)
+
+
+def is_enabled():
+    """
+    Returns whether the compiled problem cache is enabled.
+    """
+    return _max_size() > 0
+
+
+def cache_key(kind, problem_text, *args):
+    """
+    Returns the key of the `kind` of compiled data of a problem text, for the given other arguments.
+    """
+    if isinstance(problem_text, str):
+        problem_text = problem_text.encode("utf-8")
+    text_hash = hashlib.sha1(problem_text).hexdigest()
+    return (kind, CAPA_COMPILED_PROBLEM_VERSION, text_hash) + args
+
+
+def get(key):
+    """
+    Returns a copy of the value cached with `key`, or None.
+    """
+    if not is_enabled():
+        return None
+    with _lock:
+        value = _entries.get(key)
+        if value is None:
+            return None
+        _entries.move_to_end(key)
+    return deepcopy(value)
+
+
+def set(key, value):  # pylint: disable=redefined-builtin
+    """
+    Caches a copy of `value` with `key`, evicting the least recently used values beyond the size of the cache.
+    """
+    max_size = _max_size()
+    if max_size <= 0:
+        return
+    value = deepcopy(value)
+    with _lock:
+        _entries[key] = value
+        _entries.move_to_end(key)
+        while len(_entries) > max_size:
+            _entries.popitem(last=False)
+
+
+def clear():
+    """
+    Removes all the values from the cache.
+    """
+    with _lock:
+        _entries.clear()
@@ -2072,6 +2072,7 @@ class CustomResponse(LoncapaResponse):
         "formulaequationinput",
     ]
     code = None
+    cfn = None
     expect = None
 
     # Standard amount for partial credit if not otherwise specified:
@@ -2109,28 +2110,14 @@ class CustomResponse(LoncapaResponse):
                 # and invoke the function with the data needed.
                 def make_check_function(script_code, cfn):
                     def check_function(expect, ans, **kwargs):
-                        extra_args = "".join(f", {k}={k}" for k in kwargs)
-                        code = f"{script_code}\ncfn_return = {cfn}(expect, ans{extra_args})\n"
-                        globals_dict = {
-                            "expect": expect,
-                            "ans": ans,
-                        }
-                        globals_dict.update(kwargs)
-                        safe_exec(
-                            code,
-                            globals_dict,
-                            python_path=self.context["python_path"],
-                            extra_files=self.context["extra_files"],
-                            limit_overrides_context=get_course_id_from_capa_block(self.capa_block),
-                            slug=self.id,
-                            random_seed=self.context["seed"],
-                            unsafely=self.capa_system.can_execute_unsafe_code(),
-                        )
-                        return globals_dict["cfn_return"]
+                        job = self._check_function_job(script_code, cfn, expect, ans, kwargs)
+                        safe_exec(**job)
+                        return job["globals_dict"]["cfn_return"]
 
                     return check_function
 
                 self.code = make_check_function(self.context["script_code"], cfn)
+                self.cfn = cfn
 
         if not self.code:
             if answer is None:
@@ -2144,6 +2131,51 @@ class CustomResponse(LoncapaResponse):
                 else:
                     self.code = answer.text
 
+    def _check_function_job(self, script_code, cfn, expect, ans, kwargs):
+        """
+        Returns the keyword arguments of the `safe_exec` call which runs the
+        check function `cfn` defined in `script_code` on the answer `ans`.
+        """
+        extra_args = "".join(f", {k}={k}" for k in kwargs)
+        code = f"{script_code}\ncfn_return = {cfn}(expect, ans{extra_args})\n"
+        globals_dict = {
+            "expect": expect,
+            "ans": ans,
+        }
+        globals_dict.update(kwargs)
+        return {
+            "code": code,
+            "globals_dict": globals_dict,
+            "cache": self.capa_system.cache,
+            "python_path": self.context["python_path"],
+            "extra_files": self.context["extra_files"],
+            "limit_overrides_context": get_course_id_from_capa_block(self.capa_block),
+            "slug": self.id,
+            "random_seed": self.context["seed"],
+            "unsafely": self.capa_system.can_execute_unsafe_code(),
+        }
+
+    def get_check_function_job(self, student_answers):
+        """
+        Returns the keyword arguments of the `safe_exec` call which grading
+        `student_answers` with the "cfn" check function would make, so that
+        callers can run it ahead of time and leave the result in the cache.
+
+        Returns None if there is no such call to make: the response has no
+        "cfn", passes it extra arguments from the grading context, or the
+        answers are missing or empty.
+        """
+        if self.cfn is None or self.xml.get("cfn_extra_args"):
+            return None
+        idset = sorted(self.answer_ids, key=lambda x: int(x.split("_")[-1]))
+        if not all(k in student_answers for k in idset):
+            return None
+        submission = [student_answers[k] for k in idset]
+        if len(idset) == 1 and not submission[0]:
+            return None
+        answer_given = submission[0] if (len(idset) == 1) else submission
+        return self._check_function_job(self.context["script_code"], self.cfn, self.expect, answer_given, {})
+
     def get_score(self, student_answers):  # pylint: disable=too-many-locals
         """
         student_answers is a dict with everything from request.POST, but with the first part
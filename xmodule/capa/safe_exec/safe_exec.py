@@ -4,6 +4,7 @@ import copy
 import hashlib
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from typing import assert_type
 
@@ -13,7 +14,7 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from django.conf import settings
 from django.dispatch import receiver
 from django.test.signals import setting_changed
-from edx_django_utils.monitoring import function_trace, record_exception, set_custom_attribute
+from edx_django_utils.monitoring import accumulate, function_trace, record_exception, set_custom_attribute
 
 from . import lazymod
 from .remote_exec import get_remote_exec, is_codejail_in_darklaunch, is_codejail_rest_service_enabled
@@ -106,6 +107,17 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj).encode())
 
 
+def safe_exec_cache_key(code, globals_dict, random_seed):
+    """
+    Returns the key of the results of executing `code` with `globals_dict` and
+    `random_seed` in the caches given to safe_exec.
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code).encode("utf-8"))
+    update_hash(md5er, json_safe(globals_dict))
+    return f"safe_exec.{random_seed!r}.{md5er.hexdigest()}"
+
+
 @function_trace("safe_exec")
 def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-locals,too-many-positional-arguments,too-many-statements
     code,
@@ -151,11 +163,7 @@ def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode("utf-8"))
-        update_hash(md5er, safe_globals)
-        key = f"safe_exec.{random_seed!r}.{md5er.hexdigest()}"
+        key = safe_exec_cache_key(code, globals_dict, random_seed)
         cached = cache.get(key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
@@ -297,6 +305,84 @@ def safe_exec(  # pylint: disable=too-many-arguments,too-many-branches,too-many-
         raise exception
 
 
+@function_trace("safe_exec_many")
+def safe_exec_many(jobs, cache=None, max_workers=None):
+    """
+    Execute many pieces of python code safely, for instance the check
+    function of a problem with the answers of many students.
+
+    `jobs` is a list of dicts of the keyword arguments of `safe_exec` for each
+    execution, except `cache`. As with `safe_exec`, the changes made by the code
+    to the globals of a job are visible in its `globals_dict` once this function
+    returns.
+
+    `cache` is used like in `safe_exec`: jobs whose results are in the cache
+    aren't executed, and the results of the other jobs are added to it. Jobs
+    with the same code, globals and random seed are only executed once.
+
+    The distinct jobs are executed concurrently, by at most `max_workers`
+    threads (settings.CODE_JAIL_BATCH_MAX_WORKERS by default).
+
+    Returns a list with the exception raised by each job, or None.
+    """
+    exceptions = [None] * len(jobs)
+    jobs_by_key = {}
+    for index, job in enumerate(jobs):
+        key = safe_exec_cache_key(job["code"], job["globals_dict"], job.get("random_seed"))
+        jobs_by_key.setdefault(key, []).append(index)
+
+    # Look the results up in the cache, from this thread since caches might not be thread-safe.
+    keys_to_execute = []
+    for key, indexes in jobs_by_key.items():
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            keys_to_execute.append(key)
+            continue
+        emsg, cleaned_results = cached
+        for index in indexes:
+            jobs[index]["globals_dict"].update(copy.deepcopy(cleaned_results))
+            exceptions[index] = SafeExecException(emsg) if emsg else None
+
+    def execute(key):
+        """
+        Executes the first job with the given key, and returns the exception it raised, or None.
+        """
+        try:
+            safe_exec(**jobs[jobs_by_key[key][0]])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return e
+        return None
+
+    if keys_to_execute:
+        max_workers = max_workers or settings.CODE_JAIL_BATCH_MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keys_to_execute))) as executor:
+            key_exceptions = list(executor.map(execute, keys_to_execute))
+
+        for key, exception in zip(keys_to_execute, key_exceptions):
+            first_index, *duplicate_indexes = jobs_by_key[key]
+            exceptions[first_index] = exception
+            cleaned_results = json_safe(jobs[first_index]["globals_dict"])
+            for index in duplicate_indexes:
+                jobs[index]["globals_dict"].update(copy.deepcopy(cleaned_results))
+                exceptions[index] = exception
+
+            # Like safe_exec, don't cache the results of unexpected errors.
+            if cache and (exception is None or isinstance(exception, SafeExecException)):
+                cache.set(key, (str(exception) if exception else None, cleaned_results))
+
+    # .. custom_attribute_name: safe_exec_many.jobs
+    # .. custom_attribute_description: Number of jobs given to safe_exec_many.
+    accumulate("safe_exec_many.jobs", len(jobs))
+    # .. custom_attribute_name: safe_exec_many.cache_hits
+    # .. custom_attribute_description: Number of distinct jobs given to safe_exec_many whose results were cached.
+    accumulate("safe_exec_many.cache_hits", len(jobs_by_key) - len(keys_to_execute))
+    # .. custom_attribute_name: safe_exec_many.executed
+    # .. custom_attribute_description: Number of jobs executed by safe_exec_many, which excludes
+    #   the cached and duplicate jobs.
+    accumulate("safe_exec_many.executed", len(keys_to_execute))
+    return exceptions
+
+
 def _compile_normalizers(normalizer_setting):
     """
     Compile emsg normalizer search/replace pairs into regex.
@@ -20,7 +20,7 @@ from six import unichr
 from six.moves import range
 
 from openedx.core.djangolib.testing.utils import skip_unless_lms
-from xmodule.capa.safe_exec import safe_exec, update_hash
+from xmodule.capa.safe_exec import safe_exec, safe_exec_many, update_hash
 from xmodule.capa.safe_exec.remote_exec import (
     is_codejail_in_darklaunch,
     is_codejail_rest_service_enabled,
@@ -654,6 +654,57 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail(f"Tried executing code with non-ASCII unicode: {code}")
 
 
+@UseUnsafeCodejail()
+class TestSafeExecMany(unittest.TestCase):
+    """Test the batch execution of code with safe_exec_many."""
+
+    def test_results(self):
+        """Test that each job gets its own results and exceptions."""
+        jobs = [
+            {"code": "b = a * 2", "globals_dict": {"a": 1}, "random_seed": 1},
+            {"code": "b = a * 2", "globals_dict": {"a": 2}, "random_seed": 1},
+            {"code": "b = a / 0", "globals_dict": {"a": 3}, "random_seed": 1},
+        ]
+        exceptions = safe_exec_many(jobs, max_workers=2)
+        assert [job["globals_dict"].get("b") for job in jobs] == [2, 4, None]
+        assert exceptions[:2] == [None, None]
+        assert isinstance(exceptions[2], SafeExecException)
+        assert "ZeroDivisionError" in str(exceptions[2])
+
+    def test_duplicate_jobs_executed_once(self):
+        """Test that jobs with the same code, globals and seed are only executed once."""
+        jobs = [{"code": "b = a + 1", "globals_dict": {"a": 1}, "random_seed": 1} for __ in range(3)]
+        with patch("xmodule.capa.safe_exec.safe_exec.safe_exec", wraps=safe_exec) as mock_safe_exec:
+            safe_exec_many(jobs)
+        assert mock_safe_exec.call_count == 1
+        assert [job["globals_dict"]["b"] for job in jobs] == [2, 2, 2]
+        assert jobs[1]["globals_dict"] is not jobs[2]["globals_dict"]
+
+    def test_cache(self):
+        """Test that cached results aren't executed again, and that new results are cached."""
+        cache = {}
+        jobs = [{"code": "b = a + 1", "globals_dict": {"a": a}} for a in range(2)]
+        safe_exec_many(jobs, cache=DictCache(cache))
+        assert sorted(cache.values(), key=lambda value: value[1]["a"]) == [
+            (None, {"a": 0, "b": 1}),
+            (None, {"a": 1, "b": 2}),
+        ]
+
+        # A result from safe_exec_many is a hit for safe_exec.
+        g = {"a": 1}
+        with patch("xmodule.capa.safe_exec.safe_exec.codejail_not_safe_exec") as mock_exec:
+            safe_exec("b = a + 1", g, cache=DictCache(cache))
+        mock_exec.assert_not_called()
+        assert g["b"] == 2
+
+        jobs = [{"code": "b = a + 1", "globals_dict": {"a": a}} for a in range(3)]
+        with patch("xmodule.capa.safe_exec.safe_exec.safe_exec", wraps=safe_exec) as mock_safe_exec:
+            safe_exec_many(jobs, cache=DictCache(cache))
+        assert mock_safe_exec.call_count == 1
+        assert [job["globals_dict"]["b"] for job in jobs] == [1, 2, 3]
+        assert len(cache) == 3
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
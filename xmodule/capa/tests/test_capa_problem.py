@@ -14,8 +14,10 @@ from lxml import etree
 from markupsafe import Markup
 
 from openedx.core.djangolib.markup import HTML
+from xmodule.capa import compiled_problem_cache
 from xmodule.capa.correctmap import CorrectMap
 from xmodule.capa.responsetypes import LoncapaProblemError
+from xmodule.capa.safe_exec import safe_exec
 from xmodule.capa.tests.helpers import new_loncapa_problem
 from xmodule.capa.tests.test_util import UseUnsafeCodejail
 
@@ -852,3 +854,79 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
             with self.assertRaises(Exception):
                 problem.get_grade_from_current_answers(None, correct_map)
             responder_mock.evaluate_answers.assert_not_called()
+
+
+@UseUnsafeCodejail()
+@override_settings(CAPA_COMPILED_PROBLEM_CACHE_SIZE=10)
+class CompiledProblemCacheTest(unittest.TestCase):
+    """
+    Tests for the cache of the compiled parts of problems, see CAPA_COMPILED_PROBLEM_CACHE_SIZE.
+    """
+
+    XML = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+        answer = random.randint(0, 1000)
+            </script>
+            <numericalresponse answer="$answer">
+                <formulaequationinput/>
+            </numericalresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super().setUp()
+        compiled_problem_cache.clear()
+        self.addCleanup(compiled_problem_cache.clear)
+
+    def _new_problem(self, **kwargs):
+        """
+        Returns a new problem, and the number of times scripts were executed to create it.
+        """
+        with patch("xmodule.capa.capa_problem.safe_exec", wraps=safe_exec) as mock_safe_exec:
+            problem = new_loncapa_problem(self.XML, **kwargs)
+        return problem, mock_safe_exec.call_count
+
+    def test_compiled_parts_are_reused(self):
+        # The scripts are run a second time to check that the context doesn't depend on the student.
+        problem, exec_count = self._new_problem(problem_id="1")
+        assert exec_count == 2
+
+        other_problem, exec_count = self._new_problem(problem_id="2")
+        assert exec_count == 0
+        assert other_problem.context["answer"] == problem.context["answer"]
+        assert other_problem.tree is not problem.tree
+        assert other_problem.tree.find(".//numericalresponse").get("id") == "2_1"
+        assert problem.tree.find(".//numericalresponse").get("id") == "1_1"
+
+    def test_seed_is_part_of_the_key(self):
+        __, exec_count = self._new_problem(seed=1)
+        assert exec_count == 2
+        __, exec_count = self._new_problem(seed=2)
+        assert exec_count == 2
+
+    @override_settings(CAPA_COMPILED_PROBLEM_CACHE_SIZE=0)
+    def test_disabled(self):
+        __, exec_count = self._new_problem()
+        assert exec_count == 1
+        __, exec_count = self._new_problem()
+        assert exec_count == 1
+
+    def test_student_id_scripts_are_not_cached(self):
+        self.XML = self.XML.replace("random.randint(0, 1000)", "len(anonymous_student_id)")
+        __, exec_count = self._new_problem()
+        assert exec_count == 1
+        __, exec_count = self._new_problem()
+        assert exec_count == 1
+
+    def test_indirect_student_id_scripts_are_not_cached(self):
+        self.XML = self.XML.replace("random.randint(0, 1000)", "len(globals()['anonymous_' + 'student_id'])")
+        problem, exec_count = self._new_problem()
+        assert exec_count == 2
+        assert problem.context["answer"] == len(problem.capa_system.anonymous_student_id)
+        __, exec_count = self._new_problem()
+        assert exec_count == 1
+
+    def test_bytes_problem_text_key(self):
+        assert compiled_problem_cache.cache_key("tree", self.XML.encode("utf-8")) ==\
+            compiled_problem_cache.cache_key("tree", self.XML)
@@ -4,9 +4,11 @@ import logging
 import os
 import re
 import uuid
+from collections import namedtuple
 from io import BytesIO
 from urllib.parse import parse_qsl, quote_plus, urlencode, urlparse, urlunparse
 
+from edx_django_utils.cache import RequestCache
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import AssetKey, CourseKey
 from opaque_keys.edx.locator import AssetLocator, LibraryLocatorV2
@@ -23,6 +25,51 @@ XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
 STREAM_DATA_CHUNK_SIZE = 1024
 VERSIONED_ASSETS_PREFIX = '/assets/courseware'
 VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
+ASSET_METADATA_CACHE_NAMESPACE = 'contentstore.asset_metadata'
+
+
+class StaticContentMetadata(namedtuple('StaticContentMetadata', [
+    'location', 'name', 'content_type', 'content_digest', 'length', 'locked', 'last_modified_at',
+])):
+    """
+    The metadata of a piece of content, without its data.
+
+    This is all that's needed to redirect, authorize and answer conditional
+    requests for the content, so it is cached separately from the data, and
+    for any size of content.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_content(cls, content):
+        """
+        Returns the metadata of the given StaticContent.
+        """
+        return cls(
+            location=content.location,
+            name=content.name,
+            content_type=content.content_type,
+            content_digest=getattr(content, 'content_digest', None),
+            length=content.length,
+            locked=getattr(content, 'locked', False),
+            last_modified_at=content.last_modified_at,
+        )
+
+    @classmethod
+    def from_asset(cls, asset):
+        """
+        Returns the metadata of the given asset data dictionary, as returned
+        by ContentStore.get_all_content_for_course.
+        """
+        return cls(
+            location=asset['asset_key'],
+            name=asset.get('displayname'),
+            content_type=asset.get('contentType'),
+            content_digest=asset.get('custom_md5'),
+            length=asset.get('length'),
+            locked=asset.get('locked', False),
+            last_modified_at=asset.get('uploadDate'),
+        )
 
 
 class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -221,6 +268,56 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         """
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
+    @staticmethod
+    def prefetch_asset_metadata(course_key, paths):
+        """
+        Looks up the metadata needed by get_canonicalized_asset_path for the assets
+        at the given paths, including those in their query parameters, with a single
+        query, and keeps it for the rest of the request.
+
+        Args:
+            course_key: key to the course which owns the assets
+            paths: the paths to said content
+        """
+        asset_keys = []
+        for path in paths:
+            _, _, relative_path, _, query_string, _ = urlparse(path)
+            asset_keys.append(StaticContent.get_asset_key_from_path(course_key, relative_path))
+            for _, query_val in parse_qsl(query_string):
+                if query_val.startswith("/static/"):
+                    asset_keys.append(StaticContent.get_asset_key_from_path(course_key, urlparse(query_val).path))
+
+        request_cache = RequestCache(ASSET_METADATA_CACHE_NAMESPACE)
+        asset_keys = [
+            asset_key for asset_key in asset_keys
+            if not request_cache.get_cached_response(str(asset_key)).is_found
+        ]
+        if not asset_keys:
+            return
+
+        found_metadata = {
+            str(asset['asset_key']): StaticContentMetadata.from_asset(asset)
+            for asset in AssetManager.find_all_metadata(asset_keys)
+        }
+        for asset_key in asset_keys:
+            # Missing assets are cached as None, so that they aren't looked up again.
+            request_cache.set(str(asset_key), found_metadata.get(str(asset_key)))
+
+    @staticmethod
+    def get_asset_metadata(asset_key):
+        """
+        Returns the StaticContentMetadata of the asset with the given key, from the
+        metadata looked up by prefetch_asset_metadata if any, or else from the contentstore.
+
+        Raises NotFoundError if the asset doesn't exist.
+        """
+        cached_response = RequestCache(ASSET_METADATA_CACHE_NAMESPACE).get_cached_response(str(asset_key))
+        if cached_response.is_found:
+            if cached_response.value is None:
+                raise NotFoundError(asset_key)
+            return cached_response.value
+        return StaticContentMetadata.from_content(AssetManager.find(asset_key, as_stream=True))
+
     @staticmethod
     def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
         """
@@ -247,9 +344,9 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         serve_from_cdn = False
         content_digest = None
         try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
+            metadata = StaticContent.get_asset_metadata(asset_key)
+            serve_from_cdn = not metadata.locked
+            content_digest = metadata.content_digest
         except (ItemNotFoundError, NotFoundError):
             # If we can't find the item, just treat it as if it's locked.
             serve_from_cdn = False
@@ -294,6 +391,12 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -314,9 +417,19 @@ class StaticContentStream(StaticContent):  # lint-amnesty, pylint: disable=missi
                          length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
+    @property
+    def chunk_size(self):
+        """
+        The size of the reads from the underlying stream: the chunk size of GridFS
+        files, so that each read maps to a single chunk, or STREAM_DATA_CHUNK_SIZE.
+        """
+        return getattr(self._stream, 'chunk_size', None) or STREAM_DATA_CHUNK_SIZE
+
     def stream_data(self):
+        chunk_size = self.chunk_size
+        self._stream.seek(0)
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._stream.read(chunk_size)
             if len(chunk) == 0:
                 break
             yield chunk
@@ -325,17 +438,24 @@ class StaticContentStream(StaticContent):  # lint-amnesty, pylint: disable=missi
         """
         Stream the data between first_byte and last_byte (included)
         """
+        chunk_size = self.chunk_size
         self._stream.seek(first_byte)
         position = first_byte
-        while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
-                chunk = self._stream.read(last_byte - position + 1)
-                yield chunk
+        while position <= last_byte:
+            # Read up to the end of the current chunk, so that the following reads are chunk-aligned.
+            chunk = self._stream.read(min(chunk_size - position % chunk_size, last_byte - position + 1))
+            if len(chunk) == 0:
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            position += len(chunk)
             yield chunk
 
+    def read(self, size=-1):
+        """
+        Read up to `size` bytes from the current position of the underlying stream,
+        so that the content can be copied like a file object.
+        """
+        return self._stream.read(size)
+
     def close(self):
         self._stream.close()
 
@@ -373,6 +493,13 @@ class ContentStore:
         '''
         raise NotImplementedError
 
+    def get_all_content_for_asset_keys(self, asset_keys):
+        '''
+        Returns a list of the asset data dictionaries, in the format returned by
+        get_all_content_for_course, of the static assets with the given keys which exist.
+        '''
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -6,12 +6,18 @@ MongoDB/GridFS-level code for the contentstore.
 import hashlib
 import json
 import os
+import tarfile
+import time
+from contextlib import closing
+from datetime import datetime, timezone
 
 import gridfs
 import pymongo
+from bson.objectid import ObjectId
 from bson.son import SON
 from fs.osfs import OSFS
 from gridfs.errors import NoFile, FileExists
+from pymongo.errors import DuplicateKeyError
 from opaque_keys.edx.keys import AssetKey
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
@@ -31,12 +37,15 @@ class MongoContentStore(ContentStore):
 
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, shared_blobs=False,
+        **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param shared_blobs: whether the data of saved and copied assets is stored in blobs shared by all the
+            assets with the same content, rather than copied into each asset. See `_save_as_blob`.
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         self.connection_params = {
@@ -49,6 +58,7 @@ class MongoContentStore(ContentStore):
             **kwargs
         }
         self.bucket = bucket
+        self.shared_blobs = shared_blobs
         self.do_connection()
 
     def do_connection(self):
@@ -61,6 +71,8 @@ class MongoContentStore(ContentStore):
 
         self.fs_files = mongo_db[self.bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[self.bucket + ".chunks"]
+        # the reference-counted blobs holding the data shared by assets with the same content
+        self.blobs = mongo_db[self.bucket + ".blobs"]
 
     def close_connections(self):
         """
@@ -106,22 +118,36 @@ class MongoContentStore(ContentStore):
         elif collections:
             self.fs_files.drop()
             self.chunks.drop()
+            self.blobs.drop()
         else:
             self.fs_files.remove({})
             self.chunks.remove({})
+            self.blobs.remove({})
 
         if connections:
             self.close_connections()
 
     def save(self, content):
         content_id, content_son = self.asset_db_key(content.location)
+        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None  # lint-amnesty, pylint: disable=line-too-long
+
+        # Assets whose id still holds the chunks of a shared blob can't have chunks of their own.
+        if self.shared_blobs or self._has_blob_chunks(content_id):
+            self._save_as_blob(
+                content, content_id,
+                filename=str(content.location), contentType=content.content_type,
+                displayname=content.name, content_son=content_son,
+                thumbnail_location=thumbnail_location,
+                import_path=content.import_path,
+                locked=getattr(content, 'locked', False),
+            )
+            return content
 
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
         self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
-        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None  # lint-amnesty, pylint: disable=line-too-long
         with self.fs.new_file(_id=content_id, filename=str(content.location), content_type=content.content_type,  # lint-amnesty, pylint: disable=line-too-long
                               displayname=content.name, content_son=content_son,
                               thumbnail_location=thumbnail_location,
@@ -152,25 +178,160 @@ class MongoContentStore(ContentStore):
 
         return content
 
+    def _save_as_blob(self, content, content_id, **attrs):
+        """
+        Save `content` as a reference to the shared blob holding its data, with the given file attributes.
+
+        Blobs are keyed by the SHA-256 digest and the length of their data, and count the assets referencing them.
+        When a blob with the same data exists, the data of `content` isn't written again: the new asset
+        only references that blob. The blob is referenced before the previous version of the asset is
+        deleted, so that saving the same data again keeps its blob.
+        """
+        data = content.data
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, bytes):
+            blob = self._add_blob_reference(self._blob_id(hashlib.sha256(data).hexdigest(), len(data)))
+            if blob is None:
+                blob = self._store_blob([data])
+        else:
+            blob = self._store_blob(data)
+
+        self.delete(content_id)
+        try:
+            self._insert_blob_file(content_id, blob, **attrs)
+        except FileExists:
+            self._release_blob(blob['_id'])
+            raise
+
+    @staticmethod
+    def _blob_id(digest, length):
+        """
+        Returns the id of the blob holding data with the given SHA-256 `digest` and `length`.
+        """
+        return f'{digest}-{length}'
+
+    def _has_blob_chunks(self, content_id):
+        """
+        Returns whether the chunks of a shared blob are stored with the id of an asset, `content_id`.
+        That's the case for the blobs created from the data of existing assets by copy_all_course_assets.
+        """
+        return self.blobs.find_one({'chunks_id': content_id}, projection=['_id']) is not None
+
+    def _add_blob_reference(self, blob_id):
+        """
+        Adds a reference to the blob with `blob_id`, and returns that blob, or None if it doesn't exist.
+        """
+        return self.blobs.find_one_and_update(
+            {'_id': blob_id}, {'$inc': {'refcount': 1}}, return_document=pymongo.ReturnDocument.AFTER
+        )
+
+    def _store_blob(self, chunks):
+        """
+        Stores the data made of `chunks` as a new blob, and returns that blob with a reference to it.
+        The existing blob with the same data is returned instead, if any.
+        """
+        chunks_id = ObjectId()
+        custom_md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        with self.fs.new_file(_id=chunks_id) as fp:
+            for chunk in chunks:
+                fp.write(chunk)
+                custom_md5.update(chunk)
+                sha256.update(chunk)
+        # Only the chunks written by GridFS are kept: the blob replaces the file they were written for.
+        blob_file = self.fs_files.find_one_and_delete({'_id': chunks_id})
+        blob = {
+            '_id': self._blob_id(sha256.hexdigest(), blob_file['length']),
+            'chunks_id': chunks_id,
+            'length': blob_file['length'],
+            'chunkSize': blob_file['chunkSize'],
+            'custom_md5': custom_md5.hexdigest(),
+            'sha256': sha256.hexdigest(),
+            'refcount': 1,
+        }
+        while True:
+            existing_blob = self._add_blob_reference(blob['_id'])
+            if existing_blob is not None:
+                self.chunks.delete_many({'files_id': chunks_id})
+                return existing_blob
+            try:
+                self.blobs.insert_one(blob)
+                return blob
+            except DuplicateKeyError:
+                # The same data was stored concurrently: reference that blob instead.
+                continue
+
+    def _release_blob(self, blob_id):
+        """
+        Removes a reference to the blob with `blob_id`, and deletes the blob once it has no references left.
+        """
+        blob = self.blobs.find_one_and_update(
+            {'_id': blob_id}, {'$inc': {'refcount': -1}}, return_document=pymongo.ReturnDocument.AFTER
+        )
+        if blob is None or blob['refcount'] > 0:
+            return
+        # The blob is kept if it was referenced again in the meantime.
+        if self.blobs.delete_one({'_id': blob_id, 'refcount': {'$lte': 0}}).deleted_count:
+            self.chunks.delete_many({'files_id': blob['chunks_id']})
+
+    def _insert_blob_file(self, content_id, blob, **attrs):
+        """
+        Inserts the GridFS file of an asset whose data is held by `blob`, with the given attributes.
+        The file has no chunks of its own. Raises FileExists if the asset already exists.
+        """
+        try:
+            self.fs_files.insert_one({
+                '_id': content_id,
+                'length': blob['length'],
+                'chunkSize': blob['chunkSize'],
+                'uploadDate': datetime.now(timezone.utc),
+                'custom_md5': blob['custom_md5'],
+                'blob_id': blob['_id'],
+                'blob_chunks_id': blob['chunks_id'],
+                **attrs,
+            })
+        except DuplicateKeyError as error:
+            raise FileExists(content_id) from error
+
+    def _get_file(self, content_id):
+        """
+        Returns the GridOut of the asset stored with `content_id`, which reads the chunks of its shared blob if it
+        references one.
+        """
+        fp = self.fs.get(content_id)
+        # Need to replace dict IDs with SON for chunk lookup to work under Python 3
+        # because field order can be different and mongo cares about the order
+        if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
+            fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+        blob_chunks_id = getattr(fp, 'blob_chunks_id', None)
+        if blob_chunks_id is not None:
+            fp._file['_id'] = blob_chunks_id  # lint-amnesty, pylint: disable=protected-access
+        return fp
+
     def delete(self, location_or_id):
         """
         Delete an asset.
         """
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
-        # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        deleted_file = self.fs_files.find_one_and_delete({'_id': location_or_id}, projection=['blob_id'])
+        # Deletes of non-existent files are considered successful. Chunks are only deleted along with their
+        # file, as the id of a deleted asset may still hold the chunks of a shared blob.
+        if deleted_file is None:
+            return
+        if 'blob_id' in deleted_file:
+            # Assets referencing a shared blob have no chunks of their own: they release their blob instead.
+            self._release_blob(deleted_file['blob_id'])
+        else:
+            self.chunks.delete_many({'files_id': location_or_id})
 
     def find(self, location, throw_on_not_found=True, as_stream=False):  # lint-amnesty, pylint: disable=arguments-differ
         content_id, __ = self.asset_db_key(location)
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
-                # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-                # because field order can be different and mongo cares about the order
-                if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                    fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+                fp = self._get_file(content_id)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -186,11 +347,7 @@ class MongoContentStore(ContentStore):
                     content_digest=getattr(fp, 'custom_md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
-                    # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-                    # because field order can be different and mongo cares about the order
-                    if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                        fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+                with self._get_file(content_id) as fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -253,13 +410,64 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.items():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+            self._add_asset_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_to_tar(self, location, tar_file, output_directory):
+        """
+        Export the asset at `location` into the open tarfile `tar_file`, at the path that `export` writes it to
+        under `output_directory`. The data of the asset is streamed from GridFS into the tarfile, chunk by chunk.
+        """
+        content = self.find(location, as_stream=True)
+        try:
+            if content.import_path is not None:
+                output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+
+            # Escape invalid char from filename.
+            export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+
+            tar_info = tarfile.TarInfo(name=os.path.normpath(output_directory + '/' + export_name))
+            tar_info.size = content.length
+            tar_info.mtime = time.time()
+            tar_file.addfile(tar_info, content)
+        finally:
+            content.close()
+
+    def export_all_for_course_to_tar(self, course_key, tar_file, output_directory):
+        """
+        Export all of this course's assets into the open tarfile `tar_file`, under output_directory.
+        Unlike export_all_for_course, nothing is written to disk.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            tar_file (tarfile.TarFile): the tarfile to add the asset files to
+            output_directory: the directory of the tarfile under which to put all the asset files
+
+        Returns:
+            dict: the attributes of the assets, which export_all_for_course writes to its policy file.
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        for asset in assets:
+            self.export_to_tar(asset['asset_key'], tar_file, output_directory)
+            self._add_asset_policy(policy, asset)
+
+        return policy
+
+    @staticmethod
+    def _add_asset_policy(policy, asset):
+        """
+        Add the exported attributes of `asset` to the assets `policy`.
+        """
+        for attr, value in asset.items():
+            if attr not in [
+                '_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'blob_id', 'blob_chunks_id'
+            ]:
+                policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -282,7 +490,7 @@ class MongoContentStore(ContentStore):
             ])
             items = self.fs_files.find(query)
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self.delete(self.make_id_son(asset))
                 assets_to_delete += 1
 
             self.fs_files.remove(query)
@@ -355,6 +563,39 @@ class MongoContentStore(ContentStore):
             asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
         return assets, count
 
+    def get_all_content_for_asset_keys(self, asset_keys):
+        '''
+        Returns a list of the asset data dictionaries, in the format returned by
+        get_all_content_for_course, of the static assets with the given keys which exist.
+
+        The assets are looked up with a single query, whatever the number of keys.
+        '''
+        asset_keys_by_id = {}
+        content_ids = []
+        for asset_key in asset_keys:
+            content_id, __ = self.asset_db_key(asset_key)
+            id_key = self._content_id_key(content_id)
+            if id_key not in asset_keys_by_id:
+                asset_keys_by_id[id_key] = asset_key
+                content_ids.append(content_id)
+        if not content_ids:
+            return []
+
+        assets = list(self.fs_files.find({'_id': {'$in': content_ids}}))
+        for asset in assets:
+            asset['asset_key'] = asset_keys_by_id[self._content_id_key(self.make_id_son(asset))]
+        return assets
+
+    @staticmethod
+    def _content_id_key(content_id):
+        """
+        Returns a hashable value identifying the given database _id, which is either
+        a string or a SON, as returned by asset_db_key.
+        """
+        if isinstance(content_id, str):
+            return content_id
+        return tuple(content_id.items())
+
     def set_attr(self, asset_key, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -391,7 +632,7 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.keys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length', 'custom_md5', 'blob_id', 'blob_chunks_id']:
                 raise AttributeError(f"{attr} is a protected attribute.")
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
@@ -419,21 +660,18 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation fairly expensively copies all of the data, unless the store uses shared blobs:
+        the copied assets then reference the blobs holding the data of the source assets.
         """
         source_query = query_for_course(source_course_key)
         # it'd be great to figure out how to do all of this on the db server and not pull the bits over
         for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, str):
-                asset_key = AssetKey.from_string(asset_key)
+            source_id = self.make_id_son(asset)
+            if isinstance(source_id, str):
+                asset_key = AssetKey.from_string(source_id)
                 __, asset_key = self.asset_db_key(asset_key)
-            # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-            # because field order can be different and mongo cares about the order
-            if isinstance(source_content._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                source_content._file['_id'] = asset_key.copy()  # lint-amnesty, pylint: disable=protected-access
+            else:
+                asset_key = source_id.copy()
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -445,12 +683,92 @@ class MongoContentStore(ContentStore):
                 asset_id = str(
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
+
+            # Assets whose id still holds the chunks of a shared blob can't have chunks of their own.
+            if self.shared_blobs or self._has_blob_chunks(asset_id):
+                blob = self._share_blob(asset, source_id)
+                if blob is None:
+                    with closing(self._get_file(source_id)) as source_file:
+                        # Iterating over a GridOut yields lines, so read it a whole chunk at a time instead.
+                        blob = self._store_blob(iter(source_file.readchunk, b''))
+                self.delete(asset_id)
+                try:
+                    self._insert_blob_file(asset_id, blob, **self._copied_asset_attrs(asset, asset_key))
+                except FileExists:
+                    self._release_blob(blob['_id'])
+                    raise
+                continue
+
+            source_content = self._get_file(source_id)
             try:
                 self.create_asset(source_content, asset_id, asset, asset_key)
             except FileExists:
-                self.fs.delete(file_id=asset_id)
+                self.delete(asset_id)
                 self.create_asset(source_content, asset_id, asset, asset_key)
 
+    def _share_blob(self, asset, source_id):
+        """
+        Returns the shared blob holding the data of the source `asset`, with a new reference to it, or None if its
+        data isn't shared and can't be.
+
+        The chunks of an asset which doesn't reference a blob yet become the chunks of a new blob, without being
+        copied, unless a blob created the same way from an asset with the same md5 digest and length already
+        exists. Such assets only have an md5 digest, so their blobs are never shared with new data, which is
+        matched by its SHA-256 digest.
+        """
+        if 'blob_id' in asset:
+            return self._add_blob_reference(asset['blob_id'])
+        if not asset.get('custom_md5'):
+            return None
+
+        blob = self.blobs.find_one_and_update(
+            {'custom_md5': asset['custom_md5'], 'length': asset['length'], 'sha256': {'$exists': False}},
+            {'$inc': {'refcount': 1}},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        if blob is not None:
+            return blob
+
+        # The source asset references the blob before the blob is created, so that a concurrent deletion of the
+        # source asset never deletes the chunks of the blob. A deletion in between only leaves an extra reference.
+        blob_id = ObjectId()
+        result = self.fs_files.update_one(
+            {'_id': source_id, 'blob_id': {'$exists': False}},
+            {'$set': {'blob_id': blob_id, 'blob_chunks_id': source_id}},
+        )
+        if result.matched_count == 0:
+            # The source asset was deleted, or shared, in the meantime.
+            return None
+        blob = {
+            '_id': blob_id,
+            'chunks_id': source_id,
+            'length': asset['length'],
+            'chunkSize': asset['chunkSize'],
+            'custom_md5': asset['custom_md5'],
+            # Referenced by the source asset and its copy.
+            'refcount': 2,
+        }
+        self.blobs.insert_one(blob)
+        return blob
+
+    @staticmethod
+    def _copied_asset_attrs(asset, asset_key):
+        """
+        Returns the GridFS file attributes of the copy of `asset` as `asset_key`.
+        """
+        return {
+            'filename': asset['filename'],
+            'contentType': asset['contentType'],
+            'displayname': asset['displayname'],
+            'content_son': asset_key,
+            # thumbnail is not technically correct but will be functionally correct as the code
+            # only looks at the name which is not course relative.
+            'thumbnail_location': asset['thumbnail_location'],
+            'import_path': asset['import_path'],
+            # getattr b/c caching may mean some pickled instances don't have attr
+            'locked': asset.get('locked', False),
+        }
+
     def create_asset(self, source_content, asset_id, asset, asset_key):
         """
         Creates a new asset
@@ -482,7 +800,7 @@ class MongoContentStore(ContentStore):
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self.delete(asset_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -531,6 +849,18 @@ class MongoContentStore(ContentStore):
         return dbkey
 
     def ensure_indexes(self):
+        # Index needed by `_has_blob_chunks`.
+        create_collection_index(
+            self.blobs,
+            [('chunks_id', pymongo.ASCENDING)],
+            background=True
+        )
+        # Index needed by `_share_blob`.
+        create_collection_index(
+            self.blobs,
+            [('custom_md5', pymongo.ASCENDING), ('length', pymongo.ASCENDING)],
+            background=True
+        )
         # Index needed thru 'category' by `_get_all_content_for_course` and others. That query also takes a sort
         # which can be `uploadDate`, `displayname`,
         # TODO: uncomment this line once this index in prod is cleaned up. See OPS-2863 for tracking clean up.
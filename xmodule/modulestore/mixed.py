@@ -616,6 +616,17 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    def get_changed_block_keys(self, course_key, previous_version):
+        """
+        Returns the set of usage keys of the course's blocks which were added or changed
+        since the given previous version of the course, or None if that can't be determined.
+        """
+        try:
+            store = self._verify_modulestore_support(course_key, 'get_changed_block_keys')
+            return store.get_changed_block_keys(course_key, previous_version)
+        except NotImplementedError:
+            return None
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
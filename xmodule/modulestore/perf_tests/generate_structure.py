@@ -0,0 +1,98 @@
+"""
+Generates synthetic split modulestore structures for performance testing.
+"""
+
+
+import datetime
+from zoneinfo import ZoneInfo
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+
+# Shape of the generated course: each chapter has SEQUENTIALS_PER_CHAPTER sequentials,
+# each sequential has VERTICALS_PER_SEQUENTIAL verticals and each vertical has
+# LEAVES_PER_VERTICAL leaf blocks.
+SEQUENTIALS_PER_CHAPTER = 5
+VERTICALS_PER_SEQUENTIAL = 5
+LEAVES_PER_VERTICAL = 4
+LEAF_BLOCK_TYPES = ('html', 'problem', 'video', 'discussion')
+
+
+def _make_block(block_type, structure_id, edited_on, children=None):
+    """
+    Return a BlockData with fields looking like the ones of a real course block.
+    """
+    fields = {
+        'display_name': f'Synthetic {block_type}',
+    }
+    if children is not None:
+        fields['children'] = children
+    return BlockData(
+        block_type=block_type,
+        fields=fields,
+        definition=ObjectId(),
+        defaults={},
+        asides={},
+        edit_info={
+            'edited_on': edited_on,
+            'edited_by': 'perf_test',
+            'previous_version': None,
+            'update_version': structure_id,
+            'source_version': None,
+            'original_usage': None,
+            'original_usage_version': None,
+        },
+    )
+
+
+def make_structure(num_blocks):
+    """
+    Build a split modulestore structure with (approximately) `num_blocks` blocks,
+    in the same in-memory format as returned by `structure_from_mongo`.
+    """
+    structure_id = ObjectId()
+    edited_on = datetime.datetime.now(ZoneInfo("UTC"))
+    blocks = {}
+
+    blocks_per_chapter = 1 + SEQUENTIALS_PER_CHAPTER * (
+        1 + VERTICALS_PER_SEQUENTIAL * (1 + LEAVES_PER_VERTICAL)
+    )
+    chapters = []
+    for chapter_index in range(max(1, num_blocks // blocks_per_chapter)):
+        sequentials = []
+        for sequential_index in range(SEQUENTIALS_PER_CHAPTER):
+            verticals = []
+            for vertical_index in range(VERTICALS_PER_SEQUENTIAL):
+                leaves = []
+                for leaf_index in range(LEAVES_PER_VERTICAL):
+                    leaf_type = LEAF_BLOCK_TYPES[leaf_index % len(LEAF_BLOCK_TYPES)]
+                    leaf_key = BlockKey(
+                        leaf_type, f'{leaf_type}_{chapter_index}_{sequential_index}_{vertical_index}_{leaf_index}'
+                    )
+                    blocks[leaf_key] = _make_block(leaf_type, structure_id, edited_on)
+                    leaves.append(leaf_key)
+                vertical_key = BlockKey('vertical', f'vertical_{chapter_index}_{sequential_index}_{vertical_index}')
+                blocks[vertical_key] = _make_block('vertical', structure_id, edited_on, leaves)
+                verticals.append(vertical_key)
+            sequential_key = BlockKey('sequential', f'sequential_{chapter_index}_{sequential_index}')
+            blocks[sequential_key] = _make_block('sequential', structure_id, edited_on, verticals)
+            sequentials.append(sequential_key)
+        chapter_key = BlockKey('chapter', f'chapter_{chapter_index}')
+        blocks[chapter_key] = _make_block('chapter', structure_id, edited_on, sequentials)
+        chapters.append(chapter_key)
+
+    root_key = BlockKey('course', 'course')
+    blocks[root_key] = _make_block('course', structure_id, edited_on, chapters)
+
+    return {
+        '_id': structure_id,
+        'root': root_key,
+        'previous_version': None,
+        'original_version': structure_id,
+        'edited_by': 'perf_test',
+        'edited_on': edited_on,
+        'blocks': blocks,
+        'schema_version': 1,
+    }
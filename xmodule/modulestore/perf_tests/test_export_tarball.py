@@ -0,0 +1,120 @@
+"""
+Performance test comparing the export of courses to .tar.gz archives through a
+temporary directory, and straight into the archive.
+"""
+
+
+import os
+import tarfile
+import time
+import tracemalloc
+import unittest
+from shutil import rmtree
+from tempfile import NamedTemporaryFile, mkdtemp
+
+import ddt
+
+from xmodule.contentstore.content import StaticContent
+from xmodule.modulestore.tests.utils import SPLIT_MODULESTORE_SETUP, TEST_DATA_DIR
+from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+# Number of synthetic assets added to the course per test run.
+ASSET_AMOUNT_PER_TEST = (0, 10, 100)
+
+# Size, in bytes, of each synthetic asset.
+ASSET_SIZE = 1024 * 1024
+
+# Use only this course in export performance testing.
+TEST_COURSE = ('toy', )
+
+
+def _directory_size(directory):
+    """
+    Return the total size, in bytes, of the files under `directory`.
+    """
+    return sum(
+        os.path.getsize(os.path.join(dir_path, file_name))
+        for dir_path, __, file_names in os.walk(directory)
+        for file_name in file_names
+    )
+
+
+@ddt.ddt
+@unittest.skip
+class TestExportTarballTimings(unittest.TestCase):
+    """
+    This class exists to measure the duration, peak memory allocations and
+    scratch disk usage of course exports to .tar.gz archives, with and without
+    a temporary export directory.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def _export_through_directory(self, store, content_store, course_key, tarball_name):
+        """
+        Export the course to a temporary directory and compress it, as create_export_tarball does by default.
+        Return the size of the temporary directory.
+        """
+        root_dir = mkdtemp()
+        try:
+            export_course_to_xml(store, content_store, course_key, root_dir, 'exported_course')
+            scratch_size = _directory_size(root_dir)
+            with tarfile.open(name=tarball_name, mode='w:gz') as tar_file:
+                tar_file.add(os.path.join(root_dir, 'exported_course'), arcname='exported_course')
+        finally:
+            rmtree(root_dir, ignore_errors=True)
+        return scratch_size
+
+    def _export_to_tarball(self, store, content_store, course_key, tarball_name):
+        """
+        Export the course straight into the tarball. Return the size of the temporary directory, 0.
+        """
+        with tarfile.open(name=tarball_name, mode='w:gz') as tar_file:
+            export_course_to_xml(store, content_store, course_key, None, 'exported_course', tar_file=tar_file)
+        return 0
+
+    @ddt.data(*ASSET_AMOUNT_PER_TEST)
+    def test_export_tarball_timings(self, num_assets):
+        """
+        Generate export timings, peak memory allocations and scratch disk usage for both export paths.
+        """
+        with SPLIT_MODULESTORE_SETUP.build() as (content_store, store):
+            course_key = store.make_course_key('a', 'course', 'course')
+            import_course_from_xml(
+                store,
+                'test_user',
+                TEST_DATA_DIR,
+                source_dirs=TEST_COURSE,
+                static_content_store=content_store,
+                target_id=course_key,
+                create_if_not_present=True,
+                raise_on_failure=True,
+            )
+            for index in range(num_assets):
+                asset_key = StaticContent.compute_location(course_key, f'perf_asset_{index}.bin')
+                content_store.save(StaticContent(
+                    asset_key, f'perf_asset_{index}.bin', 'application/octet-stream', os.urandom(ASSET_SIZE)
+                ))
+
+            for export_path in (self._export_through_directory, self._export_to_tarball):
+                with NamedTemporaryFile(suffix='.tar.gz') as tarball:
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    scratch_size = export_path(store, content_store, course_key, tarball.name)
+                    duration = (time.perf_counter() - start) * 1000
+                    __, peak_memory = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                    print(
+                        "{}:{} assets:{} ms:{:.1f} peak_memory_kb:{} scratch_kb:{} tarball_kb:{}".format(
+                            export_path.__name__.lstrip('_'),
+                            TEST_COURSE[0],
+                            num_assets,
+                            duration,
+                            peak_memory // 1024,
+                            scratch_size // 1024,
+                            os.path.getsize(tarball.name) // 1024,
+                        )
+                    )
@@ -0,0 +1,89 @@
+"""
+Performance test for the split modulestore course structure cache.
+"""
+
+
+import time
+import unittest
+from statistics import median
+from unittest.mock import patch
+
+import ddt
+from django.core.cache.backends.locmem import LocMemCache
+
+from xmodule.modulestore.perf_tests.generate_structure import make_structure
+from xmodule.modulestore.split_mongo.mongo_connection import MongoPersistenceBackend
+from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
+
+# Number of blocks in the synthetic course structures.
+BLOCK_AMOUNT_PER_TEST = (100, 1000, 10000)
+
+# Number of timed get_structure calls per measurement.
+REPEATS = 5
+
+
+@ddt.ddt
+@unittest.skip
+class TestGetStructureTimings(unittest.TestCase):
+    """
+    This class exists to time cold and warm `get_structure` calls on synthetic
+    course structures of different sizes, including structures large enough to
+    be stored in the course structure cache as chunks.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super().setUp()
+        self.cache = LocMemCache('perf_course_structure_cache', {'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 100000}})
+        patcher = patch(
+            'xmodule.modulestore.split_mongo.mongo_connection.get_cache', return_value=self.cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db_connection = MongoPersistenceBackend(
+            db='test_structure_cache_perf',
+            collection='split',
+            host=MONGO_HOST,
+            port=MONGO_PORT_NUM,
+        )
+        self.addCleanup(self.db_connection._drop_database)  # pylint: disable=protected-access
+
+    def _time_get_structure(self, structure_id):
+        """
+        Return the duration, in milliseconds, of a single get_structure call.
+        """
+        start = time.perf_counter()
+        structure = self.db_connection.get_structure(structure_id)
+        duration = (time.perf_counter() - start) * 1000
+        assert structure is not None
+        return duration
+
+    @ddt.data(*BLOCK_AMOUNT_PER_TEST)
+    def test_get_structure_timings(self, num_blocks):
+        """
+        Generate cold (cache miss) and warm (cache hit) timings for get_structure.
+        """
+        structure = make_structure(num_blocks)
+        self.db_connection.insert_structure(structure)
+        structure_id = structure['_id']
+
+        cold_timings = []
+        warm_timings = []
+        for __ in range(REPEATS):
+            self.cache.clear()
+            cold_timings.append(self._time_get_structure(structure_id))
+            warm_timings.append(self._time_get_structure(structure_id))
+
+        manifest = self.cache.get(structure_id)
+        print(
+            "get_structure:{} blocks:{} chunks:{} cold_ms:{:.1f} warm_ms:{:.1f}".format(
+                structure_id,
+                len(structure['blocks']),
+                len(manifest['chunks']) if isinstance(manifest, dict) else 0,
+                median(cold_timings),
+                median(warm_timings),
+            )
+        )
@@ -0,0 +1,113 @@
+"""
+Performance test for the codecs used to cache split modulestore structures.
+
+By default, the courses exported in the test data directory are used. Set the
+STRUCTURE_CODEC_COURSES_DIR environment variable to a directory containing
+other exported courses (one per subdirectory) to measure real courses instead.
+"""
+
+
+import os
+import time
+import unittest
+from statistics import median
+
+import ddt
+from path import Path as path
+
+from openedx.core.lib import cache_codecs
+from xmodule.modulestore.perf_tests.generate_structure import make_structure
+from xmodule.modulestore.split_mongo.structure_codec import SplitStructureCodec
+from xmodule.modulestore.tests.utils import TEST_DATA_DIR, VersioningModulestoreBuilder
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+CODEC_NAMES = (
+    cache_codecs.ZPickleCodec.name,
+    cache_codecs.PickleCodec.name,
+    SplitStructureCodec.name,
+)
+
+# Courses to measure from the test data directory.
+TEST_COURSES = ('manual-testing-complete', 'toy', 'two_toys', 'graded')
+
+# Number of blocks in the synthetic course structures.
+BLOCK_AMOUNT_PER_TEST = (1000, 10000)
+
+# Number of timed decodes per measurement.
+REPEATS = 5
+
+TEST_DIR = path(__file__).dirname()
+PLATFORM_ROOT = TEST_DIR.parent.parent.parent
+COURSES_DIR = path(os.environ.get('STRUCTURE_CODEC_COURSES_DIR', PLATFORM_ROOT / TEST_DATA_DIR))
+
+
+def report_codec_timings(desc, structure):
+    """
+    Print the serialized size, and the median encode and decode times of structure with each codec.
+    """
+    for codec_name in CODEC_NAMES:
+        encode_timings = []
+        decode_timings = []
+        for __ in range(REPEATS):
+            start = time.perf_counter()
+            serialized = cache_codecs.dumps(structure, codec_name)
+            encode_timings.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            deserialized = cache_codecs.loads(serialized)
+            decode_timings.append((time.perf_counter() - start) * 1000)
+
+        assert deserialized == structure
+        print(
+            "{}:{} blocks:{} bytes:{} encode_ms:{:.1f} decode_ms:{:.1f}".format(
+                desc,
+                codec_name,
+                len(structure['blocks']),
+                len(serialized),
+                median(encode_timings),
+                median(decode_timings),
+            )
+        )
+
+
+@ddt.ddt
+@unittest.skip
+class TestStructureCodecs(unittest.TestCase):
+    """
+    This class exists to measure the size and the decode time of structures
+    serialized with each of the course structure cache codecs.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*BLOCK_AMOUNT_PER_TEST)
+    def test_synthetic_structures(self, num_blocks):
+        """
+        Measure synthetic course structures.
+        """
+        report_codec_timings(f'synthetic_{num_blocks}', make_structure(num_blocks))
+
+    def test_exported_courses(self):
+        """
+        Measure the structures of exported courses, once imported into split.
+        """
+        if 'STRUCTURE_CODEC_COURSES_DIR' in os.environ:
+            course_dirs = sorted(course_dir.name for course_dir in COURSES_DIR.dirs())
+        else:
+            course_dirs = TEST_COURSES
+
+        with VersioningModulestoreBuilder().build() as (source_content, source_store):
+            for course_dir in course_dirs:
+                courses = import_course_from_xml(
+                    source_store,
+                    'test_user',
+                    COURSES_DIR,
+                    source_dirs=[course_dir],
+                    static_content_store=source_content,
+                    create_if_not_present=True,
+                    raise_on_failure=True,
+                )
+                for course in courses:
+                    course_entry = source_store._lookup_course(course.id)  # pylint: disable=protected-access
+                    report_codec_timings(course_dir, course_entry.structure)
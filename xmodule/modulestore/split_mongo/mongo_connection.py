@@ -4,16 +4,16 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 
 
 import datetime
+import hashlib
 import logging
 import math
-import pickle
 import re
-import zlib
 from contextlib import contextmanager
 from time import time
 from zoneinfo import ZoneInfo
 
 from ccx_keys.locator import CCXLocator
+from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
 from django.db.transaction import TransactionManagementError
 import pymongo
@@ -26,7 +26,9 @@ from common.djangoapps.split_modulestore_django.models import SplitModulestoreCo
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import structure_codec  # pylint: disable=unused-import
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
+from openedx.core.lib import cache_codecs
 from openedx.core.lib.cache_utils import request_cached
 
 log = logging.getLogger(__name__)
@@ -194,12 +196,32 @@ def structure_to_mongo(structure, course_context=None):
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed when cached, with the
+    codec selected by the COURSE_STRUCTURE_CACHE_CODEC setting. Structures
+    cached with any codec, including the legacy zlib-compressed pickle format,
+    can always be read back.
+
+    Compressed structures which are too large to be stored as a single cache
+    value are split into content-addressed chunks. In that case, the value
+    stored under the structure key is a small manifest listing the chunk keys,
+    and the chunks are reassembled (and verified) when the structure is read.
+    Structure ids are immutable, so neither the manifest nor the chunks ever
+    need to be invalidated.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
 
+    # Only data with a size smaller than 2MB will be cached as a single value.
+    MAX_SINGLE_VALUE_SIZE = 2 * 1024 * 1024
+
+    # Size of each chunk for structures bigger than MAX_SINGLE_VALUE_SIZE. Memcached's default item size limit
+    # of 1MB also covers the key, the item header and the pickling of the value, so leave a margin for those.
+    CHUNK_SIZE = 1024 * 1024 - 64 * 1024
+
+    CHUNK_KEY_PREFIX = 'structure_chunk'
+    MANIFEST_VERSION = 1
+
     def __init__(self):
         self.cache = None
         try:
@@ -207,27 +229,91 @@ class CourseStructureCache:
         except InvalidCacheBackendError:
             pass
 
+    @classmethod
+    def _chunk_key(cls, chunk):
+        """
+        Return the content-addressed cache key for a chunk of compressed data.
+        """
+        return f'{cls.CHUNK_KEY_PREFIX}.{hashlib.sha1(chunk).hexdigest()}'
+
+    @staticmethod
+    def _is_manifest(cached_value):
+        """
+        Return True if the value read from the cache is a chunk manifest rather than the compressed data itself.
+        """
+        return isinstance(cached_value, dict) and 'chunks' in cached_value
+
+    def _read_chunks(self, manifest):
+        """
+        Reassemble the compressed data described by ``manifest``.
+
+        Returns None if any chunk is missing from the cache. Raises a ValueError
+        if the reassembled data doesn't match the manifest.
+        """
+        chunk_keys = manifest['chunks']
+        cached_chunks = self.cache.get_many(chunk_keys)
+        if len(cached_chunks) != len(set(chunk_keys)):
+            return None
+
+        data = b''.join(cached_chunks[chunk_key] for chunk_key in chunk_keys)
+        if len(data) != manifest['size'] or hashlib.sha1(data).hexdigest() != manifest['digest']:
+            raise ValueError('Reassembled structure does not match its manifest')
+        return data
+
+    def _write_chunks(self, key, data):
+        """
+        Split ``data`` into content-addressed chunks and write them to the cache,
+        followed by the manifest stored under ``key``.
+
+        The manifest is only written once all of the chunks have been written, so
+        a reader never sees a manifest pointing at chunks which were never stored.
+        """
+        chunks = {}
+        chunk_keys = []
+        for offset in range(0, len(data), self.CHUNK_SIZE):
+            chunk = data[offset:offset + self.CHUNK_SIZE]
+            chunk_key = self._chunk_key(chunk)
+            chunks[chunk_key] = chunk
+            chunk_keys.append(chunk_key)
+
+        failed_keys = self.cache.set_many(chunks)
+        if failed_keys:
+            log.warning("CourseStructureCache: Failed to store %d chunks for %s", len(failed_keys), key)
+            return
+
+        self.cache.set(key, {
+            'version': self.MANIFEST_VERSION,
+            'chunks': chunk_keys,
+            'size': len(data),
+            'digest': hashlib.sha1(data).hexdigest(),
+        })
+
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, serialized struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                compressed_data = self.cache.get(key)
+
+                if self._is_manifest(compressed_data):
+                    tagger.measure('chunks', len(compressed_data['chunks']))
+                    compressed_data = self._read_chunks(compressed_data)
+                    if compressed_data is None:
+                        # Some of the chunks were evicted, the manifest is useless now.
+                        self.cache.delete(key)
 
-                if compressed_pickled_data is None:
+                tagger.tag(from_cache=str(compressed_data is not None).lower())
+
+                if compressed_data is None:
                     # Always log cache misses, because they are unexpected
                     tagger.sample_rate = 1
                     return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
-
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
+                tagger.measure('compressed_size', len(compressed_data))
 
-                return pickle.loads(pickled_data, encoding='latin-1')
+                return cache_codecs.loads(compressed_data)
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
@@ -235,31 +321,30 @@ class CourseStructureCache:
                 return None
 
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will serialize, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
-            tagger.measure('uncompressed_size', len(pickled_data))
-
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            data_size = len(compressed_pickled_data)
+            codec_name = getattr(settings, 'COURSE_STRUCTURE_CACHE_CODEC', cache_codecs.ZPickleCodec.name)
+            tagger.tag(codec=codec_name)
+            compressed_data = cache_codecs.dumps(structure, codec_name)
+            data_size = len(compressed_data)
             tagger.measure('compressed_size', data_size)
 
             # We rely on the course structure cache default timeout, which should be
             # high by default (~ a few days).
-            total_bytes_in_one_mb = 1024 * 1024
-            if data_size < total_bytes_in_one_mb * 2:  # Only data with a size smaller than 2MB will be cached
-                self.cache.set(key, compressed_pickled_data)
+            if data_size < self.MAX_SINGLE_VALUE_SIZE:
+                self.cache.set(key, compressed_data)
             else:
+                total_bytes_in_one_mb = 1024 * 1024
                 chunk_size_in_mbs = round(data_size / total_bytes_in_one_mb, 2)
 
                 # .. custom_attribute_name: split_mongo_compressed_size_in_mbs
-                # .. custom_attribute_description: contains the data chunk size in MBs. The size on which
-                #   the memcached client failed to store value in course structure cache.
+                # .. custom_attribute_description: contains the compressed structure size in MBs, for
+                #   structures too large to be stored as a single value, which are chunked instead.
                 monitoring.set_custom_attribute('split_mongo_compressed_size_in_mbs', chunk_size_in_mbs)
+                self._write_chunks(key, compressed_data)
 
 
 class MongoPersistenceBackend:
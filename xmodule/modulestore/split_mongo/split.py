@@ -1484,6 +1484,41 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return usage_key, block.edit_info.original_usage_version
         return None, None
 
+    def get_changed_block_keys(self, course_key, previous_version):
+        """
+        Returns the set of usage keys (without branch or version) of the blocks of the
+        course's current structure which were added or changed since the given previous
+        version of the structure. Only edit_info is disregarded when comparing blocks, so
+        a block whose children changed is included, but not its ancestors.
+
+        Returns None if the previous version of the structure isn't found.
+        """
+        current_blocks = self._lookup_course(course_key).structure['blocks']
+        previous_structure = self.get_structure(course_key, course_key.as_object_id(previous_version))
+        if previous_structure is None:
+            return None
+
+        previous_blocks = previous_structure['blocks']
+        course_key = course_key.for_branch(None)
+        return {
+            course_key.make_usage_key(block_key.type, block_key.id)
+            for block_key, block in current_blocks.items()
+            if not self._is_same_block_content(block, previous_blocks.get(block_key))
+        }
+
+    @staticmethod
+    def _is_same_block_content(block, other_block):
+        """
+        Returns whether the given BlockData have the same content, disregarding their edit_info.
+        """
+        return other_block is not None and (
+            block.block_type == other_block.block_type and
+            block.definition == other_block.definition and
+            block.fields == other_block.fields and
+            block.defaults == other_block.defaults and
+            block.get_asides() == other_block.get_asides()
+        )
+
     def create_definition_from_data(self, course_key, new_def_data, category, user_id):
         """
         Pull the definition fields out of block and save to the db as a new definition
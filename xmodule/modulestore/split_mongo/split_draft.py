@@ -316,6 +316,13 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key)
         return super().get_block_original_usage(usage_key)
 
+    def get_changed_block_keys(self, course_key, previous_version):
+        """
+        See :py:meth `xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_changed_block_keys`
+        """
+        course_key = self._map_revision_to_branch(course_key)
+        return super().get_changed_block_keys(course_key, previous_version)
+
     def get_orphans(self, course_key, **kwargs):
         course_key = self._map_revision_to_branch(course_key)
         return super().get_orphans(course_key, **kwargs)
@@ -0,0 +1,111 @@
+"""
+A compact cache codec for split modulestore structures.
+"""
+
+
+import msgpack
+from bson.objectid import ObjectId
+
+from openedx.core.lib.cache_codecs import MsgpackCodec, register_codec
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+
+EXT_OBJECT_ID = 16
+EXT_BLOCK_KEY_INDEX = 17
+EXT_BLOCK_KEY = 18
+
+
+@register_codec
+class SplitStructureCodec(MsgpackCodec):
+    """
+    Serializes structures (as returned by ``structure_from_mongo``) with msgpack.
+
+    The BlockKeys of the structure's blocks are interned into a table packed
+    before the structure itself: blocks are then stored as a list in table order
+    and every reference to one of these BlockKeys (children, root, other
+    reference fields) is packed as an index into the table. Block types are
+    interned too, since courses only use a handful of them.
+
+    Anything else which msgpack can't represent makes the serialization fail,
+    in which case ``cache_codecs.dumps`` falls back to the legacy pickle format.
+    """
+    name = 'split_structure_msgpack'
+    codec_id = 16
+
+    def ext_default(self, obj, context):
+        if isinstance(obj, BlockKey):
+            index = context.get(obj)
+            if index is not None:
+                return msgpack.ExtType(EXT_BLOCK_KEY_INDEX, msgpack.packb(index))
+            return msgpack.ExtType(EXT_BLOCK_KEY, msgpack.packb([obj.type, obj.id], use_bin_type=True))
+        if isinstance(obj, ObjectId):
+            return msgpack.ExtType(EXT_OBJECT_ID, obj.binary)
+        return super().ext_default(obj, context)
+
+    def ext_hook(self, code, data, context):
+        if code == EXT_BLOCK_KEY_INDEX:
+            return context[msgpack.unpackb(data)]
+        if code == EXT_BLOCK_KEY:
+            return BlockKey(*msgpack.unpackb(data, raw=False))
+        if code == EXT_OBJECT_ID:
+            return ObjectId(data)
+        return super().ext_hook(code, data, context)
+
+    def encode(self, data):
+        block_keys = list(data['blocks'])
+        key_indexes = {block_key: index for index, block_key in enumerate(block_keys)}
+
+        block_types = []
+        block_type_indexes = {}
+        key_table = []
+        for block_key in block_keys:
+            if block_key.type not in block_type_indexes:
+                block_type_indexes[block_key.type] = len(block_types)
+                block_types.append(block_key.type)
+            key_table.append([block_type_indexes[block_key.type], block_key.id])
+
+        blocks = []
+        for block_key in block_keys:
+            block = data['blocks'][block_key]
+            blocks.append([
+                # The block type is nearly always the same as the key type.
+                None if block.block_type == block_key.type else block.block_type,
+                block.fields,
+                block.definition,
+                block.defaults,
+                block.get_asides(),
+                block.edit_info.to_storable(),
+            ])
+
+        structure = {key: value for key, value in data.items() if key != 'blocks'}
+        return (
+            self._packb([block_types, key_table], None) +
+            self._packb([structure, blocks], key_indexes)
+        )
+
+    def decode(self, encoded):
+        block_keys = []
+        unpacker = msgpack.Unpacker(
+            ext_hook=lambda code, ext_data: self.ext_hook(code, ext_data, block_keys),
+            raw=False,
+            strict_map_key=False,
+            max_buffer_size=len(encoded),
+        )
+        unpacker.feed(encoded)
+
+        block_types, key_table = next(unpacker)
+        block_keys.extend(BlockKey(block_types[type_index], block_id) for type_index, block_id in key_table)
+
+        structure, blocks = next(unpacker)
+        structure['blocks'] = {
+            block_key: BlockData(
+                block_type=block_type or block_key.type,
+                fields=fields,
+                definition=definition,
+                defaults=defaults,
+                asides=asides,
+                edit_info=edit_info,
+            )
+            for block_key, (block_type, fields, definition, defaults, asides, edit_info) in zip(block_keys, blocks)
+        }
+        return structure
@@ -3,6 +3,7 @@
 """
 
 
+import hashlib
 import logging
 import mimetypes
 import shutil
@@ -222,3 +223,112 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         assert count == len(self.course2_files)
+
+    @ddt.data(True, False)
+    def test_shared_blobs(self, deprecated):
+        """
+        Assets with the same content share a single blob, which is deleted along with its last asset
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, shared_blobs=True)  # lint-amnesty, pylint: disable=attribute-defined-outside-init
+        chunk_count = self.contentstore.chunks.count_documents({})
+        asset_keys = [
+            self.course1_key.make_asset_key('asset', 'shared.jpg'),
+            self.course2_key.make_asset_key('asset', 'shared.jpg'),
+        ]
+        for asset_key in asset_keys:
+            self.save_asset('picture1.jpg', asset_key, 'shared.jpg', False)
+
+        blob = self.contentstore.blobs.find_one()
+        assert self.contentstore.blobs.count_documents({}) == 1
+        assert blob['refcount'] == 2
+        assert self.contentstore.chunks.count_documents({}) == chunk_count + self.contentstore.chunks.count_documents(
+            {'files_id': blob['chunks_id']}
+        )
+        source = self.contentstore.find(self.course1_key.make_asset_key('asset', 'picture1.jpg'))
+        assert blob['_id'] == f'{hashlib.sha256(source.data).hexdigest()}-{len(source.data)}'
+        for asset_key in asset_keys:
+            shared = self.contentstore.find(asset_key)
+            assert shared.data == source.data
+            assert shared.content_digest == source.content_digest
+            assert b''.join(self.contentstore.find(asset_key, as_stream=True).stream_data()) == source.data
+
+        self.contentstore.delete(asset_keys[0])
+        assert self.contentstore.blobs.find_one()['refcount'] == 1
+        assert self.contentstore.find(asset_keys[1]).data == source.data
+        self.contentstore.delete(asset_keys[1])
+        assert self.contentstore.blobs.count_documents({}) == 0
+        assert self.contentstore.chunks.count_documents({}) == chunk_count
+
+    @ddt.data(True, False)
+    def test_copy_assets_with_shared_blobs(self, deprecated):
+        """
+        copy_all_course_assets shares the chunks of the source assets rather than copying them
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, shared_blobs=True)  # lint-amnesty, pylint: disable=attribute-defined-outside-init
+        chunk_count = self.contentstore.chunks.count_documents({})
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        assert self.contentstore.chunks.count_documents({}) == chunk_count
+        # The blobs of assets saved before shared blobs are matched by md5 digest, never by new data.
+        assert self.contentstore.blobs.count_documents({'sha256': {'$exists': True}}) == 0
+        self.save_asset(self.course1_files[0], dest_course.make_asset_key('asset', 'new.txt'), 'new.txt', False)
+        assert self.contentstore.blobs.count_documents({'sha256': {'$exists': True}}) == 1
+        self.contentstore.delete(dest_course.make_asset_key('asset', 'new.txt'))
+
+        source_data = {}
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            dest_key = dest_course.make_asset_key('asset', filename)
+            source = self.contentstore.find(asset_key)
+            copied = self.contentstore.find(dest_key)
+            for propname in ['name', 'content_type', 'length', 'locked', 'data', 'content_digest']:
+                assert getattr(source, propname) == getattr(copied, propname)
+            source_data[filename] = source.data
+
+        # The copies are left intact by the deletion of the source assets, and re-saving them.
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.save_asset(self.course1_files[0], self.course1_key.make_asset_key('asset', self.course1_files[0]),
+                        self.course1_files[0], False)
+        for filename in self.course1_files:
+            assert self.contentstore.find(dest_course.make_asset_key('asset', filename)).data == source_data[filename]
+
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        __, count = self.contentstore.get_all_content_for_course(self.course2_key)
+        assert count == len(self.course2_files)
+        assert self.contentstore.blobs.count_documents({}) == 0
+        assert self.contentstore.chunks.count_documents({}) == self.contentstore.chunks.count_documents(
+            {'files_id': {'$in': [asset['_id'] for asset in self.contentstore.fs_files.find()]}}
+        )
+
+    @ddt.data(True, False)
+    def test_copy_assets_without_digest_to_shared_blobs(self, deprecated):
+        """
+        copy_all_course_assets stores the data of source assets without a digest in new blobs
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, shared_blobs=True)  # lint-amnesty, pylint: disable=attribute-defined-outside-init
+        # Assets saved before the digest was recorded can't be shared in place.
+        self.contentstore.fs_files.update_many({}, {'$unset': {'custom_md5': ''}})
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        assert self.contentstore.blobs.count_documents({}) == len(self.course1_files)
+
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            assert copied.data == source.data
+            assert copied.content_digest == hashlib.md5(source.data).hexdigest()
+
+    @ddt.data(True, False)
+    def test_protected_attrs(self, deprecated):
+        """
+        The attributes identifying the data of assets can't be set
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        for attr in ['length', 'custom_md5', 'blob_id', 'blob_chunks_id']:
+            with pytest.raises(AttributeError):
+                self.contentstore.set_attrs(asset_key, {attr: 'value'})
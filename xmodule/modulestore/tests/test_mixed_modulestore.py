@@ -26,6 +26,7 @@ from openedx_events.content_authoring.signals import (
 )
 from openedx_events.tests.utils import OpenEdxEventsTestMixin
 import pymongo
+from bson.objectid import ObjectId
 import pytest
 # Mixed modulestore depends on django, so we'll manually configure some django settings
 # before importing the module
@@ -1063,6 +1064,34 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         assert not self._has_changes(locations['grandparent'])
         assert not self._has_changes(locations['parent'])
 
+    @ddt.data(ModuleStoreEnum.Type.split)
+    def test_get_changed_block_keys(self, default_ms):
+        """
+        Tests that get_changed_block_keys() returns the published blocks which changed since a previous version.
+        """
+        locations = self.setup_has_changes(default_ms)
+        course_key = self.course.id
+        with self.store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+            previous_version = self.store.get_course(course_key).course_version
+            assert self.store.get_changed_block_keys(course_key, previous_version) == set()
+
+        # Change the child and add a new one to its parent, then publish them
+        child = self.store.get_item(locations['child'])
+        child.display_name = 'Changed Display Name'
+        self.store.update_item(child, self.user_id)
+        new_child = self.store.create_child(self.user_id, locations['parent'], 'vertical', block_id='new_child')
+        self.store.publish(locations['parent'], self.user_id)
+
+        with self.store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+            changed_block_keys = self.store.get_changed_block_keys(course_key, previous_version)
+        assert changed_block_keys == {
+            location.for_branch(None)
+            for location in [locations['parent'], locations['child'], new_child.location]
+        }
+
+        # Unknown previous versions can't be compared
+        assert self.store.get_changed_block_keys(course_key, ObjectId()) is None
+
     @ddt.data(ModuleStoreEnum.Type.split)
     def test_has_changes_non_direct_only_children(self, default_ms):
         """
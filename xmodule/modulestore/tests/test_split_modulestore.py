@@ -5,6 +5,7 @@
 
 import datetime
 import os
+import pickle
 import random
 import re
 import unittest
@@ -841,23 +842,56 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         assert cached_structure == not_cached_structure
 
     @patch('xmodule.modulestore.split_mongo.mongo_connection.monitoring.set_custom_attribute')
-    @patch('django.core.cache.cache.set')
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
-    def test_course_structure_cache_with_data_chunk_greater_than_two_mb(self, mock_get_cache, mock_set_cache,
+    def test_course_structure_cache_with_data_chunk_greater_than_two_mb(self, mock_get_cache,
                                                                         mock_set_custom_attribute):
         enabled_cache = caches['default']
         mock_get_cache.return_value = enabled_cache
 
         course_cache = CourseStructureCache()
 
-        size = 3000000000
-        # this data_chunk will be compressed before being cached
-        data_chunk = b'\x00' * size
+        # random data doesn't compress, so this will need several chunks
+        data_chunk = os.urandom(5 * 1024 * 1024)
 
         course_cache.set('my_data_chunk', data_chunk)
-        mock_set_cache.assert_not_called()
         mock_set_custom_attribute.assert_called()
 
+        manifest = enabled_cache.get('my_data_chunk')
+        assert len(manifest['chunks']) > 1
+        # Each chunk fits in a memcached item of the default maximum size
+        for chunk_key in manifest['chunks']:
+            assert len(pickle.dumps(enabled_cache.get(chunk_key))) + len(chunk_key) < 1024 * 1024
+        assert course_cache.get('my_data_chunk') == data_chunk
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_with_missing_chunk(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+
+        course_cache = CourseStructureCache()
+        data_chunk = os.urandom(5 * 1024 * 1024)
+        course_cache.set('my_data_chunk', data_chunk)
+
+        # evict one of the chunks: the structure must be treated as a cache miss
+        manifest = enabled_cache.get('my_data_chunk')
+        enabled_cache.delete(manifest['chunks'][-1])
+        assert course_cache.get('my_data_chunk') is None
+        assert enabled_cache.get('my_data_chunk') is None
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_with_corrupt_chunk(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+
+        course_cache = CourseStructureCache()
+        data_chunk = os.urandom(5 * 1024 * 1024)
+        course_cache.set('my_data_chunk', data_chunk)
+
+        manifest = enabled_cache.get('my_data_chunk')
+        enabled_cache.set(manifest['chunks'][0], b'bad_data')
+        assert course_cache.get('my_data_chunk') is None
+        assert enabled_cache.get('my_data_chunk') is None
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.monitoring.set_custom_attribute')
     @patch('django.core.cache.cache.set')
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
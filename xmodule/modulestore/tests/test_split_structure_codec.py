@@ -0,0 +1,43 @@
+"""
+Tests for the split modulestore structure cache codec.
+"""
+
+
+from unittest import TestCase
+
+from openedx.core.lib import cache_codecs
+from xmodule.modulestore.perf_tests.generate_structure import make_structure
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_codec import SplitStructureCodec
+
+
+class TestSplitStructureCodec(TestCase):
+    """
+    Tests for SplitStructureCodec.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.structure = make_structure(500)
+
+    def test_round_trip(self):
+        serialized = cache_codecs.dumps(self.structure, SplitStructureCodec.name)
+        assert serialized.startswith(cache_codecs.HEADER_MAGIC)
+        assert cache_codecs.loads(serialized) == self.structure
+
+    def test_round_trip_with_external_references(self):
+        block_key = next(iter(self.structure['blocks']))
+        block = self.structure['blocks'][block_key]
+        # a reference to a block which isn't in the structure
+        block.fields['reference'] = BlockKey('problem', 'elsewhere')
+        block.fields['reference_list'] = [BlockKey('problem', 'elsewhere'), block_key]
+        block.block_type = 'other'
+
+        deserialized = cache_codecs.loads(cache_codecs.dumps(self.structure, SplitStructureCodec.name))
+        assert deserialized == self.structure
+        assert isinstance(deserialized['blocks'][block_key].fields['reference'], BlockKey)
+        assert deserialized['blocks'][block_key].block_type == 'other'
+
+    def test_smaller_than_legacy_format(self):
+        serialized = cache_codecs.dumps(self.structure, SplitStructureCodec.name)
+        assert len(serialized) < len(cache_codecs.dumps(self.structure, cache_codecs.ZPickleCodec.name))
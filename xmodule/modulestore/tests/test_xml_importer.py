@@ -246,6 +246,23 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
                 'static/inner/file1.txt', base_dir=expected_base_dir
             )
 
+    def test_import_static_content_directory_concurrently(self):
+        self.static_content_importer.max_workers = 4
+        file_names = [f'file{index}.txt' for index in range(10)]
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=[('static', None, file_names)]
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file',
+            side_effect=lambda file_path, base_dir: (file_path, file_path.upper()),
+        ) as patched_import_static_file:
+            remap_dict = self.static_content_importer.import_static_content_directory('static')
+
+        assert patched_import_static_file.call_count == len(file_names)
+        assert list(remap_dict.items()) == [
+            (f'static/{file_name}', f'STATIC/{file_name.upper()}') for file_name in file_names
+        ]
+
     def test_import_static_file(self):
         base_dir = path('/path/to/dir')
         full_file_path = os.path.join(base_dir, 'static/some_file.txt')
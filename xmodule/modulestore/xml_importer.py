@@ -27,7 +27,10 @@ import mimetypes
 import os
 import re
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from time import perf_counter
 
 import xblock
 from django.core.exceptions import ObjectDoesNotExist
@@ -120,11 +123,18 @@ class LocationMixin(XBlockMixin):
         )
 
 
-class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, static_content_store, course_data_path, target_id):
+class StaticContentImporter:
+    """
+    Imports the static files of a course directory into the static content store.
+
+    When `max_workers` is greater than 1, the files are read, hashed, thumbnailed
+    and saved into the static content store by a pool of `max_workers` threads.
+    """
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=1):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.max_workers = max_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -141,6 +151,7 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -151,15 +162,27 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            """
+            Import the static file at `file_path`.
+            """
+            if verbose:
+                log.debug('importing static content %s...', file_path)
+            return self.import_static_file(file_path, base_dir=static_dir)
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+        if self.max_workers > 1 and len(file_paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                all_imported_file_attrs = list(executor.map(import_file, file_paths))
+        else:
+            all_imported_file_attrs = [import_file(file_path) for file_path in file_paths]
+
+        for imported_file_attrs in all_imported_file_attrs:
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
 
         return remap_dict
 
@@ -259,6 +282,11 @@ class ImportManager:
             create this file to implement custom logic in their course.
 
         default_class, load_error_blocks: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_content_workers: The number of threads which import the static files concurrently.
+
+        stage_timings: If specified, a dict to which the durations in seconds of the stages of the import
+            are added, by stage name.
     """
     store_class = XMLModuleStore
 
@@ -271,6 +299,7 @@ class ImportManager:
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_content_workers=1, stage_timings=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -286,17 +315,38 @@ class ImportManager:
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_blocks=load_error_blocks,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.static_content_workers = static_content_workers
+        self.stage_timings = stage_timings
+        with self.timed_stage('parsing'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_blocks=load_error_blocks,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    def add_stage_timing(self, stage, duration):
+        """
+        Add `duration` seconds to the time spent in the `stage` of the import.
+        """
+        if self.stage_timings is not None:
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0) + duration
+
+    @contextmanager
+    def timed_stage(self, stage):
+        """
+        Context manager which adds the time spent in its body to the `stage` of the import.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_timing(stage, perf_counter() - start)
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -319,7 +369,8 @@ class ImportManager:
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            max_workers=self.static_content_workers,
         )
         if self.do_import_static:
             if self.verbose:
@@ -570,34 +621,43 @@ class ImportManager:
             # This bulk operation wraps all the operations to populate the published branch.
             with self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+                with self.timed_stage('courselike'):
+                    source_courselike, courselike, data_path = self.get_courselike(
+                        courselike_key, runtime, dest_id
+                    )
 
                 # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                with self.timed_stage('static_content'):
+                    self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                with self.timed_stage('asset_metadata'):
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
+                children_start = perf_counter()
                 self.import_children(source_courselike, courselike, courselike_key, dest_id)
+            # The blocks are only written to some modulestores at the end of the bulk operation.
+            self.add_stage_timing('children', perf_counter() - children_start)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self.timed_stage('drafts'), self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
-            with self.store.bulk_operations(dest_id):
+            with self.timed_stage('tags'), self.store.bulk_operations(dest_id):
                 try:
                     self.import_tags(data_path, dest_id)
                 except FileNotFoundError:
                     logging.info(f'Course import {dest_id}: No tags.csv file present.')
                 except ValueError as e:
                     logging.info(f'Course import {dest_id}: {str(e)}')
-            self.post_course_import(dest_id)
+            with self.timed_stage('post_import'):
+                self.post_course_import(dest_id)
             yield courselike
 
 
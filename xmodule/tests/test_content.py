@@ -8,7 +8,7 @@ import ddt
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 
-from xmodule.contentstore.content import ContentStore, StaticContent, StaticContentStream
+from xmodule.contentstore.content import STREAM_DATA_CHUNK_SIZE, ContentStore, StaticContent, StaticContentStream
 
 SAMPLE_STRING = """
 This is a sample string with more than 1024 bytes, the default STREAM_DATA_CHUNK_SIZE
@@ -202,3 +202,28 @@ class ContentTest(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-c
             total_length += len(chunck)
 
         assert total_length == ((last_byte - first_byte) + 1)
+
+    @ddt.data(None, 256, 1000)
+    def test_static_content_stream_stream_data_in_range_chunks(self, chunk_size):
+        """
+        Test StaticContentStream stream_data_in_range function, asserts that
+        the reads are aligned on the chunks of the underlying GridFS file.
+        """
+        item = FakeGridFsItem(SAMPLE_STRING)
+        item.chunk_size = chunk_size
+        static_content_stream = StaticContentStream('loc', 'name', 'type', item, length=item.length)
+
+        chunks = list(static_content_stream.stream_data_in_range(100, 1500))
+
+        assert ''.join(chunks) == SAMPLE_STRING[100:1501]
+        expected_chunk_size = chunk_size or STREAM_DATA_CHUNK_SIZE
+        assert len(chunks[0]) == expected_chunk_size - 100 % expected_chunk_size
+        assert all(len(chunk) == expected_chunk_size for chunk in chunks[1:-1])
+
+    def test_static_content_stream_data_in_range(self):
+        """
+        Test StaticContent stream_data_in_range function, asserts that we get the requested bytes
+        """
+        static_content = StaticContent('loc', 'name', 'type', SAMPLE_STRING)
+
+        assert ''.join(static_content.stream_data_in_range(100, 1500)) == SAMPLE_STRING[100:1501]